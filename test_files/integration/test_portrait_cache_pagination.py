@@ -42,7 +42,17 @@ def mock_database():
         """Mock count."""
         return len(portraits)
     
+    def list_portraits_with_client_paginated(page=1, page_size=50, **kwargs):
+        """Mock paginated list joined with client and active video."""
+        return [
+            {**portrait, "client_name": f"Client {portrait['client_id']}", "client_phone": None,
+             "active_video_id": None, "active_video_description": None}
+            for portrait in list_portraits_paginated(page, page_size)
+        ]
+    
     db.list_portraits_paginated = list_portraits_paginated
+    db.list_portraits_with_client_paginated = list_portraits_with_client_paginated
+    db.list_videos_for_portraits = lambda portrait_ids: {}
     db.count_portraits = count_portraits
     db.list_portraits = lambda **kwargs: portraits
     db.get_portrait = lambda portrait_id: next((p for p in portraits if p["id"] == portrait_id), None)
@@ -63,7 +73,7 @@ def mock_cache():
         key = ":".join(str(p) for p in key_parts)
         return cache._storage.get(key)
     
-    async def mock_set(value, *key_parts, ttl=None):
+    async def mock_set(value, *key_parts, ttl=None, tags=None):
         key = ":".join(str(p) for p in key_parts)
         cache._storage[key] = value
         return True
@@ -260,18 +270,20 @@ class TestPortraitCaching:
                 # Cache should be cleared
                 assert mock_invalidate.called
     
-    def test_preview_not_cached(self, test_app, mock_cache):
-        """Test that requests with preview data are not cached."""
+    def test_preview_urls_cached(self, test_app, mock_cache):
+        """Test that preview requests return URLs and are cached like other pages."""
         client = TestClient(test_app)
         
         with patch("app.api.portraits.get_current_user", return_value="testuser"):
             # Request with preview
             response = client.get("/portraits/?page=1&page_size=10&include_preview=true")
             
-            # Preview requests should not be cached (too large)
-            # Check that cache set was not called for preview data
-            # This is implementation-specific - our code checks include_preview flag
             assert response.status_code == 200
+            item = response.json()["items"][0]
+            # Previews are referenced by URL instead of inlined base64 data
+            assert "image_preview_url" in item
+            assert "image_preview_data" not in item
+            assert len(mock_cache._storage) > 0
 
 
 class TestAdminPortraitPreview:
@@ -489,13 +489,28 @@ class TestFolderBasedOrganization:
 class TestYandexFileAccess:
     """Test file access through Yandex Disk proxy endpoints."""
     
-    @patch("app.api.yandex_disk.YandexDiskStorageAdapter")
-    def test_serve_file_from_yandex(self, mock_adapter_class, client):
+    @staticmethod
+    def _mock_adapter(content: bytes) -> Mock:
+        """Adapter streaming ``content`` in two ranges."""
+        async def iter_download(href, start, end):
+            data = content[start:end + 1]
+            yield data[:4]
+            yield data[4:]
+        
+        mock_adapter = Mock()
+        mock_adapter.get_download_info = AsyncMock(return_value={
+            "href": "https://downloader.disk.yandex.ru/...",
+            "size": len(content),
+            "mime_type": "image/jpeg",
+        })
+        mock_adapter.iter_download = iter_download
+        return mock_adapter
+    
+    @patch("app.api.yandex_disk.get_yandex_adapter")
+    def test_serve_file_from_yandex(self, mock_get_adapter, client):
         """Test serving files through Yandex proxy endpoint."""
         # Mock adapter
-        mock_adapter = Mock()
-        mock_adapter.get_file = AsyncMock(return_value=b"fake file content")
-        mock_adapter_class.return_value = mock_adapter
+        mock_get_adapter.return_value = self._mock_adapter(b"fake file content")
         
         # Mock storage config
         with patch("app.api.yandex_disk.get_storage_config") as mock_config:
@@ -512,16 +527,11 @@ class TestYandexFileAccess:
             # Should return file content
             assert response.status_code in [200, 404]
     
-    @patch("app.api.yandex_disk.YandexDiskStorageAdapter")
-    def test_download_file_from_yandex(self, mock_adapter_class, client):
+    @patch("app.api.yandex_disk.get_yandex_adapter")
+    def test_download_file_from_yandex(self, mock_get_adapter, client):
         """Test downloading files through Yandex proxy endpoint."""
         # Mock adapter
-        mock_adapter = Mock()
-        mock_adapter.get_file = AsyncMock(return_value=b"fake file content")
-        mock_adapter.get_download_url = Mock(
-            return_value="https://downloader.disk.yandex.ru/..."
-        )
-        mock_adapter_class.return_value = mock_adapter
+        mock_get_adapter.return_value = self._mock_adapter(b"fake file content")
         
         # Mock storage config
         with patch("app.api.yandex_disk.get_storage_config") as mock_config:
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks of the in-memory LRU cache backend.
+
+Measures get and set latency at several cache sizes. With heap-based
+expiry the cost per operation must stay roughly flat as the cache grows.
+
+    pytest -s test_files/performance/test_cache_benchmark.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Добавляем путь к основному приложению
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "vertex-ar"))
+
+from app.cache import LRUCacheBackend
+
+CACHE_SIZES = [100, 1000, 10000]
+OPERATIONS = 20000
+
+
+async def _measure(size: int) -> tuple:
+    """Return (get, set) latency in microseconds for a full cache of given size."""
+    cache = LRUCacheBackend(max_size=size, default_ttl=300)
+    keys = [f"vertex_ar:0:portraits:list:{i}" for i in range(size)]
+    for key in keys:
+        await cache.set(key, {"id": key})
+
+    start = time.perf_counter()
+    for i in range(OPERATIONS):
+        await cache.get(keys[i % size])
+    get_us = (time.perf_counter() - start) / OPERATIONS * 1e6
+
+    start = time.perf_counter()
+    for i in range(OPERATIONS):
+        await cache.set(keys[i % size], {"id": i})
+    set_us = (time.perf_counter() - start) / OPERATIONS * 1e6
+
+    return get_us, set_us
+
+
+@pytest.mark.performance
+def test_lru_latency_independent_of_size():
+    """Get/set latency must not grow linearly with the number of entries."""
+    results = {}
+    for size in CACHE_SIZES:
+        results[size] = asyncio.run(_measure(size))
+        print(f"\n{size:6d} entries  get: {results[size][0]:6.2f} us  set: {results[size][1]:6.2f} us")
+
+    smallest, largest = CACHE_SIZES[0], CACHE_SIZES[-1]
+    # A full scan per operation would make the largest cache ~100x slower
+    assert results[largest][0] < results[smallest][0] * 10
+    assert results[largest][1] < results[smallest][1] * 10
+
+
+if __name__ == "__main__":
+    test_lru_latency_independent_of_size()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark of admin client search at 10k, 100k and 1M clients.
+
+Before the FTS5 trigram index, list_clients(search=...) and
+get_admin_records(search=...) matched LIKE '%term%' over every client and
+portrait, so each keystroke in the admin search box scanned both tables.
+The index answers substring queries from trigram postings instead.
+
+    pytest -s test_files/performance/test_client_search_benchmark.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+# Добавляем путь к основному приложению
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "vertex-ar"))
+
+from app.database import Database
+
+SIZES = [10_000, 100_000, 1_000_000]
+PAGE_SIZE = 25
+ROUNDS = 5
+# Typed fragments: a phone fragment, part of a surname, a broad email
+# fragment (11% of clients) and a term without matches
+TERMS = ["4567", "petrov12", "mail9", "qzx"]
+SELECTIVE_TERMS = ["4567", "petrov12", "qzx"]
+
+
+def _seed(db: Database, clients: int) -> None:
+    """Insert clients with one portrait each; triggers keep the indexes current."""
+    rows = (
+        (f"c{i:07d}", "vertex-ar-default", f"+7{900_000_0000 + i:010d}", f"Ivan Petrov{i}", f"user{i}@mail{i % 100}.ru")
+        for i in range(clients)
+    )
+    portraits = (
+        (f"p{i:07d}", f"c{i:07d}", "img.jpg", "", "", "", f"link-{i:07d}")
+        for i in range(clients)
+    )
+    with db._lock:
+        db._connection.executemany(
+            "INSERT INTO clients (id, company_id, phone, name, email) VALUES (?, ?, ?, ?, ?)", rows)
+        db._connection.executemany(
+            "INSERT INTO portraits (id, client_id, image_path, marker_fset, marker_fset3, marker_iset,"
+            " permanent_link) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            portraits,
+        )
+        db._connection.commit()
+    db._execute("ANALYZE")
+
+
+def _legacy_search(db: Database, term: str) -> list:
+    """Previous implementation: LIKE scan over clients, newest first."""
+    like = f"%{term}%"
+    cursor = db._execute(
+        "SELECT * FROM clients WHERE (phone LIKE ? OR name LIKE ? OR email LIKE ?)"
+        " ORDER BY created_at DESC LIMIT ?",
+        (like, like, like, PAGE_SIZE),
+    )
+    return cursor.fetchall()
+
+
+def _best_of(func, rounds: int = ROUNDS) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_search_latency():
+    """Indexed search must stay interactive at 1M clients and beat the LIKE scan on selective terms."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            db = Database(Path(tmp) / f"search_{size}.db")
+            try:
+                _seed(db, size)
+                for term in TERMS:
+                    indexed = _best_of(lambda: db.list_clients(search=term, limit=PAGE_SIZE))
+                    admin = _best_of(lambda: db.get_admin_records(search=term, limit=PAGE_SIZE))
+                    legacy = _best_of(lambda: _legacy_search(db, term), rounds=1)
+                    results[(size, term)] = (indexed, admin, legacy)
+                    print(f"\n{size:>9} clients  {term!r:>11}  fts: {indexed * 1000:7.2f} ms"
+                          f"  admin fts: {admin * 1000:7.2f} ms  like: {legacy * 1000:8.2f} ms")
+            finally:
+                db.close()
+
+    largest = SIZES[-1]
+    for term in TERMS:
+        indexed, admin, legacy = results[(largest, term)]
+        assert indexed < 0.25
+        assert admin < 0.25
+        if term in SELECTIVE_TERMS:
+            # A broad term lets LIKE stop after the first page of rows
+            assert indexed < legacy
+
+
+if __name__ == "__main__":
+    test_search_latency()
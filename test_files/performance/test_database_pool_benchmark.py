@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark of concurrent portrait lookups: single connection vs connection pool.
+
+Runs get_portrait_by_link from 1, 2, 4 and 8 threads against the same
+database, once with the shared serialized connection and once in
+connection-pool mode (WAL writer plus per-thread readers), and prints the
+read throughput for each thread count.
+
+    pytest -s test_files/performance/test_database_pool_benchmark.py
+"""
+
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Добавляем путь к основному приложению
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "vertex-ar"))
+
+from app.database import Database
+
+PORTRAITS = 2000
+LOOKUPS_PER_THREAD = 5000
+THREAD_COUNTS = [1, 2, 4, 8]
+
+
+def _seed(db: Database) -> list:
+    db.create_client("client-1", "+70000000000", "Benchmark Client")
+    links = []
+    for i in range(PORTRAITS):
+        link = f"portrait_{i}"
+        db.create_portrait(
+            portrait_id=f"p{i}",
+            client_id="client-1",
+            image_path=f"portraits/client-1/p{i}.jpg",
+            marker_fset="",
+            marker_fset3="",
+            marker_iset="",
+            permanent_link=link,
+        )
+        links.append(link)
+    return links
+
+
+def _throughput(db: Database, links: list, threads: int) -> float:
+    """Return lookups per second across all threads."""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        barrier.wait()
+        for _ in range(LOOKUPS_PER_THREAD):
+            assert db.get_portrait_by_link(rng.choice(links)) is not None
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return threads * LOOKUPS_PER_THREAD / (time.perf_counter() - start)
+
+
+@pytest.mark.performance
+def test_concurrent_read_throughput():
+    """Compare read throughput of the shared connection and the pool."""
+    with tempfile.TemporaryDirectory() as tmp:
+        single = Database(Path(tmp) / "single.db")
+        pooled = Database(Path(tmp) / "pooled.db", reader_connections=max(THREAD_COUNTS))
+        try:
+            links = _seed(single)
+            _seed(pooled)
+
+            results = {}
+            for threads in THREAD_COUNTS:
+                results[threads] = (_throughput(single, links, threads), _throughput(pooled, links, threads))
+                print(
+                    f"\n{threads} threads  single: {results[threads][0]:9.0f} ops/s"
+                    f"  pooled: {results[threads][1]:9.0f} ops/s"
+                )
+        finally:
+            single.close()
+            pooled.close()
+
+    top = max(THREAD_COUNTS)
+    # The shared connection serializes every read; the pool must not
+    assert results[top][1] > results[top][0]
+
+
+if __name__ == "__main__":
+    test_concurrent_read_throughput()
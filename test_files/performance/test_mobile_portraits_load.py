@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Load test of the mobile portrait list query from 100 to 100k portraits.
+
+The old endpoint listed every portrait of the tenant, looked up the client
+and active video of each one and then sliced the Python list, so its cost
+grew with the tenant. list_portraits_for_mobile filters and paginates in
+SQL with a (created_at, id) keyset, so a page costs the same at any size.
+
+    pytest -s test_files/performance/test_mobile_portraits_load.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+# Добавляем путь к основному приложению
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "vertex-ar"))
+
+from app.database import Database
+
+SIZES = [100, 1_000, 10_000, 100_000]
+LEGACY_MAX_SIZE = 10_000
+PAGE_SIZE = 20
+ROUNDS = 5
+
+
+def _seed(db: Database, portraits: int) -> None:
+    """Insert portraits over 100 clients; every other portrait has an active video."""
+    clients = [(f"c{i}", "vertex-ar-default", f"+7{i:010d}", f"Client {i}") for i in range(100)]
+    rows = [
+        (f"p{i:06d}", f"c{i % 100}", f"/storage/p{i}.jpg", "", "", "", f"link{i}",
+         f"2024-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}")
+        for i in range(portraits)
+    ]
+    videos = [(f"v{i:06d}", f"p{i:06d}", f"/storage/v{i}.mp4", 1) for i in range(0, portraits, 2)]
+    with db._lock:
+        db._connection.executemany("INSERT INTO clients (id, company_id, phone, name) VALUES (?, ?, ?, ?)", clients)
+        db._connection.executemany(
+            "INSERT INTO portraits (id, client_id, image_path, marker_fset, marker_fset3, marker_iset,"
+            " permanent_link, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        db._connection.executemany(
+            "INSERT INTO videos (id, portrait_id, video_path, is_active) VALUES (?, ?, ?, ?)", videos
+        )
+        db._connection.commit()
+    db._execute("ANALYZE")
+
+
+def _legacy_page(db: Database, company_id: str) -> list:
+    """Previous implementation: load the tenant, two lookups per portrait, slice."""
+    portraits = []
+    for client in db.list_clients(company_id=company_id):
+        portraits.extend(db.list_portraits(client_id=client["id"]))
+    result = []
+    for portrait in portraits:
+        client = db.get_client(portrait["client_id"])
+        active_video = db.get_active_video(portrait["id"])
+        if client and active_video:
+            result.append(portrait)
+    return result[PAGE_SIZE:PAGE_SIZE * 2]
+
+
+def _best_of(func, rounds: int = ROUNDS) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.mark.performance
+def test_page_latency_flat_in_tenant_size():
+    """A cursor page must cost about the same at 100 and 100k portraits."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            db = Database(Path(tmp) / f"mobile_{size}.db")
+            try:
+                _seed(db, size)
+                first = db.list_portraits_for_mobile(limit=PAGE_SIZE, company_id="vertex-ar-default")
+                after = (first[-1]["created_at"], first[-1]["id"])
+
+                keyset = _best_of(lambda: db.list_portraits_for_mobile(
+                    limit=PAGE_SIZE + 1, company_id="vertex-ar-default", after=after))
+                legacy = None
+                if size <= LEGACY_MAX_SIZE:
+                    assert [p["id"] for p in _legacy_page(db, "vertex-ar-default")]
+                    legacy = _best_of(lambda: _legacy_page(db, "vertex-ar-default"), rounds=1)
+                results[size] = keyset
+                legacy_text = f"{legacy * 1000:9.1f} ms" if legacy is not None else "      n/a"
+                print(f"\n{size:>7} portraits  keyset page: {keyset * 1000:6.2f} ms  legacy page: {legacy_text}")
+            finally:
+                db.close()
+
+    # Page cost must not track tenant size (1000x more rows)
+    assert results[SIZES[-1]] < max(results[SIZES[0]] * 10, 0.005)
+
+
+if __name__ == "__main__":
+    test_page_latency_flat_in_tenant_size()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the NFT marker engines: pure Python vs NumPy.
+
+Measures .fset/.iset generation time on 1, 12 and 50 megapixel inputs and
+checks that both engines write byte-identical files.
+
+The 12 and 50 MP cases take minutes on the Python engine and are only run
+with NFT_BENCHMARK_FULL=1:
+
+    NFT_BENCHMARK_FULL=1 pytest -s test_files/performance/test_nft_marker_benchmark.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+# Добавляем путь к основному приложению
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "vertex-ar"))
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError as e:
+    pytest.skip(f"Missing dependencies: {e}", allow_module_level=True)
+
+from nft_marker_generator import NFTMarkerConfig, NFTMarkerGenerator
+
+# Megapixels -> (width, height); 50 MP stays under the default max_image_area
+SIZES = {
+    1: (1224, 816),
+    12: (4240, 2832),
+    50: (8160, 6120),
+}
+
+FULL_RUN = os.getenv("NFT_BENCHMARK_FULL") == "1"
+
+
+def _make_image(path: Path, size) -> Path:
+    """Create a JPEG with smooth gradients and noisy texture."""
+    width, height = size
+    rng = np.random.default_rng(42)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :].repeat(height, axis=0)
+    noise = rng.integers(0, 64, size=(height, width), dtype=np.uint8)
+    channel = (gradient + noise).clip(0, 255).astype(np.uint8)
+    Image.fromarray(np.stack([channel, channel[::-1], noise * 3], axis=-1), "RGB").save(path, "JPEG", quality=90)
+    return path
+
+
+def _time_engine(use_numpy: bool, image_path: Path, out_dir: Path, config: NFTMarkerConfig):
+    generator = NFTMarkerGenerator(out_dir, enable_cache=False, use_numpy=use_numpy)
+    fset_path = out_dir / "marker.fset"
+    iset_path = out_dir / "marker.iset"
+
+    start = time.perf_counter()
+    generator._generate_fset(image_path, fset_path, config)
+    fset_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    generator._generate_iset(image_path, iset_path, config)
+    iset_time = time.perf_counter() - start
+
+    return fset_time, iset_time, fset_path.read_bytes(), iset_path.read_bytes()
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("megapixels", [
+    1,
+    pytest.param(12, marks=[pytest.mark.slow, pytest.mark.skipif(not FULL_RUN, reason="set NFT_BENCHMARK_FULL=1")]),
+    pytest.param(50, marks=[pytest.mark.slow, pytest.mark.skipif(not FULL_RUN, reason="set NFT_BENCHMARK_FULL=1")]),
+])
+def test_marker_engine_benchmark(megapixels):
+    """Compare Python and NumPy engines on one input size."""
+    config = NFTMarkerConfig(feature_density="high", levels=3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        image_path = _make_image(tmp_dir / "source.jpg", SIZES[megapixels])
+
+        py_fset, py_iset, py_fset_bytes, py_iset_bytes = _time_engine(False, image_path, tmp_dir / "python", config)
+        np_fset, np_iset, np_fset_bytes, np_iset_bytes = _time_engine(True, image_path, tmp_dir / "numpy", config)
+
+    print(
+        f"\n{megapixels:>3} MP  fset: python {py_fset:7.2f}s  numpy {np_fset:6.2f}s  x{py_fset / np_fset:5.1f}"
+        f"   iset: python {py_iset:7.2f}s  numpy {np_iset:6.2f}s  x{py_iset / np_iset:5.1f}"
+    )
+
+    assert np_fset_bytes == py_fset_bytes
+    assert np_iset_bytes == py_iset_bytes
+    assert np_fset < py_fset
+
+
+if __name__ == "__main__":
+    for mp in SIZES:
+        test_marker_engine_benchmark(mp)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Load test: concurrent uploads against the latency of an unrelated GET endpoint.
+
+Storage adapters used to write files on the event loop, so every upload
+stalled all in-flight requests. They now run blocking I/O on a bounded
+per-adapter executor. The disk is simulated as slow (20 ms per write) so the
+difference does not depend on the machine running the test.
+
+    pytest -s test_files/performance/test_storage_io_load.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+# Добавляем путь к основному приложению
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "vertex-ar"))
+
+from app.storage_local import LocalStorageAdapter
+
+SLOW_WRITE_SECONDS = 0.02
+UPLOADS = 40
+UPLOAD_CONCURRENCY = 8
+GETS = 200
+GET_INTERVAL = 0.005
+PAYLOAD = b"x" * 256 * 1024
+
+
+class SlowDiskAdapter(LocalStorageAdapter):
+    """Local adapter on a disk that takes SLOW_WRITE_SECONDS per write."""
+
+    @staticmethod
+    def _write_file(full_path: Path, file_data: bytes) -> None:
+        time.sleep(SLOW_WRITE_SECONDS)
+        LocalStorageAdapter._write_file(full_path, file_data)
+
+
+class InlineSlowDiskAdapter(SlowDiskAdapter):
+    """Previous behaviour: the write runs on the event loop."""
+
+    async def save_file(self, file_data: bytes, file_path: str) -> str:
+        self._write_file(self.storage_root / file_path, file_data)
+        return file_path
+
+
+def _build_app(storage) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/upload/{name}")
+    async def upload(name: str, request: Request):
+        await storage.save_file(await request.body(), f"uploads/{name}")
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+async def _measure(storage) -> float:
+    """Return p99 latency of GET /health while uploads are in flight."""
+    transport = httpx.ASGITransport(app=_build_app(storage))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+        async def upload(i: int):
+            async with semaphore:
+                response = await client.post(f"/upload/{i}", content=PAYLOAD)
+                assert response.status_code == 200
+
+        async def get(scheduled: float) -> float:
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            response = await client.get("/health")
+            assert response.status_code == 200
+            # Measured from the planned send time, as a client would see it
+            return time.perf_counter() - scheduled
+
+        start = time.perf_counter()
+        uploads = asyncio.gather(*(upload(i) for i in range(UPLOADS)))
+        latencies = await asyncio.gather(*(get(start + i * GET_INTERVAL) for i in range(GETS)))
+        await uploads
+
+    latencies = sorted(latencies)
+    return latencies[int(len(latencies) * 0.99) - 1]
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_uploads_do_not_inflate_get_latency(tmp_path):
+    """p99 of an unrelated GET must not grow with the upload backlog."""
+    inline_p99 = await _measure(InlineSlowDiskAdapter(tmp_path / "inline"))
+    offloaded_p99 = await _measure(SlowDiskAdapter(tmp_path / "offloaded"))
+    print(f"\nGET /health p99 during uploads: inline {inline_p99 * 1000:.1f} ms,"
+          f" executor {offloaded_p99 * 1000:.1f} ms")
+
+    # Inline writes queue every GET behind the whole upload backlog
+    assert inline_p99 >= SLOW_WRITE_SECONDS * UPLOAD_CONCURRENCY
+    assert offloaded_p99 < SLOW_WRITE_SECONDS * 2
+    assert offloaded_p99 < inline_p99 / 10
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(test_uploads_do_not_inflate_get_latency(Path(tmp)))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark of video thumbnail extraction on 1080p and 4K clips.
+
+Compares the legacy path (bytes copied to a temp file, frame-index seek,
+full-resolution blur, then thumbnail) against VideoPreviewEngine, which
+seeks by timestamp to the nearest keyframe (PyAV) or exactly (OpenCV
+fallback) and downscales before any other work.
+
+    pytest -s test_files/performance/test_video_preview_benchmark.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+import numpy as np
+from PIL import Image
+
+# Добавляем путь к основному приложению
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "vertex-ar"))
+
+from preview_generator import AV_AVAILABLE, VideoPreviewEngine
+
+CLIPS = {"1080p": (1920, 1080), "4k": (3840, 2160)}
+FPS = 30
+SECONDS = 4
+ROUNDS = 3
+
+
+def _write_clip(path: Path, width: int, height: int) -> None:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), FPS, (width, height))
+    if not writer.isOpened():
+        pytest.skip("OpenCV build cannot encode mp4v")
+    gradient = np.tile(np.linspace(0, 255, width, dtype=np.uint8), (height, 1))
+    for index in range(FPS * SECONDS):
+        frame = np.dstack([gradient, np.roll(gradient, index * 8, axis=1), np.full_like(gradient, index % 256)])
+        writer.write(frame)
+    writer.release()
+
+
+def _legacy_preview(video_bytes: bytes, size=(300, 300)) -> bytes:
+    """Previous implementation: temp copy, frame-index seek, full-res blur."""
+    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as temp_video:
+        temp_video.write(video_bytes)
+        temp_path = temp_video.name
+    try:
+        cap = cv2.VideoCapture(temp_path)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) // 2)
+        ret, frame = cap.read()
+        cap.release()
+        assert ret
+        frame = cv2.GaussianBlur(frame, (3, 3), 0)
+        image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+        preview = Image.new("RGB", size, (0, 0, 0))
+        preview.paste(image, ((size[0] - image.size[0]) // 2, (size[1] - image.size[1]) // 2))
+        buffer = BytesIO()
+        preview.save(buffer, format="WEBP", quality=85, method=6)
+        return buffer.getvalue()
+    finally:
+        os.unlink(temp_path)
+
+
+def _best_of(func) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.fixture(scope="module")
+def clips(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("video_preview_benchmark")
+    paths = {}
+    for name, (width, height) in CLIPS.items():
+        paths[name] = directory / f"{name}.mp4"
+        _write_clip(paths[name], width, height)
+    return paths
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("clip", list(CLIPS))
+def test_engine_faster_than_legacy(clips, clip):
+    """Timestamp seek + early downscale must beat the legacy single-size path."""
+    path = clips[clip]
+    engine = VideoPreviewEngine(sizes={"preview": (300, 300)})
+    fallback = VideoPreviewEngine(sizes={"preview": (300, 300)}, keyframe_seek=False)
+
+    legacy = _best_of(lambda: _legacy_preview(path.read_bytes()))
+    single = _best_of(lambda: engine.render(path))
+    exact = _best_of(lambda: fallback.render(path))
+    print(f"\n{clip}: legacy {legacy * 1000:7.1f} ms  engine {single * 1000:7.1f} ms  opencv {exact * 1000:7.1f} ms")
+
+    assert engine.render(path).previews["preview"]
+    assert fallback.render(path).previews["preview"]
+    if AV_AVAILABLE:
+        # A keyframe seek decodes one frame instead of the whole GOP prefix
+        assert single < legacy
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("clip", list(CLIPS))
+def test_full_set_single_pass(clips, clip):
+    """300px, 600px, poster and a short animation from one open of the file."""
+    path = clips[clip]
+    engine = VideoPreviewEngine(poster_size=(1280, 1280), animation_frames=6)
+
+    elapsed = _best_of(lambda: engine.render(path))
+    result = engine.render(path)
+    print(f"\n{clip}: full set {elapsed * 1000:7.1f} ms, animation {len(result.animation or b'')} bytes")
+
+    assert set(result.previews) == {"small", "medium"}
+    assert Image.open(BytesIO(result.previews["medium"])).size == (600, 600)
+    assert max(Image.open(BytesIO(result.poster)).size) == 1280
+    animation = Image.open(BytesIO(result.animation))
+    assert getattr(animation, "n_frames", 1) > 1
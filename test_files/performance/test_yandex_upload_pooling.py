@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: 100 MB multi-chunk Yandex Disk upload, per-chunk connections vs
+the pooled keep-alive transports.
+
+Chunks used to be sent with module-level ``requests.put``, which opens a new
+connection for every chunk. They now go through a pooled client. A local
+HTTP/1.1 server stands in for the upload host. It adds HANDSHAKE_SECONDS to
+every new connection to model the TCP and TLS round trips of a remote host,
+so the result does not depend on the network the test runs on.
+
+    pytest -s test_files/performance/test_yandex_upload_pooling.py
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+# Добавляем путь к основному приложению
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "vertex-ar"))
+
+from app.storage_yandex import YandexDiskStorageAdapter
+from app.yandex_transport import RequestsTransport
+
+HANDSHAKE_SECONDS = 0.05
+UPLOAD_SIZE = 100 * 1024 * 1024
+CHUNK_SIZE_MB = 5
+UPLOAD_CONCURRENCY = 3
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    """Keep-alive upload host with a simulated handshake per connection."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        time.sleep(HANDSHAKE_SECONDS)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_PUT(self):
+        remaining = int(self.headers["Content-Length"])
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1024 * 1024)))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class UnpooledTransport(RequestsTransport):
+    """Previous behaviour: a new connection for every chunk."""
+
+    async def put(self, url, data, headers=None):
+        def call():
+            response = requests.put(url, data=data, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            return response.status_code
+        return await self.io.run(call)
+
+
+def _start_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), UploadHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/upload"
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return server
+
+
+def _make_adapter(client: str) -> YandexDiskStorageAdapter:
+    with patch('app.storage_yandex.YandexDiskStorageAdapter._create_session', return_value=MagicMock()), \
+            patch('app.storage_yandex.YandexDiskStorageAdapter._ensure_directory_exists_sync'):
+        adapter = YandexDiskStorageAdapter(
+            oauth_token="benchmark",
+            chunk_size_mb=CHUNK_SIZE_MB,
+            upload_concurrency=UPLOAD_CONCURRENCY,
+            http_client="requests" if client == "unpooled" else client,
+        )
+    if client == "unpooled":
+        adapter.transfer.close()
+        adapter.transfer = UnpooledTransport(adapter._io, adapter.timeout)
+    return adapter
+
+
+async def _measure(client: str, payload: bytes):
+    """Return (seconds, new connections) for one upload of payload."""
+    server = _start_server()
+    adapter = _make_adapter(client)
+    try:
+        start = time.perf_counter()
+        assert await adapter._chunked_upload(payload, server.url)
+        return time.perf_counter() - start, server.connections
+    finally:
+        adapter.transfer.close()
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_pooled_upload_skips_per_chunk_handshakes():
+    """Pooled transports open at most one connection per parallel chunk."""
+    payload = b"\0" * UPLOAD_SIZE
+    chunks = UPLOAD_SIZE // (CHUNK_SIZE_MB * 1024 * 1024)
+
+    results = {client: await _measure(client, payload) for client in ("unpooled", "requests", "aiohttp")}
+    print(f"\n{UPLOAD_SIZE // (1024 * 1024)} MB in {chunks} chunks,"
+          f" {HANDSHAKE_SECONDS * 1000:.0f} ms per handshake:")
+    for client, (seconds, connections) in results.items():
+        print(f"  {client:>9}: {seconds:.2f} s, {connections} connections")
+
+    unpooled_seconds, unpooled_connections = results["unpooled"]
+    assert unpooled_connections == chunks
+    for client in ("requests", "aiohttp"):
+        seconds, connections = results[client]
+        assert connections <= UPLOAD_CONCURRENCY
+        # Each parallel lane saves a handshake on every chunk after its first
+        assert seconds < unpooled_seconds - HANDSHAKE_SECONDS * (chunks - connections) / UPLOAD_CONCURRENCY / 2
+
+
+if __name__ == "__main__":
+    asyncio.run(test_pooled_upload_skips_per_chunk_handshakes())
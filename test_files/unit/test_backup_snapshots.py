@@ -0,0 +1,342 @@
+"""
+Tests for incremental storage snapshots: manifests, the content-addressed
+chunk store, restore of any snapshot and retention of shared chunks.
+"""
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import requests
+
+from backup_manager import BackupManager, _chunk_store_lock
+from remote_storage import RemoteStorage, YandexDiskStorage
+
+CHUNK_MB = 1 / 1024  # 1 KiB chunks
+
+
+@pytest.fixture
+def storage_path(tmp_path):
+    storage = tmp_path / "storage"
+    (storage / "portraits" / "order-1").mkdir(parents=True)
+    (storage / "empty").mkdir()
+    (storage / "portraits" / "order-1" / "image.jpg").write_bytes(os.urandom(3000))
+    (storage / "portraits" / "order-1" / "video.mp4").write_bytes(os.urandom(5000))
+    (storage / "notes.txt").write_text("first")
+    return storage
+
+
+@pytest.fixture
+def manager(tmp_path, storage_path):
+    db_path = tmp_path / "test.db"
+    sqlite3.connect(str(db_path)).close()
+    manager = BackupManager(tmp_path / "backups", db_path, storage_path, max_backups=2)
+    with patch.object(manager, "_get_backup_settings", return_value={
+        "storage_backup_mode": "incremental",
+        "snapshot_chunk_size_mb": CHUNK_MB,
+    }):
+        yield manager
+
+
+def _chunk_count(manager):
+    return len(list(manager.chunk_dir.glob("*/*")))
+
+
+def _tree(root: Path):
+    return {
+        path.relative_to(root).as_posix(): path.read_bytes() if path.is_file() else None
+        for path in root.rglob("*")
+    }
+
+
+class TestCreateSnapshot:
+    """Only new or changed files are read and written."""
+
+    def test_first_snapshot(self, manager, storage_path):
+        result = manager.backup_storage()
+
+        assert result["success"]
+        metadata = result["metadata"]
+        assert metadata["mode"] == "incremental"
+        assert metadata["file_count"] == 3
+        assert metadata["new_files"] == 3
+        assert metadata["new_bytes"] == metadata["total_size"] == 8005
+        assert Path(result["backup_path"]).exists()
+        assert manager.snapshot_id_from_path(Path(result["backup_path"])) == result["snapshot_id"]
+
+        manifest = manager.load_snapshot_manifest(result["snapshot_id"])
+        video = next(entry for entry in manifest["files"] if entry["path"].endswith("video.mp4"))
+        assert set(video) >= {"path", "size", "mtime", "hash", "chunks"}
+        assert len(video["chunks"]) == 5
+        assert "empty" in manifest["directories"]
+
+    def test_unchanged_files_not_read(self, manager, storage_path):
+        manager.backup_storage()
+        (storage_path / "notes.txt").write_text("second")
+        (storage_path / "new.txt").write_text("new")
+
+        with patch.object(manager, "_store_file", wraps=manager._store_file) as store:
+            result = manager.backup_storage()
+
+        assert sorted(call.args[0].name for call in store.call_args_list) == ["new.txt", "notes.txt"]
+        metadata = result["metadata"]
+        assert (metadata["new_files"], metadata["changed_files"], metadata["unchanged_files"]) == (1, 1, 2)
+        assert metadata["new_bytes"] == len("second") + len("new")
+        assert metadata["parent"] is not None
+
+    def test_identical_content_stored_once(self, manager, storage_path):
+        data = (storage_path / "portraits" / "order-1" / "video.mp4").read_bytes()
+        (storage_path / "copy.mp4").write_bytes(data)
+
+        result = manager.backup_storage()
+
+        assert result["metadata"]["new_bytes"] == 8005
+        assert _chunk_count(manager) == 3 + 5 + 1
+
+    def test_full_backup_uses_snapshot(self, manager):
+        result = manager.create_full_backup()
+        assert result["success"]
+        assert result["storage"]["snapshot_id"]
+
+    def test_archive_mode(self, manager):
+        result = manager.backup_storage(mode="archive")
+        assert result["success"]
+        assert result["metadata"]["mode"] == "archive"
+        assert manager._calculate_checksum(Path(result["backup_path"])) == result["metadata"]["checksum"]
+
+
+class TestRestoreSnapshot:
+    """Any snapshot can be reassembled from the chunk store."""
+
+    def test_restore_older_snapshot(self, manager, storage_path, tmp_path):
+        original = _tree(storage_path)
+        first = manager.backup_storage()["snapshot_id"]
+        (storage_path / "notes.txt").write_text("second")
+        (storage_path / "portraits" / "order-1" / "image.jpg").unlink()
+        manager.backup_storage()
+
+        assert manager.restore_snapshot(first, target_path=tmp_path / "restored")
+        assert _tree(tmp_path / "restored") == original
+
+    def test_restore_replaces_storage(self, manager, storage_path, tmp_path):
+        original = _tree(storage_path)
+        result = manager.backup_storage()
+        (storage_path / "notes.txt").write_text("changed")
+        (storage_path / "extra.txt").write_text("extra")
+
+        assert manager.restore_storage(Path(result["backup_path"]))
+
+        assert _tree(storage_path) == original
+        before = list(tmp_path.glob("storage_before_restore_*"))
+        assert len(before) == 1
+        assert (before[0] / "extra.txt").exists()
+
+    def test_corrupted_chunk_leaves_storage_untouched(self, manager, storage_path):
+        result = manager.backup_storage()
+        (storage_path / "notes.txt").write_text("current")
+        chunk = next(manager.chunk_dir.glob("*/*"))
+        chunk.write_bytes(b"corrupted")
+
+        assert not manager.restore_snapshot(result["snapshot_id"])
+        assert (storage_path / "notes.txt").read_text() == "current"
+        assert not list(storage_path.parent.glob(".storage_restore_*"))
+
+    def test_verify_detects_missing_chunk(self, manager):
+        result = manager.backup_storage()
+        assert manager.verify_backup(Path(result["backup_path"]))["valid"]
+
+        next(manager.chunk_dir.glob("*/*")).unlink()
+        verification = manager.verify_backup(Path(result["backup_path"]))
+        assert not verification["valid"]
+        assert len(verification["missing_chunks"]) == 1
+
+    def test_unknown_snapshot(self, manager):
+        assert manager.get_snapshot_path("../database") is None
+        assert not manager.restore_snapshot("20000101_000000")
+
+
+class TestRetention:
+    """Rotation drops old snapshots and chunks nothing references any more."""
+
+    def test_rotation_prunes_unreferenced_chunks(self, manager, storage_path, tmp_path):
+        manager.backup_storage()
+        (storage_path / "portraits" / "order-1" / "video.mp4").write_bytes(os.urandom(2000))
+        manager.backup_storage()
+        (storage_path / "notes.txt").write_text("third")
+        third = manager.backup_storage()["snapshot_id"]
+        assert _chunk_count(manager) == 3 + 5 + 1 + 2 + 1
+
+        removed = manager.rotate_backups()
+
+        assert removed["storage"] == 1
+        assert len(manager.list_snapshots()) == 2
+        # The first video and notes are gone; shared image chunks stay
+        assert _chunk_count(manager) == 3 + 1 + 2 + 1
+        assert manager.restore_snapshot(third, target_path=tmp_path / "restored")
+        assert _tree(tmp_path / "restored") == _tree(storage_path)
+
+    def test_stats_count_snapshots(self, manager):
+        manager.backup_storage()
+        stats = manager.get_backup_stats()
+        assert stats["storage_backups"] == 1
+        assert stats["storage_size_mb"] >= 0
+
+
+class TestChunkStoreLock:
+    """Pruning never races a snapshot, also in another process."""
+
+    def test_prune_keeps_temporary_and_foreign_files(self, manager):
+        manager.backup_storage()
+        bucket = next(manager.chunk_dir.glob("*/"))
+        fresh = bucket / f".{'a' * 64}.tmp"
+        stale = bucket / f".{'b' * 64}.tmp"
+        for path in (fresh, stale):
+            path.write_bytes(b"partial")
+        old = time.time() - 2 * 3600
+        os.utime(stale, (old, old))
+
+        assert manager.prune_chunks() == {"chunks": 0, "bytes": 0}
+        assert fresh.exists()
+        assert not stale.exists()
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="fork start method")
+    def test_prune_waits_for_lock_held_by_other_process(self, manager):
+        ready = multiprocessing.get_context("fork").Event()
+        holder = multiprocessing.get_context("fork").Process(
+            target=_hold_lock, args=(manager.chunk_dir / ".lock", ready, 0.5)
+        )
+        holder.start()
+        try:
+            assert ready.wait(10)
+            started = time.monotonic()
+            manager.prune_chunks()
+            assert time.monotonic() - started >= 0.3
+        finally:
+            holder.join(10)
+
+
+def _hold_lock(lock_path, ready, seconds):
+    with _chunk_store_lock(lock_path):
+        ready.set()
+        time.sleep(seconds)
+
+
+class FakeRemote(RemoteStorage):
+    """Remote with folders: uploads into a missing folder fail like on Yandex Disk."""
+
+    def __init__(self):
+        self.folders = set()
+        self.files = {}
+
+    def create_directory(self, remote_dir):
+        parts = remote_dir.split("/")
+        self.folders.update("/".join(parts[:i]) for i in range(1, len(parts) + 1))
+        return {"success": True}
+
+    def upload_file(self, local_path, remote_path):
+        if remote_path.rsplit("/", 1)[0] not in self.folders:
+            return {"success": False, "error": "409 Conflict"}
+        self.files[remote_path] = Path(local_path).read_bytes()
+        return {"success": True, "remote_path": remote_path}
+
+    def download_file(self, remote_path, local_path):
+        Path(local_path).write_bytes(self.files[remote_path])
+        return {"success": True}
+
+    def list_files(self, remote_dir=""):
+        return [{"name": path.rsplit("/", 1)[1]} for path in self.files if path.rsplit("/", 1)[0] == remote_dir]
+
+    def delete_file(self, remote_path):
+        return {"success": self.files.pop(remote_path, None) is not None}
+
+    def get_storage_info(self):
+        return {"success": True}
+
+    def test_connection(self):
+        return True
+
+
+class TestRemoteSync:
+    """Snapshots sync only missing chunks, into folders created first."""
+
+    def test_sync_uploads_missing_chunks(self, manager, storage_path):
+        remote = FakeRemote()
+        first = manager.backup_storage()
+        result = manager.sync_to_remote(Path(first["backup_path"]), remote, "backups")
+        assert result["success"], result
+        assert result["uploaded_chunks"] == 9
+
+        (storage_path / "notes.txt").write_text("second")
+        second = manager.backup_storage()
+        result = manager.sync_to_remote(Path(second["backup_path"]), remote, "backups")
+        assert (result["uploaded_chunks"], result["skipped_chunks"]) == (1, 8)
+
+    def test_yandex_folder_creation_and_paged_listing(self):
+        storage = YandexDiskStorage("token")
+        storage.LIST_PAGE_SIZE = 2
+        conflict = requests.exceptions.HTTPError(response=MagicMock(status_code=409))
+        pages = [
+            [{"type": "file", "name": "a"}, {"type": "file", "name": "b"}],
+            [{"type": "dir", "name": "c"}, {"type": "file", "name": "d"}],
+            [],
+        ]
+        calls = []
+
+        def request(method, endpoint, **kwargs):
+            calls.append((method, kwargs["params"]))
+            if method == "PUT":
+                if kwargs["params"]["path"] == "backups":
+                    raise conflict
+                return MagicMock()
+            return MagicMock(json=lambda: {"_embedded": {"items": pages[kwargs["params"]["offset"] // 2]}})
+
+        with patch.object(storage, "_make_request", side_effect=request):
+            assert storage.create_directory("backups/chunks")["success"]
+            assert [item["name"] for item in storage.list_files("backups/chunks")] == ["a", "b", "d"]
+
+        assert [params["path"] for method, params in calls if method == "PUT"] == ["backups", "backups/chunks"]
+        assert [params["offset"] for method, params in calls if method == "GET"] == [0, 2, 4]
+
+
+class TestBackupsApi:
+    """/backups endpoints accept snapshot IDs."""
+
+    @pytest.fixture
+    def client(self, manager):
+        from app.api import backups
+        from app.api.auth import require_admin
+
+        app = FastAPI()
+        app.include_router(backups.router)
+        app.dependency_overrides[require_admin] = lambda: "admin"
+        with patch("app.api.backups.create_backup_manager", return_value=manager):
+            yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    @pytest.mark.asyncio
+    async def test_snapshot_endpoints(self, client, manager, storage_path):
+        async with client:
+            response = await client.post("/backups/create", json={"type": "storage"})
+            assert response.status_code == 200
+            snapshot_id = response.json()["backup"]["snapshot_id"]
+
+            response = await client.get("/backups/snapshots")
+            assert [s["snapshot_id"] for s in response.json()["snapshots"]] == [snapshot_id]
+
+            response = await client.get(f"/backups/snapshots/{snapshot_id}", params={"include_files": True})
+            assert len(response.json()["files"]) == 3
+
+            (storage_path / "notes.txt").write_text("changed")
+            response = await client.post("/backups/restore", json={"snapshot_id": snapshot_id})
+            assert response.status_code == 200
+            assert response.json()["backup_type"] == "storage"
+            assert (storage_path / "notes.txt").read_text() == "first"
+
+            response = await client.post("/backups/verify", json={"snapshot_id": "missing"})
+            assert response.status_code == 404
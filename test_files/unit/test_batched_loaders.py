@@ -0,0 +1,155 @@
+"""
+Tests for batched database loaders used by admin lists.
+Each list must issue a fixed number of queries regardless of page size.
+"""
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.database import Database
+
+
+@pytest.fixture
+def temp_db():
+    """Create a temporary database for testing."""
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+        db_path = Path(f.name)
+
+    db = Database(db_path)
+    yield db
+
+    db_path.unlink(missing_ok=True)
+
+
+@contextmanager
+def count_queries(db: Database):
+    """Count statements sent through Database._execute inside the block."""
+    executed = []
+    original = db._execute
+
+    def counting_execute(query, params=None):
+        executed.append(query)
+        return original(query, params)
+
+    with patch.object(db, "_execute", side_effect=counting_execute):
+        yield executed
+
+
+def _populate(db: Database, clients: int = 3, portraits_per_client: int = 4) -> None:
+    """Create clients with portraits (distinct created_at) and videos."""
+    minute = 0
+    for c in range(clients):
+        db.create_client(f"c{c}", f"+7000{c}", f"Client {c}")
+        for p in range(portraits_per_client):
+            portrait_id = f"c{c}-p{p}"
+            db.create_portrait(portrait_id, f"c{c}", "img.jpg", "f", "f3", "i", f"link-{portrait_id}",
+                               image_preview_path=f"portraits/{portrait_id}.webp")
+            db._execute("UPDATE portraits SET created_at = ? WHERE id = ?",
+                        (f"2024-01-01 00:{minute:02d}:00", portrait_id))
+            minute += 1
+            db.create_video(f"{portrait_id}-v0", portrait_id, "v0.mp4")
+            db.create_video(f"{portrait_id}-v1", portrait_id, "v1.mp4", is_active=p % 2 == 0,
+                            description=f"active {portrait_id}")
+
+
+class TestBatchedLoaders:
+    """Test batched loader methods."""
+
+    def test_list_videos_for_portraits(self, temp_db):
+        _populate(temp_db)
+        ids = ["c0-p0", "c1-p2", "missing"]
+
+        with count_queries(temp_db) as queries:
+            videos = temp_db.list_videos_for_portraits(ids)
+
+        assert len(queries) == 1
+        assert set(videos) == {"c0-p0", "c1-p2"}
+        for portrait_id in videos:
+            assert {v["id"] for v in videos[portrait_id]} == {v["id"] for v in temp_db.list_videos(portrait_id)}
+        assert temp_db.list_videos_for_portraits([]) == {}
+
+    def test_get_latest_portraits(self, temp_db):
+        _populate(temp_db)
+        temp_db.create_client("empty", "+79999", "No portraits")
+
+        with count_queries(temp_db) as queries:
+            latest = temp_db.get_latest_portraits(["c0", "c2", "empty"])
+
+        assert len(queries) == 1
+        assert {client: portrait["id"] for client, portrait in latest.items()} == {"c0": "c0-p3", "c2": "c2-p3"}
+        assert "row_number" not in latest["c0"]
+
+    def test_portraits_with_client_projection(self, temp_db):
+        _populate(temp_db)
+
+        with count_queries(temp_db) as queries:
+            rows = temp_db.list_portraits_with_client_paginated(page=1, page_size=5)
+
+        assert len(queries) == 1
+        assert [row["id"] for row in rows] == [row["id"] for row in temp_db.list_portraits_paginated(page=1, page_size=5)]
+        by_id = {row["id"]: row for row in rows}
+        assert by_id["c2-p3"]["client_name"] == "Client 2"
+        assert by_id["c2-p2"]["active_video_id"] == "c2-p2-v1"
+        assert by_id["c2-p2"]["active_video_description"] == "active c2-p2"
+        assert by_id["c2-p3"]["active_video_id"] is None
+
+    def test_projection_filters_match_count(self, temp_db):
+        _populate(temp_db)
+        temp_db._execute("UPDATE portraits SET lifecycle_status = 'archived' WHERE client_id = 'c1'")
+
+        rows = temp_db.list_portraits_with_client_paginated(page=1, page_size=50, lifecycle_status="archived")
+        assert {row["client_id"] for row in rows} == {"c1"}
+        assert len(rows) == temp_db.count_portraits(lifecycle_status="archived")
+        assert len(temp_db.list_portraits_with_client_paginated(company_id="vertex-ar-default")) == 12
+
+    def test_portrait_with_client_and_position(self, temp_db):
+        _populate(temp_db)
+        project = temp_db.create_project("proj", "vertex-ar-default", "Project")
+        temp_db.create_folder("fold", project["id"], "Folder")
+        temp_db._execute("UPDATE portraits SET folder_id = 'fold' WHERE id = 'c1-p1'")
+
+        portrait = temp_db.get_portrait_with_client("c1-p1")
+        assert portrait["client_phone"] == "+70001"
+        assert (portrait["folder_name"], portrait["project_name"]) == ("Folder", "Project")
+        assert temp_db.get_portrait_with_client("missing") is None
+
+        all_portraits = temp_db.list_portraits()
+        for index, row in enumerate(all_portraits):
+            assert temp_db.get_portrait_position(row["id"]) == len(all_portraits) - index
+        assert temp_db.get_portrait_position("missing") is None
+
+
+class TestAdminPreviewListQueries:
+    """The admin preview list issues a constant number of queries."""
+
+    @pytest.mark.asyncio
+    async def test_query_count_independent_of_page_size(self, temp_db, tmp_path):
+        from app.api import portraits as portraits_api
+        from app.services.preview_urls import PreviewVersions
+
+        _populate(temp_db, clients=4, portraits_per_client=5)
+
+        async def fetch(page_size):
+            # Start cold so both calls recount the total
+            temp_db._count_cache.clear()
+            with patch.object(portraits_api, "get_database", return_value=temp_db), \
+                    patch.object(portraits_api, "get_cache", return_value=None), \
+                    patch.object(portraits_api, "_preview_versions", return_value=PreviewVersions(tmp_path, tmp_path)), \
+                    count_queries(temp_db) as queries:
+                response = await portraits_api.list_portraits_with_preview(
+                    company_id=None, lifecycle_status=None, page=1, page_size=page_size, previews="url", _="admin",
+                )
+            return response, len(queries)
+
+        small, small_queries = await fetch(2)
+        large, large_queries = await fetch(20)
+
+        assert small_queries == large_queries
+        assert len(large["portraits"]) == 20
+        item = next(p for p in large["portraits"] if p["id"] == "c0-p0")
+        assert item["client_name"] == "Client 0"
+        assert item["active_video_description"] == "active c0-p0"
+        assert {v["id"] for v in item["videos"]} == {"c0-p0-v0", "c0-p0-v1"}
@@ -0,0 +1,283 @@
+"""
+Unit tests for the content-addressed blob store.
+Tests blob refcounting, upload deduplication and shared marker reuse.
+"""
+import importlib
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi import UploadFile
+
+from app.database import Database
+from app.services.blob_store import BlobStore, blob_storage_path, hash_content
+from app.services.uploads import UPLOAD_CHUNK_SIZE, spool_upload
+from app.storage_local import LocalStorageAdapter
+from preview_generator import PreviewVariant
+
+
+class _StorageManager:
+    """Minimal storage manager returning one local adapter."""
+
+    def __init__(self, storage_root: Path):
+        self.adapter = LocalStorageAdapter(storage_root)
+
+    def get_adapter_for_content(self, company_id, content_type):
+        return self.adapter
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield Path(tmp)
+
+
+@pytest.fixture
+def database(temp_dir):
+    return Database(temp_dir / "test.db")
+
+
+@pytest.fixture
+def storage_root(temp_dir):
+    return temp_dir / "storage"
+
+
+@pytest.fixture
+def blob_store(database, storage_root):
+    return BlobStore(database, _StorageManager(storage_root), storage_root)
+
+
+def _create_portrait(database, portrait_id, blob_hash, markers, marker_status="ready"):
+    if not database.get_client("client-1"):
+        database.create_client("client-1", "+70000000000", "Test Client")
+    return database.create_portrait(
+        portrait_id=portrait_id,
+        client_id="client-1",
+        image_path="portraits/blobs/p.jpg",
+        permanent_link=f"portrait_{portrait_id}",
+        marker_status=marker_status,
+        blob_hash=blob_hash,
+        **markers,
+    )
+
+
+class TestBlobDatabase:
+    """Test blob refcount persistence."""
+
+    def test_acquire_and_release_refcount(self, database):
+        blob = database.acquire_blob("abc", "", "portraits", "portraits/blobs/ab/abc.jpg", 100)
+        assert blob["refcount"] == 1
+
+        blob = database.acquire_blob("abc", "", "portraits", "ignored/path.jpg", 100)
+        assert blob["refcount"] == 2
+        assert blob["storage_path"] == "portraits/blobs/ab/abc.jpg"
+
+        assert database.release_blob("abc", "", "portraits") is None
+        released = database.release_blob("abc", "", "portraits")
+        assert released["storage_path"] == "portraits/blobs/ab/abc.jpg"
+        assert database.get_blob("abc", "", "portraits") is None
+
+    def test_blobs_are_scoped_by_company(self, database):
+        database.acquire_blob("abc", "company-a", "portraits", "a.jpg", 10)
+        database.acquire_blob("abc", "company-b", "portraits", "b.jpg", 10)
+
+        assert database.get_blob("abc", "company-a", "portraits")["refcount"] == 1
+        assert database.release_blob("abc", "company-a", "portraits") is not None
+        assert database.is_blob_hash_in_use("abc", "portraits")
+
+    def test_blob_stats(self, database):
+        database.acquire_blob("abc", "", "videos", "v.mp4", 1000)
+        database.acquire_blob("abc", "", "videos", "v.mp4", 1000)
+        database.acquire_blob("def", "", "videos", "w.mp4", 500)
+
+        stats = database.get_blob_stats()
+        assert stats["blobs"] == 2
+        assert stats["references_count"] == 3
+        assert stats["stored_bytes"] == 1500
+        assert stats["saved_bytes"] == 1000
+
+
+class TestBlobStore:
+    """Test upload deduplication through the blob store."""
+
+    @pytest.mark.asyncio
+    async def test_identical_content_is_stored_once(self, blob_store, storage_root):
+        first, first_reused = await blob_store.store(b"image-bytes", "portraits", suffix=".jpg")
+        second, second_reused = await blob_store.store(b"image-bytes", "portraits", suffix=".jpg")
+
+        assert first_reused is False
+        assert second_reused is True
+        assert second["refcount"] == 2
+        assert first["storage_path"] == blob_storage_path("portraits", hash_content(b"image-bytes"), ".jpg")
+        assert len(list((storage_root / "portraits" / "blobs").rglob("*.jpg"))) == 1
+
+    @pytest.mark.asyncio
+    async def test_streamed_upload_shares_blob_with_bytes(self, blob_store, storage_root, temp_dir):
+        content = b"v" * (3 * UPLOAD_CHUNK_SIZE + 17)
+        upload = UploadFile(file=BytesIO(content), filename="video.mp4")
+
+        stored = await spool_upload(upload, temp_dir / "spool", suffix=".mp4")
+        assert stored.size == len(content)
+        assert stored.content_hash == hash_content(content)
+
+        blob, reused = await blob_store.store_upload(stored, "videos", suffix=".mp4")
+        stored.cleanup()
+
+        assert reused is False
+        assert not stored.path.exists()
+        assert (storage_root / blob["storage_path"]).read_bytes() == content
+
+        _, reused = await blob_store.store(content, "videos", suffix=".mp4")
+        assert reused is True
+
+    @pytest.mark.asyncio
+    async def test_missing_file_is_rewritten(self, blob_store, storage_root):
+        blob, _ = await blob_store.store(b"video-bytes", "videos", suffix=".mp4")
+        (storage_root / blob["storage_path"]).unlink()
+
+        _, reused = await blob_store.store(b"video-bytes", "videos", suffix=".mp4")
+
+        assert reused is False
+        assert (storage_root / blob["storage_path"]).read_bytes() == b"video-bytes"
+
+    @pytest.mark.asyncio
+    async def test_preview_is_shared(self, blob_store):
+        blob, _ = await blob_store.store(b"image-bytes", "portraits", suffix=".jpg")
+        preview_path = await blob_store.save_preview(blob, b"preview")
+
+        again, reused = await blob_store.store(b"image-bytes", "portraits", suffix=".jpg")
+
+        assert reused is True
+        assert await blob_store.get_preview(again) == preview_path
+
+    @pytest.mark.asyncio
+    async def test_files_removed_with_last_reference(self, blob_store, storage_root):
+        blob, _ = await blob_store.store(b"image-bytes", "portraits", suffix=".jpg")
+        await blob_store.store(b"image-bytes", "portraits", suffix=".jpg")
+        await blob_store.save_preview(blob, b"preview")
+        marker_dir = blob_store.marker_dir(blob["content_hash"])
+        marker_dir.mkdir(parents=True)
+        (marker_dir / "m.fset").write_bytes(b"fset")
+
+        assert await blob_store.release(blob["content_hash"], None, "portraits") is False
+        assert (storage_root / blob["storage_path"]).exists()
+
+        assert await blob_store.release(blob["content_hash"], None, "portraits") is True
+        assert not (storage_root / blob["storage_path"]).exists()
+        assert not marker_dir.exists()
+
+    @pytest.mark.asyncio
+    async def test_preview_variants_registered_and_released(self, blob_store, storage_root):
+        blob, _ = await blob_store.store(b"image-bytes", "portraits", suffix=".jpg")
+        variants = [
+            PreviewVariant(width=150, height=100, format="webp", data=b"small"),
+            PreviewVariant(width=300, height=200, format="jpeg", data=b"large"),
+        ]
+
+        rows = await blob_store.save_preview_variants(blob["content_hash"], None, "portraits", variants)
+
+        assert [(row["width"], row["format"]) for row in rows] == [(150, "webp"), (300, "jpeg")]
+        assert rows[1]["storage_path"].endswith("_preview_300.jpg")
+        assert (storage_root / rows[0]["storage_path"]).read_bytes() == b"small"
+
+        assert await blob_store.release(blob["content_hash"], None, "portraits") is True
+        assert blob_store.list_preview_variants(blob["content_hash"], None, "portraits") == []
+        assert not (storage_root / rows[0]["storage_path"]).exists()
+
+    @pytest.mark.asyncio
+    async def test_release_record_ignores_legacy_paths(self, blob_store):
+        blob, _ = await blob_store.store(b"image-bytes", "portraits", suffix=".jpg")
+        legacy = {"blob_hash": blob["content_hash"], "image_path": "portraits/client/p.jpg"}
+        shared = {"blob_hash": blob["content_hash"], "image_path": blob["storage_path"]}
+
+        assert await blob_store.release_record(legacy, None, "portraits", "image_path") is False
+        assert await blob_store.release_record(shared, None, "portraits", "image_path") is True
+
+    def test_find_ready_markers(self, blob_store, database):
+        marker_dir = blob_store.marker_dir("hash-1")
+        marker_dir.mkdir(parents=True)
+        markers = {}
+        for field, suffix in (("marker_fset", ".fset"), ("marker_fset3", ".fset3"), ("marker_iset", ".iset")):
+            path = marker_dir / f"hash-1{suffix}"
+            path.write_bytes(b"marker")
+            markers[field] = str(path)
+
+        _create_portrait(database, "pending", "hash-1", markers, marker_status="pending")
+        assert blob_store.find_ready_markers("hash-1") is None
+
+        _create_portrait(database, "ready", "hash-1", markers)
+        assert blob_store.find_ready_markers("hash-1") == markers
+
+        (marker_dir / "hash-1.iset").unlink()
+        assert blob_store.find_ready_markers("hash-1") is None
+
+    @pytest.mark.asyncio
+    async def test_foreign_markers_copied_into_shared_dir(self, blob_store, database, storage_root):
+        blob, _ = await blob_store.store(b"image-bytes", "portraits", suffix=".jpg")
+        content_hash = blob["content_hash"]
+        order_dir = storage_root / "nft_markers" / "order-1"
+        order_dir.mkdir(parents=True)
+        markers = {}
+        for field, suffix in (("marker_fset", ".fset"), ("marker_fset3", ".fset3"), ("marker_iset", ".iset")):
+            path = order_dir / f"order-1{suffix}"
+            path.write_bytes(suffix.encode())
+            markers[field] = str(path)
+        _create_portrait(database, "order-1", content_hash, markers)
+
+        found = blob_store.find_ready_markers(content_hash)
+
+        assert found == blob_store.marker_paths(content_hash)
+        # The order's own files can go away without breaking the reuse
+        for path in markers.values():
+            Path(path).unlink()
+        assert Path(found["marker_iset"]).read_bytes() == b".iset"
+
+    def test_foreign_markers_not_reused_without_blob(self, blob_store, database, storage_root):
+        order_dir = storage_root / "nft_markers" / "order-1"
+        order_dir.mkdir(parents=True)
+        markers = {}
+        for field, suffix in (("marker_fset", ".fset"), ("marker_fset3", ".fset3"), ("marker_iset", ".iset")):
+            path = order_dir / f"order-1{suffix}"
+            path.write_bytes(b"marker")
+            markers[field] = str(path)
+        _create_portrait(database, "order-1", "hash-2", markers)
+
+        assert blob_store.find_ready_markers("hash-2") is None
+        assert not blob_store.marker_dir("hash-2").exists()
+
+
+class TestClientDelete:
+    """Deleting clients releases the blobs of their cascaded portraits and videos."""
+
+    @pytest.mark.asyncio
+    async def test_client_delete_releases_blobs(self, blob_store, database, storage_root):
+        importlib.import_module("app.main")  # app.api.clients needs the app module first
+        from app.api import clients
+
+        image, _ = await blob_store.store(b"image-bytes", "portraits", "vertex-ar-default", suffix=".jpg")
+        video, _ = await blob_store.store(b"video-bytes", "videos", suffix=".mp4")
+        database.create_client("client-1", "+70000000000", "Test Client")
+        database.create_portrait(
+            portrait_id="p-1",
+            client_id="client-1",
+            image_path=image["storage_path"],
+            permanent_link="portrait_p-1",
+            marker_fset="",
+            marker_fset3="",
+            marker_iset="",
+            blob_hash=image["content_hash"],
+        )
+        database.create_video("v-1", "p-1", video["storage_path"], blob_hash=video["content_hash"])
+
+        records = clients._client_records(database, ["client-1"])
+        assert database.delete_client("client-1")
+        with patch("app.services.blob_store.get_blob_store", return_value=blob_store), \
+                patch.object(clients, "get_current_app"):
+            await clients._release_client_blobs(database, records)
+
+        assert database.get_blob(image["content_hash"], "vertex-ar-default", "portraits") is None
+        assert database.get_blob(video["content_hash"], "", "videos") is None
+        assert not (storage_root / image["storage_path"]).exists()
+        assert not (storage_root / video["storage_path"]).exists()
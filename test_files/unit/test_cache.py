@@ -3,6 +3,7 @@ Unit tests for cache abstraction layer.
 Tests both LRU and Redis backend implementations.
 """
 import asyncio
+import time
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch, AsyncMock
@@ -168,6 +169,73 @@ class TestLRUCacheBackend:
         assert stats["hits"] == 1
         assert stats["misses"] == 1
         assert stats["hit_rate_percent"] == 50.0
+    
+    @pytest.mark.asyncio
+    async def test_namespace_stats(self):
+        """Test hit/miss statistics per key namespace."""
+        cache = LRUCacheBackend()
+        
+        await cache.set("test:0:portraits:list:1", "value1")
+        await cache.get("test:0:portraits:list:1")
+        await cache.get("test:0:clients:list:1")
+        
+        namespaces = cache.get_stats()["namespaces"]
+        assert namespaces["test:portraits"] == {"hits": 1, "misses": 0}
+        assert namespaces["test:clients"] == {"hits": 0, "misses": 1}
+    
+    @pytest.mark.asyncio
+    async def test_expired_entries_evicted_on_set(self):
+        """Test that expired entries are dropped without being read."""
+        cache = LRUCacheBackend()
+        
+        await cache.set("key1", "value1", ttl=1)
+        await cache.set("key2", "value2", ttl=0)
+        
+        with patch("app.cache.time.monotonic", return_value=time.monotonic() + 2):
+            await cache.set("key3", "value3")
+        
+        assert "key1" not in cache._cache
+        assert await cache.get("key2") == "value2"
+        assert cache.get_stats()["evictions"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_overwrite_keeps_new_expiry(self):
+        """Test that a stale deadline does not evict an overwritten key."""
+        cache = LRUCacheBackend()
+        
+        await cache.set("key1", "value1", ttl=1)
+        await cache.set("key1", "value2", ttl=10)
+        
+        with patch("app.cache.time.monotonic", return_value=time.monotonic() + 2):
+            await cache.set("key2", "value")
+            assert await cache.get("key1") == "value2"
+    
+    @pytest.mark.asyncio
+    async def test_memory_cap(self):
+        """Test eviction by estimated size in bytes."""
+        cache = LRUCacheBackend(max_memory_bytes=2500)
+        
+        await cache.set("key1", b"x" * 1000)
+        await cache.set("key2", b"x" * 1000)
+        await cache.set("key3", b"x" * 1000)
+        
+        stats = cache.get_stats()
+        assert stats["memory_bytes"] == 2000
+        assert await cache.get("key1") is None
+        assert await cache.get("key3") is not None
+        
+        # Values larger than the cap are not stored at all
+        assert await cache.set("big", b"x" * 5000) is False
+        assert await cache.get("big") is None
+        
+        # Containers count their contents
+        await cache.set("page", {"items": [b"x" * 600, "y" * 600]})
+        assert await cache.get("key2") is None
+        assert cache.get_stats()["memory_bytes"] > 1000 + 1200
+        
+        await cache.delete("key3")
+        await cache.clear()
+        assert cache.get_stats()["memory_bytes"] == 0
 
 
 class TestCacheManager:
@@ -228,6 +296,95 @@ class TestCacheManager:
         value = await manager.get("portraits", "list")
         assert value == "value2"
     
+    @pytest.mark.asyncio
+    async def test_tag_invalidation(self):
+        """Test that invalidating a tag only evicts entries tagged with it."""
+        backend = LRUCacheBackend()
+        manager = CacheManager(backend, namespace="test")
+        
+        await manager.set("a", "portraits", "list", "company-a", tags=["company:a"])
+        await manager.set("b", "portraits", "list", "company-b", tags=["company:b"])
+        await manager.set("untagged", "portraits", "list", "all")
+        
+        await manager.invalidate_tags("company:a")
+        
+        assert await manager.get("portraits", "list", "company-a") is None
+        assert await manager.get("portraits", "list", "company-b") == "b"
+        assert await manager.get("portraits", "list", "all") == "untagged"
+        
+        # Re-cached entries pick up the new tag version
+        await manager.set("a2", "portraits", "list", "company-a", tags=["company:a"])
+        assert await manager.get("portraits", "list", "company-a") == "a2"
+    
+    @pytest.mark.asyncio
+    async def test_cache_hit_is_one_backend_read(self):
+        """Test that versions are reused locally so a hit reads the backend once."""
+        backend = LRUCacheBackend()
+        manager = CacheManager(backend, namespace="test", version_ttl=60)
+        
+        await manager.set("value", "portraits", "list", tags=["company:a", "portraits:all"])
+        await manager.get("portraits", "list")
+        
+        with patch.object(backend, "get", wraps=backend.get) as backend_get:
+            assert await manager.get("portraits", "list") == "value"
+            assert backend_get.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_tag_invalidation_seen_by_other_manager(self):
+        """Test that another manager sees a tag bump once its local copy expires."""
+        backend = LRUCacheBackend()
+        writer = CacheManager(backend, namespace="test", version_ttl=0)
+        reader = CacheManager(backend, namespace="test", version_ttl=0)
+        
+        await writer.set("value", "portraits", "list", tags=["portrait:1"])
+        assert await reader.get("portraits", "list") == "value"
+        
+        await writer.invalidate_tags("portrait:1")
+        assert await reader.get("portraits", "list") is None
+    
+    @pytest.mark.asyncio
+    async def test_tag_invalidation_with_redis_counters(self):
+        """Test that tag counters stay raw integers Redis can INCRBY."""
+        
+        class FakeRedis:
+            """Stores bytes and rejects INCRBY on non-integer values like Redis."""
+            
+            def __init__(self):
+                self.data = {}
+            
+            async def get(self, key):
+                return self.data.get(key)
+            
+            async def set(self, key, value, nx=False):
+                if nx and key in self.data:
+                    return None
+                self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+                return True
+            
+            async def setex(self, key, ttl, value):
+                return await self.set(key, value)
+            
+            async def incrby(self, key, delta):
+                value = int(self.data.get(key, b"0")) + delta
+                self.data[key] = str(value).encode()
+                return value
+        
+        backend = RedisCacheBackend.__new__(RedisCacheBackend)
+        backend.redis = FakeRedis()
+        backend.default_ttl = 300
+        backend._hits = backend._misses = 0
+        manager = CacheManager(backend, namespace="test", version_ttl=0)
+        
+        await manager.set("value", "portraits", "list", tags=["portrait:1"])
+        assert await manager.get("portraits", "list") == "value"
+        
+        await manager.invalidate_tags("portrait:1")
+        assert await manager.get("portraits", "list") is None
+        
+        # A counter left pickled by an older version is replaced
+        backend.redis.data["test:tag:portrait:2"] = b"\x80\x04K\x01."
+        assert await backend.get_counter("test:tag:portrait:2", 5) == 5
+    
     @pytest.mark.asyncio
     async def test_disabled_cache(self):
         """Test cache manager when disabled."""
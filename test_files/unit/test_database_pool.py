@@ -0,0 +1,114 @@
+"""
+Tests for the database connection-pool mode (WAL writer plus per-thread readers).
+"""
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.database import Database
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield Path(tmp)
+
+
+@pytest.fixture
+def pooled_db(temp_dir):
+    db = Database(temp_dir / "pool.db", reader_connections=2)
+    yield db
+    db.close()
+
+
+def _in_thread(func):
+    result = {}
+
+    def target():
+        try:
+            result["value"] = func()
+        except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+            result["error"] = exc
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    assert "error" not in result, result.get("error")
+    return result.get("value")
+
+
+class TestDatabasePool:
+    """Test connection-pool mode."""
+
+    def test_default_mode_is_unpooled(self, temp_dir):
+        db = Database(temp_dir / "plain.db")
+        try:
+            assert db.pooled is False
+            db.get_client("missing")
+            assert db._readers == []
+        finally:
+            db.close()
+
+    def test_wal_and_pragmas(self, pooled_db):
+        assert pooled_db._connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        # synchronous=NORMAL is 1
+        assert pooled_db._connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+    def test_reads_use_reader_connection(self, pooled_db):
+        pooled_db.create_client("client-1", "+70000000000", "Test Client")
+        readers_before = len(pooled_db._readers)
+
+        client = _in_thread(lambda: pooled_db.get_client("client-1"))
+
+        assert client["name"] == "Test Client"
+        assert len(pooled_db._readers) == readers_before + 1
+        assert pooled_db._connection.in_transaction is False
+
+    def test_writes_are_visible_to_other_connections(self, pooled_db, temp_dir):
+        pooled_db.create_client("client-1", "+70000000000", "Test Client")
+
+        other = sqlite3.connect(str(temp_dir / "pool.db"))
+        try:
+            assert other.execute("SELECT COUNT(*) FROM clients").fetchone()[0] == 1
+        finally:
+            other.close()
+
+    def test_readers_are_read_only(self, pooled_db):
+        reader = pooled_db._get_reader()
+        with pytest.raises(sqlite3.OperationalError):
+            reader.execute("DELETE FROM clients")
+
+    def test_pool_is_capped(self, pooled_db):
+        for _ in range(4):
+            _in_thread(lambda: pooled_db.get_client("missing"))
+
+        assert len(pooled_db._readers) == 2
+        # Threads beyond the cap fall back to the writer connection
+        assert _in_thread(pooled_db._get_reader) is None
+        assert _in_thread(lambda: pooled_db.get_client("missing")) is None
+
+    def test_reads_inside_write_lock_see_pending_changes(self, pooled_db):
+        with pooled_db._lock:
+            pooled_db.create_client("client-1", "+70000000000", "Test Client")
+            assert pooled_db.get_client("client-1") is not None
+            # Other threads only see committed data
+            assert _in_thread(lambda: pooled_db.get_client("client-1")) is None
+
+        assert _in_thread(lambda: pooled_db.get_client("client-1")) is not None
+
+    def test_failed_write_block_is_rolled_back(self, pooled_db):
+        with pytest.raises(RuntimeError):
+            with pooled_db._lock:
+                pooled_db.create_client("client-1", "+70000000000", "Test Client")
+                raise RuntimeError("boom")
+
+        assert pooled_db.get_client("client-1") is None
+
+    def test_read_query_detection(self, pooled_db):
+        assert pooled_db._is_read_query("  select * from clients")
+        assert pooled_db._is_read_query("WITH x AS (SELECT 1) SELECT * FROM x")
+        assert not pooled_db._is_read_query("WITH x AS (SELECT 1) DELETE FROM clients")
+        assert not pooled_db._is_read_query("PRAGMA table_info(clients)")
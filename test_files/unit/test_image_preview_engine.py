@@ -0,0 +1,74 @@
+"""
+Unit tests for responsive image preview generation.
+Tests single-decode variant generation, format selection and draft decoding.
+"""
+from io import BytesIO
+
+from PIL import Image
+
+from preview_generator import ImagePreviewEngine, PreviewGenerator, supported_preview_formats
+
+
+def _jpeg(size=(2400, 1600), color=(200, 40, 40)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def _png_rgba(size=(800, 400)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGBA", size, (0, 0, 255, 0)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestImagePreviewEngine:
+    """Test ImagePreviewEngine variants."""
+
+    def test_all_widths_and_formats_from_one_decode(self):
+        engine = ImagePreviewEngine(widths=(150, 300, 600, 1200), formats=("webp", "jpeg"))
+
+        result = engine.render(_jpeg())
+
+        assert {(v.width, v.format) for v in result.variants} == {
+            (w, f) for w in (150, 300, 600, 1200) for f in ("webp", "jpeg")
+        }
+        for variant in result.variants:
+            image = Image.open(BytesIO(variant.data))
+            assert image.size == (variant.width, variant.height)
+            assert variant.height == round(variant.width * 1600 / 2400)
+        assert Image.open(BytesIO(result.square)).size == (300, 300)
+
+    def test_jpeg_decoded_at_reduced_scale(self):
+        engine = ImagePreviewEngine(widths=(300,), formats=("jpeg",), square_size=None)
+
+        result = engine.render(_jpeg(size=(4800, 3200)))
+
+        # draft() picks a 1/8 DCT scale that still covers the widest variant
+        assert result.decoded_size == (600, 400)
+        assert [v.width for v in result.variants] == [300]
+
+    def test_variants_never_upscale(self):
+        engine = ImagePreviewEngine(widths=(150, 300, 600, 1200), formats=("webp",), square_size=None)
+
+        result = engine.render(_jpeg(size=(500, 250)))
+
+        assert sorted(v.width for v in result.variants) == [150, 300, 500]
+
+    def test_transparency_flattened_on_white(self):
+        engine = ImagePreviewEngine(widths=(200,), formats=("jpeg",), square_size=None)
+
+        result = engine.render(_png_rgba())
+
+        image = Image.open(BytesIO(result.variants[0].data)).convert("RGB")
+        assert all(channel > 245 for channel in image.getpixel((10, 10)))
+
+    def test_unknown_formats_are_dropped(self):
+        assert supported_preview_formats(["JPG", "webp", "tiff", "jpeg"]) == ("jpeg", "webp")
+
+    def test_invalid_image_returns_none(self):
+        assert ImagePreviewEngine().render(b"not an image") is None
+
+    def test_legacy_square_preview_keeps_size(self):
+        preview = PreviewGenerator.generate_image_preview(_jpeg(size=(3000, 1000)), size=(300, 300))
+
+        assert Image.open(BytesIO(preview)).size == (300, 300)
@@ -0,0 +1,157 @@
+"""
+Tests for keyset (cursor) pagination of list queries and cached list totals.
+"""
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.database import Database
+
+
+@pytest.fixture
+def temp_db():
+    """Create a temporary database with companies, clients, projects, folders and portraits."""
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+        db_path = Path(f.name)
+
+    db = Database(db_path)
+    db.create_company("acme", "Acme")
+    db.create_company("beta", "Acme Beta")
+    for i in range(12):
+        company_id = "acme" if i % 3 else "vertex-ar-default"
+        db.create_client(f"c{i:02d}", f"+7000{i:02d}", f"Client {i}", company_id=company_id)
+        db.create_project(f"pr{i:02d}", company_id, f"Project {i}")
+        db.create_folder(f"f{i:02d}", f"pr{i // 2 * 2:02d}", f"Folder {i}")
+        db.create_portrait(f"p{i:02d}", f"c{i:02d}", "img.jpg", "f", "f3", "i", f"link-{i}")
+        db.add_notification_history(f"n{i:02d}", "email" if i % 2 else "telegram", "admin", "msg",
+                                    "sent" if i % 4 else "failed")
+        # Pairs of rows share a timestamp so ties are broken by id
+        stamp = f"2024-01-01 00:00:{i // 2:02d}"
+        for table in ("clients", "projects", "folders", "portraits"):
+            db._execute(f"UPDATE {table} SET created_at = ? WHERE id LIKE ?", (stamp, f"%{i:02d}"))
+        db._execute("UPDATE notification_history SET sent_at = ? WHERE id = ?", (stamp, f"n{i:02d}"))
+    yield db
+
+    db_path.unlink(missing_ok=True)
+
+
+@contextmanager
+def count_queries(db: Database):
+    """Count statements sent through Database._execute inside the block."""
+    executed = []
+    original = db._execute
+
+    def counting_execute(query, params=None):
+        executed.append(query)
+        return original(query, params)
+
+    with patch.object(db, "_execute", side_effect=counting_execute):
+        yield executed
+
+
+def _walk(fetch, sort_key: str, page_size: int) -> list:
+    """Collect all ids by following keyset pages of ``fetch(limit, after)``."""
+    ids, after = [], None
+    while True:
+        page = fetch(page_size, after)
+        ids.extend(row["id"] for row in page)
+        if len(page) < page_size:
+            return ids
+        after = (page[-1][sort_key], page[-1]["id"])
+
+
+LISTS = {
+    "portraits": (lambda db, limit, offset, after: db.list_portraits_paginated(
+        page=offset // limit + 1, page_size=limit, company_id="acme", after=after), "created_at"),
+    "clients": (lambda db, limit, offset, after: db.list_clients(
+        limit=limit, offset=offset, company_id="acme", after=after), "created_at"),
+    "folders": (lambda db, limit, offset, after: db.list_folders(
+        company_id="acme", limit=limit, offset=offset, after=after), "created_at"),
+    "projects": (lambda db, limit, offset, after: db.list_projects(
+        limit=limit, offset=offset, after=after), "created_at"),
+    "companies": (lambda db, limit, offset, after: db.list_companies_paginated(
+        limit=limit, offset=offset, search="Acme", after=after), "name"),
+    "notification_history": (lambda db, limit, offset, after: db.list_notification_history(
+        limit=limit, offset=offset, status="sent", after=after), "sent_at"),
+}
+
+
+class TestKeysetPagination:
+    """Keyset pages must return the same rows in the same order as offset pages."""
+
+    @pytest.mark.parametrize("name", sorted(LISTS))
+    def test_keyset_walk_matches_offset_order(self, temp_db, name):
+        fetch, sort_key = LISTS[name]
+        expected = [row["id"] for row in fetch(temp_db, 100, 0, None)]
+        assert expected
+
+        for page_size in (1, 2, 5):
+            keyset = _walk(lambda limit, after: fetch(temp_db, limit, 0, after), sort_key, page_size)
+            assert keyset == expected
+            offset_ids = []
+            for offset in range(0, len(expected), page_size):
+                offset_ids.extend(row["id"] for row in fetch(temp_db, page_size, offset, None))
+            assert offset_ids == expected
+
+    def test_companies_sorted_by_name_with_client_count(self, temp_db):
+        companies = temp_db.list_companies_paginated(search="Acme")
+        assert [c["id"] for c in companies] == ["acme", "beta"]
+        assert companies[0]["client_count"] == 8
+        assert companies[1]["client_count"] == 0
+
+    def test_keyset_indexes_created(self, temp_db):
+        indexes = {row[0] for row in temp_db._execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_clients_company_keyset", "idx_folders_project_keyset", "idx_projects_company_keyset",
+                "idx_companies_name_keyset", "idx_notification_history_status_keyset"} <= indexes
+        assert "idx_projects_company" not in indexes
+
+    def test_keyset_page_needs_no_sort(self, temp_db):
+        plan = " ".join(
+            row[3] for row in temp_db._execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM clients WHERE company_id = ? AND (created_at, id) < (?, ?)"
+                " ORDER BY created_at DESC, id DESC LIMIT 20",
+                ("acme", "2024-01-01 00:00:03", "c07"),
+            )
+        )
+        assert "idx_clients_company_keyset" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+class TestCachedCounts:
+    """List totals are cached until a change could alter them."""
+
+    def test_count_reused_until_table_changes(self, temp_db):
+        assert temp_db.count_clients(company_id="acme") == 8
+
+        with count_queries(temp_db) as queries:
+            assert temp_db.count_clients(company_id="acme") == 8
+        # Only the version lookup, no COUNT
+        assert len(queries) == 1
+
+        temp_db.create_client("c-new", "+79999", "New", company_id="acme")
+        assert temp_db.count_clients(company_id="acme") == 9
+        temp_db.delete_client("c-new")
+        assert temp_db.count_clients(company_id="acme") == 8
+
+    def test_filter_column_update_invalidates(self, temp_db):
+        assert temp_db.count_portraits(lifecycle_status="archived") == 0
+        temp_db._execute("UPDATE portraits SET lifecycle_status = 'archived' WHERE id = 'p01'")
+        assert temp_db.count_portraits(lifecycle_status="archived") == 1
+
+        # Joined tables are tracked too
+        assert temp_db.count_portraits(company_id="beta") == 0
+        temp_db._execute("UPDATE clients SET company_id = 'beta' WHERE id = 'c01'")
+        assert temp_db.count_portraits(company_id="beta") == 1
+        assert temp_db.count_folders(company_id="beta") == 0
+        temp_db._execute("UPDATE projects SET company_id = 'beta' WHERE id = 'pr00'")
+        assert temp_db.count_folders(company_id="beta") == 2
+
+    def test_unrelated_update_keeps_cache(self, temp_db):
+        temp_db.count_projects()
+        temp_db._execute("UPDATE projects SET name = 'Renamed' WHERE id = 'pr00'")
+        with count_queries(temp_db) as queries:
+            assert temp_db.count_projects() == 12
+        assert len(queries) == 1
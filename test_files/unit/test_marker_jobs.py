@@ -0,0 +1,220 @@
+"""
+Unit tests for the NFT marker job queue.
+Tests job persistence, process-pool execution and portrait status updates.
+"""
+import asyncio
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from app.cache import CacheManager, LRUCacheBackend
+from app.database import Database
+from app.services.marker_jobs import MarkerJobQueue, MarkerJobStatus
+from nft_marker_generator import NFTMarkerConfig
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield Path(tmp)
+
+
+@pytest.fixture
+def database(temp_dir):
+    return Database(temp_dir / "test.db")
+
+
+@pytest.fixture
+def sample_image(temp_dir):
+    image_path = temp_dir / "portrait.jpg"
+    Image.new("RGB", (500, 500), color=(120, 60, 200)).save(image_path, "JPEG")
+    return image_path
+
+
+def _create_portrait(database, portrait_id, marker_status="pending"):
+    client = database.create_client("client-1", "+70000000000", "Test Client")
+    return database.create_portrait(
+        portrait_id=portrait_id,
+        client_id=client["id"],
+        image_path="portraits/client-1/p.jpg",
+        marker_fset="",
+        marker_fset3="",
+        marker_iset="",
+        permanent_link=f"portrait_{portrait_id}",
+        marker_status=marker_status,
+    )
+
+
+class TestMarkerJobDatabase:
+    """Test marker job persistence methods."""
+
+    def test_create_and_update_job(self, database):
+        job = database.create_marker_job("job-1", "portrait-1", "/tmp/a.jpg", "portrait-1", config='{"levels": 3}')
+
+        assert job["status"] == MarkerJobStatus.PENDING.value
+        assert job["progress"] == 0
+        assert job["cleanup_image"] == 0
+
+        assert database.update_marker_job("job-1", status="running", progress=10, attempts=1)
+        job = database.get_marker_job("job-1")
+        assert job["status"] == "running"
+        assert job["attempts"] == 1
+
+    def test_update_ignores_unknown_fields(self, database):
+        database.create_marker_job("job-1", "portrait-1", "/tmp/a.jpg", "portrait-1")
+        assert database.update_marker_job("job-1", image_path="/etc/passwd") is False
+
+    def test_unfinished_jobs_and_stats(self, database):
+        database.create_marker_job("job-1", "p1", "/tmp/a.jpg", "p1")
+        database.create_marker_job("job-2", "p2", "/tmp/b.jpg", "p2")
+        database.create_marker_job("job-3", "p3", "/tmp/c.jpg", "p3")
+        database.update_marker_job("job-2", status="running")
+        database.update_marker_job("job-3", status="completed")
+
+        unfinished = {job["id"] for job in database.get_unfinished_marker_jobs()}
+        assert unfinished == {"job-1", "job-2"}
+
+        stats = database.get_marker_job_stats()
+        assert stats["pending"] == 1
+        assert stats["running"] == 1
+        assert stats["completed"] == 1
+        assert stats["total"] == 3
+
+    def test_portrait_marker_status(self, database):
+        portrait = _create_portrait(database, "portrait-1")
+        assert portrait["marker_status"] == "pending"
+
+        assert database.set_portrait_marker_status("portrait-1", "ready")
+        assert database.get_portrait("portrait-1")["marker_status"] == "ready"
+
+
+class TestMarkerJobQueue:
+    """Test marker job queue execution."""
+
+    @pytest.mark.asyncio
+    async def test_submit_generates_markers_and_marks_ready(self, database, temp_dir, sample_image):
+        _create_portrait(database, "portrait-1")
+        queue = MarkerJobQueue(database, temp_dir / "storage", max_workers=1)
+        try:
+            job_id = await queue.submit("portrait-1", sample_image, config=NFTMarkerConfig(levels=2))
+            await queue.wait(job_id)
+        finally:
+            await queue.stop()
+
+        job = database.get_marker_job(job_id)
+        assert job["status"] == MarkerJobStatus.COMPLETED.value
+        assert job["progress"] == 100
+        assert job["duration_ms"] > 0
+
+        portrait = database.get_portrait("portrait-1")
+        assert portrait["marker_status"] == "ready"
+        assert Path(portrait["marker_fset"]).exists()
+        assert Path(portrait["marker_iset"]).exists()
+
+    @pytest.mark.asyncio
+    async def test_status_changes_invalidate_portrait_cache(self, database, temp_dir, sample_image):
+        _create_portrait(database, "portrait-1")
+        cache_manager = CacheManager(LRUCacheBackend(), namespace="test")
+        queue = MarkerJobQueue(database, temp_dir / "storage", max_workers=1, cache_manager=cache_manager)
+        with patch.object(cache_manager, "invalidate_tags", wraps=cache_manager.invalidate_tags) as invalidate:
+            try:
+                job_id = await queue.submit("portrait-1", sample_image, config=NFTMarkerConfig(levels=2))
+                await queue.wait(job_id)
+            finally:
+                await queue.stop()
+
+        # pending, running and ready
+        assert [call.args for call in invalidate.call_args_list] == [("portrait:portrait-1",)] * 3
+
+    @pytest.mark.asyncio
+    async def test_failed_job_records_error(self, database, temp_dir):
+        _create_portrait(database, "portrait-1")
+        missing_image = temp_dir / "missing.jpg"
+        queue = MarkerJobQueue(database, temp_dir / "storage", max_workers=1)
+        try:
+            job_id = await queue.submit("portrait-1", missing_image)
+            await queue.wait(job_id)
+        finally:
+            await queue.stop()
+
+        job = database.get_marker_job(job_id)
+        assert job["status"] == MarkerJobStatus.FAILED.value
+        assert "validation failed" in job["error"]
+        assert database.get_portrait("portrait-1")["marker_status"] == "failed"
+
+    @pytest.mark.asyncio
+    async def test_run_returns_marker_and_keeps_image(self, database, temp_dir, sample_image):
+        queue = MarkerJobQueue(database, temp_dir / "storage", max_workers=1)
+        try:
+            marker = await queue.run("content-1", sample_image, "content-1")
+        finally:
+            await queue.stop()
+
+        assert Path(marker.fset3_path).exists()
+        assert marker.width == 500
+        assert sample_image.exists()
+        assert database.get_latest_marker_job("content-1")["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_start_resumes_unfinished_jobs(self, database, temp_dir, sample_image):
+        _create_portrait(database, "portrait-1")
+        database.create_marker_job("job-1", "portrait-1", str(sample_image), "portrait-1")
+
+        queue = MarkerJobQueue(database, temp_dir / "storage", max_workers=1)
+        try:
+            await queue.start()
+            await queue.wait("job-1")
+        finally:
+            await queue.stop()
+
+        assert database.get_marker_job("job-1")["status"] == "completed"
+        assert database.get_portrait("portrait-1")["marker_status"] == "ready"
+
+    @pytest.mark.asyncio
+    async def test_stopped_job_keeps_temp_image_for_resume(self, database, temp_dir, sample_image):
+        _create_portrait(database, "portrait-1")
+        executor = ThreadPoolExecutor(max_workers=1)
+        queue = MarkerJobQueue(database, temp_dir / "storage", max_workers=1)
+        with patch.object(queue, "_get_executor", return_value=executor), \
+                patch("app.services.marker_jobs.generate_marker_in_worker", side_effect=lambda *args: time.sleep(0.2)):
+            job_id = await queue.submit("portrait-1", sample_image, cleanup_image=True)
+            await asyncio.sleep(0.05)
+            await queue.stop()
+        executor.shutdown(wait=True)
+
+        assert sample_image.exists()
+        assert database.get_marker_job(job_id)["status"] == MarkerJobStatus.RUNNING.value
+
+        resumed = MarkerJobQueue(database, temp_dir / "storage", max_workers=1)
+        try:
+            await resumed.start()
+            await resumed.wait(job_id)
+        finally:
+            await resumed.stop()
+
+        assert database.get_marker_job(job_id)["status"] == MarkerJobStatus.COMPLETED.value
+        assert not sample_image.exists()
+
+    @pytest.mark.asyncio
+    async def test_start_drops_interrupted_synchronous_jobs(self, database, temp_dir, sample_image):
+        _create_portrait(database, "order-1", marker_status="ready")
+        database.create_marker_job("job-1", "order-1", str(sample_image), "order-1", update_portrait=False)
+
+        queue = MarkerJobQueue(database, temp_dir / "storage", max_workers=1)
+        try:
+            await queue.start()
+            await queue.wait("job-1")
+        finally:
+            await queue.stop()
+
+        job = database.get_marker_job("job-1")
+        assert job["status"] == MarkerJobStatus.FAILED.value
+        assert job["error"] == "Interrupted by restart"
+        portrait = database.get_portrait("order-1")
+        assert portrait["marker_status"] == "ready"
+        assert portrait["marker_fset"] == ""
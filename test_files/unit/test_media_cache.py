@@ -0,0 +1,343 @@
+"""
+Tests for the local read-through media cache of remote storage files.
+"""
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.database import Database
+from app.media_cache import MediaCache, delete_through, read_through, warm_media_cache
+from app.storage import StorageAdapter
+from app.storage_local import LocalStorageAdapter
+
+LATENCY = 0.05
+
+
+class FakeRemoteAdapter(StorageAdapter):
+    """Remote adapter with request latency that counts downloads."""
+
+    def __init__(self, files, namespace="fake:bucket"):
+        self.files = files
+        self.namespace = namespace
+        self.downloads = []
+
+    @property
+    def cache_namespace(self):
+        return self.namespace
+
+    async def get_file(self, file_path):
+        self.downloads.append(file_path)
+        await asyncio.sleep(LATENCY)
+        if file_path not in self.files:
+            raise FileNotFoundError(file_path)
+        return self.files[file_path]
+
+    async def save_file(self, file_data, file_path):
+        self.files[file_path] = file_data
+        return file_path
+
+    async def delete_file(self, file_path):
+        return self.files.pop(file_path, None) is not None
+
+    async def file_exists(self, file_path):
+        return file_path in self.files
+
+    def get_public_url(self, file_path):
+        return f"remote://{file_path}"
+
+    async def create_directory(self, dir_path):
+        return True
+
+    async def directory_exists(self, dir_path):
+        return True
+
+    async def list_directories(self, base_path=""):
+        return []
+
+
+class StreamingRemoteAdapter(FakeRemoteAdapter):
+    """Remote adapter that only serves files as a stream of 10-byte chunks."""
+
+    def __init__(self, files, fail_after=None, **kwargs):
+        super().__init__(files, **kwargs)
+        self.fail_after = fail_after
+
+    async def get_file(self, file_path):
+        raise AssertionError("whole-file download")
+
+    async def iter_file(self, file_path):
+        self.downloads.append(file_path)
+        data = self.files[file_path]
+        for index, offset in enumerate(range(0, len(data), 10)):
+            if index == self.fail_after:
+                raise ConnectionError("stream broke")
+            await asyncio.sleep(0)
+            yield data[offset:offset + 10]
+
+
+async def _chunks(data, size=10):
+    for offset in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[offset:offset + size]
+
+
+@pytest.fixture
+def adapter():
+    return FakeRemoteAdapter({f"video-{i}.mp4": bytes([i]) * 100 for i in range(5)})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return MediaCache(tmp_path / "cache", max_bytes=300)
+
+
+class TestReadThrough:
+    """Misses fetch once and later reads come from disk."""
+
+    @pytest.mark.asyncio
+    async def test_miss_then_hit(self, cache, adapter):
+        assert await cache.get_bytes(adapter, "video-1.mp4") == bytes([1]) * 100
+        assert await cache.get_bytes(adapter, "video-1.mp4") == bytes([1]) * 100
+        assert adapter.downloads == ["video-1.mp4"]
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_ratio"] == 0.5
+        assert stats["bytes_saved"] == 100
+        assert stats["size_bytes"] == 100
+        assert not any((cache.root / "tmp").iterdir())
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_fetch(self, cache, adapter):
+        results = await asyncio.gather(*(cache.get_bytes(adapter, "video-2.mp4") for _ in range(10)))
+        assert all(result == bytes([2]) * 100 for result in results)
+        assert adapter.downloads == ["video-2.mp4"]
+        assert cache.get_stats()["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_namespaces_do_not_collide(self, cache, adapter):
+        other = FakeRemoteAdapter({"video-1.mp4": b"other"}, namespace="fake:other")
+        await cache.get_bytes(adapter, "video-1.mp4")
+        assert await cache.get_bytes(other, "video-1.mp4") == b"other"
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_not_cached(self, cache, adapter):
+        with pytest.raises(FileNotFoundError):
+            await cache.get_bytes(adapter, "missing.mp4")
+        with pytest.raises(FileNotFoundError):
+            await cache.get_bytes(adapter, "missing.mp4")
+        assert adapter.downloads == ["missing.mp4", "missing.mp4"]
+        assert cache.get_stats()["fetch_errors"] == 2
+        assert cache.get_stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_does_not_abort_fill(self, cache, adapter):
+        request = asyncio.ensure_future(cache.get_path(adapter, "video-3.mp4"))
+        await asyncio.sleep(LATENCY / 5)
+        request.cancel()
+        await asyncio.sleep(LATENCY * 2)
+        assert cache.contains(adapter.cache_namespace, "video-3.mp4")
+
+    @pytest.mark.asyncio
+    async def test_local_adapter_bypasses_cache(self, tmp_path):
+        local = LocalStorageAdapter(tmp_path / "storage")
+        await local.save_file(b"local", "a.bin")
+        with patch("app.media_cache.get_media_cache", return_value=MediaCache(tmp_path / "cache", 100)) as get_cache:
+            assert await read_through(local, "a.bin") == b"local"
+            assert get_cache.return_value.get_stats()["misses"] == 0
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self, cache, adapter):
+        await cache.get_bytes(adapter, "video-1.mp4")
+        cache.invalidate(adapter.cache_namespace, "video-1.mp4")
+        assert not cache.contains(adapter.cache_namespace, "video-1.mp4")
+        assert cache.get_stats()["size_bytes"] == 0
+
+
+class TestStreamedFill:
+    """Fills are written to disk chunk by chunk, never through get_file."""
+
+    @pytest.mark.asyncio
+    async def test_fill_streams_to_disk(self, cache):
+        adapter = StreamingRemoteAdapter({"video.mp4": bytes(range(100))})
+        path = await cache.get_path(adapter, "video.mp4")
+        assert path.read_bytes() == bytes(range(100))
+        assert cache.get_stats()["bytes_fetched"] == 100
+
+    @pytest.mark.asyncio
+    async def test_broken_stream_not_cached(self, cache):
+        adapter = StreamingRemoteAdapter({"video.mp4": bytes(100)}, fail_after=3)
+        with pytest.raises(ConnectionError):
+            await cache.get_path(adapter, "video.mp4")
+        assert cache.get_stats()["entries"] == 0
+        assert not any((cache.root / "tmp").iterdir())
+
+
+class TestTee:
+    """A streamed response of a whole file is copied into the cache."""
+
+    @pytest.mark.asyncio
+    async def test_consumed_stream_is_cached(self, cache, adapter):
+        data = bytes(range(100))
+        received = [chunk async for chunk in cache.tee(adapter, "new.mp4", _chunks(data))]
+        assert b"".join(received) == data
+        assert cache.lookup(adapter.cache_namespace, "new.mp4").read_bytes() == data
+        assert adapter.downloads == []
+
+    @pytest.mark.asyncio
+    async def test_abandoned_stream_is_discarded(self, cache, adapter):
+        stream = cache.tee(adapter, "new.mp4", _chunks(bytes(100)))
+        await stream.__anext__()
+        await stream.aclose()
+        assert not cache.contains(adapter.cache_namespace, "new.mp4")
+        assert not any((cache.root / "tmp").iterdir())
+
+    @pytest.mark.asyncio
+    async def test_cached_file_not_rewritten(self, cache, adapter):
+        await cache.get_path(adapter, "video-1.mp4")
+        received = [chunk async for chunk in cache.tee(adapter, "video-1.mp4", _chunks(b"changed"))]
+        assert b"".join(received) == b"changed"
+        assert cache.lookup(adapter.cache_namespace, "video-1.mp4").read_bytes() == bytes([1]) * 100
+
+    @pytest.mark.asyncio
+    async def test_delete_through_invalidates(self, cache, adapter):
+        await cache.get_path(adapter, "video-1.mp4")
+        with patch("app.media_cache.get_media_cache", return_value=cache):
+            assert await delete_through(adapter, "video-1.mp4") is True
+        assert not cache.contains(adapter.cache_namespace, "video-1.mp4")
+        assert "video-1.mp4" not in adapter.files
+
+
+class TestEviction:
+    """The cache stays within its byte budget, evicting least recently used files."""
+
+    @pytest.mark.asyncio
+    async def test_lru_by_bytes(self, cache, adapter):
+        for i in range(3):
+            await cache.get_path(adapter, f"video-{i}.mp4")
+        # Touch video-0 so video-1 is the least recently used
+        await cache.get_path(adapter, "video-0.mp4")
+        await cache.get_path(adapter, "video-3.mp4")
+
+        namespace = adapter.cache_namespace
+        assert cache.contains(namespace, "video-0.mp4")
+        assert not cache.contains(namespace, "video-1.mp4")
+        stats = cache.get_stats()
+        assert stats["size_bytes"] == 300
+        assert (stats["evictions"], stats["evicted_bytes"]) == (1, 100)
+        assert len(list((cache.root / "objects").glob("*/*"))) == 3
+
+    @pytest.mark.asyncio
+    async def test_index_rebuilt_on_restart(self, cache, adapter):
+        for i in range(3):
+            await cache.get_path(adapter, f"video-{i}.mp4")
+        # Before the restart video-1 was read longest ago and video-0 last
+        now = time.time()
+        for i, age in ((1, 30), (2, 20), (0, 10)):
+            path = cache.lookup(adapter.cache_namespace, f"video-{i}.mp4")
+            os.utime(path, (now - age, now - age))
+        (cache.root / "tmp" / "partial").write_bytes(b"x")
+
+        restarted = MediaCache(cache.root, max_bytes=300)
+        assert restarted.get_stats()["size_bytes"] == 300
+        assert not (cache.root / "tmp" / "partial").exists()
+        await restarted.get_path(adapter, "video-3.mp4")
+        assert restarted.contains(adapter.cache_namespace, "video-0.mp4")
+        assert not restarted.contains(adapter.cache_namespace, "video-1.mp4")
+
+
+class TestWarmup:
+    """Warmup prefetches active videos of recently viewed portraits."""
+
+    @pytest.fixture
+    def database(self):
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = Path(f.name)
+        db = Database(db_path)
+        db.create_client("client-1", "+70000000001", "Client")
+        for i in range(3):
+            db.create_portrait(f"portrait-{i}", "client-1", "image.jpg", "m.fset", "m.fset3", "m.iset", f"link-{i}")
+            db.create_video(f"video-{i}", f"portrait-{i}", f"video-{i}.mp4", is_active=True)
+        yield db
+        db_path.unlink(missing_ok=True)
+
+    def test_views_record_last_viewed(self, database):
+        database.apply_counter_increments({("portraits", "view_count"): [("portrait-0", 2)]})
+        database.increment_portrait_views("portrait-1")
+        rows = database.list_recently_viewed_active_videos(since_days=1, limit=10)
+        assert {row["portrait_id"] for row in rows} == {"portrait-0", "portrait-1"}
+        assert all(row["company_id"] == "vertex-ar-default" for row in rows)
+
+    @pytest.mark.asyncio
+    async def test_warm_recently_viewed(self, database, cache, adapter):
+        database.apply_counter_increments({("portraits", "view_count"): [("portrait-0", 1), ("portrait-2", 1)]})
+        storage_manager = Mock()
+        storage_manager.get_adapter_for_content.return_value = adapter
+        await cache.get_path(adapter, "video-2.mp4")
+
+        with patch("app.media_cache.get_media_cache", return_value=cache):
+            result = await warm_media_cache(database, storage_manager, limit=10, since_days=1)
+
+        assert result == {"warmed": 1, "cached": 1, "local": 0, "failed": 0}
+        assert cache.contains(adapter.cache_namespace, "video-0.mp4")
+        assert not cache.contains(adapter.cache_namespace, "video-1.mp4")
+        storage_manager.get_adapter_for_content.assert_called_with("vertex-ar-default", "videos")
+
+
+class TestYandexProxyHit:
+    """Cached Yandex files are served from disk, Range included."""
+
+    @pytest.mark.asyncio
+    async def test_served_from_disk(self, cache, adapter):
+        from app.api import yandex_disk
+
+        await cache.get_path(adapter, "video-1.mp4")
+        remote = Mock(cache_namespace=adapter.cache_namespace)
+        remote.get_download_info = AsyncMock(side_effect=AssertionError("remote call on a cache hit"))
+        config = Mock()
+        config.is_yandex_enabled.return_value = True
+
+        app = FastAPI()
+        app.include_router(yandex_disk.router)
+        with patch("app.api.yandex_disk.get_storage_config", return_value=config), \
+                patch("app.api.yandex_disk.get_yandex_adapter", return_value=remote), \
+                patch("app.api.yandex_disk.get_media_cache", return_value=cache):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.get("/api/yandex-disk/file/video-1.mp4", headers={"Range": "bytes=10-19"})
+
+        assert response.status_code == 206
+        assert response.content == bytes([1]) * 10
+        assert response.headers["content-range"] == "bytes 10-19/100"
+        assert response.headers["content-type"] == "video/mp4"
+
+    @pytest.mark.asyncio
+    async def test_full_miss_streams_once_into_cache(self, cache, adapter):
+        from app.api import yandex_disk
+
+        data = bytes(range(100))
+        remote = Mock(cache_namespace=adapter.cache_namespace)
+        remote.get_download_info = AsyncMock(return_value={"href": "https://dl", "size": 100, "mime_type": "video/mp4"})
+        remote.iter_download = Mock(side_effect=lambda href, start, end: _chunks(data[start:end + 1]))
+        remote.get_file = AsyncMock(side_effect=AssertionError("second download"))
+        config = Mock()
+        config.is_yandex_enabled.return_value = True
+
+        app = FastAPI()
+        app.include_router(yandex_disk.router)
+        with patch("app.api.yandex_disk.get_storage_config", return_value=config), \
+                patch("app.api.yandex_disk.get_yandex_adapter", return_value=remote), \
+                patch("app.api.yandex_disk.get_media_cache", return_value=cache):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.get("/api/yandex-disk/file/new.mp4")
+
+        assert response.status_code == 200
+        assert response.content == data
+        assert remote.iter_download.call_count == 1
+        assert cache.lookup(adapter.cache_namespace, "new.mp4").read_bytes() == data
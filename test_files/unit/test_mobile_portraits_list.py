@@ -0,0 +1,172 @@
+"""
+Tests for the mobile portrait list: SQL filtering and cursor pagination.
+"""
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.database import Database
+from app.utils import decode_cursor, encode_cursor
+
+STORAGE_ROOT = Path("/srv/storage")
+
+
+@pytest.fixture
+def temp_db():
+    """Create a temporary database with two companies' portraits."""
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+        db_path = Path(f.name)
+
+    db = Database(db_path)
+    db.create_company("other", "Other Co")
+    db.create_client("c-default", "+70001", "Default Client")
+    db.create_client("c-other", "+70002", "Other Client", company_id="other")
+    for i in range(25):
+        client_id = "c-default" if i % 5 else "c-other"
+        portrait_id = f"p{i:02d}"
+        db.create_portrait(portrait_id, client_id, str(STORAGE_ROOT / f"{portrait_id}.jpg"), "f", "f3", "i",
+                           f"link-{portrait_id}")
+        # Pairs of portraits share a timestamp so ties are broken by id
+        db._execute("UPDATE portraits SET created_at = ? WHERE id = ?",
+                    (f"2024-01-01 00:00:{i // 2:02d}", portrait_id))
+        if i % 3 == 0:
+            db.create_video(f"v{i:02d}", portrait_id, str(STORAGE_ROOT / f"v{i:02d}.mp4"), is_active=True,
+                            description=f"video {i}")
+    yield db
+
+    db_path.unlink(missing_ok=True)
+
+
+def _walk(db: Database, page_size: int, **filters) -> list:
+    """Collect all rows by following (created_at, id) keyset pages."""
+    rows, after = [], None
+    while True:
+        page = db.list_portraits_for_mobile(limit=page_size, after=after, **filters)
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        after = (page[-1]["created_at"], page[-1]["id"])
+
+
+class TestCursorEncoding:
+    """Test opaque cursor tokens."""
+
+    def test_round_trip(self):
+        token = encode_cursor(["2024-01-01 00:00:05", "p10"])
+        assert "=" not in token
+        assert decode_cursor(token, 2) == ("2024-01-01 00:00:05", "p10")
+
+    @pytest.mark.parametrize("token", ["not base64 !", encode_cursor(["only-one"]), encode_cursor({"a": 1})])
+    def test_invalid(self, token):
+        with pytest.raises(ValueError):
+            decode_cursor(token, 2)
+
+
+class TestMobilePortraitQuery:
+    """Test Database.list_portraits_for_mobile."""
+
+    def test_keyset_walk_matches_full_order(self, temp_db):
+        expected = temp_db.list_portraits_for_mobile(limit=100, include_inactive=True)
+        assert [row["id"] for row in expected] == sorted(
+            (row["id"] for row in expected), key=lambda pid: (next(r["created_at"] for r in expected if r["id"] == pid), pid),
+            reverse=True,
+        )
+        for page_size in (1, 4, 7):
+            assert [row["id"] for row in _walk(temp_db, page_size, include_inactive=True)] == [row["id"] for row in expected]
+
+    def test_filters_applied_in_sql(self, temp_db):
+        active = temp_db.list_portraits_for_mobile(limit=100)
+        assert {row["id"] for row in active} == {f"p{i:02d}" for i in range(25) if i % 3 == 0}
+        assert all(row["active_video_id"] for row in active)
+        assert temp_db.count_portraits_for_mobile() == len(active)
+
+        other = temp_db.list_portraits_for_mobile(limit=100, company_id="other", include_inactive=True)
+        assert {row["client_id"] for row in other} == {"c-other"}
+        assert temp_db.count_portraits_for_mobile(company_id="other", include_inactive=True) == 5
+
+        client = _walk(temp_db, 2, client_id="c-default", include_inactive=True)
+        assert len(client) == 20
+        assert client[0]["client_name"] == "Default Client"
+
+    def test_offset_pages(self, temp_db):
+        full = [row["id"] for row in temp_db.list_portraits_for_mobile(limit=100, include_inactive=True)]
+        second = temp_db.list_portraits_for_mobile(limit=10, offset=10, include_inactive=True)
+        assert [row["id"] for row in second] == full[10:20]
+
+
+class TestMobilePortraitEndpoint:
+    """Test the /mobile/portraits endpoint pagination."""
+
+    async def _call(self, db, **params):
+        from app.api import mobile
+
+        app = SimpleNamespace(state=SimpleNamespace(config={"BASE_URL": "https://ar.test", "STORAGE_ROOT": STORAGE_ROOT}))
+        defaults = dict(company_id=None, client_id=None, include_inactive=False, page=1, page_size=20,
+                        cursor=None, username="admin")
+        with patch.object(mobile, "get_database", return_value=db), \
+                patch("app.main.get_current_app", return_value=app):
+            return await mobile.list_portraits_mobile(**{**defaults, **params})
+
+    @pytest.mark.asyncio
+    async def test_cursor_pages(self, temp_db):
+        first = await self._call(temp_db, include_inactive=True, page_size=10)
+        assert first.total == 25
+        assert len(first.portraits) == 10
+        assert first.next_cursor
+
+        seen = [p.id for p in first.portraits]
+        cursor = first.next_cursor
+        while cursor:
+            page = await self._call(temp_db, include_inactive=True, page_size=10, cursor=cursor)
+            assert page.total is None
+            seen.extend(p.id for p in page.portraits)
+            cursor = page.next_cursor
+        assert len(seen) == len(set(seen)) == 25
+
+    @pytest.mark.asyncio
+    async def test_active_video_and_client(self, temp_db):
+        response = await self._call(temp_db, company_id="other")
+        assert response.total == 2
+        assert response.next_cursor is None
+        portrait = response.portraits[0]
+        assert portrait.client.name == "Other Client"
+        assert portrait.active_video.url.startswith("https://ar.test/storage/")
+        assert portrait.active_video.description.startswith("video ")
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, temp_db):
+        with pytest.raises(HTTPException) as exc_info:
+            await self._call(temp_db, cursor="garbage")
+        assert exc_info.value.status_code == 400
+
+
+class TestMobileMarkerUrls:
+    """Marker URLs follow the stored marker paths."""
+
+    def _response(self, **portrait):
+        from app.api.mobile import _build_portrait_response
+
+        record = {"id": "p1", "image_path": "portraits/blobs/ab/abcd.jpg", "permanent_link": "link-p1",
+                  "created_at": "2024-01-01 00:00:00", **portrait}
+        client = {"id": "c1", "name": "Client", "phone": "+70001"}
+        return _build_portrait_response(record, client, None, "https://ar.test", STORAGE_ROOT)
+
+    def test_shared_blob_markers(self):
+        marker_dir = STORAGE_ROOT / "nft_markers" / "abcd"
+        response = self._response(
+            marker_fset=str(marker_dir / "abcd.fset"),
+            marker_fset3=str(marker_dir / "abcd.fset3"),
+            marker_iset=str(marker_dir / "abcd.iset"),
+        )
+        assert response.image.url == "https://ar.test/storage/portraits/blobs/ab/abcd.jpg"
+        assert response.markers.fset == "https://ar.test/nft-markers/abcd/abcd.fset"
+        assert response.markers.iset == "https://ar.test/nft-markers/abcd/abcd.iset"
+
+    def test_order_folder_markers(self):
+        response = self._response(marker_fset=str(STORAGE_ROOT / "orders" / "o1" / "nft_markers" / "p1.fset"))
+        assert response.markers.fset == "https://ar.test/storage/orders/o1/nft_markers/p1.fset"
+        assert response.markers.fset3 == "https://ar.test/nft-markers/p1/p1.fset3"
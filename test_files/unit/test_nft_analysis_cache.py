@@ -0,0 +1,152 @@
+"""
+Unit tests for NFT image analysis and the content-addressed analysis cache.
+"""
+import json
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from nft_marker_generator import NFTAnalysisCache, NFTMarkerGenerator, get_analysis_cache
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield Path(tmp)
+
+
+@pytest.fixture
+def cache(temp_dir):
+    cache = NFTAnalysisCache(temp_dir / "cache", memory_entries=2, sweep_interval=None)
+    yield cache
+    cache.stop_sweeper()
+
+
+def _write_image(path: Path, seed: int = 1, size=(600, 500)) -> Path:
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, size=(size[1], size[0]), dtype=np.uint8)
+    Image.fromarray(pixels, "L").save(path, "PNG")
+    return path
+
+
+def _age_entry(cache: NFTAnalysisCache, cache_key: str, days: int) -> None:
+    cache_path = cache._get_cache_path(cache_key)
+    data = json.loads(cache_path.read_text())
+    data["cached_at"] = (datetime.now() - timedelta(days=days)).isoformat()
+    cache_path.write_text(json.dumps(data))
+
+
+class TestNFTAnalysisCache:
+    """Test content-addressed analysis cache."""
+
+    def test_same_content_shares_entry(self, cache, temp_dir):
+        original = _write_image(temp_dir / "a.png")
+        copy = temp_dir / "portrait_copy.png"
+        shutil.copy(original, copy)
+
+        cache.set(original, {"quality": "good"})
+
+        assert cache.content_key(original) == cache.content_key(copy)
+        assert cache.get(copy) == {"quality": "good"}
+
+    def test_different_content_misses(self, cache, temp_dir):
+        cache.set(_write_image(temp_dir / "a.png", seed=1), {"quality": "good"})
+        assert cache.get(_write_image(temp_dir / "b.png", seed=2)) is None
+
+    def test_memory_tier_lru(self, cache, temp_dir):
+        images = [_write_image(temp_dir / f"{i}.png", seed=i) for i in range(3)]
+        for i, image in enumerate(images):
+            cache.set(image, {"n": i})
+
+        # Oldest entry was evicted from memory but is still on disk
+        assert len(cache._memory) == 2
+        assert cache.get(images[0]) == {"n": 0}
+        assert cache.stats["disk_hits"] == 1
+
+        assert cache.get(images[0]) == {"n": 0}
+        assert cache.stats["memory_hits"] == 1
+
+    def test_returned_entries_are_copies(self, cache, temp_dir):
+        image = _write_image(temp_dir / "a.png")
+        cache.set(image, {"quality": "good"})
+
+        cache.get(image)["preview_path"] = "/tmp/x.png"
+        assert cache.get(image) == {"quality": "good"}
+
+    def test_expired_entry_is_kept_until_sweep(self, cache, temp_dir):
+        image = _write_image(temp_dir / "a.png")
+        cache_key = cache.content_key(image)
+        cache.set(image, {"quality": "good"})
+        cache._memory.clear()
+        _age_entry(cache, cache_key, days=8)
+
+        assert cache.get(image) is None
+        assert cache._get_cache_path(cache_key).exists()
+
+        assert cache.clear_expired() == 1
+        assert not cache._get_cache_path(cache_key).exists()
+
+    def test_background_sweep(self, temp_dir):
+        cache = NFTAnalysisCache(temp_dir / "cache", sweep_interval=0.05)
+        try:
+            image = _write_image(temp_dir / "a.png")
+            cache_key = cache.content_key(image)
+            cache.set(image, {"quality": "good"})
+            _age_entry(cache, cache_key, days=8)
+
+            deadline = time.time() + 2
+            while cache._get_cache_path(cache_key).exists() and time.time() < deadline:
+                time.sleep(0.05)
+
+            assert not cache._get_cache_path(cache_key).exists()
+        finally:
+            cache.stop_sweeper()
+
+    def test_shared_cache_per_directory(self, temp_dir):
+        first = get_analysis_cache(temp_dir / "shared")
+        second = get_analysis_cache(temp_dir / "shared")
+        try:
+            assert first is second
+        finally:
+            first.stop_sweeper()
+
+
+class TestImageAnalysis:
+    """Test vectorized brightness/contrast analysis."""
+
+    def test_statistics_match_exact_values(self, temp_dir):
+        image = _write_image(temp_dir / "a.png", size=(640, 480))
+        pixels = np.asarray(Image.open(image), dtype=np.float64)
+
+        brightness, contrast = NFTMarkerGenerator._brightness_contrast(Image.open(image))
+
+        assert brightness == pytest.approx(pixels.mean())
+        assert contrast == pytest.approx(pixels.std())
+
+    def test_large_image_uses_bounded_sample(self, temp_dir):
+        image = _write_image(temp_dir / "big.png", size=(4000, 3000))
+        pixels = np.asarray(Image.open(image), dtype=np.float64)
+
+        brightness, contrast = NFTMarkerGenerator._brightness_contrast(Image.open(image))
+
+        assert brightness == pytest.approx(pixels.mean(), abs=1.0)
+        assert contrast == pytest.approx(pixels.std(), abs=1.0)
+
+    def test_analyze_reuses_cache_across_paths(self, temp_dir):
+        generator = NFTMarkerGenerator(temp_dir / "storage", enable_cache=True)
+        original = _write_image(temp_dir / "a.png")
+        copy = temp_dir / "b.png"
+        shutil.copy(original, copy)
+
+        first = generator.analyze_image(original)
+        second = generator.analyze_image(copy)
+
+        assert first["valid"] is True
+        assert second == first
+        assert generator.metrics["cache_hits"] == 1
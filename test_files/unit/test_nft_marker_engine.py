@@ -0,0 +1,140 @@
+"""
+Unit tests for the NFT marker engines and the shared decoded image.
+The NumPy path must write byte-identical .fset/.iset files to the pure Python path.
+"""
+import io
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from nft_marker_generator import DecodedImage, NFTMarkerConfig, NFTMarkerGenerator
+from preview_generator import PreviewGenerator
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield Path(tmp)
+
+
+def _textured_image(path: Path, size=(613, 487), mode="RGB", seed=7) -> Path:
+    rng = np.random.default_rng(seed)
+    width, height = size
+    pixels = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    # Flat regions plus noise so some grid points fall under the threshold
+    pixels[: height // 3] = 128
+    Image.fromarray(pixels, "RGB").convert(mode).save(path, "PNG")
+    return path
+
+
+def _generators(temp_dir):
+    python_gen = NFTMarkerGenerator(temp_dir / "python", enable_cache=False, use_numpy=False)
+    numpy_gen = NFTMarkerGenerator(temp_dir / "numpy", enable_cache=False, use_numpy=True)
+    return python_gen, numpy_gen
+
+
+class TestNumpyMarkerEngine:
+    """Test NumPy engine output equivalence."""
+
+    def test_engine_selection(self, temp_dir):
+        python_gen, numpy_gen = _generators(temp_dir)
+        assert python_gen.use_numpy is False
+        assert numpy_gen.use_numpy is True
+
+    @pytest.mark.parametrize("density", ["low", "medium", "high"])
+    def test_fset_byte_identical(self, temp_dir, density):
+        image_path = _textured_image(temp_dir / "source.png")
+        python_gen, numpy_gen = _generators(temp_dir)
+        config = NFTMarkerConfig(feature_density=density)
+
+        python_gen._generate_fset(image_path, temp_dir / "python.fset", config)
+        numpy_gen._generate_fset(image_path, temp_dir / "numpy.fset", config)
+
+        expected = (temp_dir / "python.fset").read_bytes()
+        assert (temp_dir / "numpy.fset").read_bytes() == expected
+        # Header (24 bytes) + count; make sure features were actually found
+        assert int.from_bytes(expected[24:28], "little") > 0
+
+    @pytest.mark.parametrize("mode", ["RGB", "RGBA", "P", "L"])
+    def test_iset_byte_identical(self, temp_dir, mode):
+        image_path = _textured_image(temp_dir / "source.png", mode=mode)
+        python_gen, numpy_gen = _generators(temp_dir)
+        config = NFTMarkerConfig(levels=3)
+
+        python_gen._generate_iset(image_path, temp_dir / "python.iset", config)
+        numpy_gen._generate_iset(image_path, temp_dir / "numpy.iset", config)
+
+        assert (temp_dir / "numpy.iset").read_bytes() == (temp_dir / "python.iset").read_bytes()
+
+    def test_small_image_has_no_features(self):
+        gray = Image.new("L", (8, 8))
+        assert NFTMarkerGenerator._pack_features_numpy(gray, 5) == NFTMarkerGenerator._pack_features_python(gray, 5)
+
+    def test_generate_marker_identical(self, temp_dir):
+        image_path = _textured_image(temp_dir / "source.png", size=(640, 480))
+        python_gen, numpy_gen = _generators(temp_dir)
+
+        python_marker = python_gen.generate_marker(image_path, "marker")
+        numpy_marker = numpy_gen.generate_marker(image_path, "marker")
+
+        for attr in ("fset_path", "fset3_path", "iset_path"):
+            assert Path(getattr(numpy_marker, attr)).read_bytes() == Path(getattr(python_marker, attr)).read_bytes()
+
+
+class TestDecodedImage:
+    """Test the shared single-decode image context."""
+
+    def test_generate_marker_opens_source_once(self, temp_dir, monkeypatch):
+        import nft_marker_generator
+
+        image_path = _textured_image(temp_dir / "source.png", size=(640, 480))
+        generator = NFTMarkerGenerator(temp_dir / "storage", enable_cache=False)
+
+        calls = []
+        original_open = nft_marker_generator.Image.open
+
+        def counting_open(*args, **kwargs):
+            calls.append(args)
+            return original_open(*args, **kwargs)
+
+        monkeypatch.setattr(nft_marker_generator.Image, "open", counting_open)
+        marker = generator.generate_marker(image_path, "marker")
+
+        assert len(calls) == 1
+        assert (marker.width, marker.height) == (640, 480)
+
+    def test_shared_decode_matches_per_call_decode(self, temp_dir):
+        image_path = _textured_image(temp_dir / "source.png")
+        generator = NFTMarkerGenerator(temp_dir / "storage", enable_cache=False)
+        config = NFTMarkerConfig(levels=3)
+
+        generator._generate_iset(image_path, temp_dir / "own.iset", config)
+        with DecodedImage.open(image_path.read_bytes()) as decoded:
+            generator._generate_iset(image_path, temp_dir / "shared.iset", config, decoded)
+            assert decoded.pyramid_level(2).size == (613 // 4, 487 // 4)
+
+        assert (temp_dir / "shared.iset").read_bytes() == (temp_dir / "own.iset").read_bytes()
+
+    def test_validation_uses_header_only(self, temp_dir):
+        image_path = _textured_image(temp_dir / "small.png", size=(320, 240))
+        generator = NFTMarkerGenerator(temp_dir / "storage", enable_cache=False)
+
+        with DecodedImage.open(image_path) as decoded:
+            is_valid, message = generator._validate_image(image_path, NFTMarkerConfig(), decoded)
+            assert decoded._loaded is False
+
+        assert is_valid is False
+        assert "too small" in message
+
+    def test_thumbnail_from_decoded_image(self, temp_dir):
+        image_path = _textured_image(temp_dir / "source.png")
+        with DecodedImage.open(image_path) as decoded:
+            preview = PreviewGenerator.generate_image_preview(decoded.image, size=(100, 100))
+            # The shared image must not be shrunk in place
+            assert decoded.image.size == (613, 487)
+
+        assert preview is not None
+        assert Image.open(io.BytesIO(preview)).size == (100, 100)
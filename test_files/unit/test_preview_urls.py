@@ -0,0 +1,182 @@
+"""
+Unit tests for preview URLs and HTTP caching helpers.
+Tests ETag matching, versioned URLs, srcset building and sprite sheets.
+"""
+import asyncio
+import importlib
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.database import Database
+from app.services.preview_urls import (
+    PreviewVersions,
+    etag_matches,
+    make_etag,
+    render_sprite,
+    sprite_layout,
+    sprite_position,
+    variant_srcset,
+)
+
+
+def _webp(size=(300, 300), color=(10, 200, 10)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="WEBP")
+    return buffer.getvalue()
+
+
+class TestEtags:
+    """Test ETag generation and If-None-Match matching."""
+
+    def test_strong_etag_is_stable(self):
+        assert make_etag(b"preview") == make_etag(b"preview")
+        assert make_etag(b"preview") != make_etag(b"other")
+        assert make_etag(b"preview").startswith('"')
+
+    def test_if_none_match_forms(self):
+        etag = make_etag(b"preview")
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"x", {etag}', etag)
+        assert etag_matches(f"W/{etag}", etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches('"x"', etag)
+
+
+class TestPreviewVersions:
+    """Test version tokens and ETag caching."""
+
+    def test_version_changes_when_file_rewritten(self, tmp_path):
+        versions = PreviewVersions(tmp_path, tmp_path / "storage")
+        preview = tmp_path / "storage" / "portraits" / "p_preview.webp"
+        preview.parent.mkdir(parents=True)
+        preview.write_bytes(b"first")
+
+        first = versions.version("portraits/p_preview.webp")
+        assert first == versions.version(str(preview.relative_to(tmp_path / "storage")))
+        preview.write_bytes(b"second version")
+        assert versions.version("portraits/p_preview.webp") != first
+        assert versions.version(None) is None
+
+    def test_record_url(self, tmp_path):
+        versions = PreviewVersions(tmp_path, tmp_path)
+        url = versions.record_url("portraits", "p1", "portraits/p1.webp")
+        assert url.startswith("/previews/portraits/p1?v=")
+        assert versions.record_url("portraits", "p1", None) is None
+
+    def test_etag_cached_per_file_state(self, tmp_path):
+        versions = PreviewVersions(tmp_path, tmp_path)
+        (tmp_path / "a.webp").write_bytes(b"one")
+        assert versions.cached_etag("a.webp") is None
+
+        etag = versions.remember_etag("a.webp", b"one")
+        assert versions.cached_etag("a.webp") == etag
+        (tmp_path / "a.webp").write_bytes(b"changed")
+        assert versions.cached_etag("a.webp") is None
+
+    def test_sprite_version_tracks_members(self, tmp_path):
+        versions = PreviewVersions(tmp_path, tmp_path)
+        items = [("p1", "a.webp"), ("p2", None)]
+        assert versions.sprite_version("portraits", items) == versions.sprite_version("portraits", items)
+        assert versions.sprite_version("portraits", items) != versions.sprite_version("portraits", items[::-1])
+        assert "ids=p1%2Cp2" in versions.sprite_url("portraits", items)
+
+
+class TestSrcsetAndSprites:
+    """Test srcset strings and sprite sheet composition."""
+
+    def test_variant_srcset_filters_format(self):
+        rows = [
+            {"content_type": "portraits", "content_hash": "abc", "width": 300, "format": "webp",
+             "storage_path": "blobs/abc_preview_300.webp"},
+            {"content_type": "portraits", "content_hash": "abc", "width": 300, "format": "jpeg",
+             "storage_path": "blobs/abc_preview_300.jpg"},
+        ]
+        assert variant_srcset(rows) == "/previews/variants/portraits/abc/300.webp 300w"
+        assert variant_srcset(rows, "jpeg") == "/previews/variants/portraits/abc/300.jpg 300w"
+        assert variant_srcset([]) is None
+
+    def test_sprite_layout_and_positions(self):
+        layout = sprite_layout(23, tile=100)
+        assert (layout["columns"], layout["rows"]) == (10, 3)
+        assert sprite_position(0, layout) == {"x": 0, "y": 0}
+        assert sprite_position(12, layout) == {"x": 200, "y": 100}
+
+    def test_render_sprite_skips_missing(self):
+        sprite = Image.open(BytesIO(render_sprite([_webp(), None, b"broken"], tile=50)))
+        assert sprite.size == (150, 50)
+        assert sprite.getpixel((25, 25))[1] > 150
+        assert sprite.getpixel((75, 25)) == (255, 255, 255)
+
+
+@pytest.fixture
+def previews_api():
+    importlib.import_module("app.main")  # app.api modules import it first
+    from app.api import previews
+
+    return previews
+
+
+class TestPreviewAuth:
+    """Previews show customer content and are served to admins only."""
+
+    @pytest.mark.parametrize("url", [
+        "/previews/portraits/portrait-1",
+        "/previews/variants/portraits/abc/300.webp",
+        "/previews/sprites/portraits?ids=portrait-1",
+    ])
+    def test_unauthenticated_request_rejected(self, previews_api, url):
+        api = FastAPI()
+        api.include_router(previews_api.router, prefix="/previews")
+
+        response = TestClient(api).get(url)
+
+        assert response.status_code == 401
+
+
+class TestSpriteEndpoint:
+    """Sprite sheets read remote previews from each record's company storage."""
+
+    def test_remote_previews_use_company_adapter(self, tmp_path, previews_api):
+        previews = previews_api
+        database = Database(tmp_path / "app.db")
+        for company in ("company-a", "company-b"):
+            database.create_company(company, company)
+            database.create_client(f"client-{company}", f"+7000{len(company)}{company[-1]}", "Client", company_id=company)
+            database.create_portrait(
+                f"portrait-{company}", f"client-{company}", "image.jpg", "m.fset", "m.fset3", "m.iset",
+                f"link-{company}", image_preview_path=f"remote/{company}_preview.webp",
+            )
+
+        companies = []
+
+        def get_adapter_for_content(company_id, content_type):
+            companies.append((company_id, content_type))
+            return Mock(cache_namespace=None)
+
+        current_app = Mock()
+        current_app.state.storage_manager.get_adapter_for_content.side_effect = get_adapter_for_content
+        versions = Mock()
+        versions.resolve.side_effect = lambda path: tmp_path / "missing" / Path(path).name
+        versions.sprite_version.return_value = "v1"
+        request = Mock(headers={})
+
+        async def read_through(adapter, path):
+            return _webp()
+
+        with patch.object(previews, "get_current_app", return_value=current_app), \
+                patch.object(previews, "get_database", return_value=database), \
+                patch.object(previews, "_versions", return_value=versions), \
+                patch.object(previews, "read_through", side_effect=read_through):
+            response = asyncio.run(previews.get_preview_sprite(
+                request, "portraits", ids="portrait-company-a,portrait-company-b", tile=50, v="v1",
+            ))
+
+        assert response.status_code == 200
+        assert sorted(companies) == [("company-a", "portraits"), ("company-b", "portraits")]
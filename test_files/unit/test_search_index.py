@@ -0,0 +1,127 @@
+"""
+Tests for the full-text search indexes behind client and admin record search.
+"""
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from app.database import Database
+
+
+@pytest.fixture
+def temp_db():
+    """Create a temporary database with a few clients and portraits."""
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+        db_path = Path(f.name)
+
+    db = Database(db_path)
+    db.create_company("other", "Other Co")
+    db.create_client("c1", "+79991234567", "Иван Петров", email="ivan@example.com")
+    db.create_client("c2", "+79995550000", "Петр Иванов")
+    db.create_client("c3", "+70001112233", "John Smith", company_id="other")
+    db.create_portrait("p1", "c1", "img.jpg", "f", "f3", "i", "link-abc123")
+    db.create_portrait("p2", "c3", "img.jpg", "f", "f3", "i", "link-xyz")
+    db.create_portrait("p3", "c3", "img.jpg", "f", "f3", "i", "link-abc999")
+    yield db
+
+    db_path.unlink(missing_ok=True)
+
+
+def _ids(rows, key="id"):
+    return [row[key] for row in rows]
+
+
+class TestClientSearch:
+    """Test client search through the trigram index."""
+
+    def test_index_enabled(self, temp_db):
+        assert temp_db.search_enabled
+        assert temp_db._search_match("ab") is None
+        assert temp_db._search_match('a"b"c') == '"a""b""c"'
+
+    def test_substring_and_case_insensitive(self, temp_db):
+        assert set(_ids(temp_db.list_clients(search="иван"))) == {"c1", "c2"}
+        assert _ids(temp_db.list_clients(search="1234")) == ["c1"]
+        assert _ids(temp_db.list_clients(search="EXAMPLE.com")) == ["c1"]
+        assert _ids(temp_db.search_clients("smith")) == ["c3"]
+        assert temp_db.count_clients(search="иван") == 2
+
+    def test_company_filter_and_pagination(self, temp_db):
+        assert _ids(temp_db.list_clients(search="+7", company_id="other")) == ["c3"]
+        assert _ids(temp_db.list_clients(search="+7999", company_id="other")) == []
+        ranked = _ids(temp_db.list_clients(search="+799"))
+        assert _ids(temp_db.list_clients(search="+799", limit=1, offset=1)) == ranked[1:2]
+        with pytest.raises(ValueError):
+            temp_db.list_clients(search="+799", after=("2024-01-01", "c1"))
+
+    def test_short_terms_fall_back_to_like(self, temp_db):
+        assert set(_ids(temp_db.list_clients(search="+7"))) == {"c1", "c2", "c3"}
+        assert temp_db.count_clients(search="Jo") == 1
+
+    def test_index_follows_changes(self, temp_db):
+        temp_db._execute("UPDATE clients SET name = 'Jane Doe' WHERE id = 'c3'")
+        assert _ids(temp_db.list_clients(search="smith")) == []
+        assert _ids(temp_db.list_clients(search="jane")) == ["c3"]
+
+        temp_db.delete_client("c2")
+        assert _ids(temp_db.list_clients(search="иван")) == ["c1"]
+
+    def test_existing_rows_indexed_on_migration(self, temp_db):
+        temp_db._execute("DROP TABLE clients_fts")
+        reopened = Database(temp_db.path)
+        assert _ids(reopened.list_clients(search="smith")) == ["c3"]
+
+    def test_search_uses_index(self, temp_db):
+        query, params, ranked = temp_db._client_filters("smith", None)
+        plan = " ".join(row[3] for row in temp_db._execute("EXPLAIN QUERY PLAN SELECT clients.* " + query, tuple(params)))
+        assert ranked
+        assert "VIRTUAL TABLE" in plan
+        assert "SCAN clients" not in plan.replace("SCAN clients_fts", "")
+
+
+class TestAdminRecordSearch:
+    """Test get_admin_records search over clients and portraits."""
+
+    def test_matches_client_and_portrait_fields(self, temp_db):
+        assert _ids(temp_db.get_admin_records(search="петров"), "portrait_id") == ["p1"]
+        assert set(_ids(temp_db.get_admin_records(search="2233"), "portrait_id")) == {"p2", "p3"}
+        assert set(_ids(temp_db.get_admin_records(search="abc"), "portrait_id")) == {"p1", "p3"}
+        assert _ids(temp_db.get_admin_records(search="link-xyz"), "portrait_id") == ["p2"]
+
+    def test_email_not_matched(self, temp_db):
+        # Admin search covers name and phone, as before
+        assert temp_db.get_admin_records(search="example") == []
+
+    def test_filters_combined_with_search(self, temp_db):
+        records = temp_db.get_admin_records(search="abc", company_id="other")
+        assert _ids(records, "portrait_id") == ["p3"]
+        assert records[0]["client_name"] == "John Smith"
+        temp_db._execute("UPDATE portraits SET lifecycle_status = 'archived' WHERE id = 'p1'")
+        assert _ids(temp_db.get_admin_records(search="abc", status="archived"), "portrait_id") == ["p1"]
+        assert len(temp_db.get_admin_records(search="abc", limit=1)) == 1
+
+    def test_portrait_matching_both_indexes_listed_once(self, temp_db):
+        temp_db.create_client("c4", "+75550001", "Link Abc Owner")
+        temp_db.create_portrait("p4", "c4", "img.jpg", "f", "f3", "i", "link-abc444")
+        assert _ids(temp_db.get_admin_records(search="abc"), "portrait_id").count("p4") == 1
+
+
+class TestRankWindow:
+    """Ranking is bounded to the newest matches but filters apply first."""
+
+    def test_filtered_matches_outside_window(self, temp_db):
+        temp_db.SEARCH_RANK_WINDOW = 2
+        for i in range(5):
+            temp_db.create_client(f"n{i}", f"+7123000{i}", f"Smith {i}")
+            temp_db.create_portrait(f"np{i}", f"n{i}", "img.jpg", "f", "f3", "i", f"link-n{i}")
+
+        # c3 is the oldest "smith" but the only one in its company
+        assert _ids(temp_db.list_clients(search="smith", company_id="other", limit=10)) == ["c3"]
+        assert set(_ids(temp_db.get_admin_records(search="smith", company_id="other"), "portrait_id")) == {"p2", "p3"}
+        # Matches past the window follow, newest first, without gaps or repeats
+        full = _ids(temp_db.list_clients(search="smith"))
+        assert full[2:] == ["n2", "n1", "n0", "c3"]
+        pages = [_ids(temp_db.list_clients(search="smith", limit=2, offset=offset)) for offset in (0, 1, 2, 4)]
+        assert pages == [full[0:2], full[1:3], full[2:4], full[4:6]]
+        assert temp_db.count_clients(search="smith") == 6
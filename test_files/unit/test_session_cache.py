@@ -0,0 +1,174 @@
+"""
+Tests for the in-memory authenticated session cache.
+"""
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.auth import TokenManager
+from app.database import Database
+
+
+@pytest.fixture
+def temp_db():
+    """Create a temporary database with an admin user."""
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+        db_path = Path(f.name)
+
+    db = Database(db_path)
+    db.create_user("admin", "hashed", is_admin=True)
+    db.create_user("other", "hashed")
+    yield db
+
+    db_path.unlink(missing_ok=True)
+
+
+@pytest.fixture
+def app_db(temp_db):
+    """Point TokenManager at the temporary database."""
+    with patch('app.main.get_current_app') as mock_get_current_app:
+        mock_app = Mock()
+        mock_app.state.database = temp_db
+        mock_get_current_app.return_value = mock_app
+        yield temp_db
+
+
+@pytest.fixture
+def tokens(app_db):
+    # Check versions on every request so tests need not sleep
+    return TokenManager(session_timeout_minutes=5, version_check_interval=0)
+
+
+@contextmanager
+def count_queries(db: Database):
+    """Count statements sent through Database._execute inside the block."""
+    executed = []
+    original = db._execute
+
+    def counting_execute(query, params=None):
+        executed.append(query)
+        return original(query, params)
+
+    with patch.object(db, "_execute", side_effect=counting_execute):
+        yield executed
+
+
+class TestSessionCache:
+    """Verified sessions are served from memory until they may have changed."""
+
+    def test_cache_hit_skips_session_and_user_lookups(self, tokens, app_db):
+        token = tokens.issue_token("admin")
+        session = tokens.authenticate(token)
+        assert session.username == "admin"
+        assert session.user["is_admin"]
+
+        tokens.running = True  # buffer last_seen instead of writing it
+        with count_queries(app_db) as queries:
+            assert tokens.authenticate(token).user["username"] == "admin"
+        # Only the version lookup
+        assert len(queries) == 1
+        assert tokens.get_stats()["hits"] == 1
+
+    def test_unknown_token(self, tokens):
+        assert tokens.authenticate("missing") is None
+        assert tokens.verify_token("missing") is None
+
+    def test_revoke_evicts_immediately(self, tokens):
+        tokens.version_check_interval = 3600
+        first = tokens.issue_token("admin")
+        second = tokens.issue_token("admin")
+        tokens.authenticate(first)
+        tokens.authenticate(second)
+
+        tokens.revoke_token(first)
+        assert tokens.authenticate(first) is None
+        assert tokens.authenticate(second) is not None
+
+        tokens.revoke_user_except_current("admin", second)
+        assert tokens.authenticate(second) is not None
+        tokens.revoke_user("admin")
+        assert tokens.authenticate(second) is None
+
+    def test_revocation_by_another_worker(self, tokens, app_db):
+        other_worker = TokenManager(session_timeout_minutes=5)
+        token = tokens.issue_token("admin")
+        assert tokens.authenticate(token) is not None
+
+        other_worker.revoke_token(token)
+        assert tokens.authenticate(token) is None
+
+    def test_version_check_interval_bounds_polling(self, tokens, app_db):
+        tokens.version_check_interval = 3600
+        token = tokens.issue_token("admin")
+        tokens.authenticate(token)
+        app_db.revoke_admin_session(token)
+        # Still cached until the next version check
+        assert tokens.authenticate(token) is not None
+
+        tokens._versions_checked_at = 0.0
+        assert tokens.authenticate(token) is None
+
+    def test_user_changes_invalidate(self, tokens, app_db):
+        token = tokens.issue_token("other")
+        assert tokens.authenticate(token).user["is_active"]
+        app_db.update_user("other", is_active=False)
+        assert not tokens.authenticate(token).user["is_active"]
+
+    def test_ttl_expiry_reloads(self, tokens, app_db):
+        tokens.cache_ttl = 0
+        token = tokens.issue_token("admin")
+        tokens.authenticate(token)
+        tokens.authenticate(token)
+        assert tokens.get_stats()["hits"] == 0
+        assert tokens.get_stats()["misses"] == 2
+
+    def test_deleted_user_not_cached(self, tokens, app_db):
+        token = tokens.issue_token("other")
+        app_db._execute("PRAGMA foreign_keys = OFF")
+        app_db._execute("DELETE FROM users WHERE username = 'other'")
+        session = tokens.authenticate(token)
+        assert session is not None and session.user is None
+        assert tokens.get_stats()["cached_sessions"] == 0
+
+
+class TestLastSeenBuffering:
+    """last_seen updates are coalesced while the flush loop runs."""
+
+    def _last_seen(self, db, token):
+        return db._execute("SELECT last_seen FROM admin_sessions WHERE token = ?", (token,)).fetchone()[0]
+
+    def test_buffered_and_flushed_in_one_batch(self, tokens, app_db):
+        first = tokens.issue_token("admin")
+        second = tokens.issue_token("other")
+        app_db._execute("UPDATE admin_sessions SET last_seen = '2000-01-01 00:00:00'")
+
+        tokens.running = True
+        for _ in range(3):
+            tokens.authenticate(first)
+            tokens.authenticate(second)
+        assert tokens.get_stats()["pending_last_seen"] == 2
+        assert self._last_seen(app_db, first) == "2000-01-01 00:00:00"
+
+        assert tokens.flush_last_seen() == 2
+        assert self._last_seen(app_db, first) > "2000-01-01 00:00:00"
+        assert tokens.get_stats()["pending_last_seen"] == 0
+        assert tokens.flush_last_seen() == 0
+
+    def test_written_through_when_not_running(self, tokens, app_db):
+        token = tokens.issue_token("admin")
+        app_db._execute("UPDATE admin_sessions SET last_seen = '2000-01-01 00:00:00'")
+        tokens.authenticate(token)
+        assert self._last_seen(app_db, token) > "2000-01-01 00:00:00"
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending(self, tokens, app_db):
+        token = tokens.issue_token("admin")
+        app_db._execute("UPDATE admin_sessions SET last_seen = '2000-01-01 00:00:00'")
+        await tokens.start()
+        tokens.authenticate(token)
+        await tokens.stop()
+        assert not tokens.running
+        assert self._last_seen(app_db, token) > "2000-01-01 00:00:00"
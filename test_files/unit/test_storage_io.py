@@ -0,0 +1,99 @@
+"""
+Tests for the bounded storage I/O executors and the adapters using them.
+"""
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app.storage_io import StorageIOExecutor, get_storage_executor
+from app.storage_local import LocalStorageAdapter
+
+
+class TestStorageIOExecutor:
+    """Test StorageIOExecutor."""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_the_event_loop(self):
+        executor = StorageIOExecutor("test", max_workers=2)
+        loop_thread = threading.get_ident()
+        assert await executor.run(threading.get_ident) != loop_thread
+        assert await executor.run(lambda a, b=0: a + b, 1, b=2) == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded_and_queue_tracked(self):
+        executor = StorageIOExecutor("test", max_workers=2)
+        release = threading.Event()
+        running = []
+
+        def blocking():
+            running.append(1)
+            release.wait(5)
+
+        tasks = [asyncio.create_task(executor.run(blocking)) for _ in range(5)]
+        while len(running) < 2:
+            await asyncio.sleep(0.01)
+        stats = executor.get_stats()
+        assert stats["active"] == 2
+        assert stats["queue_depth"] == 3
+
+        release.set()
+        await asyncio.gather(*tasks)
+        stats = executor.get_stats()
+        assert stats["active"] == stats["queue_depth"] == 0
+        assert stats["completed"] == 5
+        assert stats["wait_p99_ms"] > 0
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_are_counted(self):
+        executor = StorageIOExecutor("test", max_workers=1)
+
+        def failing():
+            raise FileNotFoundError("missing")
+
+        with pytest.raises(FileNotFoundError):
+            await executor.run(failing)
+        assert executor.get_stats()["errors"] == 1
+
+    def test_shared_per_adapter_type(self):
+        assert get_storage_executor("local") is get_storage_executor("local")
+        assert get_storage_executor("local") is not get_storage_executor("minio")
+
+
+class TestLocalAdapterOffloading:
+    """LocalStorageAdapter keeps working and leaves the event loop free."""
+
+    @pytest.mark.asyncio
+    async def test_file_operations(self, tmp_path):
+        adapter = LocalStorageAdapter(tmp_path)
+        await adapter.save_file(b"data", "a/b/file.bin")
+        assert await adapter.file_exists("a/b/file.bin")
+        assert await adapter.get_file("a/b/file.bin") == b"data"
+        assert await adapter.directory_exists("a/b")
+        assert await adapter.list_directories("a") == ["b"]
+
+        assert await adapter.delete_file("a/b/file.bin")
+        assert not (tmp_path / "a").exists()
+        assert not await adapter.delete_file("a/b/file.bin")
+        with pytest.raises(FileNotFoundError):
+            await adapter.get_file("a/b/file.bin")
+        assert await adapter.list_directories("missing") == []
+
+    @pytest.mark.asyncio
+    async def test_slow_write_does_not_block_loop(self, tmp_path, monkeypatch):
+        adapter = LocalStorageAdapter(tmp_path)
+        original = LocalStorageAdapter._write_file
+
+        def slow_write(full_path: Path, file_data: bytes) -> None:
+            time.sleep(0.3)
+            original(full_path, file_data)
+
+        monkeypatch.setattr(LocalStorageAdapter, "_write_file", staticmethod(slow_write))
+        save = asyncio.create_task(adapter.save_file(b"data", "slow.bin"))
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        assert time.perf_counter() - start < 0.2
+        await save
+        assert (tmp_path / "slow.bin").read_bytes() == b"data"
@@ -0,0 +1,128 @@
+"""
+Unit tests for video preview generation.
+Tests frame-time selection, output sizes, poster and animation output and the
+OpenCV fallback when PyAV cannot open a file.
+"""
+from io import BytesIO
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from preview_generator import VideoPreviewEngine
+
+FPS = 10
+FRAMES = 40
+SIZE = (320, 240)
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    """Four-second MJPEG clip whose red channel encodes the frame index."""
+    path = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), FPS, SIZE)
+    for index in range(FRAMES):
+        frame = np.zeros((SIZE[1], SIZE[0], 3), np.uint8)
+        frame[:, :, 2] = index * 6
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def _red_at(data: bytes, xy=(5, 5)) -> int:
+    return Image.open(BytesIO(data)).convert("RGB").getpixel(xy)[0]
+
+
+class TestFrameSelection:
+    """The preview frame is picked by timestamp."""
+
+    @pytest.mark.parametrize("keyframe_seek", [True, False])
+    def test_default_frame_is_middle(self, video_path, keyframe_seek):
+        engine = VideoPreviewEngine(sizes={"small": (100, 100)}, keyframe_seek=keyframe_seek)
+
+        result = engine.render(video_path)
+
+        assert result.frame_time == pytest.approx(2.0, abs=0.15)
+        assert result.source_size == SIZE
+
+    @pytest.mark.parametrize("keyframe_seek", [True, False])
+    def test_explicit_frame_time(self, video_path, keyframe_seek):
+        engine = VideoPreviewEngine(sizes={}, poster_size=(320, 320), keyframe_seek=keyframe_seek)
+
+        result = engine.render(video_path, frame_time=1.0)
+
+        assert result.frame_time == pytest.approx(1.0, abs=0.15)
+        assert _red_at(result.poster) == pytest.approx(60, abs=12)
+
+    def test_frame_time_past_end_is_clamped(self, video_path):
+        engine = VideoPreviewEngine(sizes={"small": (100, 100)}, keyframe_seek=False)
+
+        result = engine.render(video_path, frame_time=100)
+
+        assert result is not None
+        assert result.frame_time <= (FRAMES - 1) / FPS
+
+
+class TestOutputs:
+    """All sizes, the poster and the animation come from one open of the file."""
+
+    def test_previews_have_requested_sizes(self, video_path):
+        engine = VideoPreviewEngine(sizes={"small": (100, 100), "medium": (200, 200)})
+
+        result = engine.render(video_path)
+
+        assert {name: Image.open(BytesIO(data)).size for name, data in result.previews.items()} == {
+            "small": (100, 100),
+            "medium": (200, 200),
+        }
+        # Letterboxed on black with a white play icon in the middle
+        assert Image.open(BytesIO(result.previews["small"])).convert("RGB").getpixel((50, 2)) == (0, 0, 0)
+        assert min(Image.open(BytesIO(result.previews["medium"])).convert("RGB").getpixel((100, 100))) > 200
+
+    def test_poster_keeps_aspect_without_icon(self, video_path):
+        engine = VideoPreviewEngine(sizes={}, poster_size=(160, 160))
+
+        result = engine.render(video_path)
+
+        poster = Image.open(BytesIO(result.poster)).convert("RGB")
+        assert poster.size == (160, 120)
+        assert poster.getpixel((80, 60))[1] < 50
+        assert result.animation is None
+
+    def test_animation_is_animated_webp(self, video_path):
+        engine = VideoPreviewEngine(sizes={"small": (100, 100)}, animation_frames=4, animation_size=(80, 80))
+
+        result = engine.render(video_path)
+
+        animation = Image.open(BytesIO(result.animation))
+        assert animation.format == "WEBP"
+        assert animation.n_frames == 4
+        assert animation.size == (80, 80)
+
+    def test_jpeg_format(self, video_path):
+        engine = VideoPreviewEngine(sizes={"small": (100, 100)}, format="jpeg")
+
+        result = engine.render(video_path)
+
+        assert Image.open(BytesIO(result.previews["small"])).format == "JPEG"
+
+
+class TestFallback:
+    """OpenCV takes over when PyAV is unavailable or fails."""
+
+    def test_opencv_used_when_pyav_fails(self, video_path):
+        engine = VideoPreviewEngine(sizes={}, poster_size=(320, 320), keyframe_seek=True)
+
+        with patch("preview_generator._KeyframeReader", side_effect=ValueError("no video stream")):
+            result = engine.render(video_path, frame_time=1.0)
+
+        assert result is not None
+        assert _red_at(result.poster) == pytest.approx(60, abs=12)
+
+    def test_unreadable_file_returns_none(self, tmp_path):
+        path = tmp_path / "broken.mp4"
+        path.write_bytes(b"not a video")
+
+        assert VideoPreviewEngine().render(path) is None
@@ -0,0 +1,165 @@
+"""
+Unit tests for write-behind view and click counters.
+"""
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.cache import CacheManager, LRUCacheBackend
+from app.database import Database
+from app.services.view_counters import AR_CLICKS, PORTRAIT_VIEWS, ViewCounterBuffer
+
+
+@pytest.fixture
+def database():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "test.db")
+        db.create_client("client-1", "+70000000000", "Test Client")
+        for portrait_id in ("p1", "p2"):
+            db.create_portrait(
+                portrait_id=portrait_id,
+                client_id="client-1",
+                image_path=f"portraits/client-1/{portrait_id}.jpg",
+                marker_fset="",
+                marker_fset3="",
+                marker_iset="",
+                permanent_link=f"portrait_{portrait_id}",
+            )
+        yield db
+        db.close()
+
+
+def _views(database, portrait_id):
+    return database.get_portrait(portrait_id)["view_count"]
+
+
+class TestViewCounterBuffer:
+    """Test counter buffering and flushing."""
+
+    def test_apply_counter_increments_rejects_unknown_columns(self, database):
+        with pytest.raises(ValueError):
+            database.apply_counter_increments({("users", "hashed_password"): [("admin", 1)]})
+
+    def test_apply_counter_increments_rolls_back_on_failure(self, database, monkeypatch):
+        monkeypatch.setattr(
+            database, "COUNTER_COLUMNS", database.COUNTER_COLUMNS | {("portraits", "missing_count")}
+        )
+
+        with pytest.raises(Exception):
+            database.apply_counter_increments({
+                ("portraits", "view_count"): [("p1", 3)],
+                ("portraits", "missing_count"): [("p1", 1)],
+            })
+
+        assert _views(database, "p1") == 0
+        database.apply_counter_increments({("portraits", "view_count"): [("p2", 1)]})
+        assert _views(database, "p1") == 0
+        assert _views(database, "p2") == 1
+
+    def test_writes_through_when_not_running(self, database):
+        counter_buffer = ViewCounterBuffer(database)
+        counter_buffer.increment(PORTRAIT_VIEWS, "p1")
+
+        assert _views(database, "p1") == 1
+        assert counter_buffer.get_stats()["buffer_size"] == 0
+
+    def test_unknown_kind(self, database):
+        with pytest.raises(ValueError):
+            ViewCounterBuffer(database).increment("downloads", "p1")
+
+    @pytest.mark.asyncio
+    async def test_increments_are_aggregated_and_flushed(self, database):
+        counter_buffer = ViewCounterBuffer(database, flush_interval=3600)
+        await counter_buffer.start()
+        try:
+            for _ in range(5):
+                counter_buffer.increment(PORTRAIT_VIEWS, "p1")
+            counter_buffer.increment(PORTRAIT_VIEWS, "p2", delta=3)
+
+            assert _views(database, "p1") == 0
+            assert counter_buffer.pending(PORTRAIT_VIEWS, "p1") == 5
+
+            stats = counter_buffer.get_stats()
+            assert stats["buffer_size"] == 2
+            assert stats["pending_increments"] == 8
+            assert stats["lag_seconds"] >= 0
+
+            assert counter_buffer.flush() == 8
+        finally:
+            await counter_buffer.stop()
+
+        assert _views(database, "p1") == 5
+        assert _views(database, "p2") == 3
+        stats = counter_buffer.get_stats()
+        assert stats["buffer_size"] == 0
+        assert stats["lag_seconds"] == 0.0
+        assert stats["flushes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending(self, database):
+        counter_buffer = ViewCounterBuffer(database, flush_interval=3600)
+        await counter_buffer.start()
+        counter_buffer.increment(PORTRAIT_VIEWS, "p1")
+        await counter_buffer.stop()
+
+        assert _views(database, "p1") == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_increments(self, database, monkeypatch):
+        counter_buffer = ViewCounterBuffer(database, flush_interval=3600)
+        await counter_buffer.start()
+        counter_buffer.increment(AR_CLICKS, "content-1")
+        counter_buffer.increment(PORTRAIT_VIEWS, "p1")
+
+        def fail(_increments):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(database, "apply_counter_increments", fail)
+        assert counter_buffer.flush() == 0
+        assert counter_buffer.get_stats()["flush_errors"] == 1
+        assert counter_buffer.pending(PORTRAIT_VIEWS, "p1") == 1
+        assert counter_buffer.get_stats()["lag_seconds"] > 0
+
+        monkeypatch.undo()
+        await counter_buffer.stop()
+        assert _views(database, "p1") == 1
+
+
+    @pytest.mark.asyncio
+    async def test_flush_invalidates_cached_portraits(self, database):
+        cache_manager = CacheManager(LRUCacheBackend(), namespace="test")
+        counter_buffer = ViewCounterBuffer(database, flush_interval=3600, cache_manager=cache_manager)
+        await counter_buffer.start()
+        counter_buffer.increment(PORTRAIT_VIEWS, "p1")
+        counter_buffer.increment(PORTRAIT_VIEWS, "p1")
+        counter_buffer.increment(PORTRAIT_VIEWS, "p2")
+        counter_buffer.increment(AR_CLICKS, "content-1")
+
+        with patch.object(cache_manager, "invalidate_tags", wraps=cache_manager.invalidate_tags) as invalidate:
+            await counter_buffer.stop()
+            await counter_buffer.invalidate_written()
+
+        # One invalidation per flush, for the portraits whose view_count changed
+        assert invalidate.call_count == 1
+        assert sorted(invalidate.call_args.args) == ["portrait:p1", "portrait:p2"]
+
+
+class TestFlushMetrics:
+    """Flush totals are exported as Prometheus counters."""
+
+    def test_counters_follow_running_totals(self):
+        from prometheus_client import CollectorRegistry, Counter
+
+        from app.prometheus_metrics import _advance_counter
+
+        registry = CollectorRegistry()
+        counter = Counter("test_flushed_total", "Flushed increments", registry=registry)
+
+        _advance_counter(counter, 5)
+        _advance_counter(counter, 8)
+        assert registry.get_sample_value("test_flushed_total") == 8
+        # The buffer was recreated: its new total is all new increments
+        _advance_counter(counter, 2)
+        assert registry.get_sample_value("test_flushed_total") == 10
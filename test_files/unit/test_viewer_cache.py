@@ -0,0 +1,116 @@
+"""
+Unit tests for the public AR viewer page cache.
+"""
+import tempfile
+from pathlib import Path
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+
+from app.database import Database
+from app.services.viewer_cache import ViewerCache
+
+ORIGIN = "https://ar.example.com"
+
+
+@pytest.fixture
+def database():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "test.db")
+        db.create_client("client-1", "+70000000000", "Test Client")
+        db.create_portrait(
+            portrait_id="p1",
+            client_id="client-1",
+            image_path="portraits/client-1/p1.jpg",
+            marker_fset="",
+            marker_fset3="",
+            marker_iset="",
+            permanent_link="portrait_p1",
+        )
+        db.create_video("v1", "p1", "videos/v1.mp4", is_active=True)
+        db.create_video("v2", "p1", "videos/v2.mp4")
+        yield db
+        db.close()
+
+
+@pytest.fixture
+def viewer_cache(database):
+    cache = ViewerCache(ttl=60)
+    database.add_portrait_change_listener(cache.invalidate_portrait)
+    return cache
+
+
+class TestViewerCache:
+    """Test cached viewer pages and their invalidation."""
+
+    def test_set_and_get(self):
+        cache = ViewerCache()
+        page = cache.set("portrait_p1", ORIGIN, "p1", b"<html>")
+
+        assert cache.get("portrait_p1", ORIGIN) == page
+        assert page.etag == ViewerCache.make_etag(b"<html>")
+        assert cache.get("portrait_p1", "http://other") is None
+
+    def test_expired_page_is_dropped(self):
+        cache = ViewerCache(ttl=-1)
+        cache.set("portrait_p1", ORIGIN, "p1", b"<html>")
+
+        assert cache.get("portrait_p1", ORIGIN) is None
+        assert cache.get_stats()["size"] == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = ViewerCache(max_entries=2)
+        cache.set("a", ORIGIN, "pa", b"a")
+        cache.set("b", ORIGIN, "pb", b"b")
+        cache.get("a", ORIGIN)
+        cache.set("c", ORIGIN, "pc", b"c")
+
+        assert cache.get("b", ORIGIN) is None
+        assert cache.get("a", ORIGIN) is not None
+        assert cache.get("c", ORIGIN) is not None
+
+    def test_stale_generation_is_not_stored(self):
+        cache = ViewerCache()
+        generation = cache.generation
+        cache.invalidate_portrait("p1")
+        cache.set("portrait_p1", ORIGIN, "p1", b"<html>", generation=generation)
+
+        assert cache.get("portrait_p1", ORIGIN) is None
+
+    @pytest.mark.parametrize("change", [
+        lambda db: db.set_active_video("v2", "p1"),
+        lambda db: db.activate_video_with_history("v2"),
+        lambda db: db.deactivate_video_with_history("v1"),
+        lambda db: db.delete_portrait("p1"),
+        lambda db: db.update_portrait_marker_paths("p1", marker_fset="nft_markers/abc/abc.fset"),
+        lambda db: db.delete_client("client-1"),
+        lambda db: db.delete_clients_bulk(["client-1"]),
+    ])
+    def test_database_changes_invalidate_portrait(self, database, viewer_cache, change):
+        viewer_cache.set("portrait_p1", ORIGIN, "p1", b"<html>")
+        viewer_cache.set("portrait_p2", ORIGIN, "p2", b"<html>")
+
+        change(database)
+
+        assert viewer_cache.get("portrait_p1", ORIGIN) is None
+        assert viewer_cache.get("portrait_p2", ORIGIN) is not None
+
+
+class TestViewerMarkerUrl:
+    """The viewer loads markers from where they were generated."""
+
+    def test_page_uses_stored_marker_location(self):
+        from app.api.mobile import _marker_url
+
+        storage_root = Path("/srv/storage")
+        fset_url = _marker_url(str(storage_root / "nft_markers/abc/abc.fset"), ORIGIN, storage_root, "p1/p1.fset")
+        templates = Environment(loader=FileSystemLoader(str(Path(__file__).parents[2] / "vertex-ar" / "templates")))
+
+        page = templates.get_template("ar_page.html").render(record={
+            "id": "p1",
+            "video_url": "/storage/videos/v1.mp4",
+            "marker_url": fset_url.removesuffix(".fset"),
+            "status": "active",
+        })
+
+        assert f'url="{ORIGIN}/nft-markers/abc/abc"' in page
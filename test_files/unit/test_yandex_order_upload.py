@@ -0,0 +1,182 @@
+"""
+Tests for the batched Yandex Disk order upload: planned directory creation
+and concurrent artifact upload with per-file retry.
+"""
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from app.storage_yandex import YandexDiskStorageAdapter
+
+LATENCY = 0.05
+
+
+class FakeYandexDisk:
+    """Minimal Yandex Disk API with request latency and concurrency tracking."""
+
+    def __init__(self):
+        self.directories = {"test-base"}
+        self.files = {}
+        self.requests = []
+        self.failures = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _call(self, handler):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(LATENCY)
+            return handler()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    @staticmethod
+    def _error(status_code):
+        response = MagicMock(status_code=status_code)
+        return requests.exceptions.HTTPError(f"HTTP {status_code}", response=response)
+
+    def make_request(self, method, endpoint, **kwargs):
+        path = kwargs["params"]["path"]
+        self.requests.append((method, endpoint, path))
+
+        def handle():
+            if method == "PUT" and endpoint == "/resources":
+                # 409 both for existing directories and missing parents
+                if path in self.directories or path.rsplit("/", 1)[0] not in self.directories:
+                    raise self._error(409)
+                self.directories.add(path)
+                return MagicMock(status_code=201)
+            if method == "GET" and endpoint == "/resources/upload":
+                response = MagicMock(status_code=200)
+                response.json.return_value = {"href": f"upload://{path}#{len(self.requests)}"}
+                return response
+            raise AssertionError(f"Unexpected request {method} {endpoint}")
+
+        return self._call(handle)
+
+    def put(self, url, data=None, **kwargs):
+        path = url[len("upload://"):].split("#")[0]
+
+        def handle():
+            if self.failures.get(path, 0) > 0:
+                self.failures[path] -= 1
+                raise requests.exceptions.ConnectionError("connection reset")
+            assert path.rsplit("/", 1)[0] in self.directories
+            self.files[path] = data
+            return MagicMock(status_code=201)
+
+        return self._call(handle)
+
+
+@pytest.fixture
+def disk():
+    return FakeYandexDisk()
+
+
+@pytest.fixture
+def adapter(disk, monkeypatch):
+    """Create YandexDiskStorageAdapter talking to the fake disk."""
+    with patch('app.storage_yandex.YandexDiskStorageAdapter._create_session', return_value=MagicMock()), \
+            patch('app.storage_yandex.YandexDiskStorageAdapter._ensure_directory_exists_sync'):
+        adapter = YandexDiskStorageAdapter(oauth_token="test_token", base_path="test-base", upload_concurrency=4)
+    monkeypatch.setattr(adapter, "_make_request", disk.make_request)
+    monkeypatch.setattr(adapter.transfer.session, "put", disk.put)
+    monkeypatch.setattr(YandexDiskStorageAdapter, "RETRY_BACKOFF_SECONDS", 0.01)
+    return adapter
+
+
+class TestOrderStructure:
+    """ensure_order_structure plans the tree once and creates levels concurrently."""
+
+    @pytest.mark.asyncio
+    async def test_creates_tree_parents_first(self, adapter, disk):
+        result = await adapter.ensure_order_structure("folder", "portraits", "order-1")
+
+        assert result == {"Image": True, "QR": True, "nft_markers": True, "nft_cache": True}
+        for subdir in result:
+            assert f"test-base/folder/portraits/order-1/{subdir}" in disk.directories
+        # One PUT per level, the four subdirectories in parallel
+        assert len(disk.requests) == 7
+        assert disk.max_in_flight == 4
+
+    @pytest.mark.asyncio
+    async def test_known_levels_skipped(self, adapter, disk):
+        await adapter.ensure_order_structure("folder", "portraits", "order-1")
+        disk.requests.clear()
+
+        await adapter.ensure_order_structure("folder", "portraits", "order-2")
+        assert len(disk.requests) == 5
+        assert all("order-2" in path for _, _, path in disk.requests)
+
+    @pytest.mark.asyncio
+    async def test_failed_parent_stops_children(self, adapter, disk, monkeypatch):
+        def failing(method, endpoint, **kwargs):
+            disk.requests.append((method, endpoint, kwargs["params"]["path"]))
+            raise requests.exceptions.ConnectionError("down")
+
+        monkeypatch.setattr(adapter, "_make_request", failing)
+        result = await adapter.ensure_paths(["a/b/c", "a/d"])
+        assert result == {"a/b/c": False, "a/d": False}
+        assert len(disk.requests) == 1
+
+
+class TestSaveFiles:
+    """save_files uploads a batch concurrently with per-file retry."""
+
+    def _artifacts(self, tmp_path: Path):
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"video")
+        image = tmp_path / "image.jpg"
+        image.write_bytes(b"image")
+        artifacts = [(video, "folder/portraits/o1/Image/v.mp4"), (image, "folder/portraits/o1/Image/p.jpg"),
+                     (b"qr", "folder/portraits/o1/QR/p_qr.png")]
+        artifacts += [(b"marker", f"folder/portraits/o1/nft_markers/p.{ext}") for ext in ("fset", "fset3", "iset")]
+        return artifacts
+
+    @pytest.mark.asyncio
+    async def test_uploads_concurrently(self, adapter, disk, tmp_path):
+        artifacts = self._artifacts(tmp_path)
+        await adapter.ensure_order_structure("folder", "portraits", "o1")
+
+        start = time.perf_counter()
+        urls = await adapter.save_files(artifacts)
+        elapsed = time.perf_counter() - start
+
+        assert set(urls) == {path for _, path in artifacts}
+        assert disk.files["test-base/folder/portraits/o1/Image/v.mp4"] == b"video"
+        assert disk.files["test-base/folder/portraits/o1/QR/p_qr.png"] == b"qr"
+        # Sequential uploads take two round trips per file
+        assert elapsed < len(artifacts) * 2 * LATENCY / 2
+        assert disk.max_in_flight > 1
+
+    @pytest.mark.asyncio
+    async def test_creates_missing_parents(self, adapter, disk):
+        await adapter.save_files([(b"data", "new/dir/file.bin")])
+        assert disk.files["test-base/new/dir/file.bin"] == b"data"
+
+    @pytest.mark.asyncio
+    async def test_failed_file_retried_with_fresh_url(self, adapter, disk, tmp_path):
+        artifacts = self._artifacts(tmp_path)
+        disk.failures["test-base/folder/portraits/o1/QR/p_qr.png"] = 2
+
+        await adapter.save_files(artifacts)
+        assert disk.files["test-base/folder/portraits/o1/QR/p_qr.png"] == b"qr"
+        upload_urls = [r for r in disk.requests if r[1] == "/resources/upload" and r[2].endswith("p_qr.png")]
+        assert len(upload_urls) == 3
+
+    @pytest.mark.asyncio
+    async def test_persistent_failure_raises_after_other_files(self, adapter, disk, tmp_path):
+        artifacts = self._artifacts(tmp_path)
+        disk.failures["test-base/folder/portraits/o1/QR/p_qr.png"] = 10
+
+        with pytest.raises(Exception, match="p_qr.png"):
+            await adapter.save_files(artifacts, retries=1)
+        assert len(disk.files) == len(artifacts) - 1
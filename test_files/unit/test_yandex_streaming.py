@@ -0,0 +1,221 @@
+"""
+Tests for streamed Yandex Disk downloads: parallel range fetching over the
+pooled transport, Range passthrough in the proxy endpoints and adapter reuse.
+"""
+import threading
+import time
+from collections import OrderedDict
+from unittest.mock import MagicMock, Mock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api import yandex_disk
+from app.storage_yandex import YandexDiskStorageAdapter, get_yandex_adapter
+from app.utils import parse_range_header
+
+LATENCY = 0.05
+CONTENT = bytes(range(256)) * 40  # 10 KiB
+CHUNK = 1024
+
+
+class FakeDownloader:
+    """Session serving CONTENT by byte range with latency and concurrency tracking."""
+
+    def __init__(self):
+        self.ranges = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, **kwargs):
+        start, end = (int(value) for value in headers["Range"][len("bytes="):].split("-"))
+        with self._lock:
+            self.ranges.append((start, end))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(LATENCY)
+            return MagicMock(status_code=206, content=CONTENT[start:end + 1])
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _make_request(method, endpoint, **kwargs):
+    path = kwargs["params"]["path"]
+    if not path.endswith("video.mp4"):
+        raise Exception("404 Not Found")
+    response = MagicMock(status_code=200)
+    if endpoint == "/resources/download":
+        response.json.return_value = {"href": "https://downloader.example/video"}
+    else:
+        response.json.return_value = {"type": "file", "size": len(CONTENT), "mime_type": "video/mp4"}
+    return response
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    """Create YandexDiskStorageAdapter downloading from FakeDownloader."""
+    with patch('app.storage_yandex.YandexDiskStorageAdapter._create_session', return_value=MagicMock()), \
+            patch('app.storage_yandex.YandexDiskStorageAdapter._ensure_directory_exists_sync'):
+        adapter = YandexDiskStorageAdapter(oauth_token="test_token", base_path="test-base", upload_concurrency=4)
+    monkeypatch.setattr(adapter, "_make_request", _make_request)
+    monkeypatch.setattr(adapter.transfer, "session", FakeDownloader())
+    monkeypatch.setattr(adapter, "STREAM_CHUNK_SIZE", CHUNK)
+    return adapter
+
+
+class TestParseRangeHeader:
+    """parse_range_header follows RFC 7233 single-range semantics."""
+
+    @pytest.mark.parametrize("header,expected", [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=900-5000", (900, 999)),
+        (None, None),
+        ("items=0-10", None),
+        ("bytes=0-10,20-30", None),
+        ("bytes=10-5", None),
+        ("bytes=abc", None),
+        ("bytes=--5", None),
+    ])
+    def test_parse(self, header, expected):
+        assert parse_range_header(header, 1000) == expected
+
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+    def test_unsatisfiable(self, header):
+        with pytest.raises(ValueError):
+            parse_range_header(header, 1000)
+
+
+class TestIterDownload:
+    """iter_download fetches ranges in parallel and yields them in order."""
+
+    @pytest.mark.asyncio
+    async def test_parallel_and_in_order(self, adapter):
+        start = time.perf_counter()
+        chunks = [chunk async for chunk in adapter.iter_download("url", 0, len(CONTENT) - 1)]
+        elapsed = time.perf_counter() - start
+
+        assert b"".join(chunks) == CONTENT
+        assert len(chunks) == len(CONTENT) // CHUNK
+        assert adapter.transfer.session.max_in_flight == 4
+        # Sequential fetching takes one round trip per range
+        assert elapsed < len(chunks) * LATENCY / 2
+
+    @pytest.mark.asyncio
+    async def test_first_chunk_before_all_ranges(self, adapter):
+        stream = adapter.iter_download("url", 0, len(CONTENT) - 1)
+        first = await stream.__anext__()
+        assert first == CONTENT[:CHUNK]
+        # Only the prefetch window has been requested
+        assert len(adapter.transfer.session.ranges) <= adapter.upload_concurrency + 1
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_partial_range(self, adapter):
+        chunks = [chunk async for chunk in adapter.iter_download("url", 1000, 3500)]
+        assert b"".join(chunks) == CONTENT[1000:3501]
+
+    @pytest.mark.asyncio
+    async def test_get_file_uses_parallel_ranges(self, adapter):
+        adapter.chunk_size = CHUNK
+        assert await adapter.get_file("video.mp4") == CONTENT
+        assert adapter.transfer.session.max_in_flight > 1
+
+    @pytest.mark.asyncio
+    async def test_download_info(self, adapter):
+        info = await adapter.get_download_info("video.mp4")
+        assert info == {"href": "https://downloader.example/video", "size": len(CONTENT), "mime_type": "video/mp4"}
+        with pytest.raises(FileNotFoundError):
+            await adapter.get_download_info("missing.mp4")
+
+
+@pytest.fixture
+def client(adapter):
+    """Client for the Yandex Disk router backed by the fake adapter."""
+    app = FastAPI()
+    app.include_router(yandex_disk.router)
+    config = Mock()
+    config.is_yandex_enabled.return_value = True
+    config.get_yandex_token.return_value = "test_token"
+    with patch("app.api.yandex_disk.get_storage_config", return_value=config), \
+            patch("app.api.yandex_disk.get_yandex_adapter", return_value=adapter):
+        yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+class TestFileEndpoints:
+    """/file and /download stream content and honour Range."""
+
+    @pytest.mark.asyncio
+    async def test_full_file(self, client):
+        async with client:
+            response = await client.get("/api/yandex-disk/file/video.mp4")
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["content-type"] == "video/mp4"
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-length"] == str(len(CONTENT))
+
+    @pytest.mark.asyncio
+    async def test_range_request(self, client):
+        async with client:
+            response = await client.get("/api/yandex-disk/file/video.mp4", headers={"Range": "bytes=100-2099"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[100:2100]
+        assert response.headers["content-range"] == f"bytes 100-2099/{len(CONTENT)}"
+        assert response.headers["content-length"] == "2000"
+
+    @pytest.mark.asyncio
+    async def test_unsatisfiable_range(self, client):
+        async with client:
+            response = await client.get("/api/yandex-disk/file/video.mp4", headers={"Range": "bytes=999999-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    @pytest.mark.asyncio
+    async def test_missing_file(self, client):
+        async with client:
+            response = await client.get("/api/yandex-disk/file/missing.jpg")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_download_attachment(self, client):
+        async with client:
+            response = await client.get("/api/yandex-disk/download/dir%2Fvideo.mp4", headers={"Range": "bytes=-10"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[-10:]
+        assert response.headers["content-disposition"] == 'attachment; filename="video.mp4"'
+
+
+class TestAdapterReuse:
+    """get_yandex_adapter shares one adapter per token and base path."""
+
+    def test_reused_per_token(self, monkeypatch):
+        monkeypatch.setattr("app.storage_yandex._adapters", OrderedDict())
+        with patch('app.storage_yandex.YandexDiskStorageAdapter._create_session', return_value=MagicMock()), \
+                patch('app.storage_yandex.YandexDiskStorageAdapter._ensure_directory_exists_sync') as ensure:
+            first = get_yandex_adapter("token-a")
+            assert get_yandex_adapter("token-a") is first
+            assert get_yandex_adapter("token-b") is not first
+            assert get_yandex_adapter("token-a", base_path="other") is not first
+        assert ensure.call_count == 3
+
+    def test_evicted_adapter_closed(self, monkeypatch):
+        monkeypatch.setattr("app.storage_yandex._adapters", OrderedDict())
+        monkeypatch.setattr("app.storage_yandex.ADAPTER_CACHE_SIZE", 2)
+        with patch('app.storage_yandex.YandexDiskStorageAdapter._create_session', return_value=MagicMock()), \
+                patch('app.storage_yandex.YandexDiskStorageAdapter._ensure_directory_exists_sync'), \
+                patch('app.storage_yandex.YandexDiskStorageAdapter.close', autospec=True) as close:
+            first = get_yandex_adapter("token-a")
+            second = get_yandex_adapter("token-b")
+            get_yandex_adapter("token-a")
+            get_yandex_adapter("token-c")
+
+        # token-b was least recently used
+        close.assert_called_once_with(second)
+        assert get_yandex_adapter("token-a") is first
@@ -0,0 +1,167 @@
+"""
+Tests for the Yandex Disk chunk transports: both backends against a local
+HTTP/1.1 server, connection reuse across chunks and retry of server errors.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.storage_io import get_storage_executor
+from app.storage_yandex import YandexDiskStorageAdapter
+from app.yandex_transport import AiohttpTransport, RequestsTransport, create_transport
+
+CONTENT = bytes(range(256)) * 64  # 16 KiB
+
+
+class StorageHandler(BaseHTTPRequestHandler):
+    """Keep-alive upload/download host that counts connections."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _should_fail(self):
+        with self.server.lock:
+            if self.server.failures:
+                self.server.failures -= 1
+                return True
+        return False
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self._should_fail():
+            return self._reply(503)
+        with self.server.lock:
+            self.server.uploads.append((self.headers.get("Content-Range"), body))
+            self.server.authorized |= "Authorization" in self.headers
+        self._reply(201)
+
+    def do_GET(self):
+        if self._should_fail():
+            return self._reply(503)
+        range_header = self.headers.get("Range")
+        if range_header:
+            start, end = (int(value) for value in range_header[len("bytes="):].split("-"))
+            return self._reply(206, CONTENT[start:end + 1], {"Content-Range": f"bytes {start}-{end}/{len(CONTENT)}"})
+        self._reply(200, CONTENT)
+
+    def do_HEAD(self):
+        self._reply(200, CONTENT)
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StorageHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.failures = 0
+    server.uploads = []
+    server.authorized = False
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/file"
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["requests", "aiohttp"])
+def transport(request):
+    transport = create_transport(request.param, get_storage_executor("yandex"), timeout=10, pool_maxsize=4)
+    yield transport
+    transport.close()
+
+
+@pytest.fixture
+def adapter(transport, monkeypatch):
+    """Create YandexDiskStorageAdapter sending chunks over the transport."""
+    with patch('app.storage_yandex.YandexDiskStorageAdapter._create_session', return_value=MagicMock()), \
+            patch('app.storage_yandex.YandexDiskStorageAdapter._ensure_directory_exists_sync'):
+        adapter = YandexDiskStorageAdapter(oauth_token="test_token", base_path="test-base", upload_concurrency=2)
+    adapter.transfer.close()
+    monkeypatch.setattr(adapter, "transfer", transport)
+    adapter.chunk_size = 1024
+    return adapter
+
+
+class TestTransports:
+    """Both backends upload, download and size files the same way."""
+
+    @pytest.mark.asyncio
+    async def test_put(self, transport, server):
+        status = await transport.put(server.url, b"data", headers={"Content-Range": "bytes 0-3/4"})
+        assert status == 201
+        assert server.uploads == [("bytes 0-3/4", b"data")]
+
+    @pytest.mark.asyncio
+    async def test_get_and_range(self, transport, server):
+        assert await transport.get(server.url) == (200, CONTENT)
+        assert await transport.get(server.url, headers={"Range": "bytes=10-19"}) == (206, CONTENT[10:20])
+
+    @pytest.mark.asyncio
+    async def test_content_length(self, transport, server):
+        assert await transport.content_length(server.url) == len(CONTENT)
+
+    @pytest.mark.asyncio
+    async def test_connections_reused(self, transport, server):
+        for _ in range(10):
+            await transport.put(server.url, b"chunk")
+        assert server.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_server_errors_retried(self, transport, server, monkeypatch):
+        monkeypatch.setattr("app.yandex_transport.RETRY_BACKOFF_SECONDS", 0.01)
+        if isinstance(transport, RequestsTransport):
+            transport.session.get_adapter(server.url).max_retries.backoff_factor = 0.01
+        server.failures = 2
+        assert await transport.get(server.url) == (200, CONTENT)
+
+    def test_backend_selection(self):
+        io = get_storage_executor("yandex")
+        assert isinstance(create_transport("aiohttp", io, timeout=10), AiohttpTransport)
+        assert isinstance(create_transport("requests", io, timeout=10), RequestsTransport)
+        assert isinstance(create_transport("unknown", io, timeout=10), RequestsTransport)
+
+
+class TestAdapterTraffic:
+    """Chunked uploads and downloads go through the pooled transport."""
+
+    @pytest.mark.asyncio
+    async def test_chunked_upload_reuses_connections(self, adapter, server):
+        assert await adapter._chunked_upload(CONTENT, server.url)
+
+        assert len(server.uploads) == len(CONTENT) // adapter.chunk_size
+        assert b"".join(body for _, body in sorted(server.uploads, key=lambda u: int(u[0][6:].split("-")[0]))) == CONTENT
+        assert server.connections <= adapter.upload_concurrency
+        # Storage hosts never receive the OAuth token
+        assert not server.authorized
+
+    @pytest.mark.asyncio
+    async def test_local_file_upload(self, adapter, server, tmp_path):
+        source = tmp_path / "video.mp4"
+        source.write_bytes(CONTENT)
+        assert await adapter._chunked_upload(source, server.url)
+        assert sum(len(body) for _, body in server.uploads) == len(CONTENT)
+
+    @pytest.mark.asyncio
+    async def test_chunked_download(self, adapter, server):
+        assert await adapter._chunked_download(server.url) == CONTENT
+        assert server.connections <= adapter.upload_concurrency
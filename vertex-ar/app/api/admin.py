@@ -22,6 +22,7 @@ from app.database import Database
 # from app.main import get_current_app
 from app.models import ARContentResponse
 from app.rate_limiter import create_rate_limit_dependency
+from app.services.preview_urls import get_preview_versions
 from app.utils import verify_password as _verify_password
 from logging_setup import get_logger
 from nft_marker_generator import analyze_image
@@ -238,11 +239,11 @@ def _validate_admin_session(request: Request) -> Optional[str]:
     try:
         app = get_current_app()
         tokens = app.state.tokens
-        username = tokens.verify_token(auth_token)
+        session = tokens.authenticate(auth_token)
+        username = session.username if session else None
         if not username:
             return None
-        database = get_database()
-        user = database.get_user(username)
+        user = session.user
         if not user or not user.get("is_admin", False):
             return None
         return username
@@ -433,7 +434,8 @@ async def admin_get_backup_settings(
             settings = {
                 "compression": "gz",
                 "max_backups": 7,
-                "auto_split_backups": True
+                "auto_split_backups": True,
+                "storage_backup_mode": "incremental"
             }
 
         return {"success": True, "settings": settings}
@@ -707,6 +709,7 @@ async def admin_order_detail(request: Request, portrait_id: str) -> HTMLResponse
     if not username:
         return _redirect_to_login("unauthorized")
 
+    from app.main import get_current_app
     templates = get_templates()
     database = get_database()
     app = get_current_app()
@@ -793,44 +796,35 @@ async def admin_order_detail(request: Request, portrait_id: str) -> HTMLResponse
             cleaned = path_str.lstrip("/")
             return f"{base_url}/storage/{cleaned}"
 
-    # Get portrait information
-    portrait = database.get_portrait(portrait_id)
+    # Get portrait with client, folder and project names in one query
+    portrait = database.get_portrait_with_client(portrait_id)
     if not portrait:
         return RedirectResponse(url="/admin", status_code=status.HTTP_302_FOUND)
 
-    # Get folder information if portrait has folder_id
+    # Build folder path information if portrait has a folder
     folder_info = None
-    if portrait.get("folder_id"):
-        folder = database.get_folder(portrait["folder_id"])
-        if folder:
-            # Get project information
-            project = database.get_project(folder["project_id"])
-            if project:
-                # Build folder path information
-                folder_info = {
-                    "name": folder["name"],
-                    "project_name": project["name"],
-                    "path": f"{project['name']} / {folder['name']}"
-                }
-
-    # Load image preview if available
-    image_preview_data = None
-    image_preview_path = portrait.get("image_preview_path")
-    if image_preview_path:
-        try:
-            import base64
-            preview_path = Path(image_preview_path)
-            if preview_path.exists():
-                with open(preview_path, "rb") as f:
-                    image_preview_data = base64.b64encode(f.read()).decode()
-        except Exception as e:
-            logger.warning(f"Failed to load portrait preview: {e}")
-
-    portrait["image_preview_data"] = image_preview_data
-    portrait_preview_url = f"data:image/jpeg;base64,{image_preview_data}" if image_preview_data else None
+    if portrait.get("folder_name") and portrait.get("project_name"):
+        folder_info = {
+            "name": portrait["folder_name"],
+            "project_name": portrait["project_name"],
+            "path": f"{portrait['project_name']} / {portrait['folder_name']}"
+        }
 
-    # Get client information
-    client = database.get_client(portrait["client_id"])
+    # Reference the image preview by its versioned URL instead of inlining it
+    preview_versions = get_preview_versions(app.state.config["BASE_DIR"], storage_root)
+    portrait_preview_url = preview_versions.record_url("portraits", portrait_id, portrait.get("image_preview_path"))
+
+    # Client information comes from the joined portrait row
+    client = None
+    if portrait.get("client_name") is not None:
+        client = {
+            "id": portrait["client_id"],
+            "name": portrait["client_name"],
+            "phone": portrait["client_phone"],
+            "email": portrait["client_email"],
+            "company_id": portrait["client_company_id"],
+            "created_at": portrait["client_created_at"],
+        }
 
     # Get videos for this portrait
     videos = database.get_videos_by_portrait(portrait_id)
@@ -924,11 +918,8 @@ async def admin_order_detail(request: Request, portrait_id: str) -> HTMLResponse
         marker_info["total_size_mb"] = round(marker_total_size / (1024 * 1024), 2)
 
     # Generate order number based on portrait position in the list (consistent with Content Records)
-    all_portraits = database.list_portraits()
-    portrait_index = next((i for i, p in enumerate(all_portraits) if p.get("id") == portrait_id), -1)
-    order_position: Optional[int] = None
-    if portrait_index >= 0:
-        order_position = len(all_portraits) - portrait_index
+    order_position: Optional[int] = database.get_portrait_position(portrait_id)
+    if order_position is not None:
         order_number = f"{order_position:06d}"
     else:
         # Fallback if portrait not found in list
@@ -939,7 +930,7 @@ async def admin_order_detail(request: Request, portrait_id: str) -> HTMLResponse
 
     # Generate portrait image URL
     portrait_image_url = build_public_url(portrait['image_path'])
-    portrait_preview_download_url = build_public_url(image_preview_path)
+    portrait_preview_download_url = build_public_url(portrait.get("image_preview_path"))
 
     context = {
         "request": request,
@@ -1212,6 +1203,10 @@ async def delete_dashboard_record(
             shutil.rmtree(portrait_storage)
     except OSError as exc:
         logger.warning("Failed to remove portrait storage %s: %s", portrait_storage, exc)
+    from app.services.blob_store import get_blob_store
+    blob_store = get_blob_store(database, app.state.storage_manager, storage_root)
+    # Hash-keyed markers are shared and removed together with the image blob
+    shared_marker_dir = blob_store.marker_dir(portrait["blob_hash"]) if portrait.get("blob_hash") else None
     marker_paths = [portrait.get("marker_fset"), portrait.get("marker_fset3"), portrait.get("marker_iset")]
     for marker_path in marker_paths:
         if not marker_path:
@@ -1220,12 +1215,19 @@ async def delete_dashboard_record(
             marker_obj = Path(marker_path)
             if not marker_obj.is_absolute():
                 marker_obj = storage_root / marker_obj
+            if shared_marker_dir and marker_obj.parent == shared_marker_dir:
+                continue
             if marker_obj.exists():
                 marker_obj.unlink()
         except OSError as exc:
             logger.warning("Failed to remove marker file %s: %s", marker_path, exc)
+    videos = database.list_videos(portrait_id)
     if not database.delete_portrait(portrait_id):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Не удалось удалить запись")
+    client = database.get_client(client_id)
+    await blob_store.release_record(portrait, client.get("company_id") if client else None, "portraits", "image_path")
+    for video in videos:
+        await blob_store.release_record(video, None, "videos", "video_path")
     return {"message": "Запись удалена"}
 
 
@@ -1416,12 +1418,12 @@ async def admin_storage_page(request: Request):
 
     try:
         tokens = app.state.tokens
-        username = tokens.verify_token(auth_token)
+        session = tokens.authenticate(auth_token)
+        username = session.username if session else None
         if not username:
             return RedirectResponse(url="/admin/login", status_code=302)
 
-        database = app.state.database
-        user = database.get_user(username)
+        user = session.user
         if not user or not user.get("is_admin", False):
             return RedirectResponse(url="/admin/login", status_code=302)
 
@@ -20,6 +20,7 @@ from app.models import ARContentResponse
 # Remove direct import from main to avoid circular import
 # from app.main import get_current_app
 from app.rate_limiter import create_rate_limit_dependency
+from app.services.view_counters import AR_CLICKS, AR_VIEWS, get_view_counter_buffer
 from logging_setup import get_logger
 
 router = APIRouter()
@@ -78,12 +79,11 @@ async def get_current_user(
     # Get token manager
     app = get_current_app()
     tokens = app.state.tokens
-    username = tokens.verify_token(token)
-    if username is None:
+    session = tokens.authenticate(token)
+    if session is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired or invalid")
 
-    database = app.state.database
-    user = database.get_user(username)
+    user = session.user
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
@@ -106,7 +106,6 @@ async def require_admin(request: Request) -> str:
 
     app = get_current_app()
     tokens = app.state.tokens
-    database = app.state.database
 
     token = None
 
@@ -122,11 +121,11 @@ async def require_admin(request: Request) -> str:
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
-    username = tokens.verify_token(token)
-    if username is None:
+    session = tokens.authenticate(token)
+    if session is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired or invalid")
 
-    user = database.get_user(username)
+    user = session.user
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
@@ -136,7 +135,7 @@ async def require_admin(request: Request) -> str:
             detail="Admin access required"
         )
 
-    return username
+    return session.username
 
 
 @router.post("/upload", response_model=ARContentResponse, dependencies=[Depends(create_rate_limit_dependency("10/minute"))])
@@ -169,21 +168,14 @@ async def upload_ar_content(
     content_dir = user_storage / content_id
     content_dir.mkdir(parents=True, exist_ok=True)
 
-    # Read file contents for preview generation
-    image.file.seek(0)
-    image_content = await image.read()
-    video.file.seek(0)
-    video_content = await video.read()
+    # Stream image and video straight to their final files
+    from app.services.uploads import save_upload
 
-    # Save image
     image_path = content_dir / f"{content_id}.jpg"
-    with open(image_path, "wb") as f:
-        f.write(image_content)
+    await save_upload(image, image_path)
 
-    # Save video
     video_path = content_dir / f"{content_id}.mp4"
-    with open(video_path, "wb") as f:
-        f.write(video_content)
+    await save_upload(video, video_path)
 
     # Generate previews
     from preview_generator import PreviewGenerator
@@ -193,7 +185,7 @@ async def upload_ar_content(
 
     try:
         # Generate image preview
-        image_preview = PreviewGenerator.generate_image_preview(image_content)
+        image_preview = PreviewGenerator.generate_image_preview(image_path)
         if image_preview:
             image_preview_path = content_dir / f"{content_id}_preview.webp"
             with open(image_preview_path, "wb") as f:
@@ -204,7 +196,7 @@ async def upload_ar_content(
 
     try:
         # Generate video preview
-        video_preview = PreviewGenerator.generate_video_preview(video_content)
+        video_preview = PreviewGenerator.generate_video_preview(video_path)
         if video_preview:
             video_preview_path = content_dir / f"{content_id}_video_preview.webp"
             with open(video_preview_path, "wb") as f:
@@ -220,19 +212,20 @@ async def upload_ar_content(
     qr_img.save(qr_buffer, format="PNG")
     qr_base64 = base64.b64encode(qr_buffer.getvalue()).decode()
 
-    # Generate NFT markers with increased image size limits
-    from nft_marker_generator import NFTMarkerConfig, NFTMarkerGenerator
-    nft_generator = NFTMarkerGenerator(storage_root)
+    # Generate NFT markers with increased image size limits (off the event loop)
+    from nft_marker_generator import NFTMarkerConfig
+    from app.services.marker_jobs import get_marker_job_queue
+    database = get_database()
+    marker_queue = get_marker_job_queue(database, storage_root)
     config = NFTMarkerConfig(
         feature_density="high",
         levels=3,
         max_image_size=8192,  # Increased from 4096 to support larger images
         max_image_area=50_000_000  # Increased from 16_777_216 to support larger images
     )
-    marker_result = nft_generator.generate_marker(str(image_path), content_id, config)
+    marker_result = await marker_queue.run(content_id, image_path, content_id, config)
 
     # Create database record
-    database = get_database()
     db_record = database.create_ar_content(
         content_id=content_id,
         username=username,
@@ -275,8 +268,8 @@ async def view_ar_content(request: Request, content_id: str) -> HTMLResponse:
     if record is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="AR content not found")
 
-    # Increment view count
-    database.increment_view_count(content_id)
+    # Increment view count (buffered, flushed in batches)
+    get_view_counter_buffer(database).increment(AR_VIEWS, content_id)
     logger.info("AR content viewed", extra={"content_id": content_id})
 
     # Prepare video URL
@@ -301,7 +294,7 @@ async def track_content_click(content_id: str) -> Dict[str, str]:
     record = database.get_ar_content(content_id)
     if record is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="AR content not found")
-    database.increment_click_count(content_id)
+    get_view_counter_buffer(database).increment(AR_CLICKS, content_id)
     logger.info("AR content click tracked", extra={"content_id": content_id})
     return {"status": "success", "content_id": content_id}
 
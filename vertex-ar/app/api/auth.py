@@ -55,12 +55,11 @@ async def get_current_user(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
     tokens = get_token_manager()
-    username = tokens.verify_token(token)
-    if username is None:
+    session = tokens.authenticate(token)
+    if session is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired or invalid")
 
-    database = get_database()
-    user = database.get_user(username)
+    user = session.user
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
@@ -78,7 +77,6 @@ async def require_admin(request: Request) -> str:
     2. authToken cookie
     """
     tokens = get_token_manager()
-    database = get_database()
 
     token = None
 
@@ -94,11 +92,11 @@ async def require_admin(request: Request) -> str:
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
-    username = tokens.verify_token(token)
-    if username is None:
+    session = tokens.authenticate(token)
+    if session is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired or invalid")
 
-    user = database.get_user(username)
+    user = session.user
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
@@ -108,7 +106,7 @@ async def require_admin(request: Request) -> str:
             detail="Admin access required"
         )
 
-    return username
+    return session.username
 
 
 @router.post("/login", response_model=TokenResponse, dependencies=[Depends(create_rate_limit_dependency("5/minute"))])
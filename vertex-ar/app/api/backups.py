@@ -46,7 +46,7 @@ def resolve_backup_path(path_str: str, manager) -> Optional[Path]:
         # Determine backup type from filename and construct local path
         if filename.startswith('db_backup_'):
             return manager.db_backup_dir / filename
-        elif filename.startswith('storage_backup_'):
+        elif filename.startswith(('storage_backup_', 'storage_snapshot_')):
             return manager.storage_backup_dir / filename
         else:
             # Try to find the file in all backup directories
@@ -84,11 +84,13 @@ class BackupCreateRequest(BaseModel):
     """Request model for creating a backup."""
     type: str = "full"  # full, database, or storage
     test: bool = False  # Whether this is a test backup
+    mode: Optional[str] = None  # incremental or archive storage backup (default: from settings)
 
 
 class BackupRestoreRequest(BaseModel):
     """Request model for restoring from backup."""
-    backup_path: str
+    backup_path: Optional[str] = None
+    snapshot_id: Optional[str] = None  # Storage snapshot, instead of backup_path
     verify_checksum: bool = True
 
 
@@ -101,6 +103,8 @@ class BackupInfo(BaseModel):
     backup_path: Optional[str] = None
     checksum: Optional[str] = None
     file_count: Optional[int] = None
+    snapshot_id: Optional[str] = None
+    mode: Optional[str] = None
 
 
 class BackupStats(BaseModel):
@@ -126,6 +130,8 @@ def format_backup_info(metadata: Dict[str, Any]) -> BackupInfo:
         st_meta = metadata.get("storage", {})
         file_size = db_meta.get("file_size", 0) + st_meta.get("file_size", 0)
         file_count = st_meta.get("file_count", 0)
+        snapshot_id = st_meta.get("snapshot_id")
+        mode = st_meta.get("mode")
         # Return paths as comma-separated string for full backups
         # Include only available paths
         paths = []
@@ -140,6 +146,8 @@ def format_backup_info(metadata: Dict[str, Any]) -> BackupInfo:
         file_size = metadata.get("file_size")
         file_count = metadata.get("file_count")
         backup_path = metadata.get("backup_path")
+        snapshot_id = metadata.get("snapshot_id")
+        mode = metadata.get("mode")
 
     return BackupInfo(
         timestamp=metadata.get("timestamp", ""),
@@ -148,10 +156,30 @@ def format_backup_info(metadata: Dict[str, Any]) -> BackupInfo:
         file_size=file_size,
         backup_path=backup_path,
         checksum=metadata.get("checksum"),
-        file_count=file_count
+        file_count=file_count,
+        snapshot_id=snapshot_id,
+        mode=mode
     )
 
 
+def resolve_request_backup(request: BackupRestoreRequest, manager) -> Optional[Path]:
+    """Resolve the backup a restore/verify request refers to, by snapshot ID or path."""
+    if request.snapshot_id:
+        return manager.get_snapshot_path(request.snapshot_id)
+    if not request.backup_path:
+        raise HTTPException(status_code=400, detail="backup_path or snapshot_id is required")
+    return resolve_backup_path(request.backup_path, manager)
+
+
+def detect_backup_type(backup_path: Path, manager) -> Optional[str]:
+    """Backup type (database or storage) of a backup file, from its name."""
+    if "db_backup" in backup_path.name or backup_path.suffix == ".db":
+        return "database"
+    if "storage_backup" in backup_path.name or manager.snapshot_id_from_path(backup_path) is not None:
+        return "storage"
+    return None
+
+
 @router.post("/create")
 async def create_backup(
     request: BackupCreateRequest,
@@ -167,14 +195,17 @@ async def create_backup(
         manager = create_backup_manager()
 
         backup_type = f"{request.type}{' (test)' if request.test else ''}"
-        logger.info("Creating backup", backup_type=backup_type, admin=_admin)
+        logger.info("Creating backup", backup_type=backup_type, mode=request.mode, admin=_admin)
+
+        if request.mode not in (None, "incremental", "archive"):
+            raise HTTPException(status_code=400, detail=f"Invalid storage backup mode: {request.mode}")
 
         if request.type == "database":
             result = manager.backup_database()
         elif request.type == "storage":
-            result = manager.backup_storage()
+            result = manager.backup_storage(mode=request.mode)
         elif request.type == "full":
-            result = manager.create_full_backup()
+            result = manager.create_full_backup(mode=request.mode)
         else:
             raise HTTPException(status_code=400, detail=f"Invalid backup type: {request.type}")
 
@@ -228,6 +259,68 @@ async def list_backups(
         raise HTTPException(status_code=500, detail=f"Failed to list backups: {str(e)}")
 
 
+@router.get("/snapshots")
+async def list_snapshots(_admin=Depends(require_admin)) -> Dict[str, Any]:
+    """
+    List incremental storage snapshots (newest first).
+
+    Requires admin authentication.
+    """
+    try:
+        manager = create_backup_manager()
+
+        snapshots = manager.list_snapshots()
+
+        return {
+            "success": True,
+            "snapshots": snapshots,
+            "count": len(snapshots)
+        }
+
+    except Exception as e:
+        logger.error("Failed to list snapshots", error=str(e), exc_info=e)
+        raise HTTPException(status_code=500, detail=f"Failed to list snapshots: {str(e)}")
+
+
+@router.get("/snapshots/{snapshot_id}")
+async def get_snapshot(
+    snapshot_id: str,
+    include_files: bool = False,
+    _admin=Depends(require_admin)
+) -> Dict[str, Any]:
+    """
+    Get a storage snapshot, optionally with its file manifest.
+
+    Requires admin authentication.
+    """
+    try:
+        manager = create_backup_manager()
+
+        manifest_path = manager.get_snapshot_path(snapshot_id)
+        if manifest_path is None:
+            raise HTTPException(status_code=404, detail=f"Snapshot not found: {snapshot_id}")
+
+        snapshot = next((s for s in manager.list_snapshots() if s.get("snapshot_id") == snapshot_id), None)
+        response = {
+            "success": True,
+            "snapshot": snapshot,
+            "backup": format_backup_info(snapshot) if snapshot else None
+        }
+        if include_files:
+            manifest = manager.load_snapshot_manifest(snapshot_id)
+            response["files"] = [
+                {key: entry[key] for key in ("path", "size", "mtime", "hash")}
+                for entry in manifest.get("files", [])
+            ]
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get snapshot", snapshot_id=snapshot_id, error=str(e), exc_info=e)
+        raise HTTPException(status_code=500, detail=f"Failed to get snapshot: {str(e)}")
+
+
 @router.get("/stats")
 async def get_backup_stats(_admin=Depends(require_admin)) -> BackupStats:
     """
@@ -277,11 +370,11 @@ async def restore_backup(
         manager = create_backup_manager()
         backup_dir = Path(manager.backup_dir).resolve()
 
-        # Resolve backup path using cross-platform helper
-        backup_path = resolve_backup_path(request.backup_path, manager)
+        # Resolve snapshot ID or backup path using cross-platform helper
+        backup_path = resolve_request_backup(request, manager)
         
         if backup_path is None:
-            raise HTTPException(status_code=404, detail=f"Backup file not found: {request.backup_path}")
+            raise HTTPException(status_code=404, detail=f"Backup file not found: {request.snapshot_id or request.backup_path}")
         
         if not backup_path.exists():
             raise HTTPException(status_code=404, detail=f"Backup file not found: {str(backup_path)}")
@@ -299,12 +392,11 @@ async def restore_backup(
         )
 
         # Detect backup type
-        if "db_backup" in backup_path.name or backup_path.suffix == ".db":
+        backup_type = detect_backup_type(backup_path, manager)
+        if backup_type == "database":
             success = manager.restore_database(backup_path, verify_checksum=request.verify_checksum)
-            backup_type = "database"
-        elif "storage_backup" in backup_path.name:
+        elif backup_type == "storage":
             success = manager.restore_storage(backup_path, verify_checksum=request.verify_checksum)
-            backup_type = "storage"
         else:
             raise HTTPException(status_code=400, detail="Cannot determine backup type from filename")
 
@@ -321,7 +413,8 @@ async def restore_backup(
             "success": True,
             "message": f"{backup_type.capitalize()} restored successfully",
             "backup_type": backup_type,
-            "backup_path": str(backup_path)
+            "backup_path": str(backup_path),
+            "snapshot_id": manager.snapshot_id_from_path(backup_path)
         }
 
     except HTTPException:
@@ -423,7 +516,7 @@ async def can_delete_backup(
         backup_type_to_delete = None
         if "db_backup" in backup_path or backup_path.endswith(".db"):
             backup_type_to_delete = "database"
-        elif "storage_backup" in backup_path:
+        elif "storage_backup" in backup_path or "storage_snapshot" in backup_path:
             backup_type_to_delete = "storage"
         elif "full_backup" in backup_path:
             backup_type_to_delete = "full"
@@ -502,8 +595,8 @@ async def test_restore_backup(
         manager = create_backup_manager()
         backup_dir = Path(manager.backup_dir).resolve()
         
-        # Resolve backup path using cross-platform helper
-        backup_path = resolve_backup_path(request.backup_path, manager)
+        # Resolve snapshot ID or backup path using cross-platform helper
+        backup_path = resolve_request_backup(request, manager)
         
         if backup_path is None:
             raise HTTPException(status_code=404, detail=f"Backup file not found")
@@ -535,7 +628,8 @@ async def test_restore_backup(
         
         # Check disk space
         disk_usage = shutil.disk_usage(manager.backup_dir)
-        file_size = backup_path.stat().st_size
+        # Snapshots are reassembled from chunks: size them by the files they hold
+        file_size = verify_result.get("metadata", {}).get("total_size") or backup_path.stat().st_size
         
         # We need at least 2x the backup file size to restore safely
         required_space = file_size * 2
@@ -584,11 +678,11 @@ async def verify_backup(
         manager = create_backup_manager()
         backup_dir = Path(manager.backup_dir).resolve()
 
-        # Resolve backup path using cross-platform helper
-        backup_path = resolve_backup_path(request.backup_path, manager)
+        # Resolve snapshot ID or backup path using cross-platform helper
+        backup_path = resolve_request_backup(request, manager)
         
         if backup_path is None:
-            raise HTTPException(status_code=404, detail=f"Backup file not found: {request.backup_path}")
+            raise HTTPException(status_code=404, detail=f"Backup file not found: {request.snapshot_id or request.backup_path}")
         
         # Security check: Ensure the backup is within the allowed backup directory
         try:
@@ -683,6 +777,10 @@ async def delete_backup(
 
             deleted_files.append(str(backup_file))
 
+        # Chunks only the deleted snapshots referenced are no longer needed
+        if any(manager.snapshot_id_from_path(Path(path)) is not None for path in deleted_files):
+            manager.prune_chunks()
+
         if not deleted_files and not missing_files:
             raise HTTPException(status_code=404, detail="Backup file not found")
         elif not deleted_files and missing_files:
@@ -1,7 +1,6 @@
 """
 Client management endpoints for Vertex AR API.
 """
-import base64
 import csv
 import uuid
 from datetime import datetime
@@ -22,6 +21,9 @@ from app.models import (
     MessageResponse,
     PaginatedClientsResponse,
 )
+from app.main import get_current_app
+from app.services.preview_urls import get_preview_versions
+from app.utils import decode_cursor, encode_cursor
 from logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -69,6 +71,33 @@ def _client_to_response(
     return ClientResponse(**response_dict)
 
 
+def _client_records(database: Database, client_ids: List[str]) -> List[tuple]:
+    """Portraits and videos of clients, with each client's company, read before a cascade delete."""
+    records = []
+    for client_id in client_ids:
+        client = database.get_client(client_id)
+        if not client:
+            continue
+        for portrait in database.list_portraits(client_id):
+            records.append((portrait, client.get("company_id"), database.list_videos(portrait["id"])))
+    return records
+
+
+async def _release_client_blobs(database: Database, records: List[tuple]) -> None:
+    """Release the shared blobs of portraits and videos deleted with their clients."""
+    from app.services.blob_store import get_blob_store
+
+    app = get_current_app()
+    blob_store = get_blob_store(database, app.state.storage_manager, app.state.config["STORAGE_ROOT"])
+    for portrait, company_id, videos in records:
+        try:
+            await blob_store.release_record(portrait, company_id, "portraits", "image_path")
+            for video in videos:
+                await blob_store.release_record(video, None, "videos", "video_path")
+        except Exception as exc:
+            logger.warning("client_blob_release_failed", portrait_id=portrait["id"], error=str(exc))
+
+
 @router.post("/", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
 async def create_client(
     client: ClientCreate,
@@ -150,13 +179,28 @@ async def list_clients_admin(
     page_size: int = 25,
     search: Optional[str] = None,
     company_id: Optional[str] = None,
+    cursor: Optional[str] = None,
     _: str = Depends(require_admin),
 ) -> PaginatedClientsResponse:
-    """List clients with pagination and optional search (admin only)."""
+    """
+    List clients with pagination and optional search (admin only).
+
+    Search results are ranked by relevance and paged by ``page``; other lists
+    can follow ``cursor`` (next_cursor of the previous page), which overrides
+    ``page``.
+    """
     database = get_database()
 
     page = max(page, 1)
     page_size = max(1, min(page_size, 100))
+    after = None
+    if cursor:
+        if search:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Search results are paged by page number")
+        try:
+            after = decode_cursor(cursor, 2)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
 
     total = database.count_clients(search=search, company_id=company_id)
     if total == 0:
@@ -174,32 +218,27 @@ async def list_clients_admin(
         page = total_pages
 
     offset = (page - 1) * page_size
-    clients = database.list_clients(search=search, limit=page_size, offset=offset, company_id=company_id)
+    # One extra row tells whether there is a next page
+    clients = database.list_clients(
+        search=search, limit=page_size + 1, offset=offset, company_id=company_id, after=after,
+    )
+    next_cursor = None
+    if len(clients) > page_size:
+        clients = clients[:page_size]
+        if not search:
+            next_cursor = encode_cursor([clients[-1]["created_at"], clients[-1]["id"]])
     client_ids = [client["id"] for client in clients]
     portrait_counts = database.get_portrait_counts(client_ids)
     
     # Get latest portrait previews for each client
+    app = get_current_app()
+    preview_versions = get_preview_versions(app.state.config["BASE_DIR"], app.state.config["STORAGE_ROOT"])
     latest_previews = {}
-    for client_id in client_ids:
-        portraits = database.list_portraits(client_id)
-        if portraits:
-            # Sort by created_at to get the latest
-            latest_portrait = max(portraits, key=lambda p: p.get('created_at', ''))
-            preview_path = latest_portrait.get('image_preview_path')
-            if preview_path:
-                try:
-                    from pathlib import Path
-                    preview_file = Path(preview_path)
-                    if preview_file.exists():
-                        with open(preview_file, "rb") as f:
-                            preview_data = base64.b64encode(f.read()).decode()
-                            # Determine format from file extension
-                            if preview_path.endswith('.webp'):
-                                latest_previews[client_id] = f"data:image/webp;base64,{preview_data}"
-                            else:
-                                latest_previews[client_id] = f"data:image/jpeg;base64,{preview_data}"
-                except Exception as e:
-                    logger.warning(f"Failed to load preview for client {client_id}: {e}")
+    for client_id, latest_portrait in database.get_latest_portraits(client_ids).items():
+        # Reference the preview by a cacheable URL instead of inlining it
+        latest_previews[client_id] = preview_versions.record_url(
+            "portraits", latest_portrait["id"], latest_portrait.get('image_preview_path')
+        )
 
     items = [
         ClientListItem(
@@ -231,6 +270,7 @@ async def list_clients_admin(
         page=page,
         page_size=page_size,
         total_pages=total_pages,
+        next_cursor=next_cursor,
     )
 
 
@@ -245,7 +285,10 @@ async def bulk_delete_clients(
     if not unique_ids:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No client IDs provided")
 
+    # Portraits and videos are deleted with their clients (ON DELETE CASCADE)
+    records = _client_records(database, unique_ids)
     deleted = database.delete_clients_bulk(unique_ids)
+    await _release_client_blobs(database, records)
     logger.info(
         "clients_bulk_delete",
         requested=len(unique_ids),
@@ -413,7 +456,11 @@ async def search_clients_query(
     """Legacy endpoint: search clients via query parameter with portrait counts."""
     database = get_database()
     clients = database.search_clients(phone)
-    return [_client_to_response(client, with_portrait_count=True) for client in clients]
+    portrait_counts = database.get_portrait_counts([client["id"] for client in clients])
+    return [
+        _client_to_response(client, with_portrait_count=True, portrait_count=portrait_counts.get(client["id"], 0))
+        for client in clients
+    ]
 
 
 @router.put("/{client_id}", response_model=ClientResponse)
@@ -512,7 +559,8 @@ async def delete_client(
             detail="Client not found"
         )
     
-    # Delete client
+    # Delete client; its portraits and videos go with it (ON DELETE CASCADE)
+    records = _client_records(database, [client_id])
     deleted = database.delete_client(client_id)
     if not deleted:
         logger.error("client_deletion_failed_database_error", client_id=client_id, username=username)
@@ -520,5 +568,6 @@ async def delete_client(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete client"
         )
+    await _release_client_blobs(database, records)
     
     logger.info("client_deleted_successfully", client_id=client_id, username=username)
\ No newline at end of file
@@ -26,6 +26,7 @@ from app.models_categories import (
     PaginatedCategoriesResponse,
 )
 from app.storage_utils import is_local_storage
+from app.utils import decode_cursor, encode_cursor
 from logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -57,15 +58,15 @@ def _get_admin_user(request: Request) -> str:
     try:
         app = get_current_app()
         tokens = app.state.tokens
-        username = tokens.verify_token(auth_token)
+        session = tokens.authenticate(auth_token)
+        username = session.username if session else None
         if not username:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
 
-        database = get_database()
-        user = database.get_user(username)
+        user = session.user
         if not user or not user.get("is_admin", False):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -225,6 +226,7 @@ async def list_companies(
     page_size: int = 50,
     search: Optional[str] = None,
     storage_type: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> PaginatedCompaniesResponse:
     """
     Get list of companies with pagination and filtering.
@@ -234,6 +236,7 @@ async def list_companies(
     - page_size: Items per page (default: 50, max: 200)
     - search: Search query for company name
     - storage_type: Filter by storage type (local, local_disk, minio, yandex_disk)
+    - cursor: next_cursor of the previous page (overrides page)
     """
     username = _get_admin_user(request)
     database = get_database()
@@ -245,15 +248,26 @@ async def list_companies(
         page_size = 50
 
     offset = (page - 1) * page_size
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 2)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
 
     try:
-        # Get paginated companies
+        # Get paginated companies; one extra row tells whether there is a next page
         companies = database.list_companies_paginated(
-            limit=page_size,
+            limit=page_size + 1,
             offset=offset,
             search=search,
-            storage_type=storage_type
+            storage_type=storage_type,
+            after=after
         )
+        next_cursor = None
+        if len(companies) > page_size:
+            companies = companies[:page_size]
+            next_cursor = encode_cursor([companies[-1]["name"], companies[-1]["id"]])
 
         # Get total count for pagination
         total = database.count_companies_filtered(search=search, storage_type=storage_type)
@@ -291,6 +305,7 @@ async def list_companies(
             page=page,
             page_size=page_size,
             total_pages=total_pages,
+            next_cursor=next_cursor,
         )
     except Exception as exc:
         logger.error(f"Error listing companies: {exc}")
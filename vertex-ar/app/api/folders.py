@@ -4,7 +4,7 @@ API endpoints for folder management.
 import uuid
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from app.api.auth import get_current_user
 from app.database import Database
@@ -16,6 +16,7 @@ from app.models import (
     PaginatedFoldersResponse,
     MessageResponse,
 )
+from app.utils import decode_cursor, encode_cursor
 from logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -82,14 +83,27 @@ async def list_folders(
     company_id: Optional[str] = Query(None, description="Filter by company ID (joins through projects)"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (overrides page)"),
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_database),
 ) -> PaginatedFoldersResponse:
     """List all folders with pagination."""
     offset = (page - 1) * page_size
-
-    # Handle filtering by company_id or project_id
-    folders = db.list_folders(project_id=project_id, company_id=company_id, limit=page_size, offset=offset)
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 2)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    # Handle filtering by company_id or project_id; one extra row tells whether there is a next page
+    folders = db.list_folders(
+        project_id=project_id, company_id=company_id, limit=page_size + 1, offset=offset, after=after,
+    )
+    next_cursor = None
+    if len(folders) > page_size:
+        folders = folders[:page_size]
+        next_cursor = encode_cursor([folders[-1]["created_at"], folders[-1]["id"]])
     total = db.count_folders(project_id=project_id, company_id=company_id)
 
     # Enrich with counts
@@ -111,6 +125,7 @@ async def list_folders(
         page=page,
         page_size=page_size,
         total_pages=total_pages,
+        next_cursor=next_cursor,
     )
 
 
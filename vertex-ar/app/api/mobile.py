@@ -12,6 +12,8 @@ from pydantic import BaseModel, Field
 
 from app.api.auth import get_current_user
 from app.database import Database
+from app.utils import decode_cursor, encode_cursor
+from app.services.view_counters import PORTRAIT_VIEWS, get_view_counter_buffer
 from logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -107,9 +109,10 @@ class MobilePortraitResponse(BaseModel):
 class PortraitsListResponse(BaseModel):
     """Paginated list of portraits."""
     portraits: List[MobilePortraitResponse]
-    total: int
+    total: Optional[int] = Field(None, description="Total matching portraits (omitted on cursor pages)")
     page: int
     page_size: int
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, None on the last page")
 
 
 class ViewResponse(BaseModel):
@@ -137,6 +140,25 @@ class MarkerStatusResponse(BaseModel):
     available: bool
     files: Dict[str, MarkerStatusFile]
     total_size_mb: float
+    status: str = "ready"  # pending, running, ready, failed
+    progress: Optional[int] = None
+    error: Optional[str] = None
+
+
+def _storage_relative(path_value: str, storage_root: Path) -> Path:
+    """Return a stored path relative to the storage root (blob paths already are)."""
+    path = Path(path_value)
+    return path.relative_to(storage_root) if path.is_absolute() else path
+
+
+def _marker_url(path_value: Optional[str], base_url: str, storage_root: Path, fallback: str) -> str:
+    """Build the public URL of a stored marker file."""
+    if not path_value:
+        return f"{base_url}/nft-markers/{fallback}"
+    rel_path = _storage_relative(path_value, storage_root)
+    if rel_path.parts and rel_path.parts[0] == "nft_markers":
+        return f"{base_url}/nft-markers/{Path(*rel_path.parts[1:]).as_posix()}"
+    return f"{base_url}/storage/{rel_path.as_posix()}"
 
 
 def _build_portrait_response(
@@ -149,31 +171,32 @@ def _build_portrait_response(
     """Build mobile portrait response from database records."""
     
     # Build image URLs
-    image_rel_path = Path(portrait["image_path"]).relative_to(storage_root)
+    image_rel_path = _storage_relative(portrait["image_path"], storage_root)
     image_url = f"{base_url}/storage/{image_rel_path}"
     
     image_preview_url = None
     if portrait.get("image_preview_path"):
-        preview_rel_path = Path(portrait["image_preview_path"]).relative_to(storage_root)
+        preview_rel_path = _storage_relative(portrait["image_preview_path"], storage_root)
         image_preview_url = f"{base_url}/storage/{preview_rel_path}"
     
-    # Build marker URLs
+    # Build marker URLs from the stored paths: deduplicated portraits share
+    # the markers of their image hash
     portrait_id = portrait["id"]
     markers = MarkersInfo(
-        fset=f"{base_url}/nft-markers/{portrait_id}/{portrait_id}.fset",
-        fset3=f"{base_url}/nft-markers/{portrait_id}/{portrait_id}.fset3",
-        iset=f"{base_url}/nft-markers/{portrait_id}/{portrait_id}.iset"
+        fset=_marker_url(portrait.get("marker_fset"), base_url, storage_root, f"{portrait_id}/{portrait_id}.fset"),
+        fset3=_marker_url(portrait.get("marker_fset3"), base_url, storage_root, f"{portrait_id}/{portrait_id}.fset3"),
+        iset=_marker_url(portrait.get("marker_iset"), base_url, storage_root, f"{portrait_id}/{portrait_id}.iset"),
     )
     
     # Build video info if available
     video_info = None
     if active_video:
-        video_rel_path = Path(active_video["video_path"]).relative_to(storage_root)
+        video_rel_path = _storage_relative(active_video["video_path"], storage_root)
         video_url = f"{base_url}/storage/{video_rel_path}"
         
         video_preview_url = None
         if active_video.get("video_preview_path"):
-            video_preview_rel = Path(active_video["video_preview_path"]).relative_to(storage_root)
+            video_preview_rel = _storage_relative(active_video["video_preview_path"], storage_root)
             video_preview_url = f"{base_url}/storage/{video_preview_rel}"
         
         video_info = VideoInfo(
@@ -217,8 +240,9 @@ async def list_portraits_mobile(
     company_id: Optional[str] = Query(None, description="Filter by company ID"),
     client_id: Optional[str] = Query(None, description="Filter by client ID"),
     include_inactive: bool = Query(False, description="Include portraits without active video"),
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is given)"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     username: Optional[str] = Depends(get_current_user)
 ) -> PortraitsListResponse:
     """
@@ -226,6 +250,10 @@ async def list_portraits_mobile(
     
     Returns portraits with all necessary URLs and metadata for AR viewing.
     Optionally filtered by company or client.
+    
+    Filtering and pagination run in SQL, so only the requested page is read.
+    Follow next_cursor for stable, constant-cost paging; the total is only
+    counted for requests without a cursor.
     """
     database = get_database()
     from app.main import get_current_app
@@ -240,65 +268,71 @@ async def list_portraits_mobile(
         include_inactive=include_inactive,
         page=page,
         page_size=page_size,
+        cursor=bool(cursor),
         username=username
     )
     
-    # Get portraits based on filters
-    all_portraits = []
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 2)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
     
-    if client_id:
-        # Filter by specific client
-        all_portraits = database.list_portraits(client_id=client_id)
-    elif company_id:
-        # Filter by company - get all clients first
-        clients = database.list_clients(company_id=company_id)
-        for client in clients:
-            portraits = database.list_portraits(client_id=client["id"])
-            all_portraits.extend(portraits)
-    else:
-        # Get all portraits
-        all_portraits = database.list_portraits()
-    
-    # Filter out portraits without active video if needed
-    portraits_with_data = []
-    for portrait in all_portraits:
-        client = database.get_client(portrait["client_id"])
-        if not client:
-            continue
-        
-        active_video = database.get_active_video(portrait["id"])
-        
-        if not include_inactive and not active_video:
-            continue
-        
+    # One extra row tells whether there is a next page
+    rows = database.list_portraits_for_mobile(
+        limit=page_size + 1,
+        company_id=company_id,
+        client_id=client_id,
+        include_inactive=include_inactive,
+        after=after,
+        offset=0 if after else (page - 1) * page_size,
+    )
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    
+    portraits = []
+    for row in rows:
+        client = {"id": row["client_id"], "name": row["client_name"], "phone": row["client_phone"]}
+        active_video = None
+        if row.get("active_video_id"):
+            active_video = {
+                "id": row["active_video_id"],
+                "video_path": row["active_video_path"],
+                "video_preview_path": row.get("active_video_preview_path"),
+                "description": row.get("active_video_description"),
+                "file_size_mb": row.get("active_video_file_size_mb"),
+            }
         try:
-            portrait_response = _build_portrait_response(
-                portrait, client, active_video, base_url, storage_root
-            )
-            portraits_with_data.append(portrait_response)
+            portraits.append(_build_portrait_response(row, client, active_video, base_url, storage_root))
         except Exception as e:
-            logger.error(f"Error building portrait response for {portrait['id']}: {e}")
+            logger.error(f"Error building portrait response for {row['id']}: {e}")
             continue
     
-    # Apply pagination
-    total = len(portraits_with_data)
-    start_idx = (page - 1) * page_size
-    end_idx = start_idx + page_size
-    paginated_portraits = portraits_with_data[start_idx:end_idx]
+    next_cursor = encode_cursor([rows[-1]["created_at"], rows[-1]["id"]]) if has_more else None
+    total = None
+    if cursor is None:
+        total = database.count_portraits_for_mobile(
+            company_id=company_id,
+            client_id=client_id,
+            include_inactive=include_inactive,
+        )
     
     logger.info(
         "mobile_portraits_list_response",
         total=total,
-        returned=len(paginated_portraits),
+        returned=len(portraits),
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        has_more=has_more
     )
     
     return PortraitsListResponse(
-        portraits=paginated_portraits,
+        portraits=portraits,
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
@@ -378,9 +412,10 @@ async def track_portrait_view(
     
     # Increment view count
     try:
-        database.increment_portrait_views(portrait_id)
+        counter_buffer = get_view_counter_buffer(database)
+        counter_buffer.increment(PORTRAIT_VIEWS, portrait_id)
         updated_portrait = database.get_portrait(portrait_id)
-        new_view_count = updated_portrait["view_count"]
+        new_view_count = updated_portrait["view_count"] + counter_buffer.pending(PORTRAIT_VIEWS, portrait_id)
         
         logger.info(
             "mobile_portrait_view_count_updated",
@@ -492,8 +527,17 @@ async def get_marker_status(
     
     total_size_mb = round(total_size / (1024 * 1024), 2)
     
+    # Markers are generated asynchronously; report the job state alongside files
+    marker_status = portrait.get("marker_status") or "ready"
+    marker_job = database.get_latest_marker_job(portrait_id)
+    progress = marker_job["progress"] if marker_job else None
+    error = marker_job["error"] if marker_job and marker_status == "failed" else None
+    
     return MarkerStatusResponse(
-        available=all_available and len(files_status) == 3,
+        available=all_available and len(files_status) == 3 and marker_status == "ready",
         files=files_status,
-        total_size_mb=total_size_mb
+        total_size_mb=total_size_mb,
+        status=marker_status,
+        progress=progress,
+        error=error,
     )
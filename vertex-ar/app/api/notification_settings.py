@@ -23,6 +23,7 @@ from app.models import (
     PaginatedNotificationHistoryResponse,
     MessageResponse,
 )
+from app.utils import decode_cursor, encode_cursor
 from logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -393,24 +394,40 @@ async def get_notification_history(
     page_size: int = Query(50, ge=1, le=100, description="Items per page"),
     notification_type: Optional[str] = Query(None, description="Filter by type"),
     status: Optional[str] = Query(None, description="Filter by status"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (overrides page)"),
     _admin: str = Depends(require_admin)
 ) -> PaginatedNotificationHistoryResponse:
     """
     Get notification history with pagination and filters.
     Requires admin authentication.
     """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 2)
+        except ValueError:
+            # ``status`` is the filter parameter here
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
     try:
         app = get_current_app()
-        db = Database(app.state.config["DB_PATH"])
+        # Shared instance, so the cached total survives between requests
+        db = app.state.database
         
         offset = (page - 1) * page_size
         
+        # One extra row tells whether there is a next page
         history_items = db.list_notification_history(
-            limit=page_size,
+            limit=page_size + 1,
             offset=offset,
             notification_type=notification_type,
-            status=status
+            status=status,
+            after=after
         )
+        next_cursor = None
+        if len(history_items) > page_size:
+            history_items = history_items[:page_size]
+            next_cursor = encode_cursor([history_items[-1]["sent_at"], history_items[-1]["id"]])
         
         total = db.count_notification_history(
             notification_type=notification_type,
@@ -426,7 +443,8 @@ async def get_notification_history(
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
         
     except Exception as e:
@@ -15,10 +15,12 @@ from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, s
 from app.api.auth import require_admin
 from app.database import Database
 from app.main import get_current_app
+from app.media_cache import invalidate_cached
 from app.models import ClientResponse, OrderResponse, PortraitResponse, VideoResponse
 from app.services.folder_service import FolderService
+from app.services.uploads import save_upload
 from logging_setup import get_logger
-from nft_marker_generator import NFTMarkerConfig, NFTMarkerGenerator
+from nft_marker_generator import DecodedImage, NFTMarker, NFTMarkerConfig
 from preview_generator import PreviewGenerator
 
 logger = get_logger(__name__)
@@ -44,6 +46,39 @@ def _validate_upload(file: UploadFile, expected_prefix: str, error_detail: str)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_detail)
 
 
+def _copy_ready_markers(
+    storage_root: Path,
+    portrait_id: str,
+    image_path: Path,
+    ready_markers: dict,
+) -> NFTMarker:
+    """Copy existing NFT markers of identical image content into this order's marker slot."""
+    marker_dir = storage_root / "nft_markers" / portrait_id
+    marker_dir.mkdir(parents=True, exist_ok=True)
+
+    copied = {}
+    for field, suffix in (("marker_fset", ".fset"), ("marker_fset3", ".fset3"), ("marker_iset", ".iset")):
+        source = Path(ready_markers[field])
+        if not source.is_absolute():
+            source = storage_root / source
+        target = marker_dir / f"{portrait_id}{suffix}"
+        shutil.copyfile(source, target)
+        copied[field] = str(target)
+
+    with DecodedImage.open(image_path) as decoded:
+        width, height = decoded.size
+
+    return NFTMarker(
+        image_path=str(image_path),
+        fset_path=copied["marker_fset"],
+        fset3_path=copied["marker_fset3"],
+        iset_path=copied["marker_iset"],
+        width=width,
+        height=height,
+        dpi=NFTMarkerConfig().min_dpi,
+    )
+
+
 async def _create_order_workflow(
     phone: str,
     name: str,
@@ -108,21 +143,13 @@ async def _create_order_workflow(
     temp_dir = storage_root / "temp" / "orders" / portrait_id
     temp_dir.mkdir(parents=True, exist_ok=True)
 
-    image.file.seek(0)
-    video.file.seek(0)
-
     try:
-        image_content = await image.read()
-        video_content = await video.read()
-
-        # Write files to temp directory first
+        # Stream files to the temp directory first
         temp_image_path = temp_dir / f"{portrait_id}.jpg"
-        with open(temp_image_path, "wb") as image_file:
-            image_file.write(image_content)
+        stored_image = await save_upload(image, temp_image_path)
 
         temp_video_path = temp_dir / f"{video_id}.mp4"
-        with open(temp_video_path, "wb") as video_file:
-            video_file.write(video_content)
+        await save_upload(video, temp_video_path)
 
         # Initialize paths (will be updated based on storage type)
         image_path = temp_image_path
@@ -140,7 +167,7 @@ async def _create_order_workflow(
         video_preview_path: Path | None = None
 
         try:
-            image_preview = PreviewGenerator.generate_image_preview(image_content)
+            image_preview = PreviewGenerator.generate_image_preview(temp_image_path)
             if image_preview:
                 image_preview_path = temp_dir / f"{portrait_id}_preview.webp"
                 with open(image_preview_path, "wb") as preview_file:
@@ -162,7 +189,7 @@ async def _create_order_workflow(
             )
 
         try:
-            video_preview = PreviewGenerator.generate_video_preview(video_content)
+            video_preview = PreviewGenerator.generate_video_preview(temp_video_path)
             if video_preview:
                 video_preview_path = temp_dir / f"{video_id}_preview.webp"
                 with open(video_preview_path, "wb") as preview_file:
@@ -183,15 +210,27 @@ async def _create_order_workflow(
                 exc_info=exc,
             )
 
-        # Generate NFT markers using temp files
-        nft_generator = NFTMarkerGenerator(storage_root)
-        marker_config = NFTMarkerConfig(
-            feature_density="high",
-            levels=3,
-            max_image_size=8192,
-            max_image_area=50_000_000,
-        )
-        marker_result = nft_generator.generate_marker(str(temp_image_path), portrait_id, marker_config)
+        # Reuse NFT markers of identical images; otherwise generate them using
+        # temp files in the marker process pool. Order folders keep their own copies.
+        from app.services.blob_store import get_blob_store
+
+        blob_store = get_blob_store(database, getattr(app.state, "storage_manager", None), storage_root)
+        image_hash = stored_image.content_hash
+        ready_markers = blob_store.find_ready_markers(image_hash) if blob_store else None
+        if ready_markers:
+            marker_result = _copy_ready_markers(storage_root, portrait_id, temp_image_path, ready_markers)
+            logger.info("Reusing NFT markers for known image content", portrait_id=portrait_id, content_hash=image_hash)
+        else:
+            from app.services.marker_jobs import get_marker_job_queue
+
+            marker_queue = get_marker_job_queue(database, storage_root)
+            marker_config = NFTMarkerConfig(
+                feature_density="high",
+                levels=3,
+                max_image_size=8192,
+                max_image_area=50_000_000,
+            )
+            marker_result = await marker_queue.run(portrait_id, temp_image_path, portrait_id, marker_config)
 
         permanent_link = f"portrait_{portrait_id}"
         portrait_url = f"{base_url}/portrait/{permanent_link}"
@@ -216,7 +255,7 @@ async def _create_order_workflow(
                 if isinstance(adapter, YandexDiskStorageAdapter):
                     # Create folder structure on Yandex Disk
                     order_id = portrait_id
-                    structure_result = adapter.ensure_order_structure(
+                    structure_result = await adapter.ensure_order_structure(
                         yandex_disk_folder_id,
                         content_type,
                         order_id
@@ -230,59 +269,45 @@ async def _create_order_workflow(
                         results=structure_result
                     )
 
-                    # Upload image to Yandex Disk
-                    yandex_image_path = f"{yandex_disk_folder_id}/{content_type}/{order_id}/Image/{portrait_id}.jpg"
-                    await adapter.save_file(image_content, yandex_image_path)
-                    image_path = Path(yandex_image_path)  # Store logical path
-                    logger.info("Uploaded image to Yandex Disk", path=yandex_image_path)
+                    # Upload all artifacts as one batch: upload URLs are requested
+                    # in parallel and files are uploaded concurrently with retries
+                    order_dir = f"{yandex_disk_folder_id}/{content_type}/{order_id}"
+                    yandex_image_path = f"{order_dir}/Image/{portrait_id}.jpg"
+                    yandex_video_path = f"{order_dir}/Image/{video_id}.mp4"
+                    yandex_preview_path = f"{order_dir}/Image/{portrait_id}_preview.webp"
+                    yandex_video_preview_path = f"{order_dir}/Image/{video_id}_preview.webp"
+                    yandex_qr_path = f"{order_dir}/QR/{portrait_id}_qr.png"
+
+                    artifacts = [
+                        (temp_video_path, yandex_video_path),
+                        (temp_image_path, yandex_image_path),
+                        (qr_buffer.getvalue(), yandex_qr_path),
+                    ]
+                    if image_preview_path:
+                        artifacts.append((image_preview_path, yandex_preview_path))
+                    if video_preview_path:
+                        artifacts.append((video_preview_path, yandex_video_preview_path))
+                    for marker_file in [marker_result.fset_path, marker_result.fset3_path, marker_result.iset_path]:
+                        if marker_file and Path(marker_file).exists():
+                            artifacts.append((Path(marker_file), f"{order_dir}/nft_markers/{Path(marker_file).name}"))
 
-                    # Upload video to Yandex Disk
-                    yandex_video_path = f"{yandex_disk_folder_id}/{content_type}/{order_id}/Image/{video_id}.mp4"
-                    await adapter.save_file(video_content, yandex_video_path)
-                    video_path = Path(yandex_video_path)  # Store logical path
-                    logger.info("Uploaded video to Yandex Disk", path=yandex_video_path)
+                    await adapter.save_files(artifacts)
+                    for _, remote_path in artifacts:
+                        invalidate_cached(adapter, remote_path)
 
-                    # Upload previews if they exist
+                    # Store logical paths
+                    image_path = Path(yandex_image_path)
+                    video_path = Path(yandex_video_path)
                     if image_preview_path:
-                        with open(image_preview_path, "rb") as f:
-                            preview_data = f.read()
-                        yandex_preview_path = f"{yandex_disk_folder_id}/{content_type}/{order_id}/Image/{portrait_id}_preview.webp"
-                        await adapter.save_file(preview_data, yandex_preview_path)
                         image_preview_path = Path(yandex_preview_path)
-                        logger.info("Uploaded image preview to Yandex Disk", path=yandex_preview_path)
-
                     if video_preview_path:
-                        with open(video_preview_path, "rb") as f:
-                            preview_data = f.read()
-                        yandex_video_preview_path = f"{yandex_disk_folder_id}/{content_type}/{order_id}/Image/{video_id}_preview.webp"
-                        await adapter.save_file(preview_data, yandex_video_preview_path)
                         video_preview_path = Path(yandex_video_preview_path)
-                        logger.info("Uploaded video preview to Yandex Disk", path=yandex_video_preview_path)
-
-                    # Upload QR code
-                    qr_bytes = qr_buffer.getvalue()
-                    yandex_qr_path = f"{yandex_disk_folder_id}/{content_type}/{order_id}/QR/{portrait_id}_qr.png"
-                    await adapter.save_file(qr_bytes, yandex_qr_path)
-                    logger.info("Uploaded QR code to Yandex Disk", path=yandex_qr_path)
-
-                    # Upload NFT markers
-                    for marker_file, subdir in [
-                        (marker_result.fset_path, "nft_markers"),
-                        (marker_result.fset3_path, "nft_markers"),
-                        (marker_result.iset_path, "nft_markers")
-                    ]:
-                        if marker_file and Path(marker_file).exists():
-                            with open(marker_file, "rb") as f:
-                                marker_data = f.read()
-                            marker_filename = Path(marker_file).name
-                            yandex_marker_path = f"{yandex_disk_folder_id}/{content_type}/{order_id}/{subdir}/{marker_filename}"
-                            await adapter.save_file(marker_data, yandex_marker_path)
-                            logger.info("Uploaded NFT marker to Yandex Disk", path=yandex_marker_path)
 
                     logger.info(
                         "Successfully uploaded all order artifacts to Yandex Disk",
                         order_id=order_id,
-                        company_id=company_id
+                        company_id=company_id,
+                        files=len(artifacts)
                     )
                 else:
                     logger.warning(
@@ -430,6 +455,7 @@ async def _create_order_workflow(
             qr_code=qr_code_base64,
             image_preview_path=str(image_preview_path) if image_preview_path else None,
             subscription_end=subscription_end,
+            blob_hash=image_hash,
         )
 
         video_record = database.create_video(
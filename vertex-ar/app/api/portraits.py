@@ -1,12 +1,15 @@
 """
 Portrait management endpoints for Vertex AR API.
 """
+import asyncio
 import base64
 import math
+import os
 import shutil
 import uuid
 from datetime import datetime
 from io import BytesIO
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import qrcode
@@ -18,7 +21,10 @@ from app.config import settings
 from app.database import Database
 from app.models import ClientResponse, PortraitResponse, VideoResponse
 from app.main import get_current_app
-from nft_marker_generator import NFTMarkerConfig, NFTMarkerGenerator
+from app.services.preview_urls import get_preview_versions, sprite_layout, sprite_position, variant_srcset
+from app.storage_utils import is_local_storage
+from app.utils import decode_cursor, encode_cursor
+from nft_marker_generator import NFTMarkerConfig
 from utils import format_bytes
 from logging_setup import get_logger
 
@@ -49,12 +55,49 @@ def get_cache() -> Optional[CacheManager]:
         return None
 
 
-async def invalidate_portrait_cache() -> None:
-    """Invalidate portrait listing cache when data changes."""
+def _portrait_list_tags(
+    portraits: List[Dict[str, Any]],
+    client_id: Optional[str] = None,
+    folder_id: Optional[str] = None,
+    company_id: Optional[str] = None,
+) -> List[str]:
+    """Cache tags of a portrait list: every listed portrait plus its filters."""
+    tags = [f"portrait:{portrait['id']}" for portrait in portraits]
+    filters = [
+        tag for tag, value in (
+            (f"client:{client_id}", client_id),
+            (f"folder:{folder_id}", folder_id),
+            (f"company:{company_id}", company_id),
+        ) if value
+    ]
+    # Unfiltered lists can gain or lose any portrait
+    return tags + (filters or ["portraits:all"])
+
+
+async def invalidate_portrait_cache(
+    portrait_id: str,
+    client_id: Optional[str] = None,
+    folder_id: Optional[str] = None,
+    company_id: Optional[str] = None,
+) -> None:
+    """
+    Invalidate cached portrait lists affected by a change to one portrait.
+    
+    Lists showing the portrait are always invalidated. Passing its client
+    marks a membership change (create/delete), which also invalidates the
+    lists filtered by its client, folder or company and the unfiltered ones.
+    """
     cache = get_cache()
     if cache:
-        await cache.invalidate_all()
-        logger.info("Portrait cache invalidated")
+        tags = [f"portrait:{portrait_id}"]
+        if client_id:
+            tags += [f"client:{client_id}", "portraits:all"]
+            if folder_id:
+                tags.append(f"folder:{folder_id}")
+            if company_id:
+                tags.append(f"company:{company_id}")
+        await cache.invalidate_tags(*tags)
+        logger.info("Portrait cache invalidated", tags=tags)
 
 
 def _portrait_to_response(portrait: Dict[str, Any]) -> PortraitResponse:
@@ -71,9 +114,27 @@ def _portrait_to_response(portrait: Dict[str, Any]) -> PortraitResponse:
         subscription_end=portrait.get("subscription_end"),
         lifecycle_status=portrait.get("lifecycle_status", "active"),
         last_status_change=portrait.get("last_status_change"),
+        marker_status=portrait.get("marker_status", "ready"),
     )
 
 
+def _preview_versions():
+    """Preview URL builder bound to the running app's storage root."""
+    app = get_current_app()
+    return get_preview_versions(app.state.config["BASE_DIR"], app.state.config["STORAGE_ROOT"])
+
+
+def _attach_preview_urls(items: List[Dict[str, Any]], portraits: List[Dict[str, Any]]) -> None:
+    """Add versioned preview URLs and a responsive srcset to portrait list items."""
+    versions = _preview_versions()
+    variants = get_database().list_previews_for_contents(
+        "portraits", [portrait.get("blob_hash") for portrait in portraits]
+    )
+    for item, portrait in zip(items, portraits):
+        item["image_preview_url"] = versions.record_url("portraits", portrait["id"], portrait.get("image_preview_path"))
+        item["image_preview_srcset"] = variant_srcset(variants.get(portrait.get("blob_hash"), []))
+
+
 def _video_to_response(video: Dict[str, Any]) -> VideoResponse:
     """Convert video record to API response."""
     return VideoResponse(
@@ -95,9 +156,6 @@ async def create_portrait(
     """Create a new portrait for a client."""
     database = get_database()
     
-    # Invalidate cache after creation
-    await invalidate_portrait_cache()
-    
     # Check if client exists
     client = database.get_client(client_id)
     if not client:
@@ -130,86 +188,99 @@ async def create_portrait(
     # Get company ID for client-specific storage
     company_id = client.get('company_id')
     
-    # Generate paths for storage
-    portrait_image_path = f"portraits/{client_id}/{portrait_id}.jpg"
-    portrait_preview_path = f"portraits/{client_id}/{portrait_id}_preview.webp"
-    
-    # Save image using company-specific storage manager
-    image.file.seek(0)
-    image_content = await image.read()
-    
-    # Use company-specific storage adapter if available
-    if company_id:
-        storage_adapter = storage_manager.get_adapter_for_content(company_id, "portraits")
-    else:
-        storage_adapter = storage_manager.get_adapter("portraits")
-    
-    await storage_adapter.save_file(image_content, portrait_image_path)
-    
-    # Generate image preview with improved quality and WebP support
-    from preview_generator import PreviewGenerator
-    image_preview_path_saved = None
-    
+    # Stream the image to a spool file, then save it through the
+    # content-addressed blob store so repeat uploads share one stored file,
+    # preview and set of NFT markers
+    from app.services.blob_store import get_blob_store
+    from app.services.uploads import spool_upload
+    spooled_image = await spool_upload(image, storage_root / "temp" / "uploads", suffix=".jpg")
     try:
-        image_preview = PreviewGenerator.generate_image_preview(image_content, size=(300, 300), format='webp')
-        if image_preview:
-            await storage_adapter.save_file(image_preview, portrait_preview_path)
-            image_preview_path_saved = portrait_preview_path
-            from logging_setup import get_logger
-            logger = get_logger(__name__)
-            logger.info(f"Portrait preview created: {portrait_preview_path}")
-    except Exception as e:
-        from logging_setup import get_logger
-        logger = get_logger(__name__)
-        logger.error(f"Error generating portrait preview: {e}")
-    
-    # Generate QR code
-    portrait_url = f"{base_url}/portrait/{permanent_link}"
-    qr_img = qrcode.make(portrait_url)
-    qr_buffer = BytesIO()
-    qr_img.save(qr_buffer, format="PNG")
-    qr_base64 = base64.b64encode(qr_buffer.getvalue()).decode()
-    
-    # Generate NFT markers with increased image size limits
-    from nft_marker_generator import NFTMarkerConfig, NFTMarkerGenerator
-    nft_generator = NFTMarkerGenerator(storage_root)
-    config = NFTMarkerConfig(
-        feature_density="high", 
-        levels=3,
-        max_image_size=8192,  # Increased from 4096 to support larger images
-        max_image_area=50_000_000  # Increased from 16_777_216 to support larger images
-    )
-    
-    # Get image for NFT generation (save temporarily if needed)
-    temp_image_path = None
-    try:
-        if storage_manager.get_storage_type("portraits") == "local":
-            temp_image_path = storage_root / portrait_image_path
-        else:
-            # Save temporarily for NFT generation
-            temp_image_path = storage_root / f"temp_{portrait_id}.jpg"
-            with open(temp_image_path, "wb") as f:
-                f.write(image_content)
+        blob_store = get_blob_store(database, storage_manager, storage_root)
+        image_blob, image_reused = await blob_store.store_upload(spooled_image, "portraits", company_id, suffix=".jpg")
+        content_hash = image_blob["content_hash"]
+        portrait_image_path = image_blob["storage_path"]
+        storage_adapter = storage_manager.get_adapter_for_content(company_id, "portraits")
+        
+        # Generate the list preview and responsive variants from a single decode
+        from preview_generator import ImagePreviewEngine
+        image_preview_path_saved = await blob_store.get_preview(image_blob) if image_reused else None
+        has_variants = image_reused and bool(blob_store.list_preview_variants(content_hash, company_id, "portraits"))
+        
+        if image_preview_path_saved is None or not has_variants:
+            try:
+                engine = ImagePreviewEngine(
+                    widths=() if has_variants else settings.IMAGE_PREVIEW_WIDTHS,
+                    formats=settings.IMAGE_PREVIEW_FORMATS,
+                    square_size=(300, 300) if image_preview_path_saved is None else None,
+                )
+                previews = await asyncio.to_thread(engine.render, spooled_image.path)
+                if previews and previews.square:
+                    image_preview_path_saved = await blob_store.save_preview(image_blob, previews.square)
+                    logger.info(f"Portrait preview created: {image_preview_path_saved}")
+                if previews and previews.variants:
+                    await blob_store.save_preview_variants(content_hash, company_id, "portraits", previews.variants)
+            except Exception as e:
+                logger.error(f"Error generating portrait preview: {e}")
+        
+        # Generate QR code
+        portrait_url = f"{base_url}/portrait/{permanent_link}"
+        qr_img = qrcode.make(portrait_url)
+        qr_buffer = BytesIO()
+        qr_img.save(qr_buffer, format="PNG")
+        qr_base64 = base64.b64encode(qr_buffer.getvalue()).decode()
+        
+        # NFT markers are generated in the background by the marker job queue;
+        # paths are deterministic (keyed by image hash) so the portrait row can
+        # reference them upfront, and known content reuses existing markers.
+        config = NFTMarkerConfig(
+            feature_density="high", 
+            levels=3,
+            max_image_size=8192,  # Increased from 4096 to support larger images
+            max_image_area=50_000_000  # Increased from 16_777_216 to support larger images
+        )
+        ready_markers = blob_store.find_ready_markers(content_hash)
+        marker_paths = ready_markers or blob_store.marker_paths(content_hash)
+        
+        # Create portrait in database
+        db_portrait = database.create_portrait(
+            portrait_id=portrait_id,
+            client_id=client_id,
+            image_path=portrait_image_path,
+            permanent_link=permanent_link,
+            qr_code=qr_base64,
+            image_preview_path=image_preview_path_saved,
+            folder_id=folder_id,
+            marker_status="ready" if ready_markers else "pending",
+            blob_hash=content_hash,
+            **marker_paths,
+        )
+        
+        # Invalidate cached lists the new portrait belongs to
+        await invalidate_portrait_cache(portrait_id, client_id, folder_id, company_id)
         
-        marker_result = nft_generator.generate_marker(str(temp_image_path), portrait_id, config)
+        if ready_markers:
+            logger.info("Reusing NFT markers for known image content", portrait_id=portrait_id, content_hash=content_hash)
+        else:
+            # Get image for NFT generation (save temporarily if needed; the job removes it)
+            cleanup_image = False
+            if is_local_storage(storage_manager.get_storage_type_for_content(company_id, "portraits")):
+                marker_image_path = storage_root / portrait_image_path
+            else:
+                marker_image_path = storage_root / f"temp_{portrait_id}.jpg"
+                os.replace(spooled_image.path, marker_image_path)
+                cleanup_image = True
+            
+            from app.services.marker_jobs import get_marker_job_queue
+            marker_queue = get_marker_job_queue(database, storage_root)
+            await marker_queue.submit(
+                portrait_id,
+                marker_image_path,
+                marker_name=content_hash,
+                config=config,
+                cleanup_image=cleanup_image,
+            )
     finally:
-        # Clean up temp file
-        if temp_image_path and temp_image_path.name.startswith("temp_") and temp_image_path.exists():
-            temp_image_path.unlink()
-    
-    # Create portrait in database
-    db_portrait = database.create_portrait(
-        portrait_id=portrait_id,
-        client_id=client_id,
-        image_path=portrait_image_path,
-        marker_fset=marker_result.fset_path,
-        marker_fset3=marker_result.fset3_path,
-        marker_iset=marker_result.iset_path,
-        permanent_link=permanent_link,
-        qr_code=qr_base64,
-        image_preview_path=image_preview_path_saved,
-        folder_id=folder_id,
-    )
+        spooled_image.cleanup()
     
     # Ensure QR code is included in response payload
     db_portrait["qr_code"] = qr_base64
@@ -231,7 +302,8 @@ async def list_portraits(
     lifecycle_status: Optional[str] = Query(None),
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     page_size: int = Query(None, ge=1, le=settings.CACHE_PAGE_SIZE_MAX, description="Items per page"),
-    include_preview: bool = Query(False, description="Include base64-encoded preview data"),
+    include_preview: bool = Query(False, description="Include preview URLs (image_preview_url, image_preview_srcset)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (overrides page)"),
     username: str = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """
@@ -243,7 +315,8 @@ async def list_portraits(
             "total": 100,
             "page": 1,
             "page_size": 50,
-            "total_pages": 2
+            "total_pages": 2,
+            "next_cursor": "..."
         }
     """
     database = get_database()
@@ -253,6 +326,13 @@ async def list_portraits(
     if page_size is None:
         page_size = settings.CACHE_PAGE_SIZE_DEFAULT
     
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 2)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    
     # Generate cache key
     cache_key_parts = (
         "portraits",
@@ -264,24 +344,26 @@ async def list_portraits(
         page,
         page_size,
         include_preview,
+        cursor or "",
     )
     
     # Try to get from cache
     cached_result = None
-    if cache and not include_preview:  # Don't cache preview data (too large)
+    if cache:
         cached_result = await cache.get(*cache_key_parts)
         if cached_result:
             logger.debug("Cache hit for portrait list", page=page, page_size=page_size)
             return cached_result
     
-    # Fetch from database
+    # Fetch from database; a cursor page asks for one extra row to tell whether there is a next one
     portraits = database.list_portraits_paginated(
         page=page,
-        page_size=page_size,
+        page_size=page_size + 1 if after else page_size,
         client_id=client_id,
         folder_id=folder_id,
         company_id=company_id,
         lifecycle_status=lifecycle_status,
+        after=after,
     )
     
     total = database.count_portraits(
@@ -292,37 +374,16 @@ async def list_portraits(
     )
     
     total_pages = math.ceil(total / page_size) if page_size > 0 else 0
+    has_more = len(portraits) > page_size if after else page * page_size < total
+    portraits = portraits[:page_size]
+    next_cursor = None
+    if has_more and portraits:
+        next_cursor = encode_cursor([portraits[-1]["created_at"], portraits[-1]["id"]])
     
-    # Convert to response format
-    items = []
-    if not include_preview:
-        items = [_portrait_to_response(portrait).dict() for portrait in portraits]
-    else:
-        # Include preview data
-        from pathlib import Path
-        
-        for portrait in portraits:
-            portrait_dict = _portrait_to_response(portrait).dict()
-            
-            # Add preview data if available
-            preview_data = None
-            image_preview_path = portrait.get("image_preview_path")
-            if image_preview_path:
-                try:
-                    preview_path = Path(image_preview_path)
-                    if preview_path.exists():
-                        with open(preview_path, "rb") as f:
-                            preview_content = base64.b64encode(f.read()).decode()
-                            # Determine format from file extension
-                            if image_preview_path.endswith('.webp'):
-                                preview_data = f"data:image/webp;base64,{preview_content}"
-                            else:
-                                preview_data = f"data:image/jpeg;base64,{preview_content}"
-                except Exception as e:
-                    logger.warning(f"Failed to load preview for portrait {portrait['id']}: {e}")
-            
-            portrait_dict['image_preview_data'] = preview_data
-            items.append(portrait_dict)
+    # Convert to response format; previews are referenced by URL, not inlined
+    items = [_portrait_to_response(portrait).dict() for portrait in portraits]
+    if include_preview:
+        _attach_preview_urls(items, portraits)
     
     result = {
         "items": items,
@@ -330,11 +391,17 @@ async def list_portraits(
         "page": page,
         "page_size": page_size,
         "total_pages": total_pages,
+        "next_cursor": next_cursor,
     }
     
-    # Cache result (only if not including previews)
-    if cache and not include_preview:
-        await cache.set(result, *cache_key_parts, ttl=settings.CACHE_TTL)
+    # Cache result
+    if cache:
+        await cache.set(
+            result,
+            *cache_key_parts,
+            ttl=settings.CACHE_TTL,
+            tags=_portrait_list_tags(portraits, client_id, folder_id, company_id),
+        )
         logger.debug("Cached portrait list", page=page, page_size=page_size)
     
     return result
@@ -357,12 +424,15 @@ async def list_portraits_with_preview(
     lifecycle_status: Optional[str] = Query(None),
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     page_size: int = Query(None, ge=1, le=settings.CACHE_PAGE_SIZE_MAX, description="Items per page"),
+    previews: str = Query("url", pattern="^(url|sprite)$", description="'url' per item, or 'sprite' for one sprite sheet per page"),
     _: str = Depends(require_admin)
 ) -> Dict[str, Any]:
     """
     Get paginated portraits with preview images and video info for admin dashboard.
     
-    This is the preview-heavy endpoint used by the admin dashboard.
+    Previews are returned as cacheable URLs served by /previews. In sprite
+    mode the response also carries one sprite sheet URL for the page, and
+    each portrait its tile offset in the sheet.
     Supports pagination and caching to reduce database/storage load.
     """
     database = get_database()
@@ -380,6 +450,7 @@ async def list_portraits_with_preview(
         lifecycle_status or "all",
         page,
         page_size,
+        previews,
     )
     
     # Try to get from cache
@@ -390,8 +461,9 @@ async def list_portraits_with_preview(
             logger.debug("Cache hit for admin portrait preview list", page=page, page_size=page_size)
             return cached_result
     
-    # Fetch paginated portraits from database
-    portraits = database.list_portraits_paginated(
+    # Fetch the page with client and active video joined in, then all of its
+    # videos in one batch, instead of two queries per portrait
+    portraits = database.list_portraits_with_client_paginated(
         page=page,
         page_size=page_size,
         company_id=company_id,
@@ -405,65 +477,25 @@ async def list_portraits_with_preview(
     
     total_pages = math.ceil(total / page_size) if page_size > 0 else 0
     
-    logger.info(
-        f"Loading page {page}/{total_pages} ({len(portraits)} portraits) with previews",
-        company_id=company_id or "all",
-        total=total
-    )
+    versions = _preview_versions()
+    videos_by_portrait = database.list_videos_for_portraits([portrait["id"] for portrait in portraits])
+    variants = database.list_previews_for_contents("portraits", [portrait.get("blob_hash") for portrait in portraits])
     
     result = []
     for portrait in portraits:
         try:
-            preview_data = None
-            image_preview_path = portrait.get("image_preview_path")
-            logger.info(f"Portrait {portrait['id']}: image_preview_path={image_preview_path}")
-            if image_preview_path:
-                try:
-                    from pathlib import Path
-                    preview_path = Path(image_preview_path)
-                    if preview_path.exists():
-                        with open(preview_path, "rb") as f:
-                            preview_data = base64.b64encode(f.read()).decode()
-                            logger.info(f"Successfully loaded image preview for portrait {portrait['id']}, size={len(preview_data)}")
-                    else:
-                        logger.warning(f"Preview path does not exist for portrait {portrait['id']}: {preview_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to read preview for portrait {portrait['id']}: {e}")
-            
-            # Get client information
-            client = database.get_client(portrait["client_id"])
-            
-            videos = database.list_videos(portrait["id"])
-            
             videos_with_previews = []
-            active_video_description = "Нет активного видео"
+            if portrait.get("active_video_id"):
+                active_video_description = portrait.get("active_video_description") or "Активное видео без описания"
+            else:
+                active_video_description = "Нет активного видео"
             
-            for v in videos:
-                video_preview_data = None
-                video_preview_path = v.get("video_preview_path")
-                logger.info(f"Video {v['id']}: video_preview_path={video_preview_path}")
-                if video_preview_path:
-                    try:
-                        from pathlib import Path
-                        preview_path = Path(video_preview_path)
-                        if preview_path.exists():
-                            with open(preview_path, "rb") as f:
-                                video_preview_data = base64.b64encode(f.read()).decode()
-                                logger.info(f"Successfully loaded video preview for video {v['id']}, size={len(video_preview_data)}")
-                        else:
-                            logger.warning(f"Video preview path does not exist for video {v['id']}: {preview_path}")
-                    except Exception as e:
-                        logger.warning(f"Failed to read video preview for video {v['id']}: {e}")
-                
-                # Check if this is the active video
-                if v.get("is_active"):
-                    active_video_description = v.get("description", "Активное видео без описания")
-                
+            for v in videos_by_portrait.get(portrait["id"], []):
                 videos_with_previews.append({
                     "id": v["id"],
                     "is_active": bool(v["is_active"]),
                     "created_at": v.get("created_at"),
-                    "preview": f"data:image/webp;base64,{video_preview_data}" if video_preview_data and video_preview_path and video_preview_path.endswith('.webp') else f"data:image/jpeg;base64,{video_preview_data}" if video_preview_data else ""
+                    "preview_url": versions.record_url("videos", v["id"], v.get("video_preview_path")),
                 })
             
             result.append({
@@ -472,12 +504,12 @@ async def list_portraits_with_preview(
                 "permanent_link": portrait["permanent_link"],
                 "view_count": portrait.get("view_count", 0),
                 "created_at": portrait.get("created_at"),
-                "preview": preview_data or "",
                 "videos": videos_with_previews,
-                "client_name": client["name"] if client else "N/A",
-                "client_phone": client["phone"] if client else "N/A",
+                "client_name": portrait.get("client_name") or "N/A",
+                "client_phone": portrait.get("client_phone") or "N/A",
                 "active_video_description": active_video_description,
-                "image_preview_data": f"data:image/webp;base64,{preview_data}" if preview_data and image_preview_path and image_preview_path.endswith('.webp') else f"data:image/jpeg;base64,{preview_data}" if preview_data else "",
+                "image_preview_url": versions.record_url("portraits", portrait["id"], portrait.get("image_preview_path")),
+                "image_preview_srcset": variant_srcset(variants.get(portrait.get("blob_hash"), [])),
                 "qr_code_base64": f"data:image/png;base64,{portrait.get('qr_code', '')}" if portrait.get('qr_code') else ""
             })
         except Exception as e:
@@ -492,12 +524,25 @@ async def list_portraits_with_preview(
         "total_pages": total_pages,
     }
     
+    if previews == "sprite" and result:
+        preview_paths = {portrait["id"]: portrait.get("image_preview_path") for portrait in portraits}
+        sprite_items = [(item["id"], preview_paths[item["id"]]) for item in result]
+        layout = sprite_layout(len(sprite_items))
+        response_data["sprite"] = {"url": versions.sprite_url("portraits", sprite_items), **layout}
+        for index, item in enumerate(result):
+            item["sprite_position"] = sprite_position(index, layout)
+    
     # Cache the result
     if cache:
-        await cache.set(response_data, *cache_key_parts, ttl=settings.CACHE_TTL)
+        await cache.set(
+            response_data,
+            *cache_key_parts,
+            ttl=settings.CACHE_TTL,
+            tags=_portrait_list_tags(portraits, company_id=company_id),
+        )
         logger.debug("Cached admin portrait preview list", page=page, page_size=page_size)
     
-    logger.info(f"Returning page {page}/{total_pages} with {len(result)} portraits with previews")
+    logger.debug(f"Returning page {page}/{total_pages} with {len(result)} portraits with previews")
     return response_data
 
 
@@ -557,14 +602,27 @@ async def regenerate_portrait_marker(
     if not image_path_value:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Portrait image path is missing")
 
+    app = get_current_app()
+    storage_root: Path = app.state.config["STORAGE_ROOT"]
+
     image_path = Path(image_path_value)
+    if not image_path.is_absolute():
+        # Blob paths are stored relative to the storage root
+        image_path = storage_root / image_path
     if not image_path.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Portrait image file not found")
 
-    app = get_current_app()
-    storage_root: Path = app.state.config["STORAGE_ROOT"]
-    marker_name = portrait_id
-    marker_dir = storage_root / "nft_markers" / marker_name
+    # Deduplicated portraits share the markers of their image hash; regenerate
+    # them in place so every portrait using the blob gets the new files
+    from app.services.blob_store import get_blob_store
+    blob_store = get_blob_store(database, app.state.storage_manager, storage_root)
+    content_hash = portrait.get("blob_hash")
+    if content_hash and database.is_blob_hash_in_use(content_hash, "portraits"):
+        marker_name = content_hash
+        marker_dir = blob_store.marker_dir(content_hash)
+    else:
+        marker_name = portrait_id
+        marker_dir = storage_root / "nft_markers" / marker_name
 
     backup_dir: Optional[Path] = None
     if marker_dir.exists():
@@ -579,7 +637,6 @@ async def regenerate_portrait_marker(
                 detail="Failed to backup existing marker files",
             ) from exc
 
-    nft_generator = NFTMarkerGenerator(storage_root)
     marker_config = NFTMarkerConfig(
         feature_density="high",
         levels=3,
@@ -587,8 +644,11 @@ async def regenerate_portrait_marker(
         max_image_area=50_000_000,
     )
 
+    from app.services.marker_jobs import get_marker_job_queue
+    marker_queue = get_marker_job_queue(database, storage_root)
+
     try:
-        marker_result = nft_generator.generate_marker(image_path, marker_name, marker_config)
+        marker_result = await marker_queue.run(portrait_id, image_path, marker_name, marker_config)
         database.update_portrait_marker_paths(
             portrait_id=portrait_id,
             marker_fset=marker_result.fset_path,
@@ -695,9 +755,6 @@ async def add_video_to_portrait(
     
     database = get_database()
     
-    # Invalidate cache after video creation
-    await invalidate_portrait_cache()
-    
     # Check if portrait exists
     portrait = database.get_portrait(portrait_id)
     if not portrait:
@@ -715,53 +772,62 @@ async def add_video_to_portrait(
     app = get_current_app()
     storage_root = app.state.config["STORAGE_ROOT"]
     
-    # Create storage directories
-    client_id = portrait["client_id"]
-    portrait_storage = storage_root / "portraits" / client_id / portrait_id
-    portrait_storage.mkdir(parents=True, exist_ok=True)
-    
-    # Read and save video
-    video.file.seek(0)
-    video_content = await video.read()
-    video_path = portrait_storage / f"{video_id}.mp4"
-    
-    with open(video_path, "wb") as f:
-        f.write(video_content)
-    
-    video_file_size_mb: int | None = None
-    try:
-        video_size_bytes = video_path.stat().st_size
-        if video_size_bytes:
-            video_file_size_mb = max(1, math.ceil(video_size_bytes / (1024 * 1024)))
-    except OSError:
-        video_file_size_mb = None
-    
-    # Generate video preview
-    from preview_generator import PreviewGenerator
-    video_preview_path = None
-    
+    # Stream the video to a spool file and save it through the content-addressed
+    # blob store; re-uploads of the same file share the stored copy and its preview
+    from app.services.uploads import spool_upload
+    spooled_video = await spool_upload(video, storage_root / "temp" / "uploads", suffix=".mp4")
     try:
-        video_preview = PreviewGenerator.generate_video_preview(video_content, size=(300, 300), format='webp')
-        if video_preview and len(video_preview) > 0:
-            video_preview_path = portrait_storage / f"{video_id}_preview.webp"
-            with open(video_preview_path, "wb") as f:
-                f.write(video_preview)
-            logger.info(f"Video preview created: {video_preview_path}, size: {len(video_preview)} bytes")
+        storage_manager = app.state.storage_manager
+        from app.services.blob_store import get_blob_store
+        blob_store = get_blob_store(database, storage_manager, storage_root)
+        video_blob, video_reused = await blob_store.store_upload(spooled_video, "videos", suffix=".mp4")
+        
+        # Local files keep absolute paths like the rest of this endpoint's records
+        if is_local_storage(storage_manager.get_storage_type_for_content(None, "videos")):
+            video_path = str(storage_root / video_blob["storage_path"])
         else:
-            logger.warning(f"Failed to generate video preview for video {video_id}")
-    except Exception as e:
-        logger.error(f"Error generating video preview: {e}")
-    
-    # Create video in database (not active by default)
-    db_video = database.create_video(
-        video_id=video_id,
-        portrait_id=portrait_id,
-        video_path=str(video_path),
-        is_active=False,  # New videos are not active by default
-        video_preview_path=str(video_preview_path) if video_preview_path else None,
-        description=description,
-        file_size_mb=video_file_size_mb,
-    )
+            video_path = video_blob["storage_path"]
+        
+        video_file_size_mb: int | None = None
+        if spooled_video.size:
+            video_file_size_mb = max(1, math.ceil(spooled_video.size / (1024 * 1024)))
+        
+        # Generate video preview
+        from preview_generator import PreviewGenerator
+        video_preview_path = await blob_store.get_preview(video_blob) if video_reused else None
+        
+        if video_preview_path is None:
+            try:
+                video_preview = await asyncio.to_thread(
+                    PreviewGenerator.generate_video_preview, spooled_video.path, size=(300, 300), format='webp'
+                )
+                if video_preview and len(video_preview) > 0:
+                    video_preview_path = await blob_store.save_preview(video_blob, video_preview)
+                    logger.info(f"Video preview created: {video_preview_path}, size: {len(video_preview)} bytes")
+                else:
+                    logger.warning(f"Failed to generate video preview for video {video_id}")
+            except Exception as e:
+                logger.error(f"Error generating video preview: {e}")
+        
+        if video_preview_path and video_path != video_blob["storage_path"]:
+            video_preview_path = str(storage_root / video_preview_path)
+        
+        # Create video in database (not active by default)
+        db_video = database.create_video(
+            video_id=video_id,
+            portrait_id=portrait_id,
+            video_path=video_path,
+            is_active=False,  # New videos are not active by default
+            video_preview_path=video_preview_path,
+            description=description,
+            file_size_mb=video_file_size_mb,
+            blob_hash=video_blob["content_hash"],
+        )
+    finally:
+        spooled_video.cleanup()
+    
+    # Invalidate cached lists showing this portrait's videos
+    await invalidate_portrait_cache(portrait_id)
     
     logger.info(f"Video added to portrait {portrait_id}: {video_id}")
     
@@ -780,9 +846,6 @@ async def delete_portrait(
     
     database = get_database()
     
-    # Invalidate cache after deletion
-    await invalidate_portrait_cache()
-    
     # Check if portrait exists
     portrait = database.get_portrait(portrait_id)
     if not portrait:
@@ -813,15 +876,27 @@ async def delete_portrait(
             shutil.rmtree(portrait_storage)
             logger.info(f"Deleted portrait storage: {portrait_storage}")
         
+        # Shared blobs (image, preview, videos and hash-keyed markers) are
+        # only removed with their last reference
+        from app.services.blob_store import get_blob_store
+        blob_store = get_blob_store(database, app.state.storage_manager, storage_root)
+        client = database.get_client(client_id)
+        company_id = client.get("company_id") if client else None
+        await invalidate_portrait_cache(portrait_id, client_id, portrait.get("folder_id"), company_id)
+        await blob_store.release_record(portrait, company_id, "portraits", "image_path")
+        for video in videos:
+            await blob_store.release_record(video, None, "videos", "video_path")
+        
         # Delete NFT markers
         marker_paths = [
             portrait.get("marker_fset"),
             portrait.get("marker_fset3"),
             portrait.get("marker_iset")
         ]
+        shared_marker_dir = blob_store.marker_dir(portrait["blob_hash"]) if portrait.get("blob_hash") else None
         
         for marker_path in marker_paths:
-            if marker_path:
+            if marker_path and not (shared_marker_dir and Path(marker_path).parent == shared_marker_dir):
                 marker_file = storage_root / marker_path
                 if marker_file.exists():
                     marker_file.unlink()
@@ -867,9 +942,13 @@ async def get_portrait_by_link(permanent_link: str) -> PortraitResponse:
             detail="Portrait not found"
         )
     
-    # Increment view count
-    database.increment_portrait_views(portrait["id"])
-    portrait["view_count"] = portrait.get("view_count", 0) + 1
+    # Increment view count (buffered, flushed in batches)
+    from app.services.view_counters import PORTRAIT_VIEWS, get_view_counter_buffer
+    counter_buffer = get_view_counter_buffer(database)
+    counter_buffer.increment(PORTRAIT_VIEWS, portrait["id"])
+    # Without the flush loop the increment was written through to the database
+    pending_views = counter_buffer.pending(PORTRAIT_VIEWS, portrait["id"]) if counter_buffer.running else 1
+    portrait["view_count"] = portrait.get("view_count", 0) + pending_views
     
     return _portrait_to_response(portrait)
 
@@ -926,4 +1005,12 @@ async def delete_portrait(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete portrait"
-        )
\ No newline at end of file
+        )
+    
+    client = database.get_client(existing_portrait["client_id"])
+    await invalidate_portrait_cache(
+        portrait_id,
+        existing_portrait["client_id"],
+        existing_portrait.get("folder_id"),
+        client.get("company_id") if client else None,
+    )
@@ -0,0 +1,204 @@
+"""
+Preview serving endpoints for Vertex AR.
+Serves list previews, responsive preview variants and sprite sheets by URL
+with strong ETags and 304 support; versioned and content-addressed URLs are
+marked immutable so the admin's browser can cache them indefinitely. Previews
+show customer content, so every route requires an admin session.
+"""
+import asyncio
+from typing import Callable, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from app.api.auth import require_admin
+from app.config import settings
+from app.database import Database
+from app.main import get_current_app
+from app.media_cache import read_through
+from app.services.preview_urls import (
+    IMMUTABLE_CACHE_CONTROL,
+    PREVIEW_PATH_FIELDS,
+    REVALIDATE_CACHE_CONTROL,
+    SPRITE_TILE_SIZE,
+    etag_matches,
+    get_preview_versions,
+    media_type_for,
+    render_sprite,
+)
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+VARIANT_FORMATS = {"webp": "webp", "jpg": "jpeg", "avif": "avif"}
+
+
+def get_database() -> Database:
+    """Get database instance."""
+    app = get_current_app()
+    return app.state.database
+
+
+def _versions():
+    app = get_current_app()
+    return get_preview_versions(app.state.config["BASE_DIR"], app.state.config["STORAGE_ROOT"])
+
+
+def _company_of(database: Database, kind: str, record: dict) -> Optional[str]:
+    """Company whose storage holds a portrait or video (for remote previews)."""
+    if kind == "videos":
+        record = database.get_portrait(record["portrait_id"]) or {}
+    client = database.get_client(record["client_id"]) if record.get("client_id") else None
+    return client.get("company_id") if client else None
+
+
+def _record_company(database: Database, kind: str, record_id: str) -> Optional[str]:
+    """Company whose storage holds a portrait or video, looked up by record ID."""
+    record = database.get_portrait(record_id) if kind == "portraits" else database.get_video(record_id)
+    return _company_of(database, kind, record) if record else None
+
+
+async def _load(path: str, content_type: str, company_of: Callable[[], Optional[str]]) -> Optional[bytes]:
+    """Read a preview from local disk, falling back to the company's storage adapter (through the media cache)."""
+    local_path = _versions().resolve(path)
+    if local_path.is_file():
+        return await asyncio.to_thread(local_path.read_bytes)
+
+    storage_manager = get_current_app().state.storage_manager
+    try:
+        adapter = storage_manager.get_adapter_for_content(company_of(), content_type)
+        return await read_through(adapter, path)
+    except Exception as exc:
+        logger.warning("Preview file not available", path=path, error=str(exc))
+        return None
+
+
+def _not_modified(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+async def _serve(
+    request: Request,
+    path: str,
+    content_type: str,
+    company_of: Callable[[], Optional[str]],
+    immutable: bool,
+) -> Response:
+    """Serve a preview file with a strong ETag, answering revalidations with 304."""
+    versions = _versions()
+    cache_control = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+    if_none_match = request.headers.get("if-none-match")
+
+    etag = versions.cached_etag(path)
+    if etag and etag_matches(if_none_match, etag):
+        return _not_modified(etag, cache_control)
+
+    data = await _load(path, content_type, company_of)
+    if not data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Preview not found")
+
+    etag = versions.remember_etag(path, data)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag, cache_control)
+    return Response(
+        content=data,
+        media_type=media_type_for(path),
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+async def serve_record_preview(request: Request, kind: str, record: dict, version: Optional[str] = None) -> Response:
+    """Serve the list preview of a portrait or video record."""
+    path = record.get(PREVIEW_PATH_FIELDS[kind])
+    if not path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Preview not found")
+    database = get_database()
+    immutable = version is not None and version == _versions().version(path)
+    return await _serve(request, path, kind, lambda: _company_of(database, kind, record), immutable)
+
+
+@router.get("/variants/{content_type}/{content_hash}/{filename}")
+async def get_preview_variant(
+    request: Request,
+    content_type: str,
+    content_hash: str,
+    filename: str,
+    _: str = Depends(require_admin),
+) -> Response:
+    """Serve a responsive preview variant by content hash, width and format."""
+    width, _, extension = filename.partition(".")
+    fmt = VARIANT_FORMATS.get(extension.lower())
+    if not width.isdigit() or fmt is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Preview not found")
+
+    row = get_database().get_preview_variant(content_hash, content_type, int(width), fmt)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Preview not found")
+    # The URL names the content hash, so the response never changes
+    return await _serve(request, row["storage_path"], content_type, lambda: row["company_id"] or None, immutable=True)
+
+
+@router.get("/sprites/{kind}")
+async def get_preview_sprite(
+    request: Request,
+    kind: str,
+    ids: str = Query(..., description="Comma-separated record IDs in sprite order"),
+    tile: int = Query(SPRITE_TILE_SIZE, ge=16, le=300, description="Tile edge in pixels"),
+    v: Optional[str] = Query(None, description="Version token from the list response"),
+    _: str = Depends(require_admin),
+) -> Response:
+    """Serve a sprite sheet with the list previews of several records."""
+    if kind not in PREVIEW_PATH_FIELDS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown preview kind")
+    record_ids: List[str] = [record_id for record_id in ids.split(",") if record_id]
+    if not record_ids or len(record_ids) > settings.CACHE_PAGE_SIZE_MAX:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid number of sprite items")
+
+    versions = _versions()
+    database = get_database()
+    paths = database.get_preview_paths(kind, record_ids)
+    items = [(record_id, paths.get(record_id)) for record_id in record_ids]
+    expected_version = versions.sprite_version(kind, items, tile)
+
+    # The sprite is a pure function of its members' versions and the tile size
+    etag = f'"sprite-{expected_version}"'
+    cache_control = IMMUTABLE_CACHE_CONTROL if v == expected_version else REVALIDATE_CACHE_CONTROL
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return _not_modified(etag, cache_control)
+
+    previews = await asyncio.gather(*(
+        _load(path, kind, lambda record_id=record_id: _record_company(database, kind, record_id))
+        if path else asyncio.sleep(0, result=None)
+        for record_id, path in items
+    ))
+    sprite = await asyncio.to_thread(render_sprite, list(previews), tile)
+    return Response(
+        content=sprite,
+        media_type="image/webp",
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+@router.get("/{kind}/{record_id}")
+async def get_record_preview(
+    request: Request,
+    kind: str,
+    record_id: str,
+    v: Optional[str] = Query(None, description="Version token from the list response"),
+    _: str = Depends(require_admin),
+) -> Response:
+    """Serve the list preview of a portrait or video."""
+    database = get_database()
+    if kind == "portraits":
+        record = database.get_portrait(record_id)
+    elif kind == "videos":
+        record = database.get_video(record_id)
+    else:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown preview kind")
+    if not record:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Preview not found")
+    return await serve_record_preview(request, kind, record, v)
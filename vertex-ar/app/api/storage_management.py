@@ -120,15 +120,15 @@ def _get_admin_user(request: Request) -> str:
     try:
         app = get_current_app()
         tokens = app.state.tokens
-        username = tokens.verify_token(auth_token)
+        session = tokens.authenticate(auth_token)
+        username = session.username if session else None
         if not username:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
 
-        database = get_database()
-        user = database.get_user(username)
+        user = session.user
         if not user or not user.get("is_admin", False):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
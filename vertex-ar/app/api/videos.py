@@ -1,11 +1,11 @@
 """
 Video management endpoints for Vertex AR API.
 """
-import base64
+import asyncio
 import uuid
 from typing import Any, Dict, List
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile, status
 
 from app.api.auth import get_current_user, require_admin
 from app.database import Database
@@ -118,39 +118,41 @@ async def create_video(
     storage_manager = app.state.storage_manager
     storage_root = app.state.config["STORAGE_ROOT"]
     
-    # Generate paths for storage
-    portrait = database.get_portrait(portrait_id)
-    client_id = portrait["client_id"]
-    video_path = f"portraits/{client_id}/{portrait_id}/{video_id}.mp4"
-    video_preview_path = f"portraits/{client_id}/{portrait_id}/{video_id}_preview.webp"
-    
-    # Read and save video
-    video.file.seek(0)
-    video_content = await video.read()
-    
-    # Calculate file size in MB
-    file_size_bytes = len(video_content)
-    file_size_mb = int(file_size_bytes / (1024 * 1024))  # Convert to MB and round down to integer
-    
-    logger.info(f"Video file size: {file_size_bytes} bytes = {file_size_mb} MB")
-    
-    # Save video using storage manager
-    await storage_manager.save_file(video_content, video_path, "videos")
-    
-    # Generate video preview with improved quality and WebP support
-    from preview_generator import PreviewGenerator
-    video_preview_path_saved = None
-    
+    # Stream the video to a spool file instead of reading it into memory
+    from app.services.uploads import spool_upload
+    spooled_video = await spool_upload(video, storage_root / "temp" / "uploads", suffix=".mp4")
     try:
-        video_preview = PreviewGenerator.generate_video_preview(video_content, size=(300, 300), format='webp')
-        if video_preview and len(video_preview) > 0:
-            await storage_manager.save_file(video_preview, video_preview_path, "previews")
-            video_preview_path_saved = video_preview_path
-            logger.info(f"Video preview created: {video_preview_path}, size: {len(video_preview)} bytes")
-        else:
-            logger.warning(f"Failed to generate video preview for video {video_id}")
-    except Exception as e:
-        logger.error(f"Error generating video preview: {e}")
+        # Calculate file size in MB
+        file_size_bytes = spooled_video.size
+        file_size_mb = int(file_size_bytes / (1024 * 1024))  # Convert to MB and round down to integer
+        
+        logger.info(f"Video file size: {file_size_bytes} bytes = {file_size_mb} MB")
+        
+        # Save video through the content-addressed blob store; re-uploads of the
+        # same file share the stored copy and its preview
+        from app.services.blob_store import get_blob_store
+        blob_store = get_blob_store(database, storage_manager, storage_root)
+        video_blob, video_reused = await blob_store.store_upload(spooled_video, "videos", suffix=".mp4")
+        video_path = video_blob["storage_path"]
+        
+        # Generate video preview with improved quality and WebP support
+        from preview_generator import PreviewGenerator
+        video_preview_path_saved = await blob_store.get_preview(video_blob) if video_reused else None
+        
+        if video_preview_path_saved is None:
+            try:
+                video_preview = await asyncio.to_thread(
+                    PreviewGenerator.generate_video_preview, spooled_video.path, size=(300, 300), format='webp'
+                )
+                if video_preview and len(video_preview) > 0:
+                    video_preview_path_saved = await blob_store.save_preview(video_blob, video_preview)
+                    logger.info(f"Video preview created: {video_preview_path_saved}, size: {len(video_preview)} bytes")
+                else:
+                    logger.warning(f"Failed to generate video preview for video {video_id}")
+            except Exception as e:
+                logger.error(f"Error generating video preview: {e}")
+    finally:
+        spooled_video.cleanup()
     
     # Create video in database
     logger.info(f"Creating video with file_size_mb: {file_size_mb}")
@@ -162,6 +164,7 @@ async def create_video(
         video_preview_path=video_preview_path_saved,
         description=description,
         file_size_mb=file_size_mb,
+        blob_hash=video_blob["content_hash"],
     )
     
     logger.info(f"Database returned video: {db_video}")
@@ -170,7 +173,7 @@ async def create_video(
     if db_video.get("video_path"):
         db_video["video_url"] = storage_manager.get_public_url(db_video["video_path"], "videos")
     if db_video.get("video_preview_path"):
-        db_video["preview_url"] = storage_manager.get_public_url(db_video["video_preview_path"], "previews")
+        db_video["preview_url"] = storage_manager.get_public_url(db_video["video_preview_path"], "videos")
     
     return VideoResponse(
         id=db_video["id"],
@@ -308,10 +311,11 @@ async def set_active_video(
 
 @router.get("/{video_id}/preview")
 async def get_video_preview(
+    request: Request,
     video_id: str,
     _: str = Depends(require_admin)
-) -> Dict[str, Any]:
-    """Get video preview as base64 data."""
+) -> Response:
+    """Get video preview image, revalidated by ETag (304 when unchanged)."""
     database = get_database()
     video = database.get_video(video_id)
     
@@ -321,75 +325,8 @@ async def get_video_preview(
             detail="Video not found"
         )
     
-    video_preview_path = video.get("video_preview_path")
-    if not video_preview_path:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Video preview not found"
-        )
-    
-    try:
-        from pathlib import Path
-        app = get_current_app()
-        base_dir = app.state.config["BASE_DIR"]
-        
-        # Handle both relative and absolute preview paths
-        if video_preview_path.startswith("storage/"):
-            preview_path = base_dir / video_preview_path
-        elif video_preview_path.startswith("/"):
-            preview_path = Path(video_preview_path)
-        else:
-            # Relative path, assume it's relative to storage root
-            storage_root = app.state.config["STORAGE_ROOT"]
-            preview_path = storage_root / video_preview_path
-        
-        logger.info(f"Looking for video preview at: {preview_path}")
-        
-        if preview_path.exists():
-            with open(preview_path, "rb") as f:
-                preview_bytes = f.read()
-                
-                # Check if file is not empty
-                if len(preview_bytes) == 0:
-                    logger.error(f"Video preview file is empty: {preview_path}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail="Video preview file is empty"
-                    )
-                
-                # Encode to base64
-                preview_data = base64.b64encode(preview_bytes).decode('utf-8')
-                
-                # Verify the base64 data is valid
-                if not preview_data:
-                    logger.error(f"Failed to encode video preview to base64: {preview_path}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail="Failed to encode video preview"
-                    )
-                
-                logger.info(f"Successfully loaded preview for video {video_id}, size: {len(preview_bytes)} bytes")
-                
-                # Determine format from file extension
-                if video_preview_path.endswith('.webp'):
-                    return {"preview_data": f"data:image/webp;base64,{preview_data}"}
-                else:
-                    return {"preview_data": f"data:image/jpeg;base64,{preview_data}"}
-        else:
-            logger.error(f"Video preview file not found at {preview_path}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Video preview file not found"
-            )
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as e:
-        logger.error(f"Failed to load video preview for video {video_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to load video preview"
-        )
+    from app.api.previews import serve_record_preview
+    return await serve_record_preview(request, "videos", video)
 
 
 @router.get("/{video_id}", response_model=VideoResponse)
@@ -487,15 +424,20 @@ async def delete_video_admin(
         app = get_current_app()
         storage_root = app.state.config["STORAGE_ROOT"]
         
+        # Shared blobs are only removed with their last reference
+        from app.services.blob_store import get_blob_store
+        blob_store = get_blob_store(database, app.state.storage_manager, storage_root)
+        released = await blob_store.release_record(existing_video, None, "videos", "video_path")
+        
         video_path = existing_video.get("video_path")
-        if video_path:
+        if video_path and not released:
             video_file = storage_root / video_path
             if video_file.exists():
                 video_file.unlink()
                 logger.info(f"Deleted video file: {video_file}")
         
         preview_path = existing_video.get("video_preview_path")
-        if preview_path:
+        if preview_path and not released:
             preview_file = storage_root / preview_path
             if preview_file.exists():
                 preview_file.unlink()
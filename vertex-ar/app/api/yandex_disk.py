@@ -5,9 +5,12 @@ from pathlib import Path
 from typing import Any, Optional
 
 from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 from urllib.parse import unquote
 
-from app.storage_yandex import YandexDiskStorageAdapter
+from app.media_cache import get_media_cache
+from app.storage_yandex import get_yandex_adapter
+from app.utils import parse_range_header
 from app.models import YandexDiskFoldersResponse, YandexDiskFolder
 from storage_config import get_storage_config
 from logging_setup import get_logger
@@ -30,15 +33,15 @@ def _get_admin_user(request: Request) -> str:
     try:
         app = get_current_app()
         tokens = app.state.tokens
-        username = tokens.verify_token(auth_token)
+        session = tokens.authenticate(auth_token)
+        username = session.username if session else None
         if not username:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
         
-        database = app.state.database
-        user = database.get_user(username)
+        user = session.user
         if not user or not user.get("is_admin", False):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -205,8 +208,8 @@ async def list_yandex_disk_folders(
                 detail="No Yandex Disk OAuth token configured"
             )
         
-        # Create adapter and list directories
-        adapter = YandexDiskStorageAdapter(oauth_token=oauth_token, base_path=base_path)
+        # Reuse the pooled adapter of this token and list directories
+        adapter = get_yandex_adapter(oauth_token, base_path=base_path)
         
         try:
             result = adapter.list_directories(path=path, limit=limit, offset=offset)
@@ -262,105 +265,132 @@ async def list_yandex_disk_folders(
         )
 
 
-@router.get("/file/{encoded_path:path}")
-async def get_yandex_disk_file(encoded_path: str) -> Response:
+def _content_type(file_path: str, default: str = "application/octet-stream") -> str:
+    """Pick the response content type from the file extension."""
+    lower_path = file_path.lower()
+    if lower_path.endswith(('.jpg', '.jpeg')):
+        return "image/jpeg"
+    if lower_path.endswith('.png'):
+        return "image/png"
+    if lower_path.endswith('.webp'):
+        return "image/webp"
+    if lower_path.endswith('.mp4'):
+        return "video/mp4"
+    if lower_path.endswith('.webm'):
+        return "video/webm"
+    return default
+
+
+async def _stream_yandex_file(
+    request: Request,
+    encoded_path: str,
+    media_type: Optional[str] = None,
+    headers: Optional[dict] = None,
+) -> Response:
     """
-    Get file from Yandex Disk by encoded path.
+    Stream a Yandex Disk file, honouring a single-range Range header.
     
-    This endpoint serves as a proxy for Yandex Disk files.
+    Files in the local media cache are served from disk. Otherwise bytes are
+    forwarded as the adapter's parallel range fetches complete, so the client
+    receives the first chunk without waiting for the whole file. A response
+    covering the whole file is copied into the cache as it streams; for a
+    partial range the cache is filled in the background instead.
     """
+    file_path = unquote(encoded_path)
+    
+    # Get Yandex Disk configuration
+    config = get_storage_config()
+    if not config.is_yandex_enabled():
+        raise HTTPException(status_code=404, detail="Yandex Disk not configured")
+    
+    response_headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=3600",  # Cache for 1 hour
+        "Access-Control-Allow-Origin": "*",
+        **(headers or {}),
+    }
+    
     try:
-        # Decode the path
-        file_path = unquote(encoded_path)
-        
-        # Get Yandex Disk configuration
-        config = get_storage_config()
-        if not config.is_yandex_enabled():
-            raise HTTPException(status_code=404, detail="Yandex Disk not configured")
-        
-        # Create adapter
-        adapter = YandexDiskStorageAdapter(config.get_yandex_token())
-        
-        # Get file data
-        file_data = await adapter.get_file(file_path)
-        
-        # Determine content type
-        content_type = "application/octet-stream"
-        if file_path.lower().endswith(('.jpg', '.jpeg')):
-            content_type = "image/jpeg"
-        elif file_path.lower().endswith('.png'):
-            content_type = "image/png"
-        elif file_path.lower().endswith('.webp'):
-            content_type = "image/webp"
-        elif file_path.lower().endswith('.mp4'):
-            content_type = "video/mp4"
-        elif file_path.lower().endswith('.webm'):
-            content_type = "video/webm"
+        adapter = get_yandex_adapter(config.get_yandex_token())
         
-        return Response(
-            content=file_data,
-            media_type=content_type,
-            headers={
-                "Cache-Control": "public, max-age=3600",  # Cache for 1 hour
-                "Access-Control-Allow-Origin": "*"
-            }
-        )
+        # Served from the local media cache without touching Yandex Disk;
+        # FileResponse answers Range requests itself
+        cache = get_media_cache()
+        cached_file = cache.lookup(adapter.cache_namespace, file_path) if cache else None
+        if cached_file is not None:
+            return FileResponse(
+                cached_file,
+                media_type=media_type or _content_type(file_path),
+                headers=response_headers
+            )
         
-    except HTTPException:
-        raise
+        info = await adapter.get_download_info(file_path)
     except Exception as e:
         logger.error(
             "Failed to serve Yandex Disk file",
             error=str(e),
-            file_path=file_path if 'file_path' in locals() else encoded_path
+            file_path=file_path
         )
         raise HTTPException(status_code=404, detail="File not found")
+    
+    size = info["size"]
+    
+    try:
+        byte_range = parse_range_header(request.headers.get("range"), size)
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**response_headers, "Content-Range": f"bytes */{size}"}
+        )
+    
+    if byte_range:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        response_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    else:
+        start, end = 0, size - 1
+        status_code = status.HTTP_200_OK
+    response_headers["Content-Length"] = str(end - start + 1)
+    
+    body = adapter.iter_download(info["href"], start, end)
+    if cache is not None:
+        if start == 0 and end == size - 1:
+            # The response carries the whole file: keep it instead of downloading it twice
+            body = cache.tee(adapter, file_path, body)
+        else:
+            cache.prefetch(adapter, file_path)
+    
+    return StreamingResponse(
+        body,
+        status_code=status_code,
+        media_type=media_type or _content_type(file_path, info.get("mime_type") or "application/octet-stream"),
+        headers=response_headers
+    )
+
+
+@router.get("/file/{encoded_path:path}")
+async def get_yandex_disk_file(encoded_path: str, request: Request) -> Response:
+    """
+    Get file from Yandex Disk by encoded path.
+    
+    This endpoint serves as a proxy for Yandex Disk files. The file is
+    streamed and Range requests are answered with partial content, so video
+    players can start playback and seek without downloading the whole file.
+    """
+    return await _stream_yandex_file(request, encoded_path)
 
 
 @router.get("/download/{encoded_path:path}")
-async def download_yandex_disk_file(encoded_path: str) -> Response:
+async def download_yandex_disk_file(encoded_path: str, request: Request) -> Response:
     """
     Download file from Yandex Disk by encoded path.
     
     This endpoint provides direct download for Yandex Disk files.
     """
-    try:
-        # Decode the path
-        file_path = unquote(encoded_path)
-        
-        # Get Yandex Disk configuration
-        config = get_storage_config()
-        if not config.is_yandex_enabled():
-            raise HTTPException(status_code=404, detail="Yandex Disk not configured")
-        
-        # Create adapter
-        adapter = YandexDiskStorageAdapter(config.get_yandex_token())
-        
-        # Get direct download URL
-        download_url = adapter.get_download_url(file_path)
-        
-        # Get file data
-        file_data = await adapter.get_file(file_path)
-        
-        # Extract filename from path
-        filename = Path(file_path).name
-        
-        return Response(
-            content=file_data,
-            media_type="application/octet-stream",
-            headers={
-                "Content-Disposition": f"attachment; filename=\"{filename}\"",
-                "Cache-Control": "public, max-age=3600",
-                "Access-Control-Allow-Origin": "*"
-            }
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(
-            "Failed to download Yandex Disk file",
-            error=str(e),
-            file_path=file_path if 'file_path' in locals() else encoded_path
-        )
-        raise HTTPException(status_code=404, detail="File not found")
\ No newline at end of file
+    filename = Path(unquote(encoded_path)).name
+    return await _stream_yandex_file(
+        request,
+        encoded_path,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f"attachment; filename=\"{filename}\""}
+    )
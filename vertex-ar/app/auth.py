@@ -2,11 +2,13 @@
 Authentication module for Vertex AR application.
 Contains authentication classes and utilities.
 """
+import asyncio
 import secrets
 import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from logging_setup import get_logger
 
@@ -24,82 +26,199 @@ class SessionData:
     last_seen: datetime
 
 
+@dataclass
+class CachedSession:
+    """An authenticated session kept in the worker's session cache."""
+    username: str
+    user: Optional[Dict[str, Any]]
+    expires_at: datetime
+    cached_at: float
+
+
 class TokenManager:
-    """Manage issued access tokens with session timeouts using database storage for Uvicorn worker compatibility."""
+    """
+    Manage issued access tokens with session timeouts using database storage for Uvicorn worker compatibility.
+
+    Verified sessions and their users are cached in memory for a short TTL.
+    Local revocations evict entries immediately; changes made by other
+    workers are picked up through the admin_sessions/users table versions,
+    polled at most once per version check interval. last_seen updates are
+    coalesced and written in batches while the flush loop runs.
+    """
 
-    def __init__(self, session_timeout_minutes: int = 30) -> None:
+    VERSIONED_TABLES = ("admin_sessions", "users")
+
+    def __init__(
+        self,
+        session_timeout_minutes: int = 30,
+        cache_ttl_seconds: float = 30.0,
+        version_check_interval: float = 1.0,
+        last_seen_flush_interval: float = 60.0,
+    ) -> None:
         self._session_timeout = timedelta(minutes=session_timeout_minutes)
         self._lock = threading.Lock()
+        self.cache_ttl = cache_ttl_seconds
+        self.version_check_interval = version_check_interval
+        self.last_seen_flush_interval = last_seen_flush_interval
+        self._sessions: Dict[str, CachedSession] = {}
+        self._versions: Optional[tuple] = None
+        self._versions_checked_at = 0.0
+        self._last_seen: Dict[str, datetime] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.running = False
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "last_seen_flushes": 0}
+
+    @staticmethod
+    def _get_database():
+        from app.main import get_current_app
+        return get_current_app().state.database
 
     def issue_token(self, username: str) -> str:
         """Issue a new token and store it in the database."""
         token = secrets.token_urlsafe(32)
         expires_at = datetime.utcnow() + self._session_timeout
 
-        # Get database instance
-        from app.main import get_current_app
-        app = get_current_app()
-        database = app.state.database
-
         # Store session in database
-        database.create_admin_session(token, username, expires_at)
+        self._get_database().create_admin_session(token, username, expires_at)
         return token
 
     def verify_token(self, token: str) -> Optional[str]:
-        """Verify a token against the database and update last seen timestamp."""
-        # Get database instance
-        from app.main import get_current_app
-        app = get_current_app()
-        database = app.state.database
+        """Verify a token and record its activity. Returns the username."""
+        session = self.authenticate(token)
+        return session.username if session else None
+
+    def authenticate(self, token: str) -> Optional[CachedSession]:
+        """
+        Resolve a token to its session and user, from the cache when possible.
 
-        # Get session from database
-        session = database.get_admin_session(token)
-        if session is None:
+        Returns None for unknown, expired or revoked tokens. ``user`` is None
+        when the session's user no longer exists.
+        """
+        database = self._get_database()
+        self._check_versions(database)
+
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(token)
+        if session is not None and now - session.cached_at < self.cache_ttl and session.expires_at > datetime.utcnow():
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            session = self._load_session(database, token, now)
+            if session is None:
+                return None
+
+        self._touch(database, token)
+        return session
+
+    def _load_session(self, database, token: str, now: float) -> Optional[CachedSession]:
+        row = database.get_admin_session(token)
+        if row is None:
+            with self._lock:
+                self._sessions.pop(token, None)
             return None
 
-        # Update last seen timestamp
-        database.update_admin_session_last_seen(token)
-        return session['username']
+        try:
+            expires_at = datetime.fromisoformat(str(row["expires_at"]))
+        except ValueError:
+            expires_at = datetime.utcnow() + timedelta(seconds=self.cache_ttl)
+        user = database.get_user(row["username"])
+        session = CachedSession(username=row["username"], user=user, expires_at=expires_at, cached_at=now)
+        if user is not None:
+            with self._lock:
+                self._sessions[token] = session
+        return session
+
+    def _check_versions(self, database) -> None:
+        """Drop the cache when sessions or users changed (in any worker)."""
+        now = time.monotonic()
+        if now - self._versions_checked_at < self.version_check_interval:
+            return
+        versions = database.get_table_versions(self.VERSIONED_TABLES)
+        with self._lock:
+            if versions != self._versions:
+                if self._versions is not None and self._sessions:
+                    self.stats["invalidations"] += 1
+                self._sessions.clear()
+                self._versions = versions
+            self._versions_checked_at = now
+
+    def _touch(self, database, token: str) -> None:
+        if not self.running:
+            database.update_admin_session_last_seen(token)
+            return
+        with self._lock:
+            self._last_seen[token] = datetime.utcnow()
+
+    def flush_last_seen(self) -> int:
+        """Write buffered last_seen timestamps. Returns number of sessions updated."""
+        with self._lock:
+            if not self._last_seen:
+                return 0
+            pending, self._last_seen = self._last_seen, {}
+        try:
+            written = self._get_database().touch_admin_sessions(pending)
+        except Exception as exc:
+            # Keep the newest timestamps for the next flush
+            with self._lock:
+                for token, seen_at in pending.items():
+                    self._last_seen.setdefault(token, seen_at)
+            logger.error("Failed to flush session last_seen", error=str(exc), pending=len(pending))
+            return 0
+        self.stats["last_seen_flushes"] += 1
+        return written
+
+    async def _flush_loop(self) -> None:
+        while self.running:
+            await asyncio.sleep(self.last_seen_flush_interval)
+            await asyncio.to_thread(self.flush_last_seen)
+
+    async def start(self) -> None:
+        """Start coalescing last_seen updates into periodic batched writes."""
+        if self.running:
+            return
+        self.running = True
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Session last_seen flushing every {self.last_seen_flush_interval}s")
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out buffered last_seen updates."""
+        self.running = False
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        self.flush_last_seen()
+
+    def _evict(self, predicate: Callable[[str, CachedSession], bool]) -> None:
+        """Drop cached sessions matching ``predicate(token, session)``."""
+        with self._lock:
+            for token in [token for token, session in self._sessions.items() if predicate(token, session)]:
+                del self._sessions[token]
 
     def revoke_token(self, token: str) -> None:
         """Revoke a token by marking it as revoked in the database."""
-        # Get database instance
-        from app.main import get_current_app
-        app = get_current_app()
-        database = app.state.database
-
-        # Revoke session in database
-        database.revoke_admin_session(token)
+        self._get_database().revoke_admin_session(token)
+        self._evict(lambda candidate, _session: candidate == token)
 
     def revoke_user(self, username: str) -> None:
         """Revoke all tokens for a user by marking them as revoked in the database."""
-        # Get database instance
-        from app.main import get_current_app
-        app = get_current_app()
-        database = app.state.database
-
-        # Revoke all sessions for user in database
-        database.revoke_admin_sessions_for_user(username)
+        self._get_database().revoke_admin_sessions_for_user(username)
+        self._evict(lambda _token, session: session.username == username)
 
     def revoke_user_except_current(self, username: str, current_token: Optional[str] = None) -> None:
         """Revoke all tokens for a user except the current one."""
-        # Get database instance
-        from app.main import get_current_app
-        app = get_current_app()
-        database = app.state.database
-
-        # Revoke all sessions for user except current in database
-        database.revoke_admin_sessions_for_user_except_current(username, current_token)
+        self._get_database().revoke_admin_sessions_for_user_except_current(username, current_token)
+        self._evict(lambda token, session: token != current_token and session.username == username)
 
     def cleanup_expired_sessions(self) -> int:
         """Clean up expired sessions from the database. Returns number of sessions removed."""
-        # Get database instance
-        from app.main import get_current_app
-        app = get_current_app()
-        database = app.state.database
+        return self._get_database().cleanup_expired_admin_sessions()
 
-        # Clean up expired sessions in database
-        return database.cleanup_expired_admin_sessions()
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            return {**self.stats, "cached_sessions": len(self._sessions), "pending_last_seen": len(self._last_seen)}
 
 
 class AuthSecurityManager:
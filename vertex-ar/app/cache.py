@@ -3,13 +3,16 @@ Cache abstraction for Vertex AR application.
 Supports Redis backend with LRU in-memory fallback.
 """
 import hashlib
+import heapq
 import json
 import pickle
+import sys
+import time
 from abc import ABC, abstractmethod
 from collections import OrderedDict
-from datetime import datetime, timedelta
+from dataclasses import dataclass
 from threading import Lock
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from logging_setup import get_logger
 
@@ -49,6 +52,17 @@ class CacheBackend(ABC):
         """Increment a numeric value in cache."""
         pass
     
+    async def get_counter(self, key: str, initial: int) -> int:
+        """
+        Read a counter kept by ``increment``, creating it (without expiry)
+        with the initial value if it does not exist.
+        """
+        value = await self.get(key)
+        if value is None:
+            await self.set(key, initial, ttl=0)
+            return initial
+        return int(value)
+    
     @abstractmethod
     def get_stats(self) -> dict:
         """Get cache statistics."""
@@ -56,95 +70,187 @@ class CacheBackend(ABC):
 
 
 class LRUCacheBackend(CacheBackend):
-    """In-memory LRU cache implementation with TTL support."""
+    """
+    In-memory LRU cache implementation with TTL support.
+    
+    Expiry deadlines live in a min-heap on the monotonic clock, so only
+    entries that are actually due are visited; get is a dict lookup and set
+    is O(log n) for the heap push. Entries are bounded both by count and by
+    their estimated size in bytes.
+    """
     
-    def __init__(self, max_size: int = 1000, default_ttl: int = 300):
+    def __init__(self, max_size: int = 1000, default_ttl: int = 300, max_memory_bytes: int = 0):
         """
         Initialize LRU cache.
         
         Args:
             max_size: Maximum number of entries
             default_ttl: Default TTL in seconds
+            max_memory_bytes: Maximum estimated size of all values (0 = unlimited)
         """
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self._cache: OrderedDict[str, tuple[Any, Optional[datetime]]] = OrderedDict()
+        self.max_memory_bytes = max_memory_bytes
+        # key -> (value, expires_at on time.monotonic() or None, size in bytes)
+        self._cache: OrderedDict[str, tuple[Any, Optional[float], int]] = OrderedDict()
+        # (expires_at, key); stale pairs are skipped when popped
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._memory_bytes = 0
         self._lock = Lock()
         self._hits = 0
         self._misses = 0
         self._evictions = 0
+        self._namespace_stats: dict[str, dict[str, int]] = {}
         
         logger.info(
             "LRU cache backend initialized",
             max_size=max_size,
-            default_ttl=default_ttl
+            default_ttl=default_ttl,
+            max_memory_bytes=max_memory_bytes,
         )
     
-    def _evict_expired(self) -> None:
-        """Remove expired entries."""
-        now = datetime.utcnow()
-        expired_keys = [
-            key for key, (_, expiry) in self._cache.items()
-            if expiry is not None and expiry < now
-        ]
-        for key in expired_keys:
-            del self._cache[key]
-            self._evictions += 1
+    @classmethod
+    def _estimate_size(cls, value: Any) -> int:
+        """
+        Estimate the memory footprint of a value in bytes.
+        
+        Cheap on purpose: payload length for bytes and strings, the shallow
+        size plus contents for plain containers, ``sys.getsizeof`` otherwise.
+        """
+        if isinstance(value, (bytes, bytearray, memoryview, str)):
+            return len(value)
+        if isinstance(value, dict):
+            return sys.getsizeof(value) + sum(
+                cls._estimate_size(key) + cls._estimate_size(item) for key, item in value.items()
+            )
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return sys.getsizeof(value) + sum(cls._estimate_size(item) for item in value)
+        return sys.getsizeof(value)
+    
+    @staticmethod
+    def _namespace_of(key: str) -> str:
+        """
+        Return the stats bucket of a key.
+        
+        Keys built by CacheManager look like ``namespace:version:kind:...``;
+        the bucket is the namespace plus the first non-numeric part after it.
+        """
+        parts = key.split(":", 3)
+        if len(parts) > 2 and parts[1].isdigit():
+            return f"{parts[0]}:{parts[2]}"
+        return ":".join(parts[:2])
+    
+    def _record(self, key: str, hit: bool) -> None:
+        """Count a hit or miss, overall and for the key's namespace."""
+        counter = "hits" if hit else "misses"
+        if hit:
+            self._hits += 1
+        else:
+            self._misses += 1
+        namespace = self._namespace_of(key)
+        stats = self._namespace_stats.get(namespace)
+        if stats is None:
+            stats = self._namespace_stats[namespace] = {"hits": 0, "misses": 0}
+        stats[counter] += 1
+    
+    def _expiry(self, ttl_seconds: int, now: float) -> Optional[float]:
+        return now + ttl_seconds if ttl_seconds > 0 else None
+    
+    def _store(self, key: str, value: Any, expires_at: Optional[float], size: int) -> None:
+        """Insert or replace an entry as most recently used."""
+        self._discard(key)
+        self._cache[key] = (value, expires_at, size)
+        self._memory_bytes += size
+        if expires_at is not None:
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            # Overwritten keys leave stale heap pairs behind; rebuild when they dominate
+            if len(self._expiry_heap) > 2 * len(self._cache) + 64:
+                self._expiry_heap = [
+                    (entry_expiry, entry_key)
+                    for entry_key, (_, entry_expiry, _) in self._cache.items()
+                    if entry_expiry is not None
+                ]
+                heapq.heapify(self._expiry_heap)
+    
+    def _discard(self, key: str) -> bool:
+        """Remove an entry if present; its heap pair is left to go stale."""
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return False
+        self._memory_bytes -= entry[2]
+        return True
+    
+    def _evict_expired(self, now: float) -> None:
+        """Remove entries whose deadline has passed."""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            if entry is not None and entry[1] == expires_at:
+                self._discard(key)
+                self._evictions += 1
     
-    def _evict_lru(self) -> None:
-        """Remove least recently used entry if cache is full."""
-        if len(self._cache) >= self.max_size:
-            self._cache.popitem(last=False)
+    def _evict_lru(self, incoming_size: int) -> None:
+        """Remove least recently used entries until a new entry fits."""
+        while self._cache and (
+            len(self._cache) >= self.max_size
+            or (self.max_memory_bytes and self._memory_bytes + incoming_size > self.max_memory_bytes)
+        ):
+            key, (_, _, size) = self._cache.popitem(last=False)
+            self._memory_bytes -= size
             self._evictions += 1
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
         with self._lock:
-            self._evict_expired()
-            
-            if key not in self._cache:
-                self._misses += 1
+            entry = self._cache.get(key)
+            if entry is None:
+                self._record(key, hit=False)
                 return None
             
-            value, expiry = self._cache[key]
+            value, expires_at, _ = entry
             
             # Check expiry
-            if expiry is not None and expiry < datetime.utcnow():
-                del self._cache[key]
-                self._misses += 1
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._discard(key)
+                self._record(key, hit=False)
                 self._evictions += 1
                 return None
             
             # Move to end (most recently used)
             self._cache.move_to_end(key)
-            self._hits += 1
+            self._record(key, hit=True)
             return value
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in cache with optional TTL in seconds."""
+        size = self._estimate_size(value)
+        if self.max_memory_bytes and size > self.max_memory_bytes:
+            logger.debug("Value too large for LRU cache", key=key, size=size)
+            with self._lock:
+                self._discard(key)
+            return False
+        
+        ttl_seconds = ttl if ttl is not None else self.default_ttl
         with self._lock:
-            self._evict_expired()
-            self._evict_lru()
-            
-            ttl_seconds = ttl if ttl is not None else self.default_ttl
-            expiry = datetime.utcnow() + timedelta(seconds=ttl_seconds) if ttl_seconds > 0 else None
-            
-            self._cache[key] = (value, expiry)
-            self._cache.move_to_end(key)
+            now = time.monotonic()
+            self._evict_expired(now)
+            self._discard(key)
+            self._evict_lru(size)
+            self._store(key, value, self._expiry(ttl_seconds, now), size)
             return True
     
     async def delete(self, key: str) -> bool:
         """Delete value from cache."""
         with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+            return self._discard(key)
     
     async def clear(self) -> bool:
         """Clear all cache entries."""
         with self._lock:
             self._cache.clear()
+            self._expiry_heap.clear()
+            self._memory_bytes = 0
             return True
     
     async def exists(self, key: str) -> bool:
@@ -153,27 +259,21 @@ class LRUCacheBackend(CacheBackend):
         return value is not None
     
     async def increment(self, key: str, delta: int = 1) -> int:
-        """Increment a numeric value in cache."""
+        """Increment a numeric value in cache, keeping its current expiry."""
         with self._lock:
-            # Get current value without await (direct access)
-            if key not in self._cache:
+            now = time.monotonic()
+            entry = self._cache.get(key)
+            if entry is None or (entry[1] is not None and entry[1] <= now):
                 current = 0
+                expires_at = self._expiry(self.default_ttl, now)
             else:
-                value, expiry = self._cache[key]
-                # Check expiry
-                if expiry is not None and expiry < datetime.utcnow():
-                    del self._cache[key]
-                    current = 0
-                else:
-                    current = int(value)
+                current = int(entry[0])
+                expires_at = entry[1]
             
             new_value = current + delta
-            
-            # Set new value without await (direct access)
-            ttl_seconds = self.default_ttl
-            expiry = datetime.utcnow() + timedelta(seconds=ttl_seconds) if ttl_seconds > 0 else None
-            self._cache[key] = (new_value, expiry)
-            self._cache.move_to_end(key)
+            if entry is None:
+                self._evict_lru(sys.getsizeof(new_value))
+            self._store(key, new_value, expires_at, sys.getsizeof(new_value))
             
             return new_value
     
@@ -187,10 +287,16 @@ class LRUCacheBackend(CacheBackend):
                 "backend": "lru",
                 "size": len(self._cache),
                 "max_size": self.max_size,
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
                 "hits": self._hits,
                 "misses": self._misses,
                 "evictions": self._evictions,
                 "hit_rate_percent": round(hit_rate, 2),
+                "namespaces": {
+                    namespace: dict(counts)
+                    for namespace, counts in self._namespace_stats.items()
+                },
             }
 
 
@@ -289,6 +395,27 @@ class RedisCacheBackend(CacheBackend):
             logger.error("Redis increment failed", key=key, error=str(e))
             return 0
     
+    async def get_counter(self, key: str, initial: int) -> int:
+        """
+        Read a counter kept by ``increment``, creating it (without expiry)
+        with the initial value if it does not exist.
+        
+        Counters are stored as raw integers, not pickled like other values,
+        so INCRBY can update them.
+        """
+        try:
+            await self.redis.set(key, initial, nx=True)
+            value = await self.redis.get(key)
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                # Replace a counter written in another format (e.g. pickled)
+                await self.redis.set(key, initial)
+                return initial
+        except Exception as e:
+            logger.error("Redis get_counter failed", key=key, error=str(e))
+            return initial
+    
     def get_stats(self) -> dict:
         """Get cache statistics."""
         total_requests = self._hits + self._misses
@@ -310,14 +437,32 @@ class RedisCacheBackend(CacheBackend):
             logger.error("Failed to close Redis connection", error=str(e))
 
 
+@dataclass
+class TaggedValue:
+    """Cached value stored with the versions of the tags it depends on."""
+    value: Any
+    tags: Dict[str, int]
+
+
 class CacheManager:
-    """High-level cache manager with namespacing and key generation."""
+    """
+    High-level cache manager with namespacing, key generation and tags.
+    
+    Entries can be tagged (e.g. ``company:{id}``, ``portrait:{id}``); each
+    tag has a version counter in the backend and invalidating a tag bumps
+    it, which makes only the entries stored under an older version miss.
+    Tag versions and the global cache version are cached in-process for
+    ``version_ttl`` seconds, so a hit costs a single backend round trip.
+    Invalidations made by this process are visible immediately; other
+    processes see them within ``version_ttl``.
+    """
     
     def __init__(
         self,
         backend: CacheBackend,
         namespace: str = "vertex_ar",
-        enabled: bool = True
+        enabled: bool = True,
+        version_ttl: float = 1.0,
     ):
         """
         Initialize cache manager.
@@ -326,11 +471,15 @@ class CacheManager:
             backend: Cache backend implementation
             namespace: Namespace prefix for all keys
             enabled: Whether caching is enabled
+            version_ttl: Seconds to reuse cache/tag versions read from the backend
         """
         self.backend = backend
         self.namespace = namespace
         self.enabled = enabled
+        self.version_ttl = version_ttl
         self._version_key = f"{namespace}:cache_version"
+        # backend key -> (version, monotonic time it was read)
+        self._local_versions: Dict[str, Tuple[int, float]] = {}
         
         logger.info(
             "Cache manager initialized",
@@ -352,26 +501,65 @@ class CacheManager:
         
         return f"{self.namespace}:{key_string}"
     
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:tag:{tag}"
+    
+    async def _read_version(self, key: str, initial: int) -> int:
+        """Return a version counter, from the local copy while it is fresh."""
+        local = self._local_versions.get(key)
+        now = time.monotonic()
+        if local is not None and now - local[1] < self.version_ttl:
+            return local[0]
+        
+        version = await self.backend.get_counter(key, initial)
+        self._local_versions[key] = (version, now)
+        return version
+    
+    async def _bump_version(self, key: str, initial: int) -> int:
+        """Increment a version counter and remember the new value locally."""
+        await self._read_version(key, initial)
+        version = await self.backend.increment(key)
+        self._local_versions[key] = (version, time.monotonic())
+        return version
+    
+    @staticmethod
+    def _initial_tag_version() -> int:
+        # Start from the clock rather than 0 so a tag counter that was evicted
+        # and recreated never repeats a version an older entry was stored with
+        return int(time.time() * 1000)
+    
     async def get_cache_version(self) -> int:
         """Get current cache version for invalidation."""
         if not self.enabled:
             return 0
         
-        version = await self.backend.get(self._version_key)
-        if version is None:
-            await self.backend.set(self._version_key, 0, ttl=0)  # No expiry
-            return 0
-        return int(version)
+        return await self._read_version(self._version_key, 0)
     
     async def increment_cache_version(self) -> int:
         """Increment cache version to invalidate all cached data."""
         if not self.enabled:
             return 0
         
-        new_version = await self.backend.increment(self._version_key)
+        new_version = await self._bump_version(self._version_key, 0)
         logger.info("Cache version incremented", new_version=new_version)
         return new_version
     
+    async def get_tag_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Get current versions of tags."""
+        return {
+            tag: await self._read_version(self._tag_key(tag), self._initial_tag_version())
+            for tag in tags
+        }
+    
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Invalidate every entry stored with any of the given tags."""
+        if not self.enabled or not tags:
+            return
+        
+        for tag in set(tags):
+            await self._bump_version(self._tag_key(tag), self._initial_tag_version())
+        logger.info("Cache tags invalidated", tags=sorted(set(tags)))
+    
     async def get(self, *key_parts: Any) -> Optional[Any]:
         """Get value from cache."""
         if not self.enabled:
@@ -379,15 +567,28 @@ class CacheManager:
         
         version = await self.get_cache_version()
         key = self._make_key(version, *key_parts)
-        return await self.backend.get(key)
+        cached = await self.backend.get(key)
+        if isinstance(cached, TaggedValue):
+            if await self.get_tag_versions(cached.tags) != cached.tags:
+                return None
+            return cached.value
+        return cached
     
-    async def set(self, value: Any, *key_parts: Any, ttl: Optional[int] = None) -> bool:
-        """Set value in cache."""
+    async def set(
+        self,
+        value: Any,
+        *key_parts: Any,
+        ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """Set value in cache, optionally tagged for targeted invalidation."""
         if not self.enabled:
             return False
         
         version = await self.get_cache_version()
         key = self._make_key(version, *key_parts)
+        if tags:
+            value = TaggedValue(value=value, tags=await self.get_tag_versions(tags))
         return await self.backend.set(key, value, ttl=ttl)
     
     async def delete(self, *key_parts: Any) -> bool:
@@ -404,6 +605,7 @@ class CacheManager:
         if not self.enabled:
             return False
         
+        self._local_versions.clear()
         return await self.backend.clear()
     
     async def invalidate_all(self) -> int:
@@ -428,7 +630,9 @@ def create_cache_manager(
     namespace: str = "vertex_ar",
     default_ttl: int = 300,
     max_size: int = 1000,
-    enabled: bool = True
+    enabled: bool = True,
+    max_memory_mb: int = 0,
+    version_ttl: float = 1.0,
 ) -> CacheManager:
     """
     Create cache manager with appropriate backend.
@@ -439,6 +643,8 @@ def create_cache_manager(
         default_ttl: Default TTL in seconds
         max_size: Max size for LRU cache
         enabled: Whether caching is enabled
+        max_memory_mb: Memory cap for LRU cache in megabytes (0 = unlimited)
+        version_ttl: Seconds to reuse cache/tag versions read from the backend
     
     Returns:
         Configured CacheManager instance
@@ -452,9 +658,17 @@ def create_cache_manager(
                 "Failed to initialize Redis cache, falling back to LRU",
                 error=str(e)
             )
-            backend = LRUCacheBackend(max_size=max_size, default_ttl=default_ttl)
+            backend = LRUCacheBackend(
+                max_size=max_size,
+                default_ttl=default_ttl,
+                max_memory_bytes=max_memory_mb * 1024 * 1024,
+            )
     else:
-        backend = LRUCacheBackend(max_size=max_size, default_ttl=default_ttl)
+        backend = LRUCacheBackend(
+            max_size=max_size,
+            default_ttl=default_ttl,
+            max_memory_bytes=max_memory_mb * 1024 * 1024,
+        )
         logger.info("Using LRU cache backend")
     
-    return CacheManager(backend=backend, namespace=namespace, enabled=enabled)
+    return CacheManager(backend=backend, namespace=namespace, enabled=enabled, version_ttl=version_ttl)
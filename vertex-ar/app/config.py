@@ -44,6 +44,11 @@ class Settings:
         self.SESSION_TIMEOUT_MINUTES = int(os.getenv("SESSION_TIMEOUT_MINUTES", "30"))
         self.AUTH_MAX_ATTEMPTS = int(os.getenv("AUTH_MAX_ATTEMPTS", "5"))
         self.AUTH_LOCKOUT_MINUTES = int(os.getenv("AUTH_LOCKOUT_MINUTES", "15"))
+        # Authenticated session cache: entry TTL, how often other workers'
+        # revocations are checked for, and how often last_seen is written
+        self.SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "30"))
+        self.SESSION_VERSION_CHECK_INTERVAL = float(os.getenv("SESSION_VERSION_CHECK_INTERVAL", "1"))
+        self.SESSION_LAST_SEEN_FLUSH_INTERVAL = float(os.getenv("SESSION_LAST_SEEN_FLUSH_INTERVAL", "60"))
 
         # Rate limiting settings
         self.RUNNING_TESTS = os.getenv("RUNNING_TESTS") == "1" or "PYTEST_CURRENT_TEST" in os.environ
@@ -67,6 +72,11 @@ class Settings:
         self.MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
         self.MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY", "minioadmin")
         self.MINIO_BUCKET = os.getenv("MINIO_BUCKET", "vertex-ar")
+        # Threads per storage adapter type for blocking storage I/O
+        self.STORAGE_IO_WORKERS = int(os.getenv("STORAGE_IO_WORKERS", "8"))
+        self.STORAGE_IO_LOCAL_WORKERS = int(os.getenv("STORAGE_IO_LOCAL_WORKERS", str(self.STORAGE_IO_WORKERS)))
+        self.STORAGE_IO_MINIO_WORKERS = int(os.getenv("STORAGE_IO_MINIO_WORKERS", "16"))
+        self.STORAGE_IO_YANDEX_WORKERS = int(os.getenv("STORAGE_IO_YANDEX_WORKERS", "16"))
 
         # Telegram notifications
         self.TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -117,6 +127,8 @@ class Settings:
         self.CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))  # Default 5 minutes
         self.CACHE_NAMESPACE = os.getenv("CACHE_NAMESPACE", "vertex_ar")
         self.CACHE_MAX_SIZE = int(os.getenv("CACHE_MAX_SIZE", "1000"))  # For LRU cache
+        self.CACHE_MAX_MEMORY_MB = int(os.getenv("CACHE_MAX_MEMORY_MB", "64"))  # For LRU cache, 0 = unlimited
+        self.CACHE_VERSION_TTL = float(os.getenv("CACHE_VERSION_TTL", "1"))  # Local reuse of tag versions, seconds
         self.CACHE_PAGE_SIZE_DEFAULT = int(os.getenv("CACHE_PAGE_SIZE_DEFAULT", "50"))
         self.CACHE_PAGE_SIZE_MAX = int(os.getenv("CACHE_PAGE_SIZE_MAX", "200"))
 
@@ -197,6 +209,25 @@ class Settings:
         # Email queue worker settings
         self.EMAIL_QUEUE_WORKERS = int(os.getenv("EMAIL_QUEUE_WORKERS", "3"))
 
+        # NFT marker generation process pool size
+        self.MARKER_JOB_WORKERS = int(os.getenv("MARKER_JOB_WORKERS", "2"))
+
+        # SQLite connection pool (0 disables WAL/reader pool mode)
+        self.DB_READER_CONNECTIONS = int(os.getenv("DB_READER_CONNECTIONS", "8"))
+        self.DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+        self.DB_MMAP_SIZE_MB = int(os.getenv("DB_MMAP_SIZE_MB", "128"))
+
+        # Write-behind view/click counters flush interval
+        self.VIEW_COUNTER_FLUSH_INTERVAL = float(os.getenv("VIEW_COUNTER_FLUSH_INTERVAL", "5"))
+
+        # Rendered public AR viewer page cache
+        self.VIEWER_CACHE_TTL = float(os.getenv("VIEWER_CACHE_TTL", "300"))  # seconds
+        self.VIEWER_CACHE_MAX_ENTRIES = int(os.getenv("VIEWER_CACHE_MAX_ENTRIES", "10000"))
+
+        # Responsive image preview variants (widths in pixels; webp, jpeg, avif)
+        self.IMAGE_PREVIEW_WIDTHS = [int(width) for width in os.getenv("IMAGE_PREVIEW_WIDTHS", "150,300,600,1200").split(",") if width.strip()]
+        self.IMAGE_PREVIEW_FORMATS = [fmt.strip() for fmt in os.getenv("IMAGE_PREVIEW_FORMATS", "webp,jpeg").split(",") if fmt.strip()]
+
         # Yandex Disk storage tuning
         self.YANDEX_REQUEST_TIMEOUT = int(os.getenv("YANDEX_REQUEST_TIMEOUT", "30"))  # seconds
         self.YANDEX_CHUNK_SIZE_MB = int(os.getenv("YANDEX_CHUNK_SIZE_MB", "10"))  # megabytes
@@ -205,6 +236,18 @@ class Settings:
         self.YANDEX_DIRECTORY_CACHE_SIZE = int(os.getenv("YANDEX_DIRECTORY_CACHE_SIZE", "1000"))  # max entries
         self.YANDEX_SESSION_POOL_CONNECTIONS = int(os.getenv("YANDEX_SESSION_POOL_CONNECTIONS", "10"))
         self.YANDEX_SESSION_POOL_MAXSIZE = int(os.getenv("YANDEX_SESSION_POOL_MAXSIZE", "20"))
+        # Chunk upload/download client: "requests" (pooled session) or "aiohttp"
+        self.YANDEX_HTTP_CLIENT = os.getenv("YANDEX_HTTP_CLIENT", "requests").lower()
+        self.YANDEX_HTTP_LIMIT_PER_HOST = int(os.getenv("YANDEX_HTTP_LIMIT_PER_HOST", str(self.YANDEX_SESSION_POOL_MAXSIZE)))
+        self.YANDEX_HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("YANDEX_HTTP_KEEPALIVE_TIMEOUT", "30"))  # seconds
+
+        # Local read-through disk cache for media on remote (Yandex Disk, MinIO) storage
+        self.MEDIA_CACHE_ENABLED = os.getenv("MEDIA_CACHE_ENABLED", "false" if self.RUNNING_TESTS else "true").lower() == "true"
+        self.MEDIA_CACHE_DIR = Path(os.getenv("MEDIA_CACHE_DIR", str(self.BASE_DIR / "media_cache")))
+        self.MEDIA_CACHE_MAX_MB = int(os.getenv("MEDIA_CACHE_MAX_MB", "2048"))  # megabytes
+        # Warmup prefetches the active videos of portraits viewed within this window
+        self.MEDIA_CACHE_WARMUP_DAYS = int(os.getenv("MEDIA_CACHE_WARMUP_DAYS", "7"))
+        self.MEDIA_CACHE_WARMUP_LIMIT = int(os.getenv("MEDIA_CACHE_WARMUP_LIMIT", "100"))
 
         # Uvicorn runtime tuning
         import psutil
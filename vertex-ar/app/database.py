@@ -3,11 +3,13 @@ Database module for Vertex AR application.
 Contains all database operations and models.
 """
 import sqlite3
+import sys
 import threading
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from logging_setup import get_logger
 
@@ -31,25 +33,170 @@ def normalize_storage_type(storage_type: str) -> str:
     return storage_type
 
 
+class _WriteLock:
+    """
+    Reentrant lock serializing access to the writer connection.
+
+    In connection-pool mode the outermost release commits the open
+    transaction (or rolls it back on error), so readers on other
+    connections see every write as soon as the lock is released.
+    """
+
+    def __init__(self, database: "Database") -> None:
+        self._database = database
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    @property
+    def depth(self) -> int:
+        return getattr(self._local, "depth", 0)
+
+    def __enter__(self) -> "_WriteLock":
+        self._lock.acquire()
+        self._local.depth = self.depth + 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._local.depth -= 1
+            connection = self._database._connection
+            if self._local.depth == 0 and self._database.pooled and connection.in_transaction:
+                if exc_type is None:
+                    connection.commit()
+                else:
+                    connection.rollback()
+        finally:
+            self._lock.release()
+
+
 class Database:
     """Simplified database with just users and AR content."""
 
-    def __init__(self, path: Path) -> None:
+    READ_PREFIXES = ("SELECT", "WITH")
+    WRITE_KEYWORDS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+    # Tables whose cached reads (list totals, authenticated sessions) are
+    # invalidated through table_versions, with the columns those reads depend on
+    VERSIONED_TABLES = {
+        "portraits": ("client_id", "folder_id", "lifecycle_status"),
+        "clients": ("company_id", "phone", "name", "email"),
+        "videos": ("portrait_id", "is_active"),
+        "folders": ("project_id",),
+        "projects": ("company_id",),
+        "companies": ("name", "storage_type"),
+        "notification_history": ("notification_type", "status"),
+        "admin_sessions": ("revoked", "expires_at"),
+        "users": ("hashed_password", "is_admin", "is_active", "email", "full_name"),
+    }
+    COUNT_CACHE_SIZE = 1024
+
+    # FTS5 trigram indexes over the text columns admin search matches, keyed by
+    # index name: (content table, indexed columns)
+    SEARCH_INDEXES = {
+        "clients_fts": ("clients", ("name", "phone", "email")),
+        "portraits_fts": ("portraits", ("id", "permanent_link")),
+    }
+    # Trigram indexes cannot match shorter terms; those fall back to LIKE
+    SEARCH_MIN_LENGTH = 3
+    # Relevance is computed for at most this many of the newest matches, so
+    # a broad term costs a bounded amount of ranking work
+    SEARCH_RANK_WINDOW = 1000
+
+    def __init__(
+        self,
+        path: Path,
+        reader_connections: int = 0,
+        cache_size_kb: int = 16384,
+        mmap_size_mb: int = 128,
+    ) -> None:
+        """
+        Open the database.
+
+        Args:
+            path: SQLite database file
+            reader_connections: Size of the per-thread read connection pool.
+                0 keeps the single shared connection; a positive value enables
+                connection-pool mode (WAL journal, one serialized writer that
+                commits on lock release, and up to N lock-free readers).
+            cache_size_kb: Page cache size per connection in pool mode
+            mmap_size_mb: Memory-mapped I/O size per connection in pool mode
+        """
         self.path = Path(path)
         # Ensure directory exists
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        self._lock = threading.Lock()
+        self.pooled = reader_connections > 0
+        self.reader_connections = max(0, reader_connections)
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size_mb = mmap_size_mb
+        self._lock = _WriteLock(self)
+        self._readers_lock = threading.Lock()
+        self._readers: List[sqlite3.Connection] = []
+        self._reader_local = threading.local()
+        self._portrait_listeners: List[Callable[[Optional[str]], None]] = []
+        self._count_cache: "OrderedDict[Tuple[str, tuple], Tuple[tuple, int]]" = OrderedDict()
+        self._count_cache_lock = threading.Lock()
+        self.search_enabled = False
         self._connection = sqlite3.connect(
             str(self.path), check_same_thread=False)
         self._connection.row_factory = sqlite3.Row
         # Enable foreign key constraints for cascade delete
         self._connection.execute("PRAGMA foreign_keys = ON")
+        if self.pooled:
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._apply_pool_pragmas(self._connection)
         self._initialise_schema()
 
-    def _execute(self, query: str, params: Optional[tuple] = None):
+    def _apply_pool_pragmas(self, connection: sqlite3.Connection) -> None:
+        """Apply per-connection tuning used in connection-pool mode."""
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size_mb) * 1024 * 1024}")
+        connection.execute("PRAGMA busy_timeout = 5000")
+
+    def _get_reader(self) -> Optional[sqlite3.Connection]:
+        """
+        Return this thread's read connection.
+
+        Connections are bound to the first thread that uses them. Returns
+        None when the pool is full, in which case the caller falls back to
+        the writer connection.
+        """
+        reader = getattr(self._reader_local, "connection", None)
+        if reader is not None:
+            return reader
+
+        with self._readers_lock:
+            if len(self._readers) >= self.reader_connections:
+                return None
+            reader = sqlite3.connect(str(self.path), check_same_thread=False)
+            reader.row_factory = sqlite3.Row
+            self._apply_pool_pragmas(reader)
+            reader.execute("PRAGMA query_only = ON")
+            self._readers.append(reader)
+
+        self._reader_local.connection = reader
+        return reader
+
+    def _is_read_query(self, query: str) -> bool:
+        """Check whether a statement only reads data."""
+        statement = query.lstrip().upper()
+        if not statement.startswith(self.READ_PREFIXES):
+            return False
+        if statement.startswith("WITH"):
+            return not any(keyword in statement for keyword in self.WRITE_KEYWORDS)
+        return True
+
+    def _execute(self, query: str, params: Optional[tuple] = None) -> sqlite3.Cursor:
         """
         Execute a SQL query with slow query tracking.
 
+        Without the pool every statement runs on the shared connection under
+        the write lock and is committed immediately. In connection-pool mode
+        reads run on the calling thread's reader connection without taking
+        the write lock; writes run on the writer connection under the lock and
+        are committed when it is released. Reads issued while the thread holds
+        the write lock stay on the writer so they see the uncommitted changes.
+
         Args:
             query: SQL query string
             params: Query parameters tuple
@@ -61,17 +208,24 @@ class Database:
         start_time = time.time()
 
         try:
-            if params:
-                result = self._connection.execute(query, params)
+            if not self.pooled:
+                with self._lock:
+                    result = self._run(self._connection, query, params)
+                    self._connection.commit()
+            elif self._lock.depth == 0 and self._is_read_query(query) and (reader := self._get_reader()) is not None:
+                result = self._run(reader, query, params)
             else:
-                result = self._connection.execute(query)
+                with self._lock:
+                    result = self._run(self._connection, query, params)
 
             duration_ms = (time.time() - start_time) * 1000
 
             # Track slow queries in monitoring system
             if duration_ms > 50:  # Only track queries > 50ms to reduce overhead
                 try:
-                    from app.main import system_monitor
+                    # Only report when the app is loaded; never import it from here
+                    main_module = sys.modules.get("app.main")
+                    system_monitor = getattr(main_module, "system_monitor", None)
                     if system_monitor:
                         system_monitor.track_slow_query(
                             query, duration_ms, params)
@@ -86,6 +240,111 @@ class Database:
                          error=str(e), params=params)
             raise
 
+    @staticmethod
+    def _run(connection: sqlite3.Connection, query: str, params: Optional[tuple]):
+        if params:
+            return connection.execute(query, params)
+        return connection.execute(query)
+
+    def get_table_versions(self, tables: Sequence[str]) -> Tuple[Tuple[str, int], ...]:
+        """
+        Return the change versions of versioned tables.
+
+        A version changes whenever a row is inserted or deleted or a column
+        listed in VERSIONED_TABLES is updated, in any process using the file.
+        """
+        placeholders = ",".join("?" for _ in tables)
+        cursor = self._execute(
+            f"SELECT name, version FROM table_versions WHERE name IN ({placeholders}) ORDER BY name",
+            tuple(tables),
+        )
+        return tuple(tuple(row) for row in cursor.fetchall())
+
+    def _cached_count(self, tables: Tuple[str, ...], query: str, params: tuple = ()) -> int:
+        """
+        Run a COUNT query, reusing the previous result while its tables are unchanged.
+
+        Args:
+            tables: Versioned tables (see VERSIONED_TABLES) the count depends on
+            query: Query returning the count in its first column
+            params: Query parameters
+        """
+        versions = self.get_table_versions(tables)
+        key = (query, params)
+        with self._count_cache_lock:
+            cached = self._count_cache.get(key)
+            if cached is not None and cached[0] == versions:
+                self._count_cache.move_to_end(key)
+                return cached[1]
+
+        row = self._execute(query, params).fetchone()
+        count = row[0] if row else 0
+        with self._count_cache_lock:
+            self._count_cache[key] = (versions, count)
+            self._count_cache.move_to_end(key)
+            while len(self._count_cache) > self.COUNT_CACHE_SIZE:
+                self._count_cache.popitem(last=False)
+        return count
+
+    @staticmethod
+    def _paginate(
+        query: str,
+        params: List[Any],
+        sort_column: str,
+        id_column: str,
+        limit: Optional[int],
+        offset: int = 0,
+        after: Optional[Tuple[Any, str]] = None,
+        descending: bool = True,
+    ) -> str:
+        """
+        Append ordering and pagination to a query ending in a WHERE clause.
+
+        Rows are ordered by (sort_column, id_column). With ``after`` (the sort
+        key of the last row of the previous page) the page starts right after
+        that row, which an index on (..., sort_column, id) serves without
+        scanning skipped rows; otherwise ``offset`` rows are skipped.
+        """
+        direction = "DESC" if descending else "ASC"
+        if after is not None:
+            query += f" AND ({sort_column}, {id_column}) {'<' if descending else '>'} (?, ?)"
+            params.extend(after)
+        query += f" ORDER BY {sort_column} {direction}, {id_column} {direction}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+            if after is None:
+                query += " OFFSET ?"
+                params.append(offset)
+        return query
+
+    def close(self) -> None:
+        """Close the writer and all reader connections."""
+        with self._readers_lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers.clear()
+        with self._lock:
+            if self._connection.in_transaction:
+                self._connection.commit()
+        self._connection.close()
+
+    def add_portrait_change_listener(self, listener: Callable[[Optional[str]], None]) -> None:
+        """
+        Register a callback for changes to what a portrait's public page shows.
+
+        The callback receives the portrait ID, or None when many portraits
+        may have changed at once.
+        """
+        self._portrait_listeners.append(listener)
+
+    def _notify_portrait_changed(self, portrait_id: Optional[str]) -> None:
+        for listener in list(self._portrait_listeners):
+            try:
+                listener(portrait_id)
+            except Exception as e:
+                logger.warning("Portrait change listener failed", portrait_id=portrait_id, error=str(e))
+
     def _initialise_schema(self) -> None:
         with self._connection:
             self._connection.execute(
@@ -351,6 +610,20 @@ class Database:
                     "CREATE INDEX IF NOT EXISTS idx_video_schedule_history_video ON video_schedule_history(video_id)")
             except sqlite3.OperationalError:
                 pass
+            # Create index for newest-first portrait listing with (created_at, id) keyset pagination
+            try:
+                self._connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_portraits_created ON portraits(created_at, id)")
+            except sqlite3.OperationalError:
+                pass
+            # Create index for per-client portrait lookups (counts, latest portrait,
+            # keyset pages); it supersedes the earlier (client_id, created_at) index
+            try:
+                self._connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_portraits_client_keyset ON portraits(client_id, created_at, id)")
+                self._connection.execute("DROP INDEX IF EXISTS idx_portraits_client_created")
+            except sqlite3.OperationalError:
+                pass
             # Create index for phone search
             try:
                 self._connection.execute(
@@ -394,6 +667,37 @@ class Database:
             except sqlite3.OperationalError:
                 pass
 
+            # Add NFT marker generation status column to portraits table
+            try:
+                self._connection.execute(
+                    "ALTER TABLE portraits ADD COLUMN marker_status TEXT NOT NULL DEFAULT 'ready' CHECK (marker_status IN ('pending', 'running', 'ready', 'failed'))")
+            except sqlite3.OperationalError:
+                pass
+
+            # Add last view time (set when view counts are flushed) for media cache warmup
+            try:
+                self._connection.execute(
+                    "ALTER TABLE portraits ADD COLUMN last_viewed_at TIMESTAMP")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                self._connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_portraits_last_viewed ON portraits(last_viewed_at)")
+            except sqlite3.OperationalError:
+                pass
+
+            # Add content hash columns for blob deduplication
+            try:
+                self._connection.execute(
+                    "ALTER TABLE portraits ADD COLUMN blob_hash TEXT")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                self._connection.execute(
+                    "ALTER TABLE videos ADD COLUMN blob_hash TEXT")
+            except sqlite3.OperationalError:
+                pass
+
             # Add email column to clients table
             try:
                 self._connection.execute(
@@ -827,6 +1131,93 @@ class Database:
             except sqlite3.OperationalError:
                 pass
 
+            # Create marker_jobs table for background NFT marker generation
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS marker_jobs (
+                    id TEXT PRIMARY KEY,
+                    portrait_id TEXT NOT NULL,
+                    image_path TEXT NOT NULL,
+                    marker_name TEXT NOT NULL,
+                    config TEXT,
+                    cleanup_image INTEGER NOT NULL DEFAULT 0,
+                    update_portrait INTEGER NOT NULL DEFAULT 1,
+                    status TEXT NOT NULL CHECK (status IN ('pending', 'running', 'completed', 'failed')) DEFAULT 'pending',
+                    progress INTEGER NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    started_at TIMESTAMP,
+                    completed_at TIMESTAMP,
+                    duration_ms REAL
+                )
+                """
+            )
+
+            try:
+                self._connection.execute(
+                    "ALTER TABLE marker_jobs ADD COLUMN update_portrait INTEGER NOT NULL DEFAULT 1")
+            except sqlite3.OperationalError:
+                pass
+
+            # Create indexes for marker_jobs table
+            try:
+                self._connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_marker_jobs_portrait ON marker_jobs(portrait_id, created_at)")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                self._connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_marker_jobs_status ON marker_jobs(status)")
+            except sqlite3.OperationalError:
+                pass
+
+            # Create blobs table for content-addressed upload deduplication
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    content_hash TEXT NOT NULL,
+                    company_id TEXT NOT NULL DEFAULT '',
+                    content_type TEXT NOT NULL,
+                    storage_path TEXT NOT NULL,
+                    preview_path TEXT,
+                    size_bytes INTEGER NOT NULL DEFAULT 0,
+                    refcount INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    last_used_at TIMESTAMP,
+                    PRIMARY KEY (content_hash, company_id, content_type)
+                )
+                """
+            )
+            try:
+                self._connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_portraits_blob_hash ON portraits(blob_hash)")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                self._connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_videos_blob_hash ON videos(blob_hash)")
+            except sqlite3.OperationalError:
+                pass
+
+            # Create previews table for responsive preview variants of stored content
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS previews (
+                    content_hash TEXT NOT NULL,
+                    company_id TEXT NOT NULL DEFAULT '',
+                    content_type TEXT NOT NULL,
+                    width INTEGER NOT NULL,
+                    format TEXT NOT NULL,
+                    height INTEGER NOT NULL,
+                    storage_path TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (content_hash, company_id, content_type, width, format)
+                )
+                """
+            )
+
             # Create monitoring_settings table for persisted monitoring configuration
             self._connection.execute(
                 """
@@ -883,6 +1274,135 @@ class Database:
             except sqlite3.OperationalError:
                 pass
 
+            # Composite indexes for keyset pagination and cached list totals
+            self._migrate_keyset_indexes()
+            self._create_table_versions()
+            self._create_search_indexes()
+
+    def _migrate_keyset_indexes(self) -> None:
+        """
+        Create (filter, sort key, id) indexes used by keyset pagination.
+
+        Each list orders by its sort key with id as tie-breaker, so pages can
+        be read straight from an index without an offset scan or a sort.
+        Single-column indexes that the composite ones supersede are dropped.
+        """
+        indexes = {
+            "idx_portraits_status_keyset": "portraits(lifecycle_status, created_at, id)",
+            "idx_portraits_folder_keyset": "portraits(folder_id, created_at, id)",
+            "idx_clients_created": "clients(created_at, id)",
+            "idx_clients_company_keyset": "clients(company_id, created_at, id)",
+            "idx_folders_created": "folders(created_at, id)",
+            "idx_folders_project_keyset": "folders(project_id, created_at, id)",
+            "idx_projects_created": "projects(created_at, id)",
+            "idx_projects_company_keyset": "projects(company_id, created_at, id)",
+            "idx_companies_name_keyset": "companies(name, id)",
+            "idx_notification_history_sent_keyset": "notification_history(sent_at, id)",
+            "idx_notification_history_type_keyset": "notification_history(notification_type, sent_at, id)",
+            "idx_notification_history_status_keyset": "notification_history(status, sent_at, id)",
+        }
+        superseded = [
+            "idx_portraits_folder",
+            "idx_folders_project",
+            "idx_projects_company",
+            "idx_notification_history_type",
+            "idx_notification_history_status",
+            "idx_notification_history_sent_at",
+        ]
+        for name, definition in indexes.items():
+            try:
+                self._connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+            except sqlite3.OperationalError as e:
+                logger.warning("Migration: failed to create keyset index", index=name, error=str(e))
+        for name in superseded:
+            self._connection.execute(f"DROP INDEX IF EXISTS {name}")
+        self._connection.commit()
+
+    def _create_table_versions(self) -> None:
+        """
+        Create per-table change versions maintained by triggers.
+
+        A table's version is bumped by every insert and delete, and by updates
+        of the columns list filters use, so cached list totals stay valid until
+        a change could alter them (see _cached_count).
+        """
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS table_versions (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        for table, columns in self.VERSIONED_TABLES.items():
+            self._connection.execute(
+                "INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, 0)", (table,))
+            bump = f"UPDATE table_versions SET version = version + 1 WHERE name = '{table}';"
+            self._connection.execute(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_version_insert AFTER INSERT ON {table} BEGIN {bump} END")
+            self._connection.execute(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_version_delete AFTER DELETE ON {table} BEGIN {bump} END")
+            self._connection.execute(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_version_update AFTER UPDATE OF {', '.join(columns)} "
+                f"ON {table} BEGIN {bump} END")
+        self._connection.commit()
+
+    def _create_search_indexes(self) -> None:
+        """
+        Create the FTS5 search indexes and the triggers that keep them in sync.
+
+        The indexes are external-content tables keyed by the rowid of their
+        table, so only the index is stored. A newly created index is built
+        from the existing rows. Without FTS5 support search falls back to LIKE.
+        """
+        try:
+            for index, (table, columns) in self.SEARCH_INDEXES.items():
+                exists = self._connection.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (index,)
+                ).fetchone()
+                column_list = ", ".join(columns)
+                old_values = ", ".join(f"old.{column}" for column in columns)
+                new_values = ", ".join(f"new.{column}" for column in columns)
+                remove = (f"INSERT INTO {index} ({index}, rowid, {column_list}) "
+                          f"VALUES ('delete', old.rowid, {old_values});")
+                add = f"INSERT INTO {index} (rowid, {column_list}) VALUES (new.rowid, {new_values});"
+
+                self._connection.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+                    f"{column_list}, content='{table}', content_rowid='rowid', tokenize='trigram')"
+                )
+                self._connection.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS trg_{index}_insert AFTER INSERT ON {table} BEGIN {add} END")
+                self._connection.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS trg_{index}_delete AFTER DELETE ON {table} BEGIN {remove} END")
+                self._connection.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS trg_{index}_update AFTER UPDATE OF {column_list} ON {table} "
+                    f"BEGIN {remove} {add} END")
+                if not exists:
+                    self._connection.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+                    logger.info("Migration: built search index", index=index, table=table)
+            self._connection.commit()
+            self.search_enabled = True
+        except sqlite3.OperationalError as e:
+            self._connection.rollback()
+            logger.warning("Full-text search unavailable, falling back to LIKE", error=str(e))
+
+    def _search_match(self, search: Optional[str], columns: Optional[Sequence[str]] = None) -> Optional[str]:
+        """
+        Build an FTS5 MATCH expression for a substring search.
+
+        Returns None when the index cannot serve the term (search disabled or
+        term shorter than SEARCH_MIN_LENGTH), in which case callers use LIKE.
+        """
+        term = (search or "").strip()
+        if not self.search_enabled or len(term) < self.SEARCH_MIN_LENGTH:
+            return None
+        # A quoted phrase is a plain substring match under the trigram tokenizer
+        phrase = '"' + term.replace('"', '""') + '"'
+        if columns:
+            return "{" + " ".join(columns) + "} : " + phrase
+        return phrase
+
     def _migrate_drop_content_types(self) -> None:
         """
         Migrate companies table to drop the legacy content_types column.
@@ -998,12 +1518,6 @@ class Database:
                 f"Migration: Error checking content_types column: {e}", exc_info=True)
             # Don't raise - allow app to continue even if migration fails
 
-    def _execute(self, query: str, parameters: tuple[Any, ...] = ()) -> sqlite3.Cursor:
-        with self._lock:
-            cursor = self._connection.execute(query, parameters)
-            self._connection.commit()
-            return cursor
-
     # User methods (for admin authentication and profile management only)
     def get_user(self, username: str) -> Optional[Dict[str, Any]]:
         cursor = self._execute(
@@ -1151,6 +1665,26 @@ class Database:
                 f"Failed to update admin session last seen: {e}", exc_info=e)
             return False
 
+    def touch_admin_sessions(self, last_seen: Dict[str, datetime]) -> int:
+        """
+        Write coalesced last seen timestamps in a single transaction.
+
+        Args:
+            last_seen: Mapping of session token to its latest activity time
+
+        Returns:
+            Number of sessions updated
+        """
+        if not last_seen:
+            return 0
+        with self._lock:
+            cursor = self._connection.executemany(
+                "UPDATE admin_sessions SET last_seen = ? WHERE token = ? AND revoked = 0",
+                [(seen_at.strftime("%Y-%m-%d %H:%M:%S"), token) for token, seen_at in last_seen.items()],
+            )
+            self._connection.commit()
+        return cursor.rowcount
+
     def revoke_admin_session(self, token: str) -> bool:
         """Revoke an admin session."""
         try:
@@ -1265,6 +1799,42 @@ class Database:
             (content_id,),
         )
 
+    COUNTER_COLUMNS = {
+        ("portraits", "view_count"),
+        ("ar_content", "view_count"),
+        ("ar_content", "click_count"),
+    }
+
+    # Counter columns whose increments also record the time of the last one
+    COUNTER_TOUCH_COLUMNS = {
+        ("portraits", "view_count"): "last_viewed_at",
+    }
+
+    def apply_counter_increments(self, increments: Dict[Tuple[str, str], List[Tuple[str, int]]]) -> None:
+        """
+        Apply aggregated counter increments in a single transaction.
+
+        Args:
+            increments: Mapping of (table, column) to (record id, delta) pairs
+        """
+        for table_column in increments:
+            if table_column not in self.COUNTER_COLUMNS:
+                raise ValueError(f"Unsupported counter column: {table_column}")
+
+        with self._lock:
+            try:
+                for (table, column), rows in increments.items():
+                    touch_column = self.COUNTER_TOUCH_COLUMNS.get((table, column))
+                    touch = f", {touch_column} = CURRENT_TIMESTAMP" if touch_column else ""
+                    self._connection.executemany(
+                        f"UPDATE {table} SET {column} = {column} + ?{touch} WHERE id = ?",
+                        [(delta, record_id) for record_id, delta in rows],
+                    )
+                self._connection.commit()
+            except Exception:
+                self._connection.rollback()
+                raise
+
     def delete_ar_content(self, content_id: str) -> bool:
         """Delete AR content from database."""
         cursor = self._execute(
@@ -1316,7 +1886,7 @@ class Database:
         return dict(row)
 
     def search_clients(self, query: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
-        """Search clients by name or phone (partial match)."""
+        """Search clients by name, phone or email (partial match, best matches first)."""
         return self.list_clients(search=query, limit=limit, offset=offset)
 
     def list_clients(
@@ -1325,46 +1895,83 @@ class Database:
         limit: Optional[int] = None,
         offset: int = 0,
         company_id: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
     ) -> List[Dict[str, Any]]:
-        """Get list of clients with optional search, pagination, and company filter."""
-        query = "SELECT * FROM clients WHERE 1=1"
-        params: List[Any] = []
-
-        if company_id:
-            query += " AND company_id = ?"
-            params.append(company_id)
-
-        if search:
-            like = f"%{search}%"
-            query += " AND (phone LIKE ? OR name LIKE ? OR email LIKE ?)"
-            params.extend([like, like, like])
-
-        query += " ORDER BY created_at DESC"
-
-        if limit is not None:
-            query += " LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
-
+        """
+        Get list of clients with optional search, pagination, and company filter.
+
+        Search results served by the full-text index are ordered by relevance
+        for the newest SEARCH_RANK_WINDOW matches, followed by older matches
+        newest first; other lists are ordered newest first. ``after`` is the
+        (created_at, id) of the last client of the previous page (keyset
+        pagination, used instead of ``offset``); it cannot be combined with a
+        ranked search.
+        """
+        query, params, ranked = self._client_filters(search, company_id)
+        if ranked:
+            if after is not None:
+                raise ValueError("keyset pagination is not supported for ranked search")
+            window = self.SEARCH_RANK_WINDOW
+            matches = (
+                "SELECT * FROM (SELECT clients.*, 0 AS search_tier, clients_fts.rank AS search_rank "
+                + query + " ORDER BY clients_fts.rowid DESC LIMIT ?)"
+            )
+            match_params = params + [window]
+            if limit is None or offset + limit > window:
+                # Only pages past the ranked window read every match
+                matches += (
+                    " UNION ALL SELECT * FROM (SELECT clients.*, 1, -clients_fts.rowid "
+                    + query + " ORDER BY clients_fts.rowid DESC LIMIT -1 OFFSET ?)"
+                )
+                match_params += params + [window]
+            query = f"SELECT * FROM ({matches}) ORDER BY search_tier, search_rank, id"
+            if limit is not None:
+                query += " LIMIT ? OFFSET ?"
+                match_params += [limit, offset]
+            cursor = self._execute(query, tuple(match_params))
+            return [
+                {key: row[key] for key in row.keys() if key not in ("search_tier", "search_rank")}
+                for row in cursor.fetchall()
+            ]
+
+        query = self._paginate(
+            "SELECT clients.* " + query, params, "clients.created_at", "clients.id",
+            limit=limit, offset=offset, after=after,
+        )
         cursor = self._execute(query, tuple(params))
         return [dict(row) for row in cursor.fetchall()]
 
-    def count_clients(self, search: Optional[str] = None, company_id: Optional[str] = None) -> int:
-        """Count clients with optional search and company filter."""
-        query = "SELECT COUNT(*) as count FROM clients WHERE 1=1"
+    def _client_filters(self, search: Optional[str], company_id: Optional[str]) -> Tuple[str, List[Any], bool]:
+        """
+        FROM/WHERE clause shared by the client list and its count.
+
+        The flag tells whether the search joins the full-text index (whose
+        ``rank`` orders results by relevance).
+        """
+        match = self._search_match(search)
         params: List[Any] = []
+        if match:
+            query = ("FROM clients_fts JOIN clients ON clients.rowid = clients_fts.rowid"
+                     " WHERE clients_fts MATCH ?")
+            params.append(match)
+        else:
+            query = "FROM clients WHERE 1=1"
 
         if company_id:
-            query += " AND company_id = ?"
+            query += " AND clients.company_id = ?"
             params.append(company_id)
 
-        if search:
+        if search and not match:
             like = f"%{search}%"
-            query += " AND (phone LIKE ? OR name LIKE ? OR email LIKE ?)"
+            query += " AND (clients.phone LIKE ? OR clients.name LIKE ? OR clients.email LIKE ?)"
             params.extend([like, like, like])
 
-        cursor = self._execute(query, tuple(params))
-        row = cursor.fetchone()
-        return row['count'] if row else 0
+        return query, params, match is not None
+
+    def count_clients(self, search: Optional[str] = None, company_id: Optional[str] = None) -> int:
+        """Count clients with optional search and company filter (cached until clients change)."""
+        query, params, _ = self._client_filters(search, company_id)
+        return self._cached_count(("clients",), "SELECT COUNT(*) " + query, tuple(params))
 
     def get_clients_by_ids(self, client_ids: List[str]) -> List[Dict[str, Any]]:
         """Get multiple clients by their IDs."""
@@ -1390,17 +1997,53 @@ class Database:
         )
         return {row["client_id"]: row["count"] for row in cursor.fetchall()}
 
+    def get_latest_portraits(self, client_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the most recently created portrait of each provided client in one query."""
+        if not client_ids:
+            return {}
+        placeholders = ",".join("?" for _ in client_ids)
+        cursor = self._execute(
+            f"""
+            SELECT * FROM (
+                SELECT portraits.*,
+                       ROW_NUMBER() OVER (PARTITION BY client_id ORDER BY created_at DESC, rowid DESC) AS row_number
+                FROM portraits
+                WHERE client_id IN ({placeholders})
+            )
+            WHERE row_number = 1
+            """,
+            tuple(client_ids),
+        )
+        latest: Dict[str, Dict[str, Any]] = {}
+        for row in cursor.fetchall():
+            portrait = dict(row)
+            portrait.pop("row_number", None)
+            latest[portrait["client_id"]] = portrait
+        return latest
+
     def delete_clients_bulk(self, client_ids: List[str]) -> int:
         """Delete multiple clients by their IDs."""
         if not client_ids:
             return 0
         placeholders = ",".join("?" for _ in client_ids)
+        portrait_ids = self._client_portrait_ids(client_ids)
         cursor = self._execute(
             f"DELETE FROM clients WHERE id IN ({placeholders})",
             tuple(client_ids),
         )
+        # Portraits went with their clients (ON DELETE CASCADE)
+        for portrait_id in portrait_ids:
+            self._notify_portrait_changed(portrait_id)
         return cursor.rowcount
 
+    def _client_portrait_ids(self, client_ids: List[str]) -> List[str]:
+        placeholders = ",".join("?" for _ in client_ids)
+        rows = self._execute(
+            f"SELECT id FROM portraits WHERE client_id IN ({placeholders})",
+            tuple(client_ids),
+        ).fetchall()
+        return [row["id"] for row in rows]
+
     def update_client(self, client_id: str, phone: Optional[str] = None, name: Optional[str] = None, email: Optional[str] = None) -> bool:
         """Update client data."""
         updates = []
@@ -1425,8 +2068,12 @@ class Database:
 
     def delete_client(self, client_id: str) -> bool:
         """Delete client."""
+        portrait_ids = self._client_portrait_ids([client_id])
         cursor = self._execute(
             "DELETE FROM clients WHERE id = ?", (client_id,))
+        # Portraits went with the client (ON DELETE CASCADE)
+        for portrait_id in portrait_ids:
+            self._notify_portrait_changed(portrait_id)
         return cursor.rowcount > 0
 
     # Portrait methods
@@ -1444,6 +2091,8 @@ class Database:
         folder_id: Optional[str] = None,
         subscription_end: Optional[str] = None,
         lifecycle_status: str = "active",
+        marker_status: str = "ready",
+        blob_hash: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Create a new portrait."""
         self._execute(
@@ -1451,12 +2100,13 @@ class Database:
             INSERT INTO portraits (
                 id, client_id, image_path, image_preview_path,
                 marker_fset, marker_fset3, marker_iset,
-                permanent_link, qr_code, folder_id, subscription_end, lifecycle_status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                permanent_link, qr_code, folder_id, subscription_end, lifecycle_status,
+                marker_status, blob_hash
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (portrait_id, client_id, image_path, image_preview_path,
              marker_fset, marker_fset3, marker_iset, permanent_link, qr_code, folder_id,
-             subscription_end, lifecycle_status),
+             subscription_end, lifecycle_status, marker_status, blob_hash),
         )
         return self.get_portrait(portrait_id)
 
@@ -1486,6 +2136,16 @@ class Database:
         params.append(portrait_id)
         query = f"UPDATE portraits SET {', '.join(updates)} WHERE id = ?"
         cursor = self._execute(query, tuple(params))
+        # The public viewer page embeds the marker location
+        self._notify_portrait_changed(portrait_id)
+        return cursor.rowcount > 0
+
+    def set_portrait_marker_status(self, portrait_id: str, marker_status: str) -> bool:
+        """Update NFT marker generation status of a portrait."""
+        cursor = self._execute(
+            "UPDATE portraits SET marker_status = ? WHERE id = ?",
+            (marker_status, portrait_id),
+        )
         return cursor.rowcount > 0
 
     def get_portrait(self, portrait_id: str) -> Optional[Dict[str, Any]]:
@@ -1532,56 +2192,61 @@ class Database:
         folder_id: Optional[str] = None,
         company_id: Optional[str] = None,
         lifecycle_status: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Get paginated list of portraits with optional filters.
 
         Args:
-            page: Page number (1-indexed)
+            page: Page number (1-indexed, ignored with ``after``)
             page_size: Number of items per page
             client_id: Filter by client ID
             folder_id: Filter by folder ID
             company_id: Filter by company ID (via client relationship)
             lifecycle_status: Filter by lifecycle status (active, expiring, archived)
+            after: (created_at, id) of the last portrait of the previous page
 
         Returns:
             List of portrait dictionaries
         """
-        # Build base query
+        query, params = self._portrait_filters(client_id, folder_id, company_id, lifecycle_status)
+        query = self._paginate(
+            "SELECT p.* " + query, params, "p.created_at", "p.id",
+            limit=page_size, offset=(page - 1) * page_size, after=after,
+        )
+        cursor = self._execute(query, tuple(params))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _portrait_filters(
+        self,
+        client_id: Optional[str],
+        folder_id: Optional[str],
+        company_id: Optional[str],
+        lifecycle_status: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        """FROM/WHERE clause shared by the portrait list and its count."""
+        query = "FROM portraits p"
+        params: List[Any] = []
         if company_id:
-            # Join with clients to filter by company
-            query = """
-                SELECT p.* FROM portraits p
-                JOIN clients c ON p.client_id = c.id
-                WHERE c.company_id = ?
-            """
-            params: List[Any] = [company_id]
+            # Portraits stay the outer loop so pages walk the (created_at, id) index
+            query += " CROSS JOIN clients c ON p.client_id = c.id WHERE c.company_id = ?"
+            params.append(company_id)
         else:
-            query = "SELECT * FROM portraits WHERE 1=1"
-            params = []
+            query += " WHERE 1=1"
 
-        # Apply filters
         if client_id:
-            query += " AND client_id = ?" if not company_id else " AND p.client_id = ?"
+            query += " AND p.client_id = ?"
             params.append(client_id)
 
         if folder_id:
-            query += " AND folder_id = ?" if not company_id else " AND p.folder_id = ?"
+            query += " AND p.folder_id = ?"
             params.append(folder_id)
 
         if lifecycle_status:
-            query += " AND lifecycle_status = ?" if not company_id else " AND p.lifecycle_status = ?"
+            query += " AND p.lifecycle_status = ?"
             params.append(lifecycle_status)
 
-        # Add ordering and pagination
-        query += " ORDER BY created_at DESC" if not company_id else " ORDER BY p.created_at DESC"
-        query += " LIMIT ? OFFSET ?"
-
-        offset = (page - 1) * page_size
-        params.extend([page_size, offset])
-
-        cursor = self._execute(query, tuple(params))
-        return [dict(row) for row in cursor.fetchall()]
+        return query, params
 
     def count_portraits(
         self,
@@ -1593,6 +2258,9 @@ class Database:
         """
         Count portraits with optional filters.
 
+        The result is cached until portraits (or clients, when filtering by
+        company) change.
+
         Args:
             client_id: Filter by client ID
             folder_id: Filter by folder ID
@@ -1602,40 +2270,213 @@ class Database:
         Returns:
             Total count of portraits matching filters
         """
-        # Build base query
+        query, params = self._portrait_filters(client_id, folder_id, company_id, lifecycle_status)
+        tables = ("clients", "portraits") if company_id else ("portraits",)
+        return self._cached_count(tables, "SELECT COUNT(*) " + query, tuple(params))
+
+    def list_portraits_with_client_paginated(
+        self,
+        page: int = 1,
+        page_size: int = 50,
+        company_id: Optional[str] = None,
+        lifecycle_status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a page of portraits with client and active video details in one query.
+
+        Rows hold all portrait columns plus client_name, client_phone,
+        client_company_id, active_video_id and active_video_description
+        (client and video columns are None when missing).
+
+        Args:
+            page: Page number (1-indexed)
+            page_size: Number of items per page
+            company_id: Filter by company ID (via client relationship)
+            lifecycle_status: Filter by lifecycle status (active, expiring, archived)
+        """
+        query = """
+            SELECT
+                p.*,
+                c.name AS client_name,
+                c.phone AS client_phone,
+                c.company_id AS client_company_id,
+                av.id AS active_video_id,
+                av.description AS active_video_description
+            FROM portraits p
+            LEFT JOIN clients c ON c.id = p.client_id
+            LEFT JOIN videos av ON av.id = (
+                SELECT id FROM videos
+                WHERE portrait_id = p.id AND is_active = 1
+                ORDER BY created_at DESC
+                LIMIT 1
+            )
+            WHERE 1=1
+        """
+        params: List[Any] = []
+
         if company_id:
-            # Join with clients to filter by company
-            query = """
-                SELECT COUNT(*) FROM portraits p
-                JOIN clients c ON p.client_id = c.id
-                WHERE c.company_id = ?
+            query += " AND c.company_id = ?"
+            params.append(company_id)
+
+        if lifecycle_status:
+            query += " AND p.lifecycle_status = ?"
+            params.append(lifecycle_status)
+
+        query += " ORDER BY p.created_at DESC LIMIT ? OFFSET ?"
+        params.extend([page_size, (page - 1) * page_size])
+
+        cursor = self._execute(query, tuple(params))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_portrait_with_client(self, portrait_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a portrait with its client, folder and project names in one query.
+
+        Adds client_name, client_phone, client_email, client_company_id,
+        client_created_at, folder_name and project_name to the portrait columns.
+        """
+        cursor = self._execute(
             """
-            params: List[Any] = [company_id]
-        else:
-            query = "SELECT COUNT(*) FROM portraits WHERE 1=1"
-            params = []
+            SELECT
+                p.*,
+                c.name AS client_name,
+                c.phone AS client_phone,
+                c.email AS client_email,
+                c.company_id AS client_company_id,
+                c.created_at AS client_created_at,
+                f.name AS folder_name,
+                pr.name AS project_name
+            FROM portraits p
+            LEFT JOIN clients c ON c.id = p.client_id
+            LEFT JOIN folders f ON f.id = p.folder_id
+            LEFT JOIN projects pr ON pr.id = f.project_id
+            WHERE p.id = ?
+            """,
+            (portrait_id,),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(row)
+
+    def get_portrait_position(self, portrait_id: str) -> Optional[int]:
+        """
+        Get the 1-based position of a portrait in creation order.
+
+        Matches the order of list_portraits() read from the end, so the oldest
+        portrait is 1 and the newest equals the portrait count.
+        """
+        cursor = self._execute(
+            """
+            SELECT COUNT(*) FROM portraits other, portraits target
+            WHERE target.id = ?
+              AND (other.created_at < target.created_at
+                   OR (other.created_at = target.created_at AND other.rowid >= target.rowid))
+            """,
+            (portrait_id,),
+        )
+        row = cursor.fetchone()
+        return row[0] if row and row[0] else None
+
+    def _mobile_portraits_filters(
+        self,
+        company_id: Optional[str],
+        client_id: Optional[str],
+        include_inactive: bool,
+    ) -> Tuple[str, List[Any]]:
+        """FROM/WHERE clause shared by the mobile portrait list and its count."""
+        # CROSS JOIN keeps portraits as the outer loop, so pages walk the
+        # (created_at, id) index instead of scanning a whole company and sorting
+        query = """
+            FROM portraits p
+            CROSS JOIN clients c ON c.id = p.client_id
+            LEFT JOIN videos av ON av.id = (
+                SELECT id FROM videos
+                WHERE portrait_id = p.id AND is_active = 1
+                LIMIT 1
+            )
+            WHERE 1=1
+        """
+        params: List[Any] = []
 
-        # Apply filters
         if client_id:
-            query += " AND client_id = ?" if not company_id else " AND p.client_id = ?"
+            query += " AND p.client_id = ?"
             params.append(client_id)
 
-        if folder_id:
-            query += " AND folder_id = ?" if not company_id else " AND p.folder_id = ?"
-            params.append(folder_id)
+        if company_id:
+            query += " AND c.company_id = ?"
+            params.append(company_id)
 
-        if lifecycle_status:
-            query += " AND lifecycle_status = ?" if not company_id else " AND p.lifecycle_status = ?"
-            params.append(lifecycle_status)
+        if not include_inactive:
+            query += " AND av.id IS NOT NULL"
+
+        return query, params
+
+    def list_portraits_for_mobile(
+        self,
+        limit: int,
+        company_id: Optional[str] = None,
+        client_id: Optional[str] = None,
+        include_inactive: bool = False,
+        after: Optional[Tuple[str, str]] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get newest-first portraits with client and active video for the mobile API.
+
+        Rows hold all portrait columns plus client_name, client_phone and the
+        active video as active_video_id, active_video_path,
+        active_video_preview_path, active_video_description and
+        active_video_file_size_mb. Portraits whose client is missing are
+        skipped, as are portraits without an active video unless
+        include_inactive is set.
+
+        Args:
+            limit: Maximum number of rows
+            company_id: Filter by company ID (via client relationship)
+            client_id: Filter by client ID
+            include_inactive: Include portraits without an active video
+            after: (created_at, id) of the last row of the previous page; rows
+                strictly after it in list order are returned (keyset pagination)
+            offset: Rows to skip (page-number pagination; use 0 with ``after``)
+        """
+        from_clause, params = self._mobile_portraits_filters(company_id, client_id, include_inactive)
+        query = """
+            SELECT
+                p.*,
+                c.name AS client_name,
+                c.phone AS client_phone,
+                av.id AS active_video_id,
+                av.video_path AS active_video_path,
+                av.video_preview_path AS active_video_preview_path,
+                av.description AS active_video_description,
+                av.file_size_mb AS active_video_file_size_mb
+        """ + from_clause
+
+        if after is not None:
+            query += " AND (p.created_at, p.id) < (?, ?)"
+            params.extend(after)
+
+        query += " ORDER BY p.created_at DESC, p.id DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
 
         cursor = self._execute(query, tuple(params))
-        result = cursor.fetchone()
-        return result[0] if result else 0
+        return [dict(row) for row in cursor.fetchall()]
+
+    def count_portraits_for_mobile(
+        self,
+        company_id: Optional[str] = None,
+        client_id: Optional[str] = None,
+        include_inactive: bool = False,
+    ) -> int:
+        """Count portraits matched by list_portraits_for_mobile with the same filters."""
+        from_clause, params = self._mobile_portraits_filters(company_id, client_id, include_inactive)
+        return self._cached_count(("clients", "portraits", "videos"), "SELECT COUNT(*)" + from_clause, tuple(params))
 
     def increment_portrait_views(self, portrait_id: str) -> None:
         """Increase portrait view count."""
         self._execute(
-            "UPDATE portraits SET view_count = view_count + 1 WHERE id = ?",
+            "UPDATE portraits SET view_count = view_count + 1, last_viewed_at = CURRENT_TIMESTAMP WHERE id = ?",
             (portrait_id,),
         )
 
@@ -1643,6 +2484,7 @@ class Database:
         """Delete portrait."""
         cursor = self._execute(
             "DELETE FROM portraits WHERE id = ?", (portrait_id,))
+        self._notify_portrait_changed(portrait_id)
         return cursor.rowcount > 0
 
     # Video methods
@@ -1655,17 +2497,21 @@ class Database:
         video_preview_path: Optional[str] = None,
         description: Optional[str] = None,
         file_size_mb: Optional[int] = None,
+        blob_hash: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Create a new video."""
         self._execute(
             """
             INSERT INTO videos (
-                id, portrait_id, video_path, video_preview_path, description, is_active, file_size_mb
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                id, portrait_id, video_path, video_preview_path, description, is_active, file_size_mb,
+                blob_hash
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (video_id, portrait_id, video_path, video_preview_path,
-             description, int(is_active), file_size_mb),
+             description, int(is_active), file_size_mb, blob_hash),
         )
+        if is_active:
+            self._notify_portrait_changed(portrait_id)
         return self.get_video(video_id)
 
     def get_video(self, video_id: str) -> Optional[Dict[str, Any]]:
@@ -1688,6 +2534,28 @@ class Database:
             return None
         return dict(row)
 
+    def list_recently_viewed_active_videos(self, since_days: int = 7, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get the active videos of the most recently viewed portraits.
+
+        Returns:
+            Rows with portrait_id, video_id, video_path, company_id and
+            last_viewed_at, most recently viewed first
+        """
+        cursor = self._execute(
+            """
+            SELECT p.id AS portrait_id, v.id AS video_id, v.video_path, c.company_id, p.last_viewed_at
+            FROM portraits p
+            JOIN videos v ON v.portrait_id = p.id AND v.is_active = 1
+            LEFT JOIN clients c ON c.id = p.client_id
+            WHERE p.last_viewed_at >= datetime('now', ?)
+            ORDER BY p.last_viewed_at DESC
+            LIMIT ?
+            """,
+            (f"-{int(since_days)} days", limit),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
     def list_videos(self, portrait_id: str) -> List[Dict[str, Any]]:
         """Get list of videos for portrait."""
         cursor = self._execute(
@@ -1696,6 +2564,26 @@ class Database:
         )
         return [dict(row) for row in cursor.fetchall()]
 
+    def list_videos_for_portraits(self, portrait_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get videos of several portraits in one query.
+
+        Returns:
+            Mapping of portrait ID to its videos, newest first (portraits
+            without videos are omitted)
+        """
+        if not portrait_ids:
+            return {}
+        placeholders = ",".join("?" for _ in portrait_ids)
+        cursor = self._execute(
+            f"SELECT * FROM videos WHERE portrait_id IN ({placeholders}) ORDER BY portrait_id, created_at DESC",
+            tuple(portrait_ids),
+        )
+        videos: Dict[str, List[Dict[str, Any]]] = {}
+        for row in cursor.fetchall():
+            videos.setdefault(row["portrait_id"], []).append(dict(row))
+        return videos
+
     def set_active_video(self, video_id: str, portrait_id: str) -> bool:
         """Set active video for portrait."""
         with self._lock:
@@ -1710,7 +2598,8 @@ class Database:
                 (video_id,),
             )
             self._connection.commit()
-            return cursor.rowcount > 0
+        self._notify_portrait_changed(portrait_id)
+        return cursor.rowcount > 0
 
     def get_videos_by_portrait(self, portrait_id: str) -> List[Dict[str, Any]]:
         """Get all videos for a portrait."""
@@ -1755,7 +2644,7 @@ class Database:
         with self._lock:
             # Get current status for history
             cursor = self._execute(
-                "SELECT status FROM videos WHERE id = ?", (video_id,))
+                "SELECT status, portrait_id FROM videos WHERE id = ?", (video_id,))
             current = cursor.fetchone()
             if not current:
                 return False
@@ -1785,7 +2674,9 @@ class Database:
                 )
 
             self._connection.commit()
-            return cursor.rowcount > 0
+        if status is not None and old_status != status:
+            self._notify_portrait_changed(current["portrait_id"])
+        return cursor.rowcount > 0
 
     def get_videos_due_for_activation(self) -> List[Dict[str, Any]]:
         """Get videos that should be activated based on schedule."""
@@ -1897,14 +2788,15 @@ class Database:
             )
 
             self._connection.commit()
-            return cursor.rowcount > 0
+        self._notify_portrait_changed(current["portrait_id"])
+        return cursor.rowcount > 0
 
     def deactivate_video_with_history(self, video_id: str, reason: str = "schedule_deactivation", changed_by: str = "system") -> bool:
         """Deactivate video and record in history."""
         with self._lock:
             # Get current status
             cursor = self._execute(
-                "SELECT status FROM videos WHERE id = ?", (video_id,))
+                "SELECT status, portrait_id FROM videos WHERE id = ?", (video_id,))
             current = cursor.fetchone()
             if not current:
                 return False
@@ -1933,7 +2825,8 @@ class Database:
             )
 
             self._connection.commit()
-            return cursor.rowcount > 0
+        self._notify_portrait_changed(current["portrait_id"])
+        return cursor.rowcount > 0
 
     def archive_expired_videos(self) -> int:
         """Archive videos whose end_datetime has passed."""
@@ -1950,7 +2843,9 @@ class Database:
                 (now,),
             )
             self._connection.commit()
-            return cursor.rowcount
+        if cursor.rowcount:
+            self._notify_portrait_changed(None)
+        return cursor.rowcount
 
     def get_video_schedule_history(self, video_id: str) -> List[Dict[str, Any]]:
         """Get schedule change history for a video."""
@@ -2008,21 +2903,13 @@ class Database:
 
     def delete_video(self, video_id: str) -> bool:
         """Delete video."""
+        video = self.get_video(video_id)
         cursor = self._execute("DELETE FROM videos WHERE id = ?", (video_id,))
-        return cursor.rowcount > 0
-
-    # Dashboard/statistics helpers
-    def count_portraits(self, company_id: Optional[str] = None) -> int:
-        """Count portraits with optional company filter."""
-        query = "SELECT COUNT(*) as count FROM portraits"
-        params: List[Any] = []
-        if company_id:
-            query += " WHERE client_id IN (SELECT id FROM clients WHERE company_id = ?)"
-            params.append(company_id)
-        cursor = self._execute(query, tuple(params))
-        row = cursor.fetchone()
-        return row["count"] if row else 0
+        if video:
+            self._notify_portrait_changed(video["portrait_id"])
+        return cursor.rowcount > 0
 
+    # Dashboard/statistics helpers
     def count_videos(self, company_id: Optional[str] = None) -> int:
         """Count videos with optional company filter."""
         query = "SELECT COUNT(*) as count FROM videos"
@@ -2142,7 +3029,14 @@ class Database:
         search: Optional[str] = None,
         status: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        """Return portrait records with client info and active video details."""
+        """
+        Return portrait records with client info and active video details.
+
+        ``search`` matches client name and phone, permanent link and portrait
+        id. Results served by the full-text indexes are ordered by relevance
+        among the newest SEARCH_RANK_WINDOW matches of each index.
+        """
+        client_match = self._search_match(search, ("name", "phone"))
         base_query = [
             "SELECT",
             "    portraits.id AS portrait_id,",
@@ -2168,23 +3062,54 @@ class Database:
         ]
         params: List[Any] = []
         filters: List[str] = []
+        filter_params: List[Any] = []
         if company_id:
             filters.append("clients.company_id = ?")
-            params.append(company_id)
-        if search:
+            filter_params.append(company_id)
+        if status:
+            filters.append("portraits.lifecycle_status = ?")
+            filter_params.append(status)
+
+        if client_match:
+            # Newest filtered matches of each index, ranked; a portrait matching
+            # both indexes keeps its best rank
+            window = max(self.SEARCH_RANK_WINDOW, limit or 0)
+            where = "".join(f" AND {condition}" for condition in filters)
+            base_query[:0] = [
+                "WITH hits(portrait_rowid, score) AS (",
+                "    SELECT * FROM (SELECT portraits.rowid, portraits_fts.rank FROM portraits_fts",
+                "        JOIN portraits ON portraits.rowid = portraits_fts.rowid",
+                "        JOIN clients ON clients.id = portraits.client_id",
+                f"        WHERE portraits_fts MATCH ?{where} ORDER BY portraits_fts.rowid DESC LIMIT ?)",
+                "    UNION ALL",
+                "    SELECT * FROM (SELECT portraits.rowid, clients_fts.rank FROM clients_fts",
+                "        JOIN clients ON clients.rowid = clients_fts.rowid",
+                "        JOIN portraits ON portraits.client_id = clients.id",
+                f"        WHERE clients_fts MATCH ?{where} ORDER BY clients_fts.rowid DESC LIMIT ?)",
+                "), matches AS (",
+                "    SELECT portrait_rowid, MIN(score) AS score FROM hits GROUP BY portrait_rowid",
+                ")",
+            ]
+            base_query.insert(base_query.index("FROM portraits") + 1,
+                              "JOIN matches ON matches.portrait_rowid = portraits.rowid")
+            params.extend([self._search_match(search), *filter_params, window,
+                           client_match, *filter_params, window])
+            filters = []
+        elif search:
             search_like = f"%{search.lower()}%"
             filters.append(
                 "(LOWER(clients.name) LIKE ? OR clients.phone LIKE ? OR LOWER(portraits.permanent_link) LIKE ? OR LOWER(portraits.id) LIKE ?)"
             )
-            params.extend(
+            filter_params.extend(
                 [search_like, f"%{search}%", search_like, search_like])
-        if status:
-            filters.append("portraits.lifecycle_status = ?")
-            params.append(status)
+        params.extend(filter_params if filters else [])
         query = " ".join(base_query)
         if filters:
             query += " WHERE " + " AND ".join(filters)
-        query += " ORDER BY portraits.created_at DESC"
+        if client_match:
+            query += " ORDER BY matches.score, portraits.created_at DESC"
+        else:
+            query += " ORDER BY portraits.created_at DESC"
         if limit:
             query += " LIMIT ?"
             params.append(limit)
@@ -2432,7 +3357,8 @@ class Database:
         limit: int = 50,
         offset: int = 0,
         search: Optional[str] = None,
-        storage_type: Optional[str] = None
+        storage_type: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Get paginated list of companies with optional filtering.
@@ -2442,19 +3368,22 @@ class Database:
             offset: Number of companies to skip
             search: Optional search query (matches name)
             storage_type: Optional storage type filter
+            after: (name, id) of the last company of the previous page
+                (keyset pagination, used instead of ``offset``)
 
         Returns:
             List of company dicts with client_count
         """
+        # client_count is computed per listed company from the clients index
+        # instead of grouping all clients of all companies
         query = """
             SELECT c.id, c.name, c.created_at, c.storage_type, c.storage_connection_id,
                    c.yandex_disk_folder_id, c.storage_folder_path,
                    c.backup_provider, c.backup_remote_path,
                    c.email, c.description, c.city, c.phone, c.website, c.social_links,
                    c.manager_name, c.manager_phone, c.manager_email,
-                   COUNT(cl.id) as client_count
+                   (SELECT COUNT(*) FROM clients cl WHERE cl.company_id = c.id) as client_count
             FROM companies c
-            LEFT JOIN clients cl ON c.id = cl.company_id
             WHERE 1=1
         """
         params: List[Any] = []
@@ -2467,9 +3396,9 @@ class Database:
             query += " AND c.storage_type = ?"
             params.append(storage_type)
 
-        query += " GROUP BY c.id ORDER BY c.name ASC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-
+        query = self._paginate(
+            query, params, "c.name", "c.id", limit=limit, offset=offset, after=after, descending=False,
+        )
         cursor = self._execute(query, tuple(params))
         return [dict(row) for row in cursor.fetchall()]
 
@@ -2479,7 +3408,7 @@ class Database:
         storage_type: Optional[str] = None
     ) -> int:
         """
-        Count companies with optional filtering.
+        Count companies with optional filtering (cached until companies change).
 
         Args:
             search: Optional search query (matches name)
@@ -2499,9 +3428,7 @@ class Database:
             query += " AND storage_type = ?"
             params.append(storage_type)
 
-        cursor = self._execute(query, tuple(params))
-        row = cursor.fetchone()
-        return row['count'] if row else 0
+        return self._cached_count(("companies",), query, tuple(params))
 
     def update_company_storage(
         self,
@@ -2818,8 +3745,19 @@ class Database:
             return None
         return dict(row)
 
-    def list_projects(self, company_id: Optional[str] = None, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get list of projects with optional company filter and pagination."""
+    def list_projects(
+        self,
+        company_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[Tuple[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get list of projects with optional company filter and pagination.
+
+        ``after`` is the (created_at, id) of the last project of the previous
+        page (keyset pagination, used instead of ``offset``).
+        """
         query = "SELECT * FROM projects WHERE 1=1"
         params: List[Any] = []
 
@@ -2827,17 +3765,12 @@ class Database:
             query += " AND company_id = ?"
             params.append(company_id)
 
-        query += " ORDER BY created_at DESC"
-
-        if limit is not None:
-            query += " LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
-
+        query = self._paginate(query, params, "created_at", "id", limit=limit, offset=offset, after=after)
         cursor = self._execute(query, tuple(params))
         return [dict(row) for row in cursor.fetchall()]
 
     def count_projects(self, company_id: Optional[str] = None) -> int:
-        """Count projects with optional company filter."""
+        """Count projects with optional company filter (cached until projects change)."""
         query = "SELECT COUNT(*) as count FROM projects WHERE 1=1"
         params: List[Any] = []
 
@@ -2845,9 +3778,7 @@ class Database:
             query += " AND company_id = ?"
             params.append(company_id)
 
-        cursor = self._execute(query, tuple(params))
-        row = cursor.fetchone()
-        return row['count'] if row else 0
+        return self._cached_count(("projects",), query, tuple(params))
 
     def update_project(
         self,
@@ -3152,33 +4083,31 @@ class Database:
             return None
         return dict(row)
 
-    def list_folders(self, project_id: Optional[str] = None, company_id: Optional[str] = None, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get list of folders with optional project or company filter and pagination."""
-        query = "SELECT f.* FROM folders f"
-        params: List[Any] = []
-
-        # Join with projects table if filtering by company_id
-        if company_id:
-            query += " JOIN projects p ON f.project_id = p.id WHERE p.company_id = ?"
-            params.append(company_id)
-        else:
-            query += " WHERE 1=1"
-            if project_id:
-                query += " AND f.project_id = ?"
-                params.append(project_id)
-
-        query += " ORDER BY f.created_at DESC"
-
-        if limit is not None:
-            query += " LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
+    def list_folders(
+        self,
+        project_id: Optional[str] = None,
+        company_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[Tuple[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get list of folders with optional project or company filter and pagination.
 
+        ``after`` is the (created_at, id) of the last folder of the previous
+        page (keyset pagination, used instead of ``offset``).
+        """
+        query, params = self._folder_filters(project_id, company_id)
+        query = self._paginate(
+            "SELECT f.* " + query, params, "f.created_at", "f.id", limit=limit, offset=offset, after=after,
+        )
         cursor = self._execute(query, tuple(params))
         return [dict(row) for row in cursor.fetchall()]
 
-    def count_folders(self, project_id: Optional[str] = None, company_id: Optional[str] = None) -> int:
-        """Count folders with optional project or company filter."""
-        query = "SELECT COUNT(*) as count FROM folders f"
+    @staticmethod
+    def _folder_filters(project_id: Optional[str], company_id: Optional[str]) -> Tuple[str, List[Any]]:
+        """FROM/WHERE clause shared by the folder list and its count."""
+        query = "FROM folders f"
         params: List[Any] = []
 
         # Join with projects table if filtering by company_id
@@ -3191,9 +4120,13 @@ class Database:
                 query += " AND f.project_id = ?"
                 params.append(project_id)
 
-        cursor = self._execute(query, tuple(params))
-        row = cursor.fetchone()
-        return row['count'] if row else 0
+        return query, params
+
+    def count_folders(self, project_id: Optional[str] = None, company_id: Optional[str] = None) -> int:
+        """Count folders with optional project or company filter (cached until folders or projects change)."""
+        query, params = self._folder_filters(project_id, company_id)
+        tables = ("folders", "projects") if company_id else ("folders",)
+        return self._cached_count(tables, "SELECT COUNT(*) " + query, tuple(params))
 
     def update_folder(self, folder_id: str, name: Optional[str] = None, description: Optional[str] = None) -> bool:
         """Update folder data."""
@@ -3347,9 +4280,15 @@ class Database:
         limit: int = 50,
         offset: int = 0,
         notification_type: Optional[str] = None,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
     ) -> List[Dict[str, Any]]:
-        """Get list of notification history with optional filters."""
+        """
+        Get list of notification history with optional filters.
+
+        ``after`` is the (sent_at, id) of the last entry of the previous page
+        (keyset pagination, used instead of ``offset``).
+        """
         query = "SELECT * FROM notification_history WHERE 1=1"
         params: List[Any] = []
 
@@ -3361,9 +4300,7 @@ class Database:
             query += " AND status = ?"
             params.append(status)
 
-        query += " ORDER BY sent_at DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-
+        query = self._paginate(query, params, "sent_at", "id", limit=limit, offset=offset, after=after)
         cursor = self._execute(query, tuple(params))
         return [dict(row) for row in cursor.fetchall()]
 
@@ -3372,7 +4309,7 @@ class Database:
         notification_type: Optional[str] = None,
         status: Optional[str] = None
     ) -> int:
-        """Count notification history with optional filters."""
+        """Count notification history with optional filters (cached until the history changes)."""
         query = "SELECT COUNT(*) as count FROM notification_history WHERE 1=1"
         params: List[Any] = []
 
@@ -3384,9 +4321,7 @@ class Database:
             query += " AND status = ?"
             params.append(status)
 
-        cursor = self._execute(query, tuple(params))
-        row = cursor.fetchone()
-        return row['count'] if row else 0
+        return self._cached_count(("notification_history",), query, tuple(params))
 
     def cleanup_old_notification_history(self, days: int = 30) -> int:
         """Clean up notification history older than specified days."""
@@ -4222,6 +5157,364 @@ class Database:
         return cursor.rowcount
 
 
+    # ============================================================
+    # Marker Job Methods
+    # ============================================================
+
+    def create_marker_job(
+        self,
+        job_id: str,
+        portrait_id: str,
+        image_path: str,
+        marker_name: str,
+        config: Optional[str] = None,
+        cleanup_image: bool = False,
+        update_portrait: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Create a new NFT marker generation job.
+
+        Args:
+            job_id: Job identifier
+            portrait_id: Portrait (or AR content) the markers belong to
+            image_path: Local path of the source image
+            marker_name: Marker directory/file name
+            config: JSON-serialized NFTMarkerConfig
+            cleanup_image: Delete the source image once the job finishes
+            update_portrait: Write the result to the portrait row (background
+                jobs); False for jobs whose caller waits for the result
+
+        Returns:
+            Job dictionary
+        """
+        self._execute(
+            """
+            INSERT INTO marker_jobs (id, portrait_id, image_path, marker_name, config, cleanup_image, update_portrait, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?)
+            """,
+            (job_id, portrait_id, image_path, marker_name, config, int(cleanup_image), int(update_portrait), datetime.utcnow()),
+        )
+        return self.get_marker_job(job_id)
+
+    def update_marker_job(self, job_id: str, **kwargs) -> bool:
+        """
+        Update fields of a marker job.
+
+        Args:
+            job_id: Job identifier
+            **kwargs: Columns to update (status, progress, attempts, error,
+                started_at, completed_at, duration_ms)
+
+        Returns:
+            True if updated, False otherwise
+        """
+        allowed_fields = {"status", "progress", "attempts", "error", "started_at", "completed_at", "duration_ms"}
+        updates = []
+        params: List[Any] = []
+        for field, value in kwargs.items():
+            if field in allowed_fields:
+                updates.append(f"{field} = ?")
+                params.append(value)
+
+        if not updates:
+            return False
+
+        params.append(job_id)
+        cursor = self._execute(
+            f"UPDATE marker_jobs SET {', '.join(updates)} WHERE id = ?",
+            tuple(params),
+        )
+        return cursor.rowcount > 0
+
+    def get_marker_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get marker job by ID."""
+        cursor = self._execute(
+            "SELECT * FROM marker_jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(row)
+
+    def get_latest_marker_job(self, portrait_id: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent marker job for a portrait."""
+        cursor = self._execute(
+            """
+            SELECT * FROM marker_jobs
+            WHERE portrait_id = ?
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            (portrait_id,),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(row)
+
+    def get_unfinished_marker_jobs(self) -> List[Dict[str, Any]]:
+        """Get pending and running marker jobs (e.g. to resume after restart)."""
+        cursor = self._execute(
+            """
+            SELECT * FROM marker_jobs
+            WHERE status IN ('pending', 'running')
+            ORDER BY created_at ASC
+            """
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_marker_job_stats(self) -> Dict[str, int]:
+        """
+        Get marker job statistics.
+
+        Returns:
+            Dictionary with job counts per status
+        """
+        cursor = self._execute(
+            """
+            SELECT
+                status,
+                COUNT(*) as count
+            FROM marker_jobs
+            GROUP BY status
+            """
+        )
+
+        stats = {
+            "pending": 0,
+            "running": 0,
+            "completed": 0,
+            "failed": 0,
+            "total": 0,
+        }
+
+        for row in cursor.fetchall():
+            stats[row["status"]] = row["count"]
+            stats["total"] += row["count"]
+
+        return stats
+
+    # ============================================================
+    # Blob Methods
+    # ============================================================
+
+    def get_blob(self, content_hash: str, company_id: str, content_type: str) -> Optional[Dict[str, Any]]:
+        """Get a stored blob by content hash and storage scope."""
+        cursor = self._execute(
+            "SELECT * FROM blobs WHERE content_hash = ? AND company_id = ? AND content_type = ?",
+            (content_hash, company_id, content_type),
+        )
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def acquire_blob(
+        self,
+        content_hash: str,
+        company_id: str,
+        content_type: str,
+        storage_path: str,
+        size_bytes: int,
+    ) -> Dict[str, Any]:
+        """
+        Register a reference to a blob, creating it on first use.
+
+        Args:
+            content_hash: Content hash of the file
+            company_id: Company whose storage holds the blob ('' for default storage)
+            content_type: Storage content type (portraits, videos)
+            storage_path: Path of the stored file (used only when creating)
+            size_bytes: File size in bytes
+
+        Returns:
+            Blob dictionary with the updated refcount
+        """
+        now = datetime.utcnow()
+        self._execute(
+            """
+            INSERT INTO blobs (content_hash, company_id, content_type, storage_path, size_bytes, refcount, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+            ON CONFLICT(content_hash, company_id, content_type)
+            DO UPDATE SET refcount = refcount + 1, last_used_at = excluded.last_used_at
+            """,
+            (content_hash, company_id, content_type, storage_path, size_bytes, now, now),
+        )
+        return self.get_blob(content_hash, company_id, content_type)
+
+    def set_blob_preview(self, content_hash: str, company_id: str, content_type: str, preview_path: str) -> bool:
+        """Record the preview generated for a blob."""
+        cursor = self._execute(
+            "UPDATE blobs SET preview_path = ? WHERE content_hash = ? AND company_id = ? AND content_type = ?",
+            (preview_path, content_hash, company_id, content_type),
+        )
+        return cursor.rowcount > 0
+
+    def release_blob(self, content_hash: str, company_id: str, content_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Drop a reference to a blob.
+
+        Returns:
+            The blob dictionary if this was the last reference (the row is
+            deleted and the caller should remove the files), otherwise None
+        """
+        self._execute(
+            """
+            UPDATE blobs SET refcount = refcount - 1
+            WHERE content_hash = ? AND company_id = ? AND content_type = ? AND refcount > 0
+            """,
+            (content_hash, company_id, content_type),
+        )
+        blob = self.get_blob(content_hash, company_id, content_type)
+        if blob is None or blob["refcount"] > 0:
+            return None
+
+        self._execute(
+            "DELETE FROM blobs WHERE content_hash = ? AND company_id = ? AND content_type = ? AND refcount <= 0",
+            (content_hash, company_id, content_type),
+        )
+        return blob
+
+    def is_blob_hash_in_use(self, content_hash: str, content_type: str) -> bool:
+        """Check whether any storage scope still references the given content."""
+        cursor = self._execute(
+            "SELECT 1 FROM blobs WHERE content_hash = ? AND content_type = ? LIMIT 1",
+            (content_hash, content_type),
+        )
+        return cursor.fetchone() is not None
+
+    def list_ready_markers_for_blob(self, content_hash: str) -> List[Dict[str, Any]]:
+        """List marker paths of portraits with the given image content whose markers are ready."""
+        cursor = self._execute(
+            """
+            SELECT marker_fset, marker_fset3, marker_iset FROM portraits
+            WHERE blob_hash = ? AND marker_status = 'ready'
+            ORDER BY created_at DESC
+            """,
+            (content_hash,),
+        )
+        rows = cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    def upsert_preview(
+        self,
+        content_hash: str,
+        company_id: str,
+        content_type: str,
+        width: int,
+        height: int,
+        format: str,
+        storage_path: str,
+        size_bytes: int,
+    ) -> None:
+        """Register (or replace) a preview variant of stored content."""
+        self._execute(
+            """
+            INSERT INTO previews (content_hash, company_id, content_type, width, format, height, storage_path, size_bytes, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(content_hash, company_id, content_type, width, format)
+            DO UPDATE SET height = excluded.height, storage_path = excluded.storage_path,
+                          size_bytes = excluded.size_bytes, created_at = excluded.created_at
+            """,
+            (content_hash, company_id, content_type, width, format, height, storage_path, size_bytes, datetime.utcnow()),
+        )
+
+    def list_previews(self, content_hash: str, company_id: str, content_type: str) -> List[Dict[str, Any]]:
+        """List preview variants of stored content ordered by width."""
+        cursor = self._execute(
+            """
+            SELECT * FROM previews
+            WHERE content_hash = ? AND company_id = ? AND content_type = ?
+            ORDER BY width, format
+            """,
+            (content_hash, company_id, content_type),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_preview_variant(self, content_hash: str, content_type: str, width: int, format: str) -> Optional[Dict[str, Any]]:
+        """Get a preview variant of content from any storage scope (the bytes are identical)."""
+        cursor = self._execute(
+            """
+            SELECT * FROM previews
+            WHERE content_hash = ? AND content_type = ? AND width = ? AND format = ?
+            ORDER BY company_id LIMIT 1
+            """,
+            (content_hash, content_type, width, format),
+        )
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def list_previews_for_contents(self, content_type: str, content_hashes: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        List preview variants of several contents in one query.
+
+        Returns:
+            Mapping of content hash to variant rows ordered by width (one row per
+            width and format, whichever storage scope holds it)
+        """
+        hashes = sorted({content_hash for content_hash in content_hashes if content_hash})
+        if not hashes:
+            return {}
+        placeholders = ",".join("?" for _ in hashes)
+        cursor = self._execute(
+            f"""
+            SELECT * FROM previews
+            WHERE content_type = ? AND content_hash IN ({placeholders})
+            ORDER BY content_hash, width, format, company_id
+            """,
+            (content_type, *hashes),
+        )
+        variants: Dict[str, List[Dict[str, Any]]] = {}
+        seen = set()
+        for row in cursor.fetchall():
+            key = (row["content_hash"], row["width"], row["format"])
+            if key in seen:
+                continue
+            seen.add(key)
+            variants.setdefault(row["content_hash"], []).append(dict(row))
+        return variants
+
+    def get_preview_paths(self, kind: str, record_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get list preview paths of several portraits or videos in one query.
+
+        Args:
+            kind: 'portraits' or 'videos'
+            record_ids: Record IDs
+
+        Returns:
+            Mapping of record ID to preview path (missing records are omitted)
+        """
+        column = {"portraits": "image_preview_path", "videos": "video_preview_path"}[kind]
+        if not record_ids:
+            return {}
+        placeholders = ",".join("?" for _ in record_ids)
+        cursor = self._execute(
+            f"SELECT id, {column} AS preview_path FROM {kind} WHERE id IN ({placeholders})",
+            tuple(record_ids),
+        )
+        return {row["id"]: row["preview_path"] for row in cursor.fetchall()}
+
+    def delete_previews(self, content_hash: str, company_id: str, content_type: str) -> int:
+        """Remove all preview variant rows of stored content."""
+        cursor = self._execute(
+            "DELETE FROM previews WHERE content_hash = ? AND company_id = ? AND content_type = ?",
+            (content_hash, company_id, content_type),
+        )
+        return cursor.rowcount
+
+    def get_blob_stats(self) -> Dict[str, Any]:
+        """Get blob deduplication statistics."""
+        cursor = self._execute(
+            """
+            SELECT COUNT(*) AS blobs,
+                   COALESCE(SUM(refcount), 0) AS references_count,
+                   COALESCE(SUM(size_bytes), 0) AS stored_bytes,
+                   COALESCE(SUM(size_bytes * (refcount - 1)), 0) AS saved_bytes
+            FROM blobs
+            """
+        )
+        row = cursor.fetchone()
+        return dict(row) if row else {"blobs": 0, "references_count": 0, "stored_bytes": 0, "saved_bytes": 0}
+
+
 def ensure_default_admin_user(database: "Database") -> None:
     """Ensure the default admin user exists in the provided database instance."""
     from app.config import settings
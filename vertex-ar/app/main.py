@@ -114,6 +114,8 @@ def create_app() -> FastAPI:
         default_ttl=settings.CACHE_TTL,
         max_size=settings.CACHE_MAX_SIZE,
         enabled=settings.CACHE_ENABLED,
+        max_memory_mb=settings.CACHE_MAX_MEMORY_MB,
+        version_ttl=settings.CACHE_VERSION_TTL,
     )
     logger.info(
         "Cache manager initialized",
@@ -125,7 +127,12 @@ def create_app() -> FastAPI:
     # Initialize database
     global database
     from app.database import Database, ensure_default_admin_user, ensure_default_company
-    database = Database(settings.DB_PATH)
+    database = Database(
+        settings.DB_PATH,
+        reader_connections=settings.DB_READER_CONNECTIONS,
+        cache_size_kb=settings.DB_CACHE_SIZE_KB,
+        mmap_size_mb=settings.DB_MMAP_SIZE_MB,
+    )
     app.state.database = database
     ensure_default_admin_user(app.state.database)
     ensure_default_company(app.state.database)
@@ -144,7 +151,10 @@ def create_app() -> FastAPI:
         lockout_minutes=settings.AUTH_LOCKOUT_MINUTES
     )
     app.state.tokens = TokenManager(
-        session_timeout_minutes=settings.SESSION_TIMEOUT_MINUTES
+        session_timeout_minutes=settings.SESSION_TIMEOUT_MINUTES,
+        cache_ttl_seconds=settings.SESSION_CACHE_TTL_SECONDS,
+        version_check_interval=settings.SESSION_VERSION_CHECK_INTERVAL,
+        last_seen_flush_interval=settings.SESSION_LAST_SEEN_FLUSH_INTERVAL,
     )
 
     # Initialize storage manager
@@ -157,8 +167,16 @@ def create_app() -> FastAPI:
     # Initialize templates
     app.state.templates = Jinja2Templates(directory=str(settings.BASE_DIR / "templates"))
 
+    # Initialize public viewer page cache, invalidated on active video changes
+    from app.services.viewer_cache import ViewerCache
+    app.state.viewer_cache = ViewerCache(
+        ttl=settings.VIEWER_CACHE_TTL,
+        max_entries=settings.VIEWER_CACHE_MAX_ENTRIES,
+    )
+    database.add_portrait_change_listener(app.state.viewer_cache.invalidate_portrait)
+
     # Register API routes
-    from app.api import auth, ar, admin, clients, companies, projects, folders, portraits, videos, health, users, notifications as notifications_api, notifications_management, notification_settings, orders, backups, monitoring, mobile, remote_storage, storage_config, storage_management, yandex_disk, email_templates
+    from app.api import auth, ar, admin, clients, companies, projects, folders, portraits, previews, videos, health, users, notifications as notifications_api, notifications_management, notification_settings, orders, backups, monitoring, mobile, remote_storage, storage_config, storage_management, yandex_disk, email_templates
 
     app.include_router(auth.router, prefix="/auth", tags=["auth"])
     app.include_router(users.router, prefix="/users", tags=["users"])
@@ -170,6 +188,7 @@ def create_app() -> FastAPI:
     app.include_router(clients.router, prefix="/clients", tags=["clients"])
     app.include_router(portraits.router, prefix="/portraits", tags=["portraits"])
     app.include_router(videos.router, prefix="/videos", tags=["videos"])
+    app.include_router(previews.router, prefix="/previews", tags=["previews"])
     app.include_router(orders.router, prefix="/orders", tags=["orders"])
     app.include_router(orders.legacy_router, prefix="/api/orders", tags=["orders"])
     app.include_router(backups.router, tags=["backups"])
@@ -217,52 +236,78 @@ def create_app() -> FastAPI:
     @app.get("/portrait/{permanent_link}", response_class=fastapi.responses.HTMLResponse)
     async def view_portrait(request: Request, permanent_link: str):
         """Public endpoint to view AR portrait by permanent link."""
+        from app.services.preview_urls import etag_matches
+        from app.services.view_counters import PORTRAIT_VIEWS, get_view_counter_buffer
+
         database = app.state.database
-        portrait = database.get_portrait_by_link(permanent_link)
+        viewer_cache = app.state.viewer_cache
+        origin = f"{request.url.scheme}://{request.url.netloc}"
 
-        if not portrait:
-            raise fastapi.HTTPException(
-                status_code=fastapi.status.HTTP_404_NOT_FOUND,
-                detail="Portrait not found"
-            )
+        page = viewer_cache.get(permanent_link, origin)
+        if page is None:
+            generation = viewer_cache.generation
+            portrait = database.get_portrait_by_link(permanent_link)
 
-        # Increment view count
-        database.increment_portrait_views(portrait["id"])
+            if not portrait:
+                raise fastapi.HTTPException(
+                    status_code=fastapi.status.HTTP_404_NOT_FOUND,
+                    detail="Portrait not found"
+                )
 
-        # Get active video for this portrait
-        active_video = database.get_active_video(portrait["id"])
+            # Get active video for this portrait
+            active_video = database.get_active_video(portrait["id"])
 
-        # Determine portrait status based on video availability and status
-        portrait_status = "active"
-        video_url = None
+            # Determine portrait status based on video availability and status
+            portrait_status = "active"
+            video_url = None
 
-        if not active_video:
-            # No active video - treat as archived
-            portrait_status = "archived"
-        else:
-            # Check video status field (if it exists)
-            video_status = active_video.get("status", "active")
-            if video_status == "archived":
-                portrait_status = "archived"
-            elif video_status == "inactive":
+            if not active_video:
+                # No active video - treat as archived
                 portrait_status = "archived"
             else:
-                # Video is active - prepare URL
-                storage_manager = app.state.storage_manager
-                video_url = storage_manager.get_public_url(active_video['video_path'], "videos")
-                portrait_status = "active"
-
-        # Prepare portrait data for AR viewer
-        portrait_data = {
-            "id": portrait["id"],
-            "permanent_link": portrait["permanent_link"],
-            "video_url": video_url,
-            "view_count": portrait["view_count"],
-            "status": portrait_status
-        }
+                # Check video status field (if it exists)
+                video_status = active_video.get("status", "active")
+                if video_status == "archived":
+                    portrait_status = "archived"
+                elif video_status == "inactive":
+                    portrait_status = "archived"
+                else:
+                    # Video is active - prepare URL
+                    storage_manager = app.state.storage_manager
+                    video_url = storage_manager.get_public_url(active_video['video_path'], "videos")
+                    portrait_status = "active"
+
+            # Markers live where they were generated (shared by content hash
+            # for deduplicated images); AR.js appends .fset/.fset3/.iset
+            from app.api.mobile import _marker_url
+            fset_url = _marker_url(
+                portrait.get("marker_fset"), origin, settings.STORAGE_ROOT,
+                f"{portrait['id']}/{portrait['id']}.fset",
+            )
 
-        templates = app.state.templates
-        return templates.TemplateResponse("ar_page.html", {"request": request, "record": portrait_data})
+            # Prepare portrait data for AR viewer
+            portrait_data = {
+                "id": portrait["id"],
+                "permanent_link": portrait["permanent_link"],
+                "video_url": video_url,
+                "marker_url": fset_url.removesuffix(".fset"),
+                "status": portrait_status
+            }
+
+            template = app.state.templates.get_template("ar_page.html")
+            body = template.render({"request": request, "record": portrait_data}).encode("utf-8")
+            page = viewer_cache.set(permanent_link, origin, portrait["id"], body, generation=generation)
+
+        # Increment view count (buffered, flushed in batches)
+        get_view_counter_buffer(database).increment(PORTRAIT_VIEWS, page.portrait_id)
+
+        headers = {
+            "ETag": page.etag,
+            "Cache-Control": "public, no-cache",
+        }
+        if etag_matches(request.headers.get("if-none-match"), page.etag):
+            return fastapi.Response(status_code=fastapi.status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return fastapi.responses.HTMLResponse(content=page.body, headers=headers)
 
     # Start background monitoring tasks
     if settings.ALERTING_ENABLED:
@@ -336,6 +381,42 @@ def create_app() -> FastAPI:
         except Exception as e:
             logger.error("Failed to start persistent email queue", error=str(e), exc_info=e)
 
+    # Start write-behind view/click counter flushing
+    @app.on_event("startup")
+    async def start_view_counter_buffer():
+        """Start periodic flushing of buffered view/click counters."""
+        try:
+            from app.services.view_counters import get_view_counter_buffer
+
+            counter_buffer = get_view_counter_buffer(
+                database,
+                settings.VIEW_COUNTER_FLUSH_INTERVAL,
+                cache_manager=getattr(app.state, "cache_manager", None),
+            )
+            app.state.view_counter_buffer = counter_buffer
+            await counter_buffer.start()
+        except Exception as e:
+            logger.error("Failed to start view counter buffer", error=str(e), exc_info=e)
+
+    # Start NFT marker generation job queue
+    @app.on_event("startup")
+    async def start_marker_job_queue():
+        """Start marker job queue and resume unfinished marker jobs."""
+        try:
+            from app.services.marker_jobs import get_marker_job_queue
+
+            queue = get_marker_job_queue(
+                database=database,
+                storage_root=settings.STORAGE_ROOT,
+                max_workers=settings.MARKER_JOB_WORKERS,
+                cache_manager=getattr(app.state, "cache_manager", None),
+            )
+            app.state.marker_job_queue = queue
+            await queue.start()
+            logger.info(f"Marker job queue started with {queue.max_workers} workers")
+        except Exception as e:
+            logger.error("Failed to start marker job queue", error=str(e), exc_info=e)
+
     # Start in-memory email queue processor (fallback/urgent emails)
     @app.on_event("startup")
     async def start_email_queue_processor():
@@ -410,6 +491,9 @@ def create_app() -> FastAPI:
             asyncio.create_task(cleanup_expired_sessions())
             logger.info("Session cleanup task started")
 
+            # Coalesce session last_seen updates into periodic batched writes
+            await app.state.tokens.start()
+
         except Exception as e:
             logger.error("Failed to start session cleanup task", error=str(e), exc_info=e)
 
@@ -425,6 +509,35 @@ def create_app() -> FastAPI:
             logger.error("Failed to stop persistent email queue", error=str(e), exc_info=e)
 
 
+    @app.on_event("shutdown")
+    async def stop_session_last_seen_flush():
+        """Write buffered session last_seen updates."""
+        try:
+            await app.state.tokens.stop()
+        except Exception as e:
+            logger.error("Failed to flush session last_seen", error=str(e), exc_info=e)
+
+
+    @app.on_event("shutdown")
+    async def stop_view_counter_buffer():
+        """Flush buffered view/click counters."""
+        try:
+            if hasattr(app.state, "view_counter_buffer"):
+                await app.state.view_counter_buffer.stop()
+        except Exception as e:
+            logger.error("Failed to flush view counters", error=str(e), exc_info=e)
+
+
+    @app.on_event("shutdown")
+    async def stop_marker_job_queue():
+        """Stop marker job queue and its worker processes."""
+        try:
+            if hasattr(app.state, "marker_job_queue"):
+                await app.state.marker_job_queue.stop()
+        except Exception as e:
+            logger.error("Failed to stop marker job queue", error=str(e), exc_info=e)
+
+
     @app.on_event("shutdown")
     async def stop_notification_services():
         """Stop notification center background services."""
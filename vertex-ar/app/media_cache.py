@@ -0,0 +1,406 @@
+"""
+Local read-through disk cache for media kept on remote storage.
+
+Companies on Yandex Disk or MinIO storage otherwise pay a remote round trip
+for every preview or video fetch. Files fetched through a remote adapter are
+kept on local disk under the SHA-256 of their storage identity (adapter
+namespace + path), evicted least recently used first once the cache exceeds
+its byte budget. Concurrent misses for the same file share one remote fetch,
+and cached files can be served from disk with FileResponse. Fills stream
+the remote file to disk in chunks, so a large video is never held in memory.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Set, Tuple
+
+from app.storage import StorageAdapter
+from app.storage_io import get_storage_executor
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+class MediaCache:
+    """
+    Size-bounded LRU disk cache of remote storage files.
+
+    Files are written to a temporary name and renamed into place, so readers
+    never see a partial file. Recency survives restarts through file mtimes.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        """
+        Initialize cache and index the files already on disk.
+
+        Args:
+            root: Cache directory
+            max_bytes: Byte budget; least recently used files are evicted above it
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._objects = self.root / "objects"
+        self._tmp = self.root / "tmp"
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._tmp.mkdir(parents=True, exist_ok=True)
+        self._io = get_storage_executor("local")
+        self._lock = threading.Lock()
+        # key -> size in bytes, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Keys being written by tee() from a response stream
+        self._teeing: Set[str] = set()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "fetch_errors": 0,
+            "bytes_saved": 0,
+            "bytes_fetched": 0,
+            "evictions": 0,
+            "evicted_bytes": 0,
+        }
+        self._load()
+
+    def _load(self) -> None:
+        """Rebuild the index from disk, oldest access first, and drop partial writes."""
+        for partial in self._tmp.iterdir():
+            partial.unlink(missing_ok=True)
+        files = []
+        for path in self._objects.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, path.name, stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._unlink(self._evict_locked(keep=None))
+        logger.info("Media cache loaded", root=str(self.root), entries=len(self._entries), size_bytes=self._total_bytes)
+
+    @staticmethod
+    def key(namespace: str, file_path: str) -> str:
+        """Cache key of a file: hash of the storage it lives on and its path."""
+        return hashlib.sha256(f"{namespace}\n{file_path}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._objects / key[:2] / key
+
+    def contains(self, namespace: str, file_path: str) -> bool:
+        """Whether a storage path is cached (without counting a hit)."""
+        with self._lock:
+            return self.key(namespace, file_path) in self._entries
+
+    def lookup(self, namespace: str, file_path: str) -> Optional[Path]:
+        """Return the cached file of a storage path, or None when it is not cached."""
+        key = self.key(namespace, file_path)
+        with self._lock:
+            size = self._entries.get(key)
+            if size is None:
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            # Recency for the index rebuilt on restart
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                if self._entries.pop(key, None) is not None:
+                    self._total_bytes -= size
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+            self.stats["bytes_saved"] += size
+        return path
+
+    async def get_path(self, adapter: StorageAdapter, file_path: str) -> Path:
+        """
+        Return a local copy of a remote file, fetching it on a miss.
+
+        Raises:
+            Whatever the adapter raises when the file cannot be fetched
+        """
+        path = self.lookup(adapter.cache_namespace, file_path)
+        if path is not None:
+            return path
+        # Shielded: a cancelled request does not abort a fill others wait for
+        return await asyncio.shield(self._fill(adapter, file_path))
+
+    async def get_bytes(self, adapter: StorageAdapter, file_path: str) -> bytes:
+        """Return the content of a remote file, read through the cache."""
+        path = await self.get_path(adapter, file_path)
+        try:
+            return await self._io.run(path.read_bytes)
+        except FileNotFoundError:
+            # Evicted between the fill and the read
+            return await adapter.get_file(file_path)
+
+    def prefetch(self, adapter: StorageAdapter, file_path: str) -> None:
+        """Fill the cache with a remote file in the background."""
+        if not self.contains(adapter.cache_namespace, file_path):
+            self._fill(adapter, file_path)
+
+    def invalidate(self, namespace: str, file_path: str) -> None:
+        """Drop a file from the cache (after it changed or was deleted remotely)."""
+        key = self.key(namespace, file_path)
+        with self._lock:
+            size = self._entries.pop(key, None)
+            if size is None:
+                return
+            self._total_bytes -= size
+        self._path(key).unlink(missing_ok=True)
+
+    def _fill(self, adapter: StorageAdapter, file_path: str) -> asyncio.Task:
+        """Start (or join) the remote fetch of a file into the cache."""
+        key = self.key(adapter.cache_namespace, file_path)
+        task = self._inflight.get(key)
+        with self._lock:
+            self.stats["misses"] += 1
+            if task is not None:
+                self.stats["coalesced"] += 1
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(adapter, file_path, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._fill_done(key, done))
+        return task
+
+    def _fill_done(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            with self._lock:
+                self.stats["fetch_errors"] += 1
+
+    async def _fetch(self, adapter: StorageAdapter, file_path: str, key: str) -> Path:
+        partial, f = await self._io.run(self._open_partial, key)
+        size = 0
+        try:
+            async for chunk in adapter.iter_file(file_path):
+                await self._io.run(f.write, chunk)
+                size += len(chunk)
+            await self._io.run(f.close)
+            return await self._io.run(self._commit, key, partial, size)
+        except BaseException:
+            self._discard(partial, f)
+            raise
+
+    async def tee(
+        self, adapter: StorageAdapter, file_path: str, chunks: AsyncIterator[bytes]
+    ) -> AsyncIterator[bytes]:
+        """
+        Pass a stream of a whole remote file through, keeping a copy in the cache.
+
+        The copy is committed only once the stream has been consumed to the
+        end; a client that disconnects early leaves nothing behind. Nothing is
+        written when the file is already cached or being fetched, and a cache
+        write error never interrupts the stream.
+        """
+        key = self.key(adapter.cache_namespace, file_path)
+        with self._lock:
+            busy = key in self._entries or key in self._inflight or key in self._teeing
+            if not busy:
+                self.stats["misses"] += 1
+        if busy:
+            async for chunk in chunks:
+                yield chunk
+            return
+
+        self._teeing.add(key)
+        partial, f = None, None
+        size = 0
+        committed = False
+        try:
+            try:
+                partial, f = await self._io.run(self._open_partial, key)
+            except OSError as exc:
+                logger.warning("Media cache tee failed", file_path=file_path, error=str(exc))
+            async for chunk in chunks:
+                if f is not None:
+                    try:
+                        await self._io.run(f.write, chunk)
+                    except OSError as exc:
+                        logger.warning("Media cache tee failed", file_path=file_path, error=str(exc))
+                        self._discard(partial, f)
+                        partial, f = None, None
+                size += len(chunk)
+                yield chunk
+            if f is not None:
+                try:
+                    await self._io.run(f.close)
+                    await self._io.run(self._commit, key, partial, size)
+                    committed = True
+                except OSError as exc:
+                    logger.warning("Media cache tee failed", file_path=file_path, error=str(exc))
+        finally:
+            self._teeing.discard(key)
+            if partial is not None and not committed:
+                self._discard(partial, f)
+
+    def _open_partial(self, key: str) -> Tuple[Path, BinaryIO]:
+        """Open a temporary file a fill of ``key`` is written to."""
+        partial = self._tmp / f"{key}.{uuid.uuid4().hex}"
+        return partial, open(partial, "wb")
+
+    @staticmethod
+    def _discard(partial: Path, f: BinaryIO) -> None:
+        """Drop a partial write that failed or was cancelled."""
+        f.close()
+        partial.unlink(missing_ok=True)
+
+    def _commit(self, key: str, partial: Path, size: int) -> Path:
+        """Atomically move a completed partial write into place and evict down to the byte budget."""
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        os.replace(partial, path)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous
+            self._entries[key] = size
+            self._total_bytes += size
+            self.stats["bytes_fetched"] += size
+            evicted = self._evict_locked(keep=key)
+        self._unlink(evicted)
+        return path
+
+    def _evict_locked(self, keep: Optional[str]) -> List[str]:
+        """Pop least recently used entries above the budget (caller holds the lock)."""
+        evicted = []
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                # A file larger than the whole budget stays until the next fill
+                break
+            del self._entries[key]
+            self._total_bytes -= size
+            self.stats["evictions"] += 1
+            self.stats["evicted_bytes"] += size
+            evicted.append(key)
+        return evicted
+
+    def _unlink(self, keys: List[str]) -> None:
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return size, hit ratio, bytes saved and eviction counters."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update({
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "inflight": len(self._inflight),
+            })
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_media_cache: Optional[MediaCache] = None
+_media_cache_lock = threading.Lock()
+
+
+def get_media_cache() -> Optional[MediaCache]:
+    """Get the shared media cache, or None when MEDIA_CACHE_ENABLED is off."""
+    global _media_cache
+    from app.config import settings
+
+    if not settings.MEDIA_CACHE_ENABLED:
+        return None
+    with _media_cache_lock:
+        if _media_cache is None:
+            _media_cache = MediaCache(settings.MEDIA_CACHE_DIR, settings.MEDIA_CACHE_MAX_MB * 1024 * 1024)
+        return _media_cache
+
+
+def invalidate_cached(adapter: StorageAdapter, file_path: str) -> None:
+    """Drop a remote file from the media cache after it was replaced or deleted."""
+    cache = get_media_cache()
+    if cache is not None and adapter.cache_namespace is not None:
+        cache.invalidate(adapter.cache_namespace, file_path)
+
+
+async def delete_through(adapter: StorageAdapter, file_path: str) -> bool:
+    """Delete a file through an adapter, dropping its cached copy first."""
+    invalidate_cached(adapter, file_path)
+    return await adapter.delete_file(file_path)
+
+
+async def read_through(adapter: StorageAdapter, file_path: str) -> bytes:
+    """Read a file from an adapter, through the media cache when it is remote."""
+    cache = get_media_cache()
+    if cache is None or adapter.cache_namespace is None:
+        return await adapter.get_file(file_path)
+    return await cache.get_bytes(adapter, file_path)
+
+
+async def cached_path(adapter: StorageAdapter, file_path: str) -> Optional[Path]:
+    """Local copy of a remote file to serve with FileResponse, or None when not cacheable."""
+    cache = get_media_cache()
+    if cache is None or adapter.cache_namespace is None:
+        return None
+    return await cache.get_path(adapter, file_path)
+
+
+async def warm_media_cache(
+    database,
+    storage_manager,
+    limit: int = 100,
+    since_days: int = 7,
+    concurrency: int = 4,
+) -> Dict[str, int]:
+    """
+    Prefetch the active videos of recently viewed portraits into the cache.
+
+    Args:
+        database: Database instance
+        storage_manager: StorageManager resolving each company's adapter
+        limit: Maximum number of portraits to warm
+        since_days: Only portraits viewed within this many days
+        concurrency: Parallel remote fetches
+
+    Returns:
+        Counts of warmed, already cached, local (skipped) and failed videos
+    """
+    cache = get_media_cache()
+    result = {"warmed": 0, "cached": 0, "local": 0, "failed": 0}
+    if cache is None:
+        return result
+
+    rows = database.list_recently_viewed_active_videos(since_days=since_days, limit=limit)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm(row: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        adapter = storage_manager.get_adapter_for_content(row.get("company_id"), "videos")
+        if adapter.cache_namespace is None:
+            return "local", None
+        if cache.contains(adapter.cache_namespace, row["video_path"]):
+            return "cached", None
+        async with semaphore:
+            try:
+                await cache.get_path(adapter, row["video_path"])
+                return "warmed", None
+            except Exception as exc:
+                return "failed", str(exc)
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(warm(row) for row in rows))
+    for row, (outcome, error) in zip(rows, outcomes):
+        result[outcome] += 1
+        if error:
+            logger.warning("Media cache warmup failed", portrait_id=row["portrait_id"], error=error)
+    logger.info(
+        "Media cache warmed",
+        portraits=len(rows),
+        duration_seconds=round(time.perf_counter() - started, 3),
+        **result,
+    )
+    return result
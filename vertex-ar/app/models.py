@@ -530,6 +530,7 @@ class PaginatedCompaniesResponse(BaseModel):
     page: int = Field(default=1, description="Current page number")
     page_size: int = Field(default=50, description="Items per page")
     total_pages: int = Field(default=1, description="Total number of pages")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page, None on the last page")
 
 
 # Client models
@@ -601,7 +602,7 @@ class ClientResponse(BaseModel):
 
 class ClientListItem(ClientResponse):
     portraits_count: int = 0
-    latest_portrait_preview: Optional[str] = None  # Base64 encoded preview of latest portrait
+    latest_portrait_preview: Optional[str] = None  # Versioned preview URL of latest portrait
     company_id: Optional[str] = None
 
 
@@ -611,6 +612,7 @@ class PaginatedClientsResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page, None on the last page")
 
 
 class BulkIdsRequest(BaseModel):
@@ -710,6 +712,7 @@ class PaginatedProjectsResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page, None on the last page")
 
 
 # Folder models
@@ -761,6 +764,7 @@ class PaginatedFoldersResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page, None on the last page")
 
 
 # Order models
@@ -814,6 +818,7 @@ class PortraitResponse(BaseModel):
     subscription_end: Optional[str] = None
     lifecycle_status: Optional[str] = "active"
     last_status_change: Optional[str] = None
+    marker_status: Optional[str] = "ready"  # NFT marker generation status
 
 
 # Video models
@@ -991,6 +996,7 @@ class PaginatedNotificationHistoryResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page, None on the last page")
 
 
 # Email Template models
@@ -71,6 +71,47 @@ process_history_count_gauge = Gauge('vertex_ar_process_history_count', 'Number o
 process_trend_cpu_gauge = Gauge('vertex_ar_process_trend_cpu_avg', 'Average CPU usage for tracked process', ['pid'], registry=registry)
 process_trend_rss_gauge = Gauge('vertex_ar_process_trend_rss_mb', 'Average RSS memory for tracked process in MB', ['pid'], registry=registry)
 
+# Write-behind view/click counter metrics
+view_counter_buffer_size_gauge = Gauge('vertex_ar_view_counter_buffer_size', 'Records with unflushed view/click increments', registry=registry)
+view_counter_pending_gauge = Gauge('vertex_ar_view_counter_pending_increments', 'Unflushed view/click increments', registry=registry)
+view_counter_lag_gauge = Gauge('vertex_ar_view_counter_lag_seconds', 'Age of the oldest unflushed view/click increment', registry=registry)
+view_counter_flushed_counter = Counter('vertex_ar_view_counter_flushed_total', 'View/click increments written to the database', registry=registry)
+view_counter_flush_errors_counter = Counter('vertex_ar_view_counter_flush_errors_total', 'Failed view/click counter flushes', registry=registry)
+
+# Storage I/O executor metrics
+storage_io_queue_depth_gauge = Gauge('vertex_ar_storage_io_queue_depth', 'Blocking storage calls waiting for a worker', ['adapter'], registry=registry)
+storage_io_active_gauge = Gauge('vertex_ar_storage_io_active', 'Blocking storage calls running', ['adapter'], registry=registry)
+storage_io_workers_gauge = Gauge('vertex_ar_storage_io_workers', 'Storage I/O executor size', ['adapter'], registry=registry)
+storage_io_wait_gauge = Gauge('vertex_ar_storage_io_wait_ms', 'Recent storage I/O queue wait time', ['adapter', 'quantile'], registry=registry)
+storage_io_run_gauge = Gauge('vertex_ar_storage_io_run_ms', 'Recent storage I/O call duration', ['adapter', 'quantile'], registry=registry)
+storage_io_completed_counter = Counter('vertex_ar_storage_io_completed_total', 'Storage I/O calls completed', ['adapter'], registry=registry)
+storage_io_errors_counter = Counter('vertex_ar_storage_io_errors_total', 'Storage I/O calls that raised', ['adapter'], registry=registry)
+
+# Local media cache metrics
+media_cache_hits_counter = Counter('vertex_ar_media_cache_hits_total', 'Remote media reads served from the local cache', registry=registry)
+media_cache_misses_counter = Counter('vertex_ar_media_cache_misses_total', 'Remote media reads that missed the local cache', registry=registry)
+media_cache_hit_ratio_gauge = Gauge('vertex_ar_media_cache_hit_ratio', 'Local media cache hit ratio', registry=registry)
+media_cache_bytes_saved_counter = Counter('vertex_ar_media_cache_bytes_saved_total', 'Remote bytes not downloaded thanks to the cache', registry=registry)
+media_cache_evictions_counter = Counter('vertex_ar_media_cache_evictions_total', 'Files evicted from the local media cache', registry=registry)
+media_cache_size_gauge = Gauge('vertex_ar_media_cache_size_bytes', 'Bytes held by the local media cache', registry=registry)
+media_cache_entries_gauge = Gauge('vertex_ar_media_cache_entries', 'Files held by the local media cache', registry=registry)
+
+
+# Last exported value of each counter that mirrors a running total kept elsewhere
+_mirrored_totals: Dict[Any, float] = {}
+
+
+def _advance_counter(counter, total: float) -> None:
+    """
+    Advance a Counter (or a labelled child) to a running total from a stats snapshot.
+
+    Totals only grow while their source lives; a smaller total means the
+    source was recreated, so all of it counts as new increments.
+    """
+    previous = _mirrored_totals.get(counter, 0)
+    counter.inc(total - previous if total >= previous else total)
+    _mirrored_totals[counter] = total
+
 
 class PrometheusExporter:
     """Exports monitoring metrics in Prometheus format."""
@@ -253,8 +294,65 @@ class PrometheusExporter:
         
         return generate_latest(registry)
     
+    def update_view_counter_metrics(self):
+        """Update view counter buffer metrics (cheap, refreshed on every scrape)."""
+        try:
+            from app.services.view_counters import get_view_counter_buffer
+
+            counter_buffer = get_view_counter_buffer()
+            if counter_buffer is None:
+                return
+            stats = counter_buffer.get_stats()
+            view_counter_buffer_size_gauge.set(stats["buffer_size"])
+            view_counter_pending_gauge.set(stats["pending_increments"])
+            view_counter_lag_gauge.set(stats["lag_seconds"])
+            _advance_counter(view_counter_flushed_counter, stats["flushed_increments"])
+            _advance_counter(view_counter_flush_errors_counter, stats["flush_errors"])
+        except Exception as e:
+            logger.debug(f"Could not update view counter metrics: {e}")
+
+    def update_storage_io_metrics(self):
+        """Update storage I/O executor metrics (cheap, refreshed on every scrape)."""
+        try:
+            from app.storage_io import get_storage_executors
+
+            for name, executor in get_storage_executors().items():
+                stats = executor.get_stats()
+                storage_io_queue_depth_gauge.labels(adapter=name).set(stats["queue_depth"])
+                storage_io_active_gauge.labels(adapter=name).set(stats["active"])
+                storage_io_workers_gauge.labels(adapter=name).set(stats["max_workers"])
+                _advance_counter(storage_io_completed_counter.labels(adapter=name), stats["completed"])
+                _advance_counter(storage_io_errors_counter.labels(adapter=name), stats["errors"])
+                for quantile in ("p50", "p99"):
+                    storage_io_wait_gauge.labels(adapter=name, quantile=quantile).set(stats[f"wait_{quantile}_ms"])
+                    storage_io_run_gauge.labels(adapter=name, quantile=quantile).set(stats[f"run_{quantile}_ms"])
+        except Exception as e:
+            logger.debug(f"Could not update storage I/O metrics: {e}")
+
+    def update_media_cache_metrics(self):
+        """Update local media cache metrics (cheap, refreshed on every scrape)."""
+        try:
+            from app.media_cache import get_media_cache
+
+            cache = get_media_cache()
+            if cache is None:
+                return
+            stats = cache.get_stats()
+            _advance_counter(media_cache_hits_counter, stats["hits"])
+            _advance_counter(media_cache_misses_counter, stats["misses"])
+            media_cache_hit_ratio_gauge.set(stats["hit_ratio"])
+            _advance_counter(media_cache_bytes_saved_counter, stats["bytes_saved"])
+            _advance_counter(media_cache_evictions_counter, stats["evictions"])
+            media_cache_size_gauge.set(stats["size_bytes"])
+            media_cache_entries_gauge.set(stats["entries"])
+        except Exception as e:
+            logger.debug(f"Could not update media cache metrics: {e}")
+
     def get_metrics(self) -> str:
         """Get current metrics in Prometheus format."""
+        self.update_view_counter_metrics()
+        self.update_storage_io_metrics()
+        self.update_media_cache_metrics()
         return self.update_metrics()
 
 
@@ -0,0 +1,335 @@
+"""
+Content-addressed blob storage for Vertex AR.
+Stores each uploaded image or video once per storage scope, shares previews and
+NFT markers between records with identical content, and removes files only
+when the last reference goes away.
+"""
+import asyncio
+import hashlib
+import shutil
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.media_cache import delete_through, invalidate_cached
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+MARKER_FIELDS = ("marker_fset", "marker_fset3", "marker_iset")
+
+
+def content_hasher():
+    """Return a new incremental hasher producing blob content hashes."""
+    return hashlib.blake2b(digest_size=32)
+
+
+def hash_content(data: bytes) -> str:
+    """Return the content hash used to address blobs."""
+    hasher = content_hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def blob_storage_path(content_type: str, content_hash: str, suffix: str = "") -> str:
+    """Return the storage path of a blob, fanned out by hash prefix."""
+    return f"{content_type}/blobs/{content_hash[:2]}/{content_hash}{suffix}"
+
+
+class BlobStore:
+    """
+    Content-addressed layer on top of StorageManager.
+
+    Blobs are scoped by company and content type because each company may use
+    its own storage backend; the ``blobs`` table tracks one refcount per scope.
+    """
+
+    def __init__(self, database, storage_manager, storage_root: Path):
+        """
+        Initialize blob store.
+
+        Args:
+            database: Database instance holding the ``blobs`` table
+            storage_manager: StorageManager used to resolve adapters
+            storage_root: Local storage root (NFT markers live here)
+        """
+        self.database = database
+        self.storage_manager = storage_manager
+        self.storage_root = Path(storage_root)
+
+    def _adapter(self, company_id: Optional[str], content_type: str):
+        return self.storage_manager.get_adapter_for_content(company_id or None, content_type)
+
+    def _resolve(self, path: str) -> Path:
+        """Resolve a stored path (absolute or relative to storage root)."""
+        candidate = Path(path)
+        return candidate if candidate.is_absolute() else self.storage_root / candidate
+
+    async def store(
+        self,
+        data: bytes,
+        content_type: str,
+        company_id: Optional[str] = None,
+        suffix: str = "",
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Store content, reusing an existing blob with the same hash.
+
+        Args:
+            data: Raw file content
+            content_type: Storage content type (portraits, videos)
+            company_id: Company whose storage should hold the file
+            suffix: File extension appended to the blob path
+
+        Returns:
+            Tuple of (blob dictionary, True if existing content was reused)
+        """
+        content_hash = await asyncio.to_thread(hash_content, data)
+        return await self._store(
+            content_hash,
+            len(data),
+            content_type,
+            company_id,
+            suffix,
+            lambda adapter, storage_path: adapter.save_file(data, storage_path),
+        )
+
+    async def store_upload(
+        self,
+        upload,
+        content_type: str,
+        company_id: Optional[str] = None,
+        suffix: str = "",
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Store a spooled upload, reusing an existing blob with the same hash.
+
+        The file is streamed from disk to the storage adapter, so its content
+        is never held in memory as a whole.
+
+        Args:
+            upload: StoredUpload from app.services.uploads
+            content_type: Storage content type (portraits, videos)
+            company_id: Company whose storage should hold the file
+            suffix: File extension appended to the blob path
+
+        Returns:
+            Tuple of (blob dictionary, True if existing content was reused)
+        """
+        return await self._store(
+            upload.content_hash,
+            upload.size,
+            content_type,
+            company_id,
+            suffix,
+            lambda adapter, storage_path: adapter.save_local_file(upload.path, storage_path),
+        )
+
+    async def _store(
+        self,
+        content_hash: str,
+        size: int,
+        content_type: str,
+        company_id: Optional[str],
+        suffix: str,
+        save: Callable[[Any, str], Awaitable[Any]],
+    ) -> Tuple[Dict[str, Any], bool]:
+        scope = company_id or ""
+        adapter = self._adapter(company_id, content_type)
+
+        existing = self.database.get_blob(content_hash, scope, content_type)
+        reused = existing is not None and await adapter.file_exists(existing["storage_path"])
+        storage_path = existing["storage_path"] if existing else blob_storage_path(content_type, content_hash, suffix)
+
+        if not reused:
+            await save(adapter, storage_path)
+            invalidate_cached(adapter, storage_path)
+
+        blob = self.database.acquire_blob(content_hash, scope, content_type, storage_path, size)
+        if reused:
+            logger.info(
+                "Reusing stored blob",
+                content_hash=content_hash,
+                content_type=content_type,
+                refcount=blob["refcount"],
+            )
+        return blob, reused
+
+    async def get_preview(self, blob: Dict[str, Any]) -> Optional[str]:
+        """Return the blob's stored preview path if the preview file still exists."""
+        preview_path = blob.get("preview_path")
+        if not preview_path:
+            return None
+        adapter = self._adapter(blob["company_id"], blob["content_type"])
+        if await adapter.file_exists(preview_path):
+            return preview_path
+        return None
+
+    async def save_preview(self, blob: Dict[str, Any], preview: bytes, suffix: str = "_preview.webp") -> str:
+        """Store a preview next to the blob and record it for reuse."""
+        preview_path = blob_storage_path(blob["content_type"], blob["content_hash"], suffix)
+        adapter = self._adapter(blob["company_id"], blob["content_type"])
+        await adapter.save_file(preview, preview_path)
+        invalidate_cached(adapter, preview_path)
+        self.database.set_blob_preview(blob["content_hash"], blob["company_id"], blob["content_type"], preview_path)
+        blob["preview_path"] = preview_path
+        return preview_path
+
+    async def save_preview_variants(
+        self,
+        content_hash: str,
+        company_id: Optional[str],
+        content_type: str,
+        variants: Iterable[Any],
+    ) -> List[Dict[str, Any]]:
+        """
+        Store responsive preview variants next to the content and register them.
+
+        Args:
+            content_hash: Content hash of the previewed file
+            company_id: Company whose storage holds the file
+            content_type: Storage content type (portraits, videos)
+            variants: PreviewVariant objects from preview_generator
+
+        Returns:
+            Rows of the ``previews`` table for the content
+        """
+        scope = company_id or ""
+        adapter = self._adapter(company_id, content_type)
+        variants = list(variants)
+        paths = [blob_storage_path(content_type, content_hash, variant.suffix) for variant in variants]
+        await asyncio.gather(*(adapter.save_file(variant.data, path) for variant, path in zip(variants, paths)))
+        for variant, path in zip(variants, paths):
+            invalidate_cached(adapter, path)
+            self.database.upsert_preview(
+                content_hash, scope, content_type,
+                variant.width, variant.height, variant.format, path, len(variant.data),
+            )
+        return self.database.list_previews(content_hash, scope, content_type)
+
+    def list_preview_variants(self, content_hash: str, company_id: Optional[str], content_type: str) -> List[Dict[str, Any]]:
+        """List registered preview variants of stored content."""
+        return self.database.list_previews(content_hash, company_id or "", content_type)
+
+    def marker_dir(self, content_hash: str) -> Path:
+        """Directory holding the NFT markers generated for an image hash."""
+        return self.storage_root / "nft_markers" / content_hash
+
+    def marker_paths(self, content_hash: str) -> Dict[str, str]:
+        """Marker file paths of an image hash inside its shared marker directory."""
+        marker_dir = self.marker_dir(content_hash)
+        return {
+            "marker_fset": str(marker_dir / f"{content_hash}.fset"),
+            "marker_fset3": str(marker_dir / f"{content_hash}.fset3"),
+            "marker_iset": str(marker_dir / f"{content_hash}.iset"),
+        }
+
+    def find_ready_markers(self, content_hash: str) -> Optional[Dict[str, str]]:
+        """
+        Find already generated NFT markers for image content.
+
+        Only markers in the hash's shared directory are returned: that directory
+        lives as long as a portraits blob with the hash, while markers of other
+        records (orders, AR content, legacy per-portrait folders) are deleted
+        with their owner. Ready markers found there are copied into the shared
+        directory first, provided a portraits blob keeps it alive.
+
+        Returns:
+            Dictionary with marker_fset, marker_fset3 and marker_iset paths,
+            or None if no ready markers exist on disk
+        """
+        shared = self.marker_paths(content_hash)
+        candidates = [
+            row for row in self.database.list_ready_markers_for_blob(content_hash)
+            if all(row.get(field) and self._resolve(row[field]).exists() for field in MARKER_FIELDS)
+        ]
+        for row in candidates:
+            if all(self._resolve(row[field]) == Path(shared[field]) for field in MARKER_FIELDS):
+                return shared
+
+        if not candidates or not self.database.is_blob_hash_in_use(content_hash, "portraits"):
+            return None
+        try:
+            self.marker_dir(content_hash).mkdir(parents=True, exist_ok=True)
+            for field in MARKER_FIELDS:
+                shutil.copyfile(self._resolve(candidates[0][field]), shared[field])
+        except OSError as exc:
+            logger.warning("Failed to copy NFT markers", content_hash=content_hash, error=str(exc))
+            return None
+        logger.info("Copied NFT markers into shared marker directory", content_hash=content_hash)
+        return shared
+
+    def is_blob_path(self, blob: Dict[str, Any], path: Optional[str]) -> bool:
+        """Check whether a record path points at the blob's stored file."""
+        if not path:
+            return False
+        return self._resolve(path) == self._resolve(blob["storage_path"])
+
+    async def release(self, content_hash: str, company_id: Optional[str], content_type: str) -> bool:
+        """
+        Drop one reference to a blob, deleting its files with the last reference.
+
+        Returns:
+            True if the blob files were deleted
+        """
+        blob = self.database.release_blob(content_hash, company_id or "", content_type)
+        if blob is None:
+            return False
+
+        adapter = self._adapter(company_id, content_type)
+        variant_paths = [row["storage_path"] for row in self.list_preview_variants(content_hash, company_id, content_type)]
+        self.database.delete_previews(content_hash, company_id or "", content_type)
+        for path in (blob["storage_path"], blob.get("preview_path"), *variant_paths):
+            if not path:
+                continue
+            try:
+                await delete_through(adapter, path)
+            except Exception as exc:
+                logger.warning("Failed to delete blob file", path=path, error=str(exc))
+
+        # Markers are keyed by hash only, so other companies may still use them
+        if content_type == "portraits" and not self.database.is_blob_hash_in_use(content_hash, content_type):
+            marker_dir = self.marker_dir(content_hash)
+            if marker_dir.exists():
+                shutil.rmtree(marker_dir, ignore_errors=True)
+
+        logger.info("Blob deleted", content_hash=content_hash, content_type=content_type)
+        return True
+
+    async def release_record(
+        self,
+        record: Dict[str, Any],
+        company_id: Optional[str],
+        content_type: str,
+        path_field: str,
+    ) -> bool:
+        """
+        Release the blob referenced by a portrait or video row.
+
+        Returns:
+            True if the record's file is managed by the blob store (callers must
+            not delete it themselves), False for legacy per-record files
+        """
+        content_hash = record.get("blob_hash")
+        if not content_hash:
+            return False
+        blob = self.database.get_blob(content_hash, company_id or "", content_type)
+        if blob is None or not self.is_blob_path(blob, record.get(path_field)):
+            return False
+        await self.release(content_hash, company_id, content_type)
+        return True
+
+
+blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store(database=None, storage_manager=None, storage_root: Optional[Path] = None) -> Optional[BlobStore]:
+    """Get the blob store, (re)creating it when database, storage manager and root are given."""
+    global blob_store
+    if database is not None and storage_manager is not None and storage_root is not None:
+        if (
+            blob_store is None
+            or blob_store.database is not database
+            or blob_store.storage_manager is not storage_manager
+        ):
+            blob_store = BlobStore(database, storage_manager, storage_root)
+    return blob_store
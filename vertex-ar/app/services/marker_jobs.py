@@ -0,0 +1,351 @@
+"""
+NFT marker generation job queue for Vertex AR.
+Runs CPU-heavy marker generation in a process pool so request handlers never
+block the event loop, and persists job state in the database.
+"""
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+class MarkerJobStatus(Enum):
+    """Marker job status."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+def generate_marker_in_worker(
+    storage_root: str,
+    image_path: str,
+    marker_name: str,
+    config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Generate NFT marker files inside a worker process.
+
+    Must stay a module-level function so it can be pickled by ProcessPoolExecutor.
+
+    Returns:
+        NFTMarker fields as a dictionary
+    """
+    from nft_marker_generator import NFTMarkerConfig, NFTMarkerGenerator
+
+    generator = NFTMarkerGenerator(Path(storage_root), enable_cache=False)
+    marker_config = NFTMarkerConfig.from_dict(config) if config else None
+    marker = generator.generate_marker(image_path, marker_name, marker_config)
+    return asdict(marker)
+
+
+class MarkerJobQueue:
+    """
+    Persistent NFT marker generation queue backed by a process pool.
+
+    Jobs are stored in the ``marker_jobs`` table so their status, progress,
+    errors and timings survive restarts; unfinished jobs are resumed on start.
+    """
+
+    def __init__(self, database, storage_root: Path, max_workers: int = 2, cache_manager=None):
+        """
+        Initialize marker job queue.
+
+        Args:
+            database: Database instance for persistence
+            storage_root: Root directory where ``nft_markers`` are written
+            max_workers: Number of worker processes (default: 2)
+            cache_manager: Optional CacheManager whose portrait lists are
+                invalidated when a portrait's marker status changes
+        """
+        self.database = database
+        self.storage_root = Path(storage_root)
+        self.max_workers = max(1, max_workers)
+        self.cache_manager = cache_manager
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.running = False
+
+        logger.info(f"MarkerJobQueue initialized with {self.max_workers} workers")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the process pool, creating it on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _create_job(
+        self,
+        portrait_id: str,
+        image_path: str | Path,
+        marker_name: Optional[str],
+        config,
+        cleanup_image: bool,
+        update_portrait: bool,
+    ) -> Dict[str, Any]:
+        config_json = json.dumps(config.to_dict()) if config is not None else None
+        return self.database.create_marker_job(
+            job_id=str(uuid.uuid4()),
+            portrait_id=portrait_id,
+            image_path=str(image_path),
+            marker_name=marker_name or portrait_id,
+            config=config_json,
+            cleanup_image=cleanup_image,
+            update_portrait=update_portrait,
+        )
+
+    async def submit(
+        self,
+        portrait_id: str,
+        image_path: str | Path,
+        marker_name: Optional[str] = None,
+        config=None,
+        cleanup_image: bool = False,
+    ) -> str:
+        """
+        Enqueue marker generation for a portrait and return immediately.
+
+        When the job finishes the portrait row gets the marker paths and its
+        ``marker_status`` is set to ``ready`` (or ``failed``).
+
+        Args:
+            portrait_id: Portrait ID
+            image_path: Local path to the source image
+            marker_name: Marker name (defaults to portrait ID)
+            config: Optional NFTMarkerConfig
+            cleanup_image: Delete the source image when the job is done
+
+        Returns:
+            Job ID
+        """
+        job = self._create_job(portrait_id, image_path, marker_name, config, cleanup_image, update_portrait=True)
+        await self._set_portrait_status(portrait_id, "pending")
+        self._schedule(job)
+
+        logger.info(f"Marker job enqueued: {job['id']} (portrait: {portrait_id})")
+        return job["id"]
+
+    async def run(
+        self,
+        portrait_id: str,
+        image_path: str | Path,
+        marker_name: Optional[str] = None,
+        config=None,
+    ):
+        """
+        Generate markers in the process pool and wait for the result.
+
+        Used by workflows that need the marker files right away (orders move
+        them into the order folder). The event loop stays free meanwhile.
+
+        Returns:
+            NFTMarker object
+
+        Raises:
+            Exception: Whatever marker generation raised (e.g. ValueError)
+        """
+        job = self._create_job(portrait_id, image_path, marker_name, config, cleanup_image=False, update_portrait=False)
+        return await self._process_job(job, update_portrait=False)
+
+    async def _set_portrait_status(self, portrait_id: str, marker_status: str) -> None:
+        """Record a portrait's marker status and drop cached lists showing it."""
+        self.database.set_portrait_marker_status(portrait_id, marker_status)
+        if self.cache_manager is not None:
+            await self.cache_manager.invalidate_tags(f"portrait:{portrait_id}")
+
+    def _schedule(self, job: Dict[str, Any]) -> None:
+        task = asyncio.create_task(self._run_job(job))
+        self._tasks[job["id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job["id"], None))
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        try:
+            await self._process_job(job, update_portrait=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Failure is already recorded on the job and portrait rows
+            pass
+
+    async def _process_job(self, job: Dict[str, Any], update_portrait: bool):
+        """
+        Run a single marker job and record its outcome.
+
+        Args:
+            job: Job dictionary from the database
+            update_portrait: Write marker paths/status to the portrait row
+        """
+        from nft_marker_generator import NFTMarker
+
+        job_id = job["id"]
+        portrait_id = job["portrait_id"]
+        start_time = time.monotonic()
+
+        self.database.update_marker_job(
+            job_id,
+            status=MarkerJobStatus.RUNNING.value,
+            progress=10,
+            attempts=(job.get("attempts") or 0) + 1,
+            started_at=datetime.utcnow(),
+        )
+        if update_portrait:
+            await self._set_portrait_status(portrait_id, "running")
+
+        config = json.loads(job["config"]) if job.get("config") else None
+        loop = asyncio.get_running_loop()
+
+        try:
+            result = await loop.run_in_executor(
+                self._get_executor(),
+                generate_marker_in_worker,
+                str(self.storage_root),
+                job["image_path"],
+                job["marker_name"],
+                config,
+            )
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # A worker died (e.g. OOM); start a fresh pool for the next job
+                self._executor = None
+
+            duration_ms = (time.monotonic() - start_time) * 1000
+            logger.error(f"Marker job {job_id} failed for portrait {portrait_id}: {e}")
+            self.database.update_marker_job(
+                job_id,
+                status=MarkerJobStatus.FAILED.value,
+                error=str(e) or e.__class__.__name__,
+                completed_at=datetime.utcnow(),
+                duration_ms=duration_ms,
+            )
+            if update_portrait:
+                await self._set_portrait_status(portrait_id, "failed")
+            self._discard_image(job)
+            raise
+        # A cancelled job (queue stopped) keeps its image: start() resumes it
+        self._discard_image(job)
+
+        duration_ms = (time.monotonic() - start_time) * 1000
+        self.database.update_marker_job(
+            job_id,
+            status=MarkerJobStatus.COMPLETED.value,
+            progress=100,
+            error=None,
+            completed_at=datetime.utcnow(),
+            duration_ms=duration_ms,
+        )
+        if update_portrait:
+            self.database.update_portrait_marker_paths(
+                portrait_id=portrait_id,
+                marker_fset=result["fset_path"],
+                marker_fset3=result["fset3_path"],
+                marker_iset=result["iset_path"],
+            )
+            await self._set_portrait_status(portrait_id, "ready")
+
+        logger.info(f"Marker job {job_id} completed in {duration_ms:.0f}ms (portrait: {portrait_id})")
+        return NFTMarker(**result)
+
+    @staticmethod
+    def _discard_image(job: Dict[str, Any]) -> None:
+        """Delete a job's temporary source image once the job has finished."""
+        if job.get("cleanup_image"):
+            Path(job["image_path"]).unlink(missing_ok=True)
+
+    async def wait(self, job_id: str) -> None:
+        """Wait for a submitted job to finish (no-op if it is not running here)."""
+        task = self._tasks.get(job_id)
+        if task:
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def start(self) -> None:
+        """Start the queue and resume unfinished jobs from the database."""
+        if self.running:
+            logger.warning("Marker job queue already running")
+            return
+
+        self.running = True
+
+        resumed = 0
+        for job in self.database.get_unfinished_marker_jobs():
+            if job["id"] in self._tasks:
+                continue
+            if not job.get("update_portrait", 1):
+                # Nobody waits for a synchronous job any more; its caller
+                # failed with the restart and never stored the result
+                self.database.update_marker_job(
+                    job["id"],
+                    status=MarkerJobStatus.FAILED.value,
+                    error="Interrupted by restart",
+                    completed_at=datetime.utcnow(),
+                )
+                self._discard_image(job)
+                continue
+            self._schedule(job)
+            resumed += 1
+
+        logger.info(f"Marker job queue started, resumed {resumed} unfinished jobs")
+
+    async def stop(self) -> None:
+        """Stop the queue without waiting for in-flight jobs.
+
+        Interrupted jobs stay pending/running in the database and are
+        resumed on the next start.
+        """
+        self.running = False
+
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+        logger.info("Marker job queue stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics.
+
+        Returns:
+            Dictionary with job counts and worker info
+        """
+        stats = self.database.get_marker_job_stats()
+        stats["workers"] = self.max_workers
+        stats["running"] = self.running
+        stats["in_flight"] = len(self._tasks)
+        return stats
+
+
+# Singleton instance (created at startup or on first use)
+marker_job_queue: Optional[MarkerJobQueue] = None
+
+
+def get_marker_job_queue(
+    database=None,
+    storage_root: Optional[Path] = None,
+    max_workers: Optional[int] = None,
+    cache_manager=None,
+) -> Optional[MarkerJobQueue]:
+    """Get the marker job queue, creating it if database and storage root are given."""
+    global marker_job_queue
+    if marker_job_queue is None and database is not None and storage_root is not None:
+        if max_workers is None:
+            from app.config import settings
+            max_workers = settings.MARKER_JOB_WORKERS
+        marker_job_queue = MarkerJobQueue(database, storage_root, max_workers=max_workers)
+    if marker_job_queue is not None and cache_manager is not None:
+        marker_job_queue.cache_manager = cache_manager
+    return marker_job_queue
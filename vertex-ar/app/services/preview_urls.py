@@ -0,0 +1,229 @@
+"""
+Preview URLs and HTTP caching for Vertex AR.
+List endpoints return versioned preview URLs instead of inlining base64 data;
+the preview router serves those URLs with strong ETags so browsers and proxies
+can cache them and revalidate with 304 responses.
+"""
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+from PIL import Image
+
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Preview path column of each record kind served by /previews/{kind}/{id}
+PREVIEW_PATH_FIELDS = {
+    "portraits": "image_preview_path",
+    "videos": "video_preview_path",
+}
+
+# Private: previews are admin-only, so shared caches (nginx) must not keep them
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+MEDIA_TYPES = {
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".avif": "image/avif",
+}
+
+SPRITE_TILE_SIZE = 100
+SPRITE_MAX_COLUMNS = 10
+
+
+def media_type_for(path: str) -> str:
+    """Return the MIME type of a preview file from its extension."""
+    return MEDIA_TYPES.get(Path(path).suffix.lower(), "application/octet-stream")
+
+
+def make_etag(data: bytes) -> str:
+    """Return a strong ETag for preview content."""
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def resolve_local_path(path: str, base_dir: Path, storage_root: Path) -> Path:
+    """Resolve a stored preview path (absolute, 'storage/...' or storage-relative)."""
+    candidate = Path(path)
+    if candidate.is_absolute():
+        return candidate
+    if path.startswith("storage/"):
+        return base_dir / candidate
+    return storage_root / candidate
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class PreviewVersions:
+    """
+    Version tokens and content ETags of preview files.
+
+    The version token goes into list URLs (``?v=``) and changes whenever the
+    file is rewritten, so a URL carrying the current token can be served as
+    immutable. ETags are content hashes, cached per (path, size, mtime) so
+    conditional requests are answered without reading the file again.
+    """
+
+    def __init__(self, base_dir: Path, storage_root: Path, max_entries: int = 10000):
+        self.base_dir = Path(base_dir)
+        self.storage_root = Path(storage_root)
+        self.max_entries = max_entries
+        self._etags: "OrderedDict[Tuple[str, Any], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, path: str) -> Path:
+        return resolve_local_path(path, self.base_dir, self.storage_root)
+
+    def version(self, path: Optional[str]) -> Optional[str]:
+        """
+        Return the URL version token of a preview, or None if there is none.
+
+        Files that are not on local disk (remote storage) are versioned by
+        path alone; their paths are content-addressed blob paths.
+        """
+        if not path:
+            return None
+        stat_key = _stat_key(self.resolve(path))
+        token = f"{path}:{stat_key}" if stat_key else path
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=8).hexdigest()
+
+    def cached_etag(self, path: str) -> Optional[str]:
+        """Return the known ETag of a preview without reading it."""
+        key = (path, _stat_key(self.resolve(path)))
+        with self._lock:
+            etag = self._etags.get(key)
+            if etag is not None:
+                self._etags.move_to_end(key)
+            return etag
+
+    def remember_etag(self, path: str, data: bytes) -> str:
+        """Compute and cache the ETag of freshly read preview content."""
+        etag = make_etag(data)
+        key = (path, _stat_key(self.resolve(path)))
+        with self._lock:
+            self._etags[key] = etag
+            self._etags.move_to_end(key)
+            while len(self._etags) > self.max_entries:
+                self._etags.popitem(last=False)
+        return etag
+
+    def record_url(self, kind: str, record_id: str, path: Optional[str]) -> Optional[str]:
+        """Versioned URL of a portrait or video list preview."""
+        version = self.version(path)
+        if version is None:
+            return None
+        return f"/previews/{kind}/{record_id}?v={version}"
+
+    def sprite_version(self, kind: str, items: Sequence[Tuple[str, Optional[str]]], tile: int = SPRITE_TILE_SIZE) -> str:
+        """
+        Version token of a sprite sheet combining the previews of several records.
+
+        Args:
+            kind: Record kind (portraits, videos)
+            items: (record_id, preview_path) pairs in sprite order
+            tile: Tile edge in pixels
+        """
+        versions = ",".join(f"{record_id}:{self.version(path) or ''}" for record_id, path in items)
+        return hashlib.blake2b(f"{kind}|{tile}|{versions}".encode("utf-8"), digest_size=8).hexdigest()
+
+    def sprite_url(self, kind: str, items: Sequence[Tuple[str, Optional[str]]], tile: int = SPRITE_TILE_SIZE) -> Optional[str]:
+        """Versioned URL of a sprite sheet (see sprite_version)."""
+        if not items:
+            return None
+        query = urlencode({
+            "ids": ",".join(record_id for record_id, _ in items),
+            "tile": tile,
+            "v": self.sprite_version(kind, items, tile),
+        })
+        return f"/previews/sprites/{kind}?{query}"
+
+
+def variant_url(row: Dict[str, Any]) -> str:
+    """Immutable URL of a responsive preview variant (content-addressed)."""
+    extension = Path(row["storage_path"]).suffix
+    return f"/previews/variants/{row['content_type']}/{row['content_hash']}/{row['width']}{extension}"
+
+
+def variant_srcset(rows: Iterable[Dict[str, Any]], format: str = "webp") -> Optional[str]:
+    """Build an HTML ``srcset`` value from preview variant rows of one format."""
+    entries = [f"{variant_url(row)} {row['width']}w" for row in rows if row["format"] == format]
+    return ", ".join(entries) or None
+
+
+def sprite_layout(count: int, tile: int = SPRITE_TILE_SIZE) -> Dict[str, int]:
+    """Grid geometry of a sprite sheet with ``count`` tiles."""
+    columns = max(1, min(count, SPRITE_MAX_COLUMNS))
+    rows = max(1, math.ceil(count / columns))
+    return {"tile": tile, "columns": columns, "rows": rows, "width": columns * tile, "height": rows * tile}
+
+
+def sprite_position(index: int, layout: Dict[str, int]) -> Dict[str, int]:
+    """Pixel offset of a tile inside a sprite sheet."""
+    return {
+        "x": (index % layout["columns"]) * layout["tile"],
+        "y": (index // layout["columns"]) * layout["tile"],
+    }
+
+
+def render_sprite(previews: List[Optional[bytes]], tile: int = SPRITE_TILE_SIZE) -> bytes:
+    """Compose preview images into one WebP sprite sheet; missing previews stay blank."""
+    layout = sprite_layout(len(previews), tile)
+    sheet = Image.new("RGB", (layout["width"], layout["height"]), (255, 255, 255))
+    for index, data in enumerate(previews):
+        if not data:
+            continue
+        try:
+            with Image.open(BytesIO(data)) as image:
+                image.draft("RGB", (tile, tile))
+                thumbnail = image.convert("RGB")
+            thumbnail.thumbnail((tile, tile), Image.Resampling.LANCZOS)
+        except Exception as exc:
+            logger.warning("Skipping unreadable preview in sprite", index=index, error=str(exc))
+            continue
+        position = sprite_position(index, layout)
+        sheet.paste(
+            thumbnail,
+            (position["x"] + (tile - thumbnail.width) // 2, position["y"] + (tile - thumbnail.height) // 2),
+        )
+    buffer = BytesIO()
+    sheet.save(buffer, format="WEBP", quality=80, method=4)
+    return buffer.getvalue()
+
+
+preview_versions: Optional[PreviewVersions] = None
+
+
+def get_preview_versions(base_dir: Optional[Path] = None, storage_root: Optional[Path] = None) -> PreviewVersions:
+    """Get the process-wide preview version tracker, creating it on first use."""
+    global preview_versions
+    if preview_versions is None or (
+        storage_root is not None and preview_versions.storage_root != Path(storage_root)
+    ):
+        from app.config import settings
+        preview_versions = PreviewVersions(base_dir or settings.BASE_DIR, storage_root or settings.STORAGE_ROOT)
+    return preview_versions
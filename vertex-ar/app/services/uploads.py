@@ -0,0 +1,86 @@
+"""
+Streaming handling of multipart uploads for Vertex AR.
+Uploaded files are copied to disk in fixed-size chunks while their size and
+content hash are computed, so request handlers never hold a whole upload in memory.
+"""
+import asyncio
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import UploadFile
+
+from app.services.blob_store import content_hasher
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+@dataclass
+class StoredUpload:
+    """Upload written to a local file."""
+    path: Path
+    size: int
+    content_hash: str
+
+    def cleanup(self) -> None:
+        """Remove the local file if it still exists."""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Failed to remove upload file", path=str(self.path), error=str(e))
+
+
+async def save_upload(upload: UploadFile, destination: Path) -> StoredUpload:
+    """
+    Stream an upload to a local file.
+
+    Args:
+        upload: Uploaded file
+        destination: File to write; parent directories are created
+
+    Returns:
+        StoredUpload describing the written file
+    """
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    await upload.seek(0)
+
+    hasher = content_hasher()
+    size = 0
+
+    def write_chunk(out, chunk: bytes) -> None:
+        hasher.update(chunk)
+        out.write(chunk)
+
+    try:
+        with open(destination, "wb") as out:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                await asyncio.to_thread(write_chunk, out, chunk)
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+
+    return StoredUpload(path=destination, size=size, content_hash=hasher.hexdigest())
+
+
+async def spool_upload(upload: UploadFile, spool_dir: Path, suffix: str = "") -> StoredUpload:
+    """
+    Stream an upload to a new temporary file in ``spool_dir``.
+
+    The caller owns the file and must call ``cleanup()`` when done.
+    """
+    spool_dir = Path(spool_dir)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(suffix=suffix, dir=spool_dir)
+    os.close(fd)
+    return await save_upload(upload, Path(name))
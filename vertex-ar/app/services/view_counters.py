@@ -0,0 +1,202 @@
+"""
+Write-behind view and click counters for Vertex AR.
+Public AR pages increment counters in memory; a background task applies the
+aggregated increments to the database in one transaction per interval.
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+PORTRAIT_VIEWS = "portrait_views"
+AR_VIEWS = "ar_views"
+AR_CLICKS = "ar_clicks"
+
+# Counter kind -> (table, column)
+COUNTER_COLUMNS: Dict[str, Tuple[str, str]] = {
+    PORTRAIT_VIEWS: ("portraits", "view_count"),
+    AR_VIEWS: ("ar_content", "view_count"),
+    AR_CLICKS: ("ar_content", "click_count"),
+}
+
+
+class ViewCounterBuffer:
+    """
+    In-memory aggregation of view/click increments.
+
+    Increments are buffered per (kind, record id) and flushed periodically.
+    While the flush loop is not running (e.g. before startup) increments are
+    written straight to the database.
+    """
+
+    def __init__(self, database, flush_interval: float = 5.0, cache_manager=None):
+        """
+        Initialize counter buffer.
+
+        Args:
+            database: Database instance to flush into
+            flush_interval: Seconds between flushes (default: 5)
+            cache_manager: Optional CacheManager whose cached portraits are
+                invalidated once their view counts were written
+        """
+        self.database = database
+        self.flush_interval = flush_interval
+        self.cache_manager = cache_manager
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], int] = defaultdict(int)
+        # Portraits whose view_count changed in the database since the last invalidation
+        self._written_portraits: Set[str] = set()
+        self._oldest_pending: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.running = False
+        self.stats = {
+            "flushes": 0,
+            "flushed_increments": 0,
+            "flush_errors": 0,
+            "last_flush_at": None,
+            "last_flush_ms": 0.0,
+        }
+
+    def increment(self, kind: str, record_id: str, delta: int = 1) -> None:
+        """Buffer an increment for a portrait or AR content counter."""
+        if kind not in COUNTER_COLUMNS:
+            raise ValueError(f"Unknown counter kind: {kind}")
+
+        if not self.running:
+            table, column = COUNTER_COLUMNS[kind]
+            self.database.apply_counter_increments({(table, column): [(record_id, delta)]})
+            if kind == PORTRAIT_VIEWS:
+                with self._lock:
+                    self._written_portraits.add(record_id)
+            return
+
+        with self._lock:
+            self._pending[(kind, record_id)] += delta
+            if self._oldest_pending is None:
+                self._oldest_pending = time.monotonic()
+
+    def pending(self, kind: str, record_id: str) -> int:
+        """Return the not yet flushed increment for a record."""
+        with self._lock:
+            return self._pending.get((kind, record_id), 0)
+
+    def flush(self) -> int:
+        """
+        Apply all buffered increments to the database.
+
+        Returns:
+            Number of increments written
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, defaultdict(int)
+            oldest_pending, self._oldest_pending = self._oldest_pending, None
+
+        by_column: Dict[Tuple[str, str], list] = defaultdict(list)
+        for (kind, record_id), delta in pending.items():
+            by_column[COUNTER_COLUMNS[kind]].append((record_id, delta))
+
+        start = time.perf_counter()
+        try:
+            self.database.apply_counter_increments(by_column)
+        except Exception as exc:
+            # Put the increments back so they are retried on the next flush
+            with self._lock:
+                for key, delta in pending.items():
+                    self._pending[key] += delta
+                if oldest_pending is not None and (
+                    self._oldest_pending is None or oldest_pending < self._oldest_pending
+                ):
+                    self._oldest_pending = oldest_pending
+            self.stats["flush_errors"] += 1
+            logger.error("Failed to flush view counters", error=str(exc), pending=len(pending))
+            return 0
+
+        written = sum(pending.values())
+        with self._lock:
+            self._written_portraits.update(record_id for kind, record_id in pending if kind == PORTRAIT_VIEWS)
+        self.stats["flushes"] += 1
+        self.stats["flushed_increments"] += written
+        self.stats["last_flush_at"] = time.time()
+        self.stats["last_flush_ms"] = (time.perf_counter() - start) * 1000
+        return written
+
+    async def invalidate_written(self) -> None:
+        """Invalidate cached portraits whose view counts were written since the last call."""
+        with self._lock:
+            portrait_ids, self._written_portraits = self._written_portraits, set()
+        if self.cache_manager is None or not portrait_ids:
+            return
+        try:
+            await self.cache_manager.invalidate_tags(*(f"portrait:{portrait_id}" for portrait_id in portrait_ids))
+        except Exception as exc:
+            logger.warning("Failed to invalidate cached view counts", error=str(exc), portraits=len(portrait_ids))
+
+    async def _flush_loop(self) -> None:
+        while self.running:
+            await asyncio.sleep(self.flush_interval)
+            await asyncio.to_thread(self.flush)
+            await self.invalidate_written()
+
+    async def start(self) -> None:
+        """Start periodic flushing."""
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info(f"View counter buffer started, flushing every {self.flush_interval}s")
+
+    async def stop(self) -> None:
+        """Stop periodic flushing and write out everything still buffered."""
+        self.running = False
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        written = self.flush()
+        await self.invalidate_written()
+        logger.info("View counter buffer stopped", flushed=written)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return buffer size, flush lag and flush statistics."""
+        with self._lock:
+            buffer_size = len(self._pending)
+            pending_increments = sum(self._pending.values())
+            oldest_pending = self._oldest_pending
+
+        return {
+            **self.stats,
+            "buffer_size": buffer_size,
+            "pending_increments": pending_increments,
+            "lag_seconds": time.monotonic() - oldest_pending if oldest_pending is not None else 0.0,
+            "running": self.running,
+        }
+
+
+view_counter_buffer: Optional[ViewCounterBuffer] = None
+
+
+def get_view_counter_buffer(
+    database=None,
+    flush_interval: Optional[float] = None,
+    cache_manager=None,
+) -> Optional[ViewCounterBuffer]:
+    """Get the counter buffer, creating it for the given database if needed."""
+    global view_counter_buffer
+    if database is not None and (
+        view_counter_buffer is None
+        or (view_counter_buffer.database is not database and not view_counter_buffer.running)
+    ):
+        if flush_interval is None:
+            from app.config import settings
+            flush_interval = settings.VIEW_COUNTER_FLUSH_INTERVAL
+        view_counter_buffer = ViewCounterBuffer(database, flush_interval=flush_interval)
+    if view_counter_buffer is not None and cache_manager is not None:
+        view_counter_buffer.cache_manager = cache_manager
+    return view_counter_buffer
@@ -0,0 +1,132 @@
+"""
+In-process cache of rendered public AR viewer pages for Vertex AR.
+Repeat scans of a portrait QR code are served from memory with an ETag;
+entries are invalidated when the portrait's active video changes.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ViewerPage:
+    """Rendered viewer page."""
+    portrait_id: str
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+class ViewerCache:
+    """
+    Bounded LRU cache of rendered viewer pages keyed by permanent link and origin.
+
+    The page embeds the request origin, so the same link is cached separately
+    per scheme/host. A TTL bounds staleness for changes made by other worker
+    processes, which cannot invalidate this process's entries.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 10000):
+        """
+        Initialize viewer cache.
+
+        Args:
+            ttl: Seconds a rendered page stays valid (default: 300)
+            max_entries: Maximum number of cached pages (default: 10000)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._pages: "OrderedDict[Tuple[str, str], ViewerPage]" = OrderedDict()
+        self._keys_by_portrait: Dict[str, Set[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so renders that raced with one are not stored
+        self._generation = 0
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        """Return a strong ETag for a rendered page."""
+        return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    def get(self, permanent_link: str, origin: str) -> Optional[ViewerPage]:
+        """Return the cached page for a link, or None if missing or expired."""
+        key = (permanent_link, origin)
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None or page.expires_at < time.monotonic():
+                if page is not None:
+                    self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            self._pages.move_to_end(key)
+            self.stats["hits"] += 1
+            return page
+
+    @property
+    def generation(self) -> int:
+        """Invalidation generation; read it before loading the data to render."""
+        return self._generation
+
+    def set(
+        self,
+        permanent_link: str,
+        origin: str,
+        portrait_id: str,
+        body: bytes,
+        generation: Optional[int] = None,
+    ) -> ViewerPage:
+        """
+        Store a rendered page and return it.
+
+        If ``generation`` is given and an invalidation happened since it was
+        read, the page is returned but not cached.
+        """
+        key = (permanent_link, origin)
+        page = ViewerPage(
+            portrait_id=portrait_id,
+            body=body,
+            etag=self.make_etag(body),
+            expires_at=time.monotonic() + self.ttl,
+        )
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return page
+            if key in self._pages:
+                self._remove(key)
+            self._pages[key] = page
+            self._keys_by_portrait.setdefault(portrait_id, set()).add(key)
+            while len(self._pages) > self.max_entries:
+                self._remove(next(iter(self._pages)))
+        return page
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        page = self._pages.pop(key)
+        keys = self._keys_by_portrait.get(page.portrait_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_portrait[page.portrait_id]
+
+    def invalidate_portrait(self, portrait_id: Optional[str]) -> None:
+        """Drop cached pages of a portrait (all pages when portrait_id is None)."""
+        with self._lock:
+            if portrait_id is None:
+                self._pages.clear()
+                self._keys_by_portrait.clear()
+            else:
+                for key in list(self._keys_by_portrait.get(portrait_id, ())):
+                    self._remove(key)
+            self._generation += 1
+            self.stats["invalidations"] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            return {**self.stats, "size": len(self._pages), "max_entries": self.max_entries}
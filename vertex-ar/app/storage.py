@@ -3,12 +3,22 @@ Base storage adapter interface for Vertex AR.
 """
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 
 
 class StorageAdapter(ABC):
     """Abstract base class for storage adapters."""
     
+    @property
+    def cache_namespace(self) -> Optional[str]:
+        """Identity of the backing store for the local media cache.
+        
+        None for adapters whose files are already on local disk; remote
+        adapters return a string that differs between buckets, accounts and
+        base paths so equal file paths on different stores do not collide.
+        """
+        return None
+    
     @abstractmethod
     async def save_file(self, file_data: bytes, file_path: str) -> str:
         """Save file data to storage.
@@ -22,6 +32,21 @@ class StorageAdapter(ABC):
         """
         pass
     
+    async def save_local_file(self, local_path: Path, file_path: str) -> str:
+        """Save a local file to storage.
+        
+        Adapters override this to stream the file instead of loading it
+        into memory; the default reads it whole and calls save_file.
+        
+        Args:
+            local_path: Path of the local file to store
+            file_path: Destination path within storage
+            
+        Returns:
+            Public URL or path to access the file
+        """
+        return await self.save_file(Path(local_path).read_bytes(), file_path)
+    
     @abstractmethod
     async def get_file(self, file_path: str) -> bytes:
         """Get file data from storage.
@@ -34,6 +59,17 @@ class StorageAdapter(ABC):
         """
         pass
     
+    async def iter_file(self, file_path: str) -> AsyncIterator[bytes]:
+        """Yield the content of a file in order.
+        
+        Adapters override this to stream the file instead of loading it
+        into memory; the default yields get_file in one piece.
+        
+        Args:
+            file_path: Path to the file in storage
+        """
+        yield await self.get_file(file_path)
+    
     @abstractmethod
     async def delete_file(self, file_path: str) -> bool:
         """Delete file from storage.
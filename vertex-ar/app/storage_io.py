@@ -0,0 +1,147 @@
+"""
+Bounded executors for blocking storage I/O in Vertex AR.
+
+Storage adapters expose async methods, but their backends (filesystem calls,
+the minio and requests clients) block. Each adapter type runs that work on
+its own size-bounded thread pool, so a burst of uploads queues behind the
+pool of its adapter instead of stalling the event loop or filling the
+default executor shared with the rest of the application.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Latency samples kept per executor for percentile stats
+LATENCY_SAMPLES = 1024
+
+
+def _percentile(samples, percentile: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * percentile))
+    return ordered[index]
+
+
+class StorageIOExecutor:
+    """
+    Thread pool for one storage adapter type with queue and latency stats.
+
+    ``queue_depth`` counts calls waiting for a free worker; wait time is the
+    time a call spent queued and run time the time it spent on a worker.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        """
+        Initialize executor.
+
+        Args:
+            name: Adapter type the pool serves (used in thread names and metrics)
+            max_workers: Maximum number of concurrent blocking calls
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"storage-{name}")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._wait_times = deque(maxlen=LATENCY_SAMPLES)
+        self._run_times = deque(maxlen=LATENCY_SAMPLES)
+        self.stats = {"completed": 0, "errors": 0}
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking callable on the pool and return its result."""
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        submitted = time.perf_counter()
+        started = False
+
+        def worker():
+            nonlocal started
+            begin = time.perf_counter()
+            with self._lock:
+                if not started:
+                    started = True
+                    self._queued -= 1
+                self._active += 1
+                self._wait_times.append(begin - submitted)
+            failed = False
+            try:
+                return call()
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._run_times.append(time.perf_counter() - begin)
+                    self.stats["completed"] += 1
+                    if failed:
+                        self.stats["errors"] += 1
+
+        with self._lock:
+            self._queued += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, worker)
+        finally:
+            # The call may never reach a worker (cancelled while queued)
+            with self._lock:
+                if not started:
+                    started = True
+                    self._queued -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue depth, utilisation and latency percentiles."""
+        with self._lock:
+            wait_times = list(self._wait_times)
+            run_times = list(self._run_times)
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "active": self._active,
+                "completed": self.stats["completed"],
+                "errors": self.stats["errors"],
+                "wait_p50_ms": round(_percentile(wait_times, 0.5) * 1000, 3),
+                "wait_p99_ms": round(_percentile(wait_times, 0.99) * 1000, 3),
+                "run_p50_ms": round(_percentile(run_times, 0.5) * 1000, 3),
+                "run_p99_ms": round(_percentile(run_times, 0.99) * 1000, 3),
+            }
+
+
+_executors: Dict[str, StorageIOExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_storage_executor(name: str, max_workers: Optional[int] = None) -> StorageIOExecutor:
+    """
+    Get the shared executor of a storage adapter type, creating it if needed.
+
+    Pool sizes come from STORAGE_IO_<NAME>_WORKERS settings unless given.
+    """
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            if max_workers is None:
+                from app.config import settings
+                max_workers = getattr(settings, f"STORAGE_IO_{name.upper()}_WORKERS", settings.STORAGE_IO_WORKERS)
+            executor = StorageIOExecutor(name, max_workers)
+            _executors[name] = executor
+            logger.info("Storage I/O executor created", adapter=name, max_workers=max_workers)
+        return executor
+
+
+def get_storage_executors() -> Dict[str, StorageIOExecutor]:
+    """Return all storage executors created so far."""
+    with _executors_lock:
+        return dict(_executors)
+
@@ -7,10 +7,15 @@ from pathlib import Path
 from typing import Optional
 
 from app.storage import StorageAdapter
+from app.storage_io import get_storage_executor
 
 
 class LocalStorageAdapter(StorageAdapter):
-    """Local filesystem storage implementation."""
+    """Local filesystem storage implementation.
+    
+    Filesystem calls run on the bounded "local" storage executor so slow
+    disks never block the event loop.
+    """
     
     def __init__(self, storage_root: Path):
         """Initialize local storage adapter.
@@ -20,6 +25,7 @@ class LocalStorageAdapter(StorageAdapter):
         """
         self.storage_root = Path(storage_root)
         self.storage_root.mkdir(parents=True, exist_ok=True)
+        self._io = get_storage_executor("local")
     
     async def save_file(self, file_data: bytes, file_path: str) -> str:
         """Save file data to local filesystem.
@@ -31,11 +37,21 @@ class LocalStorageAdapter(StorageAdapter):
         Returns:
             Public URL to access the file
         """
-        full_path = self.storage_root / file_path
-        full_path.parent.mkdir(parents=True, exist_ok=True)
+        await self._io.run(self._write_file, self.storage_root / file_path, file_data)
         
-        with open(full_path, 'wb') as f:
-            f.write(file_data)
+        return self.get_public_url(file_path)
+    
+    async def save_local_file(self, local_path: Path, file_path: str) -> str:
+        """Copy a local file into storage without reading it into memory.
+        
+        Args:
+            local_path: Path of the local file to store
+            file_path: Destination path within storage
+            
+        Returns:
+            Public URL to access the file
+        """
+        await self._io.run(self._copy_file, Path(local_path), self.storage_root / file_path)
         
         return self.get_public_url(file_path)
     
@@ -50,11 +66,10 @@ class LocalStorageAdapter(StorageAdapter):
         """
         full_path = self.storage_root / file_path
         
-        if not full_path.exists():
+        try:
+            return await self._io.run(full_path.read_bytes)
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
-        
-        with open(full_path, 'rb') as f:
-            return f.read()
     
     async def delete_file(self, file_path: str) -> bool:
         """Delete file from local filesystem.
@@ -65,26 +80,7 @@ class LocalStorageAdapter(StorageAdapter):
         Returns:
             True if deleted successfully, False otherwise
         """
-        full_path = self.storage_root / file_path
-        
-        try:
-            if full_path.exists():
-                full_path.unlink()
-                # Try to remove parent directories if they're empty
-                try:
-                    parent = full_path.parent
-                    while parent != self.storage_root:
-                        if parent.exists() and not any(parent.iterdir()):
-                            parent.rmdir()
-                        else:
-                            break
-                        parent = parent.parent
-                except OSError:
-                    pass  # Directory not empty or other error
-                return True
-            return False
-        except OSError:
-            return False
+        return await self._io.run(self._delete_file, self.storage_root / file_path)
     
     async def file_exists(self, file_path: str) -> bool:
         """Check if file exists in local filesystem.
@@ -95,8 +91,7 @@ class LocalStorageAdapter(StorageAdapter):
         Returns:
             True if file exists, False otherwise
         """
-        full_path = self.storage_root / file_path
-        return full_path.exists() and full_path.is_file()
+        return await self._io.run((self.storage_root / file_path).is_file)
     
     def get_public_url(self, file_path: str) -> str:
         """Get public URL for file access.
@@ -121,7 +116,7 @@ class LocalStorageAdapter(StorageAdapter):
         """
         full_path = self.storage_root / dir_path
         try:
-            full_path.mkdir(parents=True, exist_ok=True)
+            await self._io.run(full_path.mkdir, parents=True, exist_ok=True)
             return True
         except Exception:
             return False
@@ -135,8 +130,7 @@ class LocalStorageAdapter(StorageAdapter):
         Returns:
             True if directory exists
         """
-        full_path = self.storage_root / dir_path
-        return full_path.exists() and full_path.is_dir()
+        return await self._io.run((self.storage_root / dir_path).is_dir)
     
     async def list_directories(self, base_path: str = "") -> list:
         """List directories at the given path in local storage.
@@ -149,14 +143,48 @@ class LocalStorageAdapter(StorageAdapter):
         """
         full_path = self.storage_root / base_path if base_path else self.storage_root
         
-        if not full_path.exists() or not full_path.is_dir():
-            return []
-        
         try:
-            return [
-                entry.name
-                for entry in full_path.iterdir()
-                if entry.is_dir()
-            ]
+            return await self._io.run(self._list_directories, full_path)
         except Exception:
-            return []
\ No newline at end of file
+            return []
+    
+    @staticmethod
+    def _write_file(full_path: Path, file_data: bytes) -> None:
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(full_path, 'wb') as f:
+            f.write(file_data)
+    
+    @staticmethod
+    def _copy_file(local_path: Path, full_path: Path) -> None:
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(local_path, full_path)
+    
+    def _delete_file(self, full_path: Path) -> bool:
+        try:
+            if full_path.exists():
+                full_path.unlink()
+                # Try to remove parent directories if they're empty
+                try:
+                    parent = full_path.parent
+                    while parent != self.storage_root:
+                        if parent.exists() and not any(parent.iterdir()):
+                            parent.rmdir()
+                        else:
+                            break
+                        parent = parent.parent
+                except OSError:
+                    pass  # Directory not empty or other error
+                return True
+            return False
+        except OSError:
+            return False
+    
+    @staticmethod
+    def _list_directories(full_path: Path) -> list:
+        if not full_path.is_dir():
+            return []
+        return [
+            entry.name
+            for entry in full_path.iterdir()
+            if entry.is_dir()
+        ]
\ No newline at end of file
@@ -1,14 +1,23 @@
 """
 MinIO storage adapter for Vertex AR.
 """
+from pathlib import Path
 from urllib.parse import urljoin
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from app.storage import StorageAdapter
+from app.storage_io import get_storage_executor
 
 
 class MinioStorageAdapter(StorageAdapter):
-    """MinIO storage implementation."""
+    """MinIO storage implementation.
+    
+    The minio client is synchronous; its calls run on the bounded "minio"
+    storage executor instead of the event loop.
+    """
+    
+    # Read size when streaming an object
+    STREAM_CHUNK_SIZE = 1024 * 1024
     
     def __init__(self, endpoint: str, access_key: str, secret_key: str, bucket: str):
         """Initialize MinIO storage adapter.
@@ -23,6 +32,7 @@ class MinioStorageAdapter(StorageAdapter):
         self.access_key = access_key
         self.secret_key = secret_key
         self.bucket = bucket
+        self._io = get_storage_executor("minio")
         
         try:
             from minio import Minio
@@ -40,6 +50,11 @@ class MinioStorageAdapter(StorageAdapter):
         except ImportError:
             raise ImportError("minio package is required for MinIO storage. Install with: pip install minio")
     
+    @property
+    def cache_namespace(self) -> str:
+        """Media cache namespace: the endpoint and bucket."""
+        return f"minio:{self.endpoint}/{self.bucket}"
+    
     async def save_file(self, file_data: bytes, file_path: str) -> str:
         """Save file data to MinIO.
         
@@ -54,7 +69,8 @@ class MinioStorageAdapter(StorageAdapter):
         from minio.error import S3Error
         
         try:
-            self.client.put_object(
+            await self._io.run(
+                self.client.put_object,
                 self.bucket,
                 file_path,
                 BytesIO(file_data),
@@ -64,6 +80,24 @@ class MinioStorageAdapter(StorageAdapter):
         except S3Error as e:
             raise Exception(f"Failed to save file to MinIO: {e}")
     
+    async def save_local_file(self, local_path: Path, file_path: str) -> str:
+        """Stream a local file to MinIO.
+        
+        Args:
+            local_path: Path of the local file to store
+            file_path: Destination path within storage
+            
+        Returns:
+            Public URL to access the file
+        """
+        from minio.error import S3Error
+        
+        try:
+            await self._io.run(self.client.fput_object, self.bucket, file_path, str(local_path))
+            return self.get_public_url(file_path)
+        except S3Error as e:
+            raise Exception(f"Failed to save file to MinIO: {e}")
+    
     async def get_file(self, file_path: str) -> bytes:
         """Get file data from MinIO.
         
@@ -76,11 +110,32 @@ class MinioStorageAdapter(StorageAdapter):
         from minio.error import S3Error
         
         try:
-            response = self.client.get_object(self.bucket, file_path)
-            return response.read()
+            return await self._io.run(self._read_object, file_path)
         except S3Error as e:
             raise FileNotFoundError(f"File not found in MinIO: {file_path}")
     
+    async def iter_file(self, file_path: str) -> AsyncIterator[bytes]:
+        """Stream file data from MinIO in STREAM_CHUNK_SIZE pieces.
+        
+        Args:
+            file_path: Path to the file in storage
+        """
+        from minio.error import S3Error
+        
+        try:
+            response = await self._io.run(self.client.get_object, self.bucket, file_path)
+        except S3Error:
+            raise FileNotFoundError(f"File not found in MinIO: {file_path}")
+        try:
+            while True:
+                chunk = await self._io.run(response.read, self.STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            response.close()
+            response.release_conn()
+    
     async def delete_file(self, file_path: str) -> bool:
         """Delete file from MinIO.
         
@@ -93,7 +148,7 @@ class MinioStorageAdapter(StorageAdapter):
         from minio.error import S3Error
         
         try:
-            self.client.remove_object(self.bucket, file_path)
+            await self._io.run(self.client.remove_object, self.bucket, file_path)
             return True
         except S3Error:
             return False
@@ -110,11 +165,19 @@ class MinioStorageAdapter(StorageAdapter):
         from minio.error import S3Error
         
         try:
-            self.client.stat_object(self.bucket, file_path)
+            await self._io.run(self.client.stat_object, self.bucket, file_path)
             return True
         except S3Error:
             return False
     
+    def _read_object(self, file_path: str) -> bytes:
+        response = self.client.get_object(self.bucket, file_path)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+    
     def get_public_url(self, file_path: str) -> str:
         """Get public URL for file access.
         
@@ -153,7 +216,8 @@ class MinioStorageAdapter(StorageAdapter):
         
         try:
             # Create a zero-byte marker object for the directory
-            self.client.put_object(
+            await self._io.run(
+                self.client.put_object,
                 self.bucket,
                 dir_path,
                 BytesIO(b''),
@@ -180,16 +244,18 @@ class MinioStorageAdapter(StorageAdapter):
         
         try:
             # Check if the directory marker exists
-            self.client.stat_object(self.bucket, dir_path)
+            await self._io.run(self.client.stat_object, self.bucket, dir_path)
             return True
         except S3Error:
             # Also check if there are any objects with this prefix
             try:
-                objects = list(self.client.list_objects(
-                    self.bucket,
-                    prefix=dir_path,
-                    max_keys=1
-                ))
+                objects = await self._io.run(
+                    lambda: list(self.client.list_objects(
+                        self.bucket,
+                        prefix=dir_path,
+                        max_keys=1
+                    ))
+                )
                 return len(objects) > 0
             except S3Error:
                 return False
@@ -211,10 +277,13 @@ class MinioStorageAdapter(StorageAdapter):
         
         try:
             # List objects with delimiter to get "directories"
-            objects = self.client.list_objects(
-                self.bucket,
-                prefix=base_path,
-                recursive=False
+            # The listing is paged lazily; consume it on the executor
+            objects = await self._io.run(
+                lambda: list(self.client.list_objects(
+                    self.bucket,
+                    prefix=base_path,
+                    recursive=False
+                ))
             )
             
             directories = set()
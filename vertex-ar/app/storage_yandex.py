@@ -4,20 +4,23 @@ Stores photos, videos, previews, and NFT files on Yandex Disk.
 
 Enhanced with:
 - Persistent session for connection pooling
+- Pooled keep-alive transport for chunk traffic (requests or aiohttp)
 - Configurable request timeouts
 - Chunked uploads/downloads for large files
 - Directory creation caching with TTL
 - Prometheus metrics for monitoring
 """
 import asyncio
+import hashlib
 import json
 import os
+import threading
 import time
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
 from io import BytesIO
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, List, Optional, Tuple, Union
 from urllib.parse import quote
 
 import requests
@@ -25,6 +28,8 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from app.storage import StorageAdapter
+from app.storage_io import get_storage_executor
+from app.yandex_transport import create_transport
 from logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -86,6 +91,12 @@ class YandexDiskStorageAdapter(StorageAdapter):
     
     BASE_URL = "https://cloud-api.yandex.net/v1/disk"
     
+    # Backoff before retrying a failed file of a batch upload (doubles per attempt)
+    RETRY_BACKOFF_SECONDS = 1.0
+    
+    # Range size when streaming downloads, small so the first bytes go out early
+    STREAM_CHUNK_SIZE = 1024 * 1024
+    
     # Prometheus metrics (initialized on first import)
     _metrics_initialized = False
     
@@ -99,7 +110,10 @@ class YandexDiskStorageAdapter(StorageAdapter):
         cache_ttl: int = 300,
         cache_size: int = 1000,
         pool_connections: int = 10,
-        pool_maxsize: int = 20
+        pool_maxsize: int = 20,
+        http_client: str = "requests",
+        limit_per_host: Optional[int] = None,
+        keepalive_timeout: float = 30.0
     ):
         """
         Initialize Yandex Disk storage adapter.
@@ -114,6 +128,9 @@ class YandexDiskStorageAdapter(StorageAdapter):
             cache_size: Maximum directory cache entries
             pool_connections: Connection pool size
             pool_maxsize: Maximum pool size
+            http_client: Transport for chunk uploads/downloads ("requests" or "aiohttp")
+            limit_per_host: Connections per storage host (aiohttp, defaults to pool_maxsize)
+            keepalive_timeout: Idle connection lifetime in seconds (aiohttp)
         """
         self.oauth_token = oauth_token
         self.base_path = base_path.rstrip('/')
@@ -124,6 +141,20 @@ class YandexDiskStorageAdapter(StorageAdapter):
         # Initialize persistent session with connection pooling
         self.session = self._create_session(pool_connections, pool_maxsize)
         
+        # Blocking HTTP calls run on the bounded "yandex" storage executor
+        self._io = get_storage_executor("yandex")
+        
+        # Chunk traffic goes to separate storage hosts without the OAuth header
+        self.transfer = create_transport(
+            http_client,
+            self._io,
+            timeout,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout
+        )
+        
         # Initialize directory cache
         self.directory_cache = DirectoryCache(max_size=cache_size, ttl_seconds=cache_ttl)
         
@@ -140,9 +171,16 @@ class YandexDiskStorageAdapter(StorageAdapter):
             chunk_size_mb=chunk_size_mb,
             upload_concurrency=upload_concurrency,
             cache_ttl=cache_ttl,
-            cache_size=cache_size
+            cache_size=cache_size,
+            http_client=self.transfer.name
         )
     
+    @property
+    def cache_namespace(self) -> str:
+        """Media cache namespace: the account (by token hash) and base path."""
+        account = hashlib.sha256(self.oauth_token.encode("utf-8")).hexdigest()[:16]
+        return f"yandex:{account}/{self.base_path}"
+    
     def _create_session(self, pool_connections: int, pool_maxsize: int) -> requests.Session:
         """Create persistent session with retry logic and connection pooling."""
         session = requests.Session()
@@ -331,9 +369,7 @@ class YandexDiskStorageAdapter(StorageAdapter):
         
         try:
             # Run in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
+            await self._io.run(
                 lambda: self._make_request("PUT", "/resources", params={"path": dir_path})
             )
             logger.info("Created directory on Yandex Disk", directory=dir_path)
@@ -373,59 +409,69 @@ class YandexDiskStorageAdapter(StorageAdapter):
         )
         return response.json()["href"]
     
-    async def _chunked_upload(self, file_data: bytes, upload_url: str) -> bool:
-        """Upload file in chunks with concurrency control."""
-        file_size = len(file_data)
+    async def _chunked_upload(self, source: Union[bytes, Path], upload_url: str) -> bool:
+        """Upload bytes or a local file in chunks with concurrency control.
+        
+        Chunks of a local file are read only when they are sent, so at most
+        ``upload_concurrency`` chunks are held in memory. All chunks go through
+        the pooled transport and reuse its kept-alive connections.
+        """
+        if isinstance(source, (bytes, bytearray)):
+            file_size = len(source)
+            
+            async def read_range(start: int, end: int) -> bytes:
+                return source[start:end]
+        else:
+            file_size = os.path.getsize(source)
+            
+            def read_file_range(start: int, end: int) -> bytes:
+                with open(source, "rb") as f:
+                    f.seek(start)
+                    return f.read(end - start)
+            
+            async def read_range(start: int, end: int) -> bytes:
+                return await self._io.run(read_file_range, start, end)
         
         # Use direct upload for small files
         if file_size <= self.chunk_size:
             logger.debug("Using direct upload for small file", size_bytes=file_size)
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: requests.put(upload_url, data=file_data, timeout=self.timeout)
-            )
-            response.raise_for_status()
+            await self.transfer.put(upload_url, await read_range(0, file_size))
             self.bytes_transferred.labels(operation="upload").inc(file_size)
             return True
         
         # Chunked upload for large files
         logger.info("Starting chunked upload", size_bytes=file_size, chunk_size=self.chunk_size, chunks=file_size // self.chunk_size + 1)
         
-        # Split into chunks
+        # Split into chunk ranges
         chunks = []
         offset = 0
         while offset < file_size:
             end = min(offset + self.chunk_size, file_size)
-            chunks.append((offset, end, file_data[offset:end]))
+            chunks.append((offset, end))
             offset = end
         
         # Upload chunks with concurrency control
         semaphore = asyncio.Semaphore(self.upload_concurrency)
         
-        async def upload_chunk(chunk_data: Tuple[int, int, bytes]) -> bool:
+        async def upload_chunk(chunk_range: Tuple[int, int]) -> bool:
             async with semaphore:
-                start_offset, end_offset, data = chunk_data
+                start_offset, end_offset = chunk_range
                 headers = {
                     "Content-Range": f"bytes {start_offset}-{end_offset-1}/{file_size}"
                 }
                 
                 try:
-                    loop = asyncio.get_event_loop()
-                    response = await loop.run_in_executor(
-                        None,
-                        lambda: requests.put(upload_url, data=data, headers=headers, timeout=self.timeout)
-                    )
-                    response.raise_for_status()
+                    data = await read_range(start_offset, end_offset)
+                    await self.transfer.put(upload_url, data, headers=headers)
                     
                     self.chunks_transferred.labels(operation="upload").inc()
-                    self.bytes_transferred.labels(operation="upload").inc(len(data))
+                    self.bytes_transferred.labels(operation="upload").inc(end_offset - start_offset)
                     
                     logger.debug(
                         "Chunk uploaded",
                         start=start_offset,
                         end=end_offset,
-                        size=len(data)
+                        size=end_offset - start_offset
                     )
                     return True
                 except Exception as e:
@@ -459,6 +505,22 @@ class YandexDiskStorageAdapter(StorageAdapter):
         Returns:
             Public URL to access the file
         """
+        return await self._save(file_data, file_path, len(file_data))
+    
+    async def save_local_file(self, local_path: Path, file_path: str) -> str:
+        """Stream a local file to Yandex Disk with chunked upload support.
+        
+        Args:
+            local_path: Path of the local file to store
+            file_path: Destination path within storage
+            
+        Returns:
+            Public URL to access the file
+        """
+        local_path = Path(local_path)
+        return await self._save(local_path, file_path, local_path.stat().st_size)
+    
+    async def _save(self, source: Union[bytes, Path], file_path: str, size_bytes: int) -> str:
         remote_path = self._get_full_path(file_path)
         
         start_time = time.time()
@@ -472,20 +534,18 @@ class YandexDiskStorageAdapter(StorageAdapter):
                 await self._ensure_directory_exists(parent_dir)
             
             # Get upload URL
-            loop = asyncio.get_event_loop()
-            upload_url = await loop.run_in_executor(
-                None,
+            upload_url = await self._io.run(
                 lambda: self._get_upload_url(remote_path)
             )
             
             # Upload file (with chunking for large files)
-            await self._chunked_upload(file_data, upload_url)
+            await self._chunked_upload(source, upload_url)
             
             logger.info(
                 "File saved to Yandex Disk",
                 file_path=file_path,
                 remote_path=remote_path,
-                size_bytes=len(file_data)
+                size_bytes=size_bytes
             )
             
             success = True
@@ -503,61 +563,244 @@ class YandexDiskStorageAdapter(StorageAdapter):
             duration = time.time() - start_time
             self._record_operation("save_file", duration, success, error_type)
     
-    async def _chunked_download(self, download_url: str, expected_size: Optional[int] = None) -> bytes:
-        """Download file in chunks for better memory efficiency."""
-        loop = asyncio.get_event_loop()
+    async def ensure_paths(self, dir_paths: Iterable[str]) -> Dict[str, bool]:
+        """Create several directory paths with shared, concurrent requests.
+        
+        Every level of every path is planned up front. Levels in the directory
+        cache are skipped; the rest are created one depth at a time, with the
+        directories of a depth created concurrently (at most
+        ``upload_concurrency`` requests in flight).
+        
+        Args:
+            dir_paths: Directory paths relative to base_path
+            
+        Returns:
+            Dict mapping each requested path to whether it exists now
+        """
+        targets: Dict[str, List[str]] = {}
+        depths: Dict[int, set] = {}
+        for dir_path in dir_paths:
+            parts = [part for part in dir_path.split('/') if part]
+            levels = [self._get_full_path('/'.join(parts[:i])) for i in range(1, len(parts) + 1)]
+            targets[dir_path] = levels
+            for depth, level in enumerate(levels):
+                depths.setdefault(depth, set()).add(level)
         
+        semaphore = asyncio.Semaphore(self.upload_concurrency)
+        created: Dict[str, bool] = {}
+        
+        async def create(level: str) -> bool:
+            async with semaphore:
+                try:
+                    return await self._ensure_directory_exists(level)
+                except Exception:
+                    return False
+        
+        for depth in sorted(depths):
+            pending = []
+            for level in sorted(depths[depth]):
+                # Nothing can be created below a level that failed
+                if created.get(level.rsplit('/', 1)[0], True):
+                    pending.append(level)
+                else:
+                    created[level] = False
+            results = await asyncio.gather(*(create(level) for level in pending))
+            created.update(zip(pending, results))
+        
+        return {
+            dir_path: all(created[level] for level in levels)
+            for dir_path, levels in targets.items()
+        }
+    
+    async def save_files(self, files: List[Tuple[Union[bytes, Path], str]], retries: int = 2) -> Dict[str, str]:
+        """Upload several files concurrently.
+        
+        Parent directories of the whole batch are created once, upload URLs
+        are requested in parallel and at most ``upload_concurrency`` files are
+        uploaded at a time. A failed file is retried with a fresh upload URL.
+        
+        Args:
+            files: (raw data or local file path, destination path within storage) pairs
+            retries: Extra attempts per file
+            
+        Returns:
+            Dict mapping each destination path to its public URL
+            
+        Raises:
+            Exception: If a file still fails after its retries (the other
+                files are uploaded regardless)
+        """
+        if not files:
+            return {}
+        
+        parents = {file_path.rsplit('/', 1)[0] for _, file_path in files if '/' in file_path}
+        await self.ensure_paths(parents)
+        
+        async def get_upload_url(file_path: str) -> str:
+            remote_path = self._get_full_path(file_path)
+            return await self._io.run(lambda: self._get_upload_url(remote_path))
+        
+        upload_urls = await asyncio.gather(*(get_upload_url(file_path) for _, file_path in files), return_exceptions=True)
+        semaphore = asyncio.Semaphore(self.upload_concurrency)
+        
+        async def upload(source: Union[bytes, Path], file_path: str, upload_url) -> str:
+            async with semaphore:
+                start_time = time.time()
+                success = False
+                error_type = None
+                try:
+                    for attempt in range(retries + 1):
+                        try:
+                            if attempt:
+                                await asyncio.sleep(self.RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+                                upload_url = await get_upload_url(file_path)
+                            elif isinstance(upload_url, BaseException):
+                                raise upload_url
+                            await self._chunked_upload(source, upload_url)
+                            break
+                        except Exception as e:
+                            error_type = type(e).__name__
+                            if attempt == retries:
+                                raise
+                            logger.warning(
+                                "Retrying file upload to Yandex Disk",
+                                error=str(e),
+                                file_path=file_path,
+                                attempt=attempt + 1
+                            )
+                    
+                    logger.info("File saved to Yandex Disk", file_path=file_path, remote_path=self._get_full_path(file_path))
+                    success = True
+                    return self.get_public_url(file_path)
+                finally:
+                    self._record_operation("save_file", time.time() - start_time, success, error_type)
+        
+        results = await asyncio.gather(
+            *(upload(source, file_path, upload_url) for (source, file_path), upload_url in zip(files, upload_urls)),
+            return_exceptions=True
+        )
+        
+        failures = [(file_path, result) for (_, file_path), result in zip(files, results) if isinstance(result, Exception)]
+        if failures:
+            file_path, error = failures[0]
+            logger.error("Failed to save files to Yandex Disk", failures=len(failures), total_files=len(files), error=str(error))
+            raise Exception(f"Failed to save file to Yandex Disk: {file_path}: {error}")
+        
+        return {file_path: url for (_, file_path), url in zip(files, results)}
+    
+    async def _get_range(self, download_url: str, start: int, end: int) -> bytes:
+        """Fetch bytes start..end (inclusive) of a download URL over the pooled transport."""
+        status, data = await self.transfer.get(download_url, headers={"Range": f"bytes={start}-{end}"})
+        if status != 206:
+            # Server ignored the range and sent the whole file
+            data = data[start:end + 1]
+        return data
+    
+    async def iter_download(
+        self,
+        download_url: str,
+        start: int,
+        end: int,
+        chunk_size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Yield bytes start..end (inclusive) of a download URL in order.
+        
+        Ranges are fetched in parallel over the pooled transport, at most
+        ``upload_concurrency`` ahead of the consumer, so the first range is
+        yielded as soon as it arrives and memory stays bounded.
+        
+        Args:
+            download_url: Download URL returned by get_download_info
+            start: First byte to fetch
+            end: Last byte to fetch (inclusive)
+            chunk_size: Range size in bytes (defaults to STREAM_CHUNK_SIZE)
+        """
+        chunk_size = chunk_size or self.STREAM_CHUNK_SIZE
+        pending: Deque[asyncio.Future] = deque()
+        
+        async def fetch(range_start: int, range_end: int) -> bytes:
+            data = await self._get_range(download_url, range_start, range_end)
+            self.chunks_transferred.labels(operation="download").inc()
+            self.bytes_transferred.labels(operation="download").inc(len(data))
+            return data
+        
+        try:
+            for offset in range(start, end + 1, chunk_size):
+                pending.append(asyncio.ensure_future(fetch(offset, min(offset + chunk_size, end + 1) - 1)))
+                if len(pending) >= self.upload_concurrency:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # Client went away or a range failed: drop the prefetched ranges
+            for task in pending:
+                task.cancel()
+    
+    async def _chunked_download(self, download_url: str, expected_size: Optional[int] = None) -> bytes:
+        """Download file, fetching ranges of large files in parallel."""
         # Get file size if not provided
         if expected_size is None:
-            response = await loop.run_in_executor(
-                None,
-                lambda: requests.head(download_url, timeout=self.timeout)
-            )
-            expected_size = int(response.headers.get('Content-Length', 0))
+            expected_size = await self.transfer.content_length(download_url)
         
         # Use direct download for small files
         if expected_size <= self.chunk_size:
             logger.debug("Using direct download for small file", size_bytes=expected_size)
-            response = await loop.run_in_executor(
-                None,
-                lambda: requests.get(download_url, timeout=self.timeout)
-            )
-            response.raise_for_status()
-            self.bytes_transferred.labels(operation="download").inc(len(response.content))
-            return response.content
+            _, data = await self.transfer.get(download_url)
+            self.bytes_transferred.labels(operation="download").inc(len(data))
+            return data
         
         # Chunked download for large files
         logger.info("Starting chunked download", size_bytes=expected_size, chunk_size=self.chunk_size)
         
-        chunks = []
-        offset = 0
-        
-        while offset < expected_size:
-            end = min(offset + self.chunk_size - 1, expected_size - 1)
-            headers = {"Range": f"bytes={offset}-{end}"}
-            
-            response = await loop.run_in_executor(
-                None,
-                lambda: requests.get(download_url, headers=headers, timeout=self.timeout)
+        chunks = [
+            chunk async for chunk in self.iter_download(
+                download_url, 0, expected_size - 1, chunk_size=self.chunk_size
             )
-            response.raise_for_status()
-            
-            chunks.append(response.content)
-            self.chunks_transferred.labels(operation="download").inc()
-            self.bytes_transferred.labels(operation="download").inc(len(response.content))
-            
-            logger.debug(
-                "Chunk downloaded",
-                start=offset,
-                end=end,
-                size=len(response.content)
-            )
-            
-            offset = end + 1
+        ]
         
         logger.info("Chunked download completed", chunks=len(chunks), size_bytes=expected_size)
         return b''.join(chunks)
     
+    async def get_download_info(self, file_path: str) -> Dict[str, Any]:
+        """Resolve a file to its download URL, size and MIME type.
+        
+        The download link and the file metadata are requested in parallel.
+        
+        Args:
+            file_path: Path to the file in storage
+            
+        Returns:
+            Dict with ``href``, ``size`` and ``mime_type``
+            
+        Raises:
+            FileNotFoundError: If the file does not exist or cannot be resolved
+        """
+        remote_path = self._get_full_path(file_path)
+        try:
+            link, meta = await asyncio.gather(
+                self._io.run(
+                    lambda: self._make_request("GET", "/resources/download", params={"path": remote_path})
+                ),
+                self._io.run(
+                    lambda: self._make_request(
+                        "GET",
+                        "/resources",
+                        params={"path": remote_path, "fields": "type,size,mime_type"}
+                    )
+                )
+            )
+            metadata = meta.json()
+            if metadata.get("type") == "dir":
+                raise IsADirectoryError(remote_path)
+            return {
+                "href": link.json()["href"],
+                "size": int(metadata.get("size", 0)),
+                "mime_type": metadata.get("mime_type"),
+            }
+        except Exception as e:
+            logger.error("Failed to resolve Yandex Disk download", error=str(e), file_path=file_path)
+            raise FileNotFoundError(f"File not found on Yandex Disk: {file_path}")
+    
     async def get_file(self, file_path: str) -> bytes:
         """Get file data from Yandex Disk with chunked download support.
         
@@ -574,20 +817,11 @@ class YandexDiskStorageAdapter(StorageAdapter):
         error_type = None
         
         try:
-            # Get download URL
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self._make_request(
-                    "GET",
-                    "/resources/download",
-                    params={"path": remote_path}
-                )
-            )
-            download_url = response.json()["href"]
+            # Get download URL and size (saves a HEAD round trip)
+            info = await self.get_download_info(file_path)
             
             # Download file (with chunking for large files)
-            data = await self._chunked_download(download_url)
+            data = await self._chunked_download(info["href"], info["size"])
             
             logger.info(
                 "File downloaded from Yandex Disk",
@@ -611,6 +845,18 @@ class YandexDiskStorageAdapter(StorageAdapter):
             duration = time.time() - start_time
             self._record_operation("get_file", duration, success, error_type)
     
+    async def iter_file(self, file_path: str) -> AsyncIterator[bytes]:
+        """Stream file data from Yandex Disk range by range.
+        
+        Args:
+            file_path: Path to the file in storage
+        """
+        info = await self.get_download_info(file_path)
+        if info["size"] <= 0:
+            return
+        async for chunk in self.iter_download(info["href"], 0, info["size"] - 1):
+            yield chunk
+    
     async def delete_file(self, file_path: str) -> bool:
         """Delete file from Yandex Disk.
         
@@ -627,9 +873,7 @@ class YandexDiskStorageAdapter(StorageAdapter):
         error_type = None
         
         try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
+            await self._io.run(
                 lambda: self._make_request(
                     "DELETE",
                     "/resources",
@@ -674,9 +918,7 @@ class YandexDiskStorageAdapter(StorageAdapter):
         error_type = None
         
         try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
+            await self._io.run(
                 lambda: self._make_request("GET", "/resources", params={"path": remote_path})
             )
             success = True
@@ -903,11 +1145,14 @@ class YandexDiskStorageAdapter(StorageAdapter):
             )
             return False
     
-    def ensure_order_structure(self, folder_id: str, content_type: str, order_id: str) -> Dict[str, bool]:
+    async def ensure_order_structure(self, folder_id: str, content_type: str, order_id: str) -> Dict[str, bool]:
         """
         Create the required folder structure for an order on Yandex Disk.
         Structure: {folder_id}/{content_type}/{order_id}/[Image|QR|nft_markers|nft_cache]
         
+        The whole tree is planned once (see ensure_paths), so the four
+        subdirectories are created together after their missing parents.
+        
         Args:
             folder_id: Base folder ID for the company
             content_type: Content type (e.g., 'portraits', 'videos')
@@ -920,14 +1165,11 @@ class YandexDiskStorageAdapter(StorageAdapter):
         results = {}
         
         try:
-            # Create base order path
             base_path = f"{folder_id}/{content_type}/{order_id}"
-            self.ensure_path(base_path)
+            created = await self.ensure_paths([f"{base_path}/{subdir}" for subdir in subdirs])
             
-            # Create subdirectories
             for subdir in subdirs:
-                subdir_path = f"{base_path}/{subdir}"
-                success = self.ensure_path(subdir_path)
+                success = created[f"{base_path}/{subdir}"]
                 results[subdir] = success
                 
                 if success:
@@ -1081,9 +1323,7 @@ class YandexDiskStorageAdapter(StorageAdapter):
         error_type = None
         
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
+            response = await self._io.run(
                 lambda: self._make_request("GET", "/resources", params={"path": full_path})
             )
             
@@ -1126,9 +1366,7 @@ class YandexDiskStorageAdapter(StorageAdapter):
         error_type = None
         
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
+            response = await self._io.run(
                 lambda: self._make_request("GET", "/resources", params={"path": full_path})
             )
             
@@ -1154,10 +1392,12 @@ class YandexDiskStorageAdapter(StorageAdapter):
             self._record_operation("list_directories", duration, success, error_type)
     
     def close(self):
-        """Close persistent session and cleanup resources."""
+        """Close persistent session, transfer connections and cleanup resources."""
         if self.session:
             self.session.close()
             logger.info("Yandex Disk session closed")
+        if getattr(self, "transfer", None) is not None:
+            self.transfer.close()
     
     def __del__(self):
         """Cleanup on deletion."""
@@ -1165,3 +1405,53 @@ class YandexDiskStorageAdapter(StorageAdapter):
             self.close()
         except:
             pass
+
+
+# Adapters shared by API endpoints, keyed by (token, base_path)
+ADAPTER_CACHE_SIZE = 16
+_adapters: "OrderedDict[Tuple[str, str], YandexDiskStorageAdapter]" = OrderedDict()
+_adapters_lock = threading.Lock()
+
+
+def get_yandex_adapter(oauth_token: str, base_path: str = "vertex-ar") -> YandexDiskStorageAdapter:
+    """
+    Get a shared adapter for an OAuth token and base path, creating it if needed.
+    
+    Building an adapter opens a connection pool and creates the base directory
+    on the disk, so request handlers reuse one per token instead of paying for
+    a new pool and TLS handshakes on every request.
+    """
+    key = (oauth_token, base_path)
+    with _adapters_lock:
+        adapter = _adapters.get(key)
+        if adapter is not None:
+            _adapters.move_to_end(key)
+            return adapter
+    
+    from app.config import settings
+    adapter = YandexDiskStorageAdapter(
+        oauth_token=oauth_token,
+        base_path=base_path,
+        timeout=settings.YANDEX_REQUEST_TIMEOUT,
+        chunk_size_mb=settings.YANDEX_CHUNK_SIZE_MB,
+        upload_concurrency=settings.YANDEX_UPLOAD_CONCURRENCY,
+        cache_ttl=settings.YANDEX_DIRECTORY_CACHE_TTL,
+        cache_size=settings.YANDEX_DIRECTORY_CACHE_SIZE,
+        pool_connections=settings.YANDEX_SESSION_POOL_CONNECTIONS,
+        pool_maxsize=settings.YANDEX_SESSION_POOL_MAXSIZE,
+        http_client=settings.YANDEX_HTTP_CLIENT,
+        limit_per_host=settings.YANDEX_HTTP_LIMIT_PER_HOST,
+        keepalive_timeout=settings.YANDEX_HTTP_KEEPALIVE_TIMEOUT
+    )
+    with _adapters_lock:
+        # Another request may have created one meanwhile; keep the first
+        shared = _adapters.setdefault(key, adapter)
+        _adapters.move_to_end(key)
+        evicted = [_adapters.popitem(last=False)[1] for _ in range(len(_adapters) - ADAPTER_CACHE_SIZE)]
+    if shared is not adapter:
+        evicted.append(adapter)
+    for stale in evicted:
+        # Releases the pooled connections; both transports reopen a session
+        # lazily, so requests still holding the adapter keep working
+        stale.close()
+    return shared
@@ -3,7 +3,10 @@ Utility functions for Vertex AR application.
 Contains shared utility functions that don't depend on other app modules.
 """
 
+import base64
 import hashlib
+import json
+from typing import Any, Optional, Sequence, Tuple
 
 
 def hash_password(password: str) -> str:
@@ -14,3 +17,63 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed: str) -> bool:
     """Verify password against hash."""
     return hash_password(password) == hashed
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last returned row as an opaque pagination cursor."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[Any, ...]:
+    """
+    Decode a pagination cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed or does not hold ``size`` values
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return tuple(values)
+
+
+def parse_range_header(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header against a resource of ``size`` bytes.
+
+    Supports ``bytes=start-end``, ``bytes=start-`` and suffix ``bytes=-length``.
+
+    Returns:
+        Inclusive (start, end) byte positions, or None when the header is absent,
+        malformed or asks for several ranges (the whole resource is served)
+
+    Raises:
+        ValueError: If the range cannot be satisfied (answer with 416)
+    """
+    if not range_header or "," in range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    start_text, separator, end_text = spec.strip().partition("-")
+    if unit.strip().lower() != "bytes" or not separator:
+        return None
+    if not all(text.isdigit() for text in (start_text, end_text) if text):
+        return None
+    start = int(start_text) if start_text else None
+    end = int(end_text) if end_text else None
+
+    if start is None:
+        if end is None:
+            return None
+        if end == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(0, size - end), size - 1
+    if end is not None and end < start:
+        return None
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    return start, size - 1 if end is None else min(end, size - 1)
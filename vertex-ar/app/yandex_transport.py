@@ -0,0 +1,214 @@
+"""
+HTTP transports for Yandex Disk data-plane traffic (chunk uploads and downloads).
+
+Upload and download hrefs returned by the Yandex Disk API point at separate
+storage hosts. Every chunk goes through one long-lived client, so chunks to
+the same host reuse kept-alive connections instead of paying a TCP and TLS
+handshake each.
+
+Two backends are available:
+
+- ``requests``: a pooled ``requests.Session`` whose blocking calls run on the
+  bounded "yandex" storage executor;
+- ``aiohttp``: a native asyncio client with a per-host connection limit and
+  a keep-alive timeout, which needs no executor threads.
+"""
+import asyncio
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.storage_io import StorageIOExecutor
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Same policy as the API session: retry throttling and server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 1.0
+
+
+class RequestsTransport:
+    """Pooled keep-alive ``requests.Session`` driven from the storage executor."""
+
+    name = "requests"
+
+    def __init__(self, io: StorageIOExecutor, timeout: float, pool_connections: int = 10, pool_maxsize: int = 20):
+        """
+        Initialize transport.
+
+        Args:
+            io: Executor the blocking calls run on
+            timeout: Request timeout in seconds
+            pool_connections: Number of hosts to keep connection pools for
+            pool_maxsize: Connections kept alive per host
+        """
+        self.io = io
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            max_retries=Retry(
+                total=RETRY_ATTEMPTS,
+                backoff_factor=RETRY_BACKOFF_SECONDS,
+                status_forcelist=list(RETRY_STATUSES),
+                allowed_methods=["HEAD", "GET", "PUT"],
+            ),
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=False,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    async def put(self, url: str, data: bytes, headers: Optional[Dict[str, str]] = None) -> int:
+        """Upload a body, returning the response status."""
+        def call():
+            response = self.session.put(url, data=data, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            return response.status_code
+        return await self.io.run(call)
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        """Download a body, returning the response status and content."""
+        def call():
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            return response.status_code, response.content
+        return await self.io.run(call)
+
+    async def content_length(self, url: str) -> int:
+        """Size of a download from a HEAD request (following redirects)."""
+        def call():
+            response = self.session.head(url, allow_redirects=True, timeout=self.timeout)
+            response.raise_for_status()
+            return int(response.headers.get("Content-Length", 0))
+        return await self.io.run(call)
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
+
+
+class AiohttpTransport:
+    """Native asyncio client with per-host connection limits and keep-alive."""
+
+    name = "aiohttp"
+
+    def __init__(self, timeout: float, limit: int = 100, limit_per_host: int = 20, keepalive_timeout: float = 30.0):
+        """
+        Initialize transport; the client session is opened on first use.
+
+        Args:
+            timeout: Request timeout in seconds
+            limit: Maximum open connections in total
+            limit_per_host: Maximum open connections per storage host
+            keepalive_timeout: Seconds an idle connection is kept open
+        """
+        self.timeout = timeout
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self._session = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self):
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        # A client session is bound to the loop that created it
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._loop = loop
+        return self._session
+
+    async def _request(self, method: str, url: str, **kwargs) -> Tuple[int, bytes, Dict[str, str]]:
+        import aiohttp
+
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            try:
+                async with self._get_session().request(method, url, **kwargs) as response:
+                    if response.status in RETRY_STATUSES and attempt < RETRY_ATTEMPTS:
+                        await response.read()
+                    else:
+                        response.raise_for_status()
+                        body = await response.read() if method != "HEAD" else b""
+                        return response.status, body, dict(response.headers)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == RETRY_ATTEMPTS:
+                    raise
+                logger.debug("Yandex transfer retry", method=method, attempt=attempt + 1, error=str(e))
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+    async def put(self, url: str, data: bytes, headers: Optional[Dict[str, str]] = None) -> int:
+        """Upload a body, returning the response status."""
+        status, _, _ = await self._request("PUT", url, data=data, headers=headers)
+        return status
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        """Download a body, returning the response status and content."""
+        status, body, _ = await self._request("GET", url, headers=headers)
+        return status, body
+
+    async def content_length(self, url: str) -> int:
+        """Size of a download from a HEAD request (following redirects)."""
+        _, _, headers = await self._request("HEAD", url, allow_redirects=True)
+        return int(headers.get("Content-Length", 0))
+
+    def close(self) -> None:
+        """Close the client session (scheduled when called outside its loop)."""
+        session, self._session = self._session, None
+        if session is None or session.closed:
+            return
+        try:
+            if asyncio.get_running_loop() is self._loop:
+                asyncio.ensure_future(session.close())
+                return
+        except RuntimeError:
+            pass
+        if self._loop is not None and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(session.close(), self._loop)
+
+
+def create_transport(
+    client: str,
+    io: StorageIOExecutor,
+    timeout: float,
+    pool_connections: int = 10,
+    pool_maxsize: int = 20,
+    limit_per_host: Optional[int] = None,
+    keepalive_timeout: float = 30.0,
+):
+    """
+    Create the data-plane transport selected by YANDEX_HTTP_CLIENT.
+
+    Args:
+        client: "requests" or "aiohttp"
+        io: Executor for the blocking requests backend
+        timeout: Request timeout in seconds
+        pool_connections: Hosts to keep pools for (requests)
+        pool_maxsize: Connections kept alive per host (requests)
+        limit_per_host: Connections per host (aiohttp, defaults to pool_maxsize)
+        keepalive_timeout: Idle connection lifetime in seconds (aiohttp)
+    """
+    if client == "aiohttp":
+        per_host = limit_per_host or pool_maxsize
+        return AiohttpTransport(
+            timeout=timeout,
+            limit=max(per_host * pool_connections, per_host),
+            limit_per_host=per_host,
+            keepalive_timeout=keepalive_timeout,
+        )
+    if client != "requests":
+        logger.warning("Unknown Yandex HTTP client, using requests", client=client)
+    return RequestsTransport(io, timeout, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
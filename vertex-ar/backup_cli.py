@@ -34,10 +34,10 @@ def cmd_create(args):
         result = manager.backup_database()
     elif args.type == "storage":
         print("Creating storage backup...")
-        result = manager.backup_storage()
+        result = manager.backup_storage(mode=args.mode)
     elif args.type == "full":
         print("Creating full backup (database + storage)...")
-        result = manager.create_full_backup()
+        result = manager.create_full_backup(mode=args.mode)
     else:
         print(f"Error: Unknown backup type '{args.type}'")
         return 1
@@ -51,6 +51,13 @@ def cmd_create(args):
                 print(f"  Size: {format_size(metadata['file_size'])}")
             if "checksum" in metadata:
                 print(f"  Checksum: {metadata['checksum'][:16]}...")
+        storage_metadata = result.get("storage") or result.get("metadata") or {}
+        if storage_metadata.get("snapshot_id"):
+            print(f"  Snapshot: {storage_metadata['snapshot_id']}")
+            print(f"  Files: {storage_metadata['file_count']} "
+                  f"({storage_metadata['new_files']} new, {storage_metadata['changed_files']} changed)")
+            print(f"  New data: {format_size(storage_metadata['new_bytes'])} "
+                  f"of {format_size(storage_metadata['total_size'])}")
     else:
         print(f"✗ Backup failed: {result.get('error')}")
         return 1
@@ -106,6 +113,34 @@ def cmd_list(args):
     return 0
 
 
+def cmd_snapshots(args):
+    """List incremental storage snapshots."""
+    manager = create_backup_manager(
+        backup_dir=Path(args.backup_dir) if args.backup_dir else None
+    )
+    
+    snapshots = manager.list_snapshots()
+    
+    if not snapshots:
+        print("No storage snapshots found")
+        return 0
+    
+    print(f"\nStorage Snapshots ({len(snapshots)} total):\n")
+    print(f"{'Snapshot ID':<22} {'Files':>7} {'Total':>12} {'New data':>12}  {'Parent'}")
+    print("-" * 80)
+    
+    for snapshot in snapshots:
+        print(
+            f"{snapshot.get('snapshot_id', 'unknown'):<22} "
+            f"{snapshot.get('file_count', 0):>7} "
+            f"{format_size(snapshot.get('total_size', 0)):>12} "
+            f"{format_size(snapshot.get('new_bytes', 0)):>12}  "
+            f"{snapshot.get('parent') or '-'}"
+        )
+    
+    return 0
+
+
 def cmd_stats(args):
     """Show backup statistics."""
     manager = create_backup_manager(
@@ -144,14 +179,28 @@ def cmd_restore(args):
         backup_dir=Path(args.backup_dir) if args.backup_dir else None
     )
     
-    backup_path = Path(args.backup_path)
+    if args.snapshot:
+        backup_path = manager.get_snapshot_path(args.snapshot)
+        if backup_path is None:
+            print(f"Error: Snapshot not found: {args.snapshot}")
+            return 1
+    elif args.backup_path:
+        backup_path = Path(args.backup_path)
+    else:
+        print("Error: Specify a backup file or --snapshot ID")
+        return 1
     
     if not backup_path.exists():
         print(f"Error: Backup file not found: {backup_path}")
         return 1
     
-    # Confirm restoration
-    if not args.yes:
+    snapshot_id = manager.snapshot_id_from_path(backup_path)
+    if args.target and snapshot_id is None:
+        print("Error: --target is only supported for storage snapshots")
+        return 1
+    
+    # Confirm restoration (restoring into a separate directory overwrites nothing)
+    if not args.yes and not args.target:
         print(f"\n⚠️  WARNING: This will restore from backup and overwrite current data!")
         print(f"   Backup: {backup_path}")
         response = input("\nAre you sure you want to continue? (yes/no): ")
@@ -162,7 +211,13 @@ def cmd_restore(args):
     print(f"\nRestoring from {backup_path}...")
     
     # Detect backup type from filename
-    if "db_backup" in backup_path.name or backup_path.suffix == ".db":
+    if snapshot_id is not None:
+        success = manager.restore_snapshot(
+            snapshot_id,
+            target_path=Path(args.target) if args.target else None,
+            verify_checksum=not args.no_verify
+        )
+    elif "db_backup" in backup_path.name or backup_path.suffix == ".db":
         success = manager.restore_database(backup_path, verify_checksum=not args.no_verify)
     elif "storage_backup" in backup_path.name:
         success = manager.restore_storage(backup_path, verify_checksum=not args.no_verify)
@@ -210,15 +265,24 @@ Examples:
   # Create database backup only
   python backup_cli.py create --type database
   
+  # Create storage backup as a full tar archive instead of a snapshot
+  python backup_cli.py create --type storage --mode archive
+  
   # List all backups
   python backup_cli.py list
   
+  # List incremental storage snapshots
+  python backup_cli.py snapshots
+  
   # Show backup statistics
   python backup_cli.py stats
   
   # Restore from backup
   python backup_cli.py restore backups/database/db_backup_20240101_120000.db
   
+  # Restore a storage snapshot into a separate directory
+  python backup_cli.py restore --snapshot 20240101_120000 --target /tmp/storage
+  
   # Rotate old backups
   python backup_cli.py rotate --max-backups 7
         """
@@ -240,6 +304,12 @@ Examples:
         default="full",
         help="Type of backup to create (default: full)"
     )
+    create_parser.add_argument(
+        "--mode",
+        choices=["incremental", "archive"],
+        default=None,
+        help="Storage backup mode: incremental snapshot or tar archive (default: from backup settings)"
+    )
     create_parser.add_argument(
         "--max-backups",
         type=int,
@@ -261,6 +331,9 @@ Examples:
         help="Type of backups to list (default: all)"
     )
     
+    # Snapshots command
+    subparsers.add_parser("snapshots", help="List incremental storage snapshots")
+    
     # Stats command
     stats_parser = subparsers.add_parser("stats", help="Show backup statistics")
     
@@ -268,8 +341,17 @@ Examples:
     restore_parser = subparsers.add_parser("restore", help="Restore from backup")
     restore_parser.add_argument(
         "backup_path",
+        nargs="?",
         help="Path to backup file to restore from"
     )
+    restore_parser.add_argument(
+        "--snapshot",
+        help="Storage snapshot ID to restore (instead of a backup file)"
+    )
+    restore_parser.add_argument(
+        "--target",
+        help="Restore a snapshot into this directory instead of replacing storage"
+    )
     restore_parser.add_argument(
         "--yes", "-y",
         action="store_true",
@@ -301,6 +383,8 @@ Examples:
         return cmd_create(args)
     elif args.command == "list":
         return cmd_list(args)
+    elif args.command == "snapshots":
+        return cmd_snapshots(args)
     elif args.command == "stats":
         return cmd_stats(args)
     elif args.command == "restore":
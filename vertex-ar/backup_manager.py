@@ -2,21 +2,96 @@
 Backup management system for Vertex AR.
 Handles database and file backups with rotation and restoration.
 Supports remote storage sync (Yandex Disk, Google Drive).
+
+Storage is backed up either as a compressed tar archive or as an
+incremental snapshot: a manifest of (path, size, mtime, hash) for every file
+whose content lives in a shared content-addressed chunk store, so only new
+or changed files are read and written on each run.
 """
 import json
 import shutil
 import sqlite3
 import tarfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Tuple
 import hashlib
 import os
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 from logging_setup import get_logger
 
 logger = get_logger(__name__)
 
+# Storage backup modes
+STORAGE_MODE_ARCHIVE = "archive"
+STORAGE_MODE_INCREMENTAL = "incremental"
+
+SNAPSHOT_PREFIX = "storage_snapshot_"
+MANIFEST_SUFFIX = ".manifest"
+
+# Chunk names are full SHA-256 hex digests; anything else is a temporary file
+CHUNK_NAME_LENGTH = 64
+# Temporary chunk files older than this are left over from interrupted runs
+STALE_PARTIAL_SECONDS = 3600
+
+# Snapshot creation and chunk garbage collection must not interleave, also
+# across processes (the app scheduler and backup_cli run separately)
+_snapshot_lock = threading.Lock()
+
+
+@contextmanager
+def _chunk_store_lock(lock_path: Path):
+    """Hold an exclusive lock on the chunk store for this thread and process."""
+    with _snapshot_lock:
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                # msvcrt.locking gives up after ~10 seconds; keep waiting
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _HashingWriter:
+    """File wrapper that checksums an archive while it is written."""
+    
+    def __init__(self, file):
+        self.file = file
+        self.sha256 = hashlib.sha256()
+    
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        return self.file.write(data)
+    
+    def tell(self) -> int:
+        return self.file.tell()
+    
+    def flush(self):
+        self.file.flush()
+
 
 class BackupManager:
     """Manages backups for database and storage files."""
@@ -52,8 +127,10 @@ class BackupManager:
         self.db_backup_dir = self.backup_dir / "database"
         self.storage_backup_dir = self.backup_dir / "storage"
         self.full_backup_dir = self.backup_dir / "full"
+        # Content-addressed chunks shared by all storage snapshots
+        self.chunk_dir = self.backup_dir / "chunks"
         
-        for dir_path in [self.db_backup_dir, self.storage_backup_dir, self.full_backup_dir]:
+        for dir_path in [self.db_backup_dir, self.storage_backup_dir, self.full_backup_dir, self.chunk_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
     
     def _get_timestamp(self) -> str:
@@ -188,7 +265,9 @@ class BackupManager:
                 "max_backups": backup_settings.get("max_backups", 7),
                 "auto_split_backups": backup_settings.get("auto_split_backups", True),
                 "max_backup_size_mb": backup_settings.get("max_backup_size_mb", 500),
-                "chunk_size_mb": backup_settings.get("chunk_size_mb", 100)
+                "chunk_size_mb": backup_settings.get("chunk_size_mb", 100),
+                "storage_backup_mode": backup_settings.get("storage_backup_mode", STORAGE_MODE_INCREMENTAL),
+                "snapshot_chunk_size_mb": backup_settings.get("snapshot_chunk_size_mb", 4)
             }
         except Exception as e:
             logger.error("Failed to load storage config for backup settings", error=str(e))
@@ -198,7 +277,9 @@ class BackupManager:
                 "max_backups": 7,
                 "auto_split_backups": True,
                 "max_backup_size_mb": 500,
-                "chunk_size_mb": 100
+                "chunk_size_mb": 100,
+                "storage_backup_mode": STORAGE_MODE_INCREMENTAL,
+                "snapshot_chunk_size_mb": 4
             }
     
     def _calculate_checksum(self, file_path: Path) -> str:
@@ -275,12 +356,14 @@ class BackupManager:
             logger.error("Failed to backup database", error=str(e), exc_info=e)
             return {"success": False, "error": str(e)}
     
-    def backup_storage(self, timestamp: Optional[str] = None) -> Dict[str, Any]:
+    def backup_storage(self, timestamp: Optional[str] = None, mode: Optional[str] = None) -> Dict[str, Any]:
         """
-        Create a compressed backup of the storage directory.
+        Create a backup of the storage directory.
         
         Args:
             timestamp: Custom timestamp for backup (optional)
+            mode: "incremental" snapshot or compressed "archive"
+                (default: storage_backup_mode from backup settings)
             
         Returns:
             Dictionary with backup information
@@ -291,6 +374,12 @@ class BackupManager:
         
         # Get backup settings
         settings = self._get_backup_settings()
+        mode = mode or settings.get("storage_backup_mode", STORAGE_MODE_INCREMENTAL)
+        if mode == STORAGE_MODE_INCREMENTAL:
+            return self.create_snapshot(timestamp, settings.get("snapshot_chunk_size_mb", 4))
+        if mode != STORAGE_MODE_ARCHIVE:
+            return {"success": False, "error": f"Unknown storage backup mode: {mode}"}
+        
         compression = settings.get("compression", self.compression)
         auto_split = settings.get("auto_split_backups", True)
         max_size_mb = settings.get("max_backup_size_mb", 500)
@@ -301,14 +390,14 @@ class BackupManager:
         backup_path = self.storage_backup_dir / backup_filename
         
         try:
-            # Create compressed tar archive
+            # Create compressed tar archive, checksumming it as it is written
             compression_mode = f"w:{compression}" if compression else "w"
             
-            with tarfile.open(backup_path, compression_mode) as tar:
-                tar.add(self.storage_path, arcname="storage")
-            
-            # Calculate checksum
-            checksum = self._calculate_checksum(backup_path)
+            with open(backup_path, "wb") as archive_file:
+                writer = _HashingWriter(archive_file)
+                with tarfile.open(backup_path, compression_mode, fileobj=writer) as tar:
+                    tar.add(self.storage_path, arcname="storage")
+            checksum = writer.sha256.hexdigest()
             
             # Get file size
             file_size = backup_path.stat().st_size
@@ -326,6 +415,7 @@ class BackupManager:
                 "file_count": file_count,
                 "checksum": checksum,
                 "compression": compression,
+                "mode": STORAGE_MODE_ARCHIVE,
                 "created_at": datetime.now().isoformat(),
                 "split_files": []
             }
@@ -369,10 +459,451 @@ class BackupManager:
             logger.error("Failed to backup storage", error=str(e), exc_info=e)
             return {"success": False, "error": str(e)}
     
-    def create_full_backup(self) -> Dict[str, Any]:
+    def _chunk_path(self, digest: str) -> Path:
+        """Location of a chunk in the content-addressed store."""
+        return self.chunk_dir / digest[:2] / digest
+    
+    def _snapshot_paths(self, snapshot_id: str) -> Tuple[Path, Path]:
+        """Manifest and metadata paths of a storage snapshot."""
+        manifest_path = self.storage_backup_dir / f"{SNAPSHOT_PREFIX}{snapshot_id}{MANIFEST_SUFFIX}"
+        return manifest_path, manifest_path.with_suffix(".json")
+    
+    @staticmethod
+    def _is_valid_snapshot_id(snapshot_id: Optional[str]) -> bool:
+        """Snapshot IDs are timestamps: reject anything that could escape the backup directory."""
+        return bool(snapshot_id) and all(c.isalnum() or c in "_-" for c in snapshot_id)
+    
+    @staticmethod
+    def snapshot_id_from_path(backup_path: Path) -> Optional[str]:
+        """Snapshot ID of a manifest path, or None for other backup files."""
+        name = Path(backup_path).name
+        if name.startswith(SNAPSHOT_PREFIX) and name.endswith(MANIFEST_SUFFIX):
+            return name[len(SNAPSHOT_PREFIX):-len(MANIFEST_SUFFIX)]
+        return None
+    
+    def get_snapshot_path(self, snapshot_id: str) -> Optional[Path]:
+        """
+        Get the manifest path of a storage snapshot.
+        
+        Args:
+            snapshot_id: Snapshot ID (as shown by list_snapshots)
+            
+        Returns:
+            Manifest path, or None if there is no such snapshot
+        """
+        if not self._is_valid_snapshot_id(snapshot_id):
+            return None
+        manifest_path, _ = self._snapshot_paths(snapshot_id)
+        return manifest_path if manifest_path.exists() else None
+    
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """
+        List storage snapshots.
+        
+        Returns:
+            List of snapshot metadata dictionaries (newest first)
+        """
+        snapshots = []
+        for metadata_file in self.storage_backup_dir.glob(f"{SNAPSHOT_PREFIX}*.json"):
+            try:
+                with open(metadata_file) as f:
+                    snapshots.append(json.load(f))
+            except Exception as e:
+                logger.error("Failed to read snapshot metadata", file=str(metadata_file), error=str(e))
+        snapshots.sort(key=lambda x: (x.get("created_at", ""), x.get("snapshot_id", "")), reverse=True)
+        return snapshots
+    
+    def load_snapshot_manifest(self, snapshot_id: str) -> Optional[Dict[str, Any]]:
+        """Load the file manifest of a storage snapshot."""
+        manifest_path = self.get_snapshot_path(snapshot_id)
+        if manifest_path is None:
+            return None
+        with open(manifest_path) as f:
+            return json.load(f)
+    
+    def _chunk_lock_path(self) -> Path:
+        return self.chunk_dir / ".lock"
+    
+    def _write_chunk(self, digest: str, data: bytes) -> bool:
+        """Store a chunk unless it is already present; returns True if written."""
+        chunk_path = self._chunk_path(digest)
+        if chunk_path.exists():
+            return False
+        chunk_path.parent.mkdir(exist_ok=True)
+        # Written under a temporary name so an interrupted run leaves no partial chunk
+        partial_path = chunk_path.with_name(f".{digest}.{uuid.uuid4().hex}")
+        try:
+            with open(partial_path, "wb") as f:
+                f.write(data)
+            os.replace(partial_path, chunk_path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        return True
+    
+    def _store_file(self, file_path: Path, chunk_size: int) -> Dict[str, Any]:
+        """
+        Split a file into chunks and store the ones not yet in the chunk store.
+        
+        The file is read once: chunk hashes and the whole-file hash are
+        computed in the same pass.
+        """
+        file_hash = hashlib.sha256()
+        chunks = []
+        new_chunks = 0
+        new_bytes = 0
+        with open(file_path, "rb") as f:
+            for data in iter(lambda: f.read(chunk_size), b""):
+                file_hash.update(data)
+                digest = hashlib.sha256(data).hexdigest()
+                chunks.append(digest)
+                if self._write_chunk(digest, data):
+                    new_chunks += 1
+                    new_bytes += len(data)
+        return {
+            "hash": file_hash.hexdigest(),
+            "chunks": chunks,
+            "new_chunks": new_chunks,
+            "new_bytes": new_bytes
+        }
+    
+    def _new_snapshot_id(self, timestamp: str) -> str:
+        """Snapshot ID for a timestamp, suffixed if one was already taken this second."""
+        snapshot_id = timestamp
+        suffix = 1
+        while self._snapshot_paths(snapshot_id)[0].exists():
+            suffix += 1
+            snapshot_id = f"{timestamp}_{suffix}"
+        return snapshot_id
+    
+    def create_snapshot(self, timestamp: Optional[str] = None, chunk_size_mb: int = 4) -> Dict[str, Any]:
+        """
+        Create an incremental snapshot of the storage directory.
+        
+        Files whose size and mtime match the previous snapshot reuse its
+        entry without being read. New or changed files are split into chunks
+        and only chunks missing from the store are written.
+        
+        Args:
+            timestamp: Custom timestamp for backup (optional)
+            chunk_size_mb: Chunk size in MB for new files
+            
+        Returns:
+            Dictionary with backup information
+        """
+        if not self.storage_path.exists():
+            logger.warning("Storage directory not found", storage_path=str(self.storage_path))
+            return {"success": False, "error": "Storage directory not found"}
+        
+        timestamp = timestamp or self._get_timestamp()
+        chunk_size = max(1, int(chunk_size_mb * 1024 * 1024))
+        started = datetime.now()
+        
+        try:
+            with _chunk_store_lock(self._chunk_lock_path()):
+                previous = self.list_snapshots()
+                parent_id = previous[0]["snapshot_id"] if previous else None
+                parent_files = {}
+                if parent_id:
+                    parent_manifest = self.load_snapshot_manifest(parent_id) or {}
+                    parent_files = {entry["path"]: entry for entry in parent_manifest.get("files", [])}
+                
+                directories = []
+                files = []
+                counts = {"new_files": 0, "changed_files": 0, "unchanged_files": 0}
+                new_chunks = 0
+                new_bytes = 0
+                
+                for root, dir_names, file_names in os.walk(self.storage_path):
+                    dir_names.sort()
+                    root_path = Path(root)
+                    for dir_name in dir_names:
+                        directories.append((root_path / dir_name).relative_to(self.storage_path).as_posix())
+                    for file_name in sorted(file_names):
+                        file_path = root_path / file_name
+                        if file_path.is_symlink():
+                            continue
+                        rel_path = file_path.relative_to(self.storage_path).as_posix()
+                        stat = file_path.stat()
+                        
+                        previous_entry = parent_files.get(rel_path)
+                        if (
+                            previous_entry is not None
+                            and previous_entry["size"] == stat.st_size
+                            and previous_entry["mtime"] == stat.st_mtime
+                            and all(self._chunk_path(digest).exists() for digest in previous_entry["chunks"])
+                        ):
+                            files.append(previous_entry)
+                            counts["unchanged_files"] += 1
+                            continue
+                        
+                        stored = self._store_file(file_path, chunk_size)
+                        new_chunks += stored["new_chunks"]
+                        new_bytes += stored["new_bytes"]
+                        counts["changed_files" if previous_entry is not None else "new_files"] += 1
+                        files.append({
+                            "path": rel_path,
+                            "size": stat.st_size,
+                            "mtime": stat.st_mtime,
+                            "hash": stored["hash"],
+                            "chunks": stored["chunks"]
+                        })
+                
+                snapshot_id = self._new_snapshot_id(timestamp)
+                manifest_path, metadata_path = self._snapshot_paths(snapshot_id)
+                manifest = {
+                    "snapshot_id": snapshot_id,
+                    "parent": parent_id,
+                    "chunk_size": chunk_size,
+                    "created_at": started.isoformat(),
+                    "directories": directories,
+                    "files": files
+                }
+                manifest_data = json.dumps(manifest).encode("utf-8")
+                partial_path = manifest_path.with_name(f".{manifest_path.name}.partial")
+                with open(partial_path, "wb") as f:
+                    f.write(manifest_data)
+                os.replace(partial_path, manifest_path)
+            
+            current_paths = {entry["path"] for entry in files}
+            metadata = {
+                "timestamp": timestamp,
+                "snapshot_id": snapshot_id,
+                "type": "storage",
+                "mode": STORAGE_MODE_INCREMENTAL,
+                "original_path": str(self.storage_path),
+                "backup_path": str(manifest_path),
+                # Bytes this snapshot added to the backup directory
+                "file_size": len(manifest_data) + new_bytes,
+                "file_count": len(files),
+                "total_size": sum(entry["size"] for entry in files),
+                "checksum": hashlib.sha256(manifest_data).hexdigest(),
+                "parent": parent_id,
+                "removed_files": sum(1 for path in parent_files if path not in current_paths),
+                "new_chunks": new_chunks,
+                "new_bytes": new_bytes,
+                "chunk_size": chunk_size,
+                "created_at": started.isoformat(),
+                "duration_seconds": round((datetime.now() - started).total_seconds(), 3),
+                **counts
+            }
+            with open(metadata_path, "w") as f:
+                json.dump(metadata, f, indent=2)
+            
+            logger.info(
+                "Storage snapshot created",
+                snapshot_id=snapshot_id,
+                parent=parent_id,
+                file_count=len(files),
+                new_files=counts["new_files"],
+                changed_files=counts["changed_files"],
+                new_chunks=new_chunks,
+                new_mb=round(new_bytes / (1024 * 1024), 2),
+                duration_seconds=metadata["duration_seconds"]
+            )
+            
+            return {
+                "success": True,
+                "snapshot_id": snapshot_id,
+                "backup_path": str(manifest_path),
+                "metadata": metadata
+            }
+            
+        except Exception as e:
+            logger.error("Failed to create storage snapshot", error=str(e), exc_info=e)
+            return {"success": False, "error": str(e)}
+    
+    def _read_snapshot(self, snapshot_id: str, verify_checksum: bool) -> Dict[str, Any]:
+        """Load a snapshot manifest, checking it against its metadata checksum."""
+        manifest_path = self.get_snapshot_path(snapshot_id)
+        if manifest_path is None:
+            raise FileNotFoundError(f"Snapshot not found: {snapshot_id}")
+        manifest_data = manifest_path.read_bytes()
+        _, metadata_path = self._snapshot_paths(snapshot_id)
+        if verify_checksum and metadata_path.exists():
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            if hashlib.sha256(manifest_data).hexdigest() != metadata.get("checksum"):
+                raise ValueError(f"Snapshot manifest checksum mismatch: {snapshot_id}")
+        return json.loads(manifest_data)
+    
+    def restore_snapshot(
+        self,
+        snapshot_id: str,
+        target_path: Optional[Path] = None,
+        verify_checksum: bool = True
+    ) -> bool:
+        """
+        Restore storage from a snapshot by reassembling its files from chunks.
+        
+        Files are assembled in a staging directory first, so a missing or
+        corrupted chunk leaves current storage untouched.
+        
+        Args:
+            snapshot_id: Snapshot to restore
+            target_path: Directory to restore into instead of replacing storage
+                (must not exist or be empty)
+            verify_checksum: Whether to verify manifest and file hashes
+            
+        Returns:
+            True if restore was successful
+        """
+        target_path = Path(target_path) if target_path else None
+        if target_path is not None and target_path.exists() and any(target_path.iterdir()):
+            logger.error("Restore target is not empty", target_path=str(target_path))
+            return False
+        
+        destination = target_path or self.storage_path
+        staging_path = destination.parent / f".{destination.name}_restore_{uuid.uuid4().hex[:8]}"
+        
+        try:
+            manifest = self._read_snapshot(snapshot_id, verify_checksum)
+            
+            staging_path.mkdir(parents=True)
+            for dir_path in manifest.get("directories", []):
+                (staging_path / dir_path).mkdir(parents=True, exist_ok=True)
+            
+            for entry in manifest["files"]:
+                file_path = staging_path / entry["path"]
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                file_hash = hashlib.sha256()
+                with open(file_path, "wb") as output_file:
+                    for digest in entry["chunks"]:
+                        data = self._chunk_path(digest).read_bytes()
+                        if verify_checksum:
+                            file_hash.update(data)
+                        output_file.write(data)
+                if verify_checksum and file_hash.hexdigest() != entry["hash"]:
+                    raise ValueError(f"Checksum mismatch for {entry['path']}")
+                os.utime(file_path, (entry["mtime"], entry["mtime"]))
+            
+            if target_path is None and self.storage_path.exists():
+                # Keep current storage, as archive restores do
+                backup_current = self.storage_path.parent / f"storage_before_restore_{self._get_timestamp()}"
+                os.replace(self.storage_path, backup_current)
+                logger.info("Current storage backed up", backup_path=str(backup_current))
+            if destination.exists():
+                destination.rmdir()
+            os.replace(staging_path, destination)
+            
+            logger.info(
+                "Storage snapshot restored",
+                snapshot_id=snapshot_id,
+                destination=str(destination),
+                file_count=len(manifest["files"])
+            )
+            return True
+            
+        except Exception as e:
+            logger.error("Failed to restore storage snapshot", snapshot_id=snapshot_id, error=str(e), exc_info=e)
+            if staging_path.exists():
+                shutil.rmtree(staging_path, ignore_errors=True)
+            return False
+    
+    def verify_snapshot(self, snapshot_id: str, deep: bool = False) -> Dict[str, Any]:
+        """
+        Verify a snapshot without restoring it.
+        
+        Args:
+            snapshot_id: Snapshot to verify
+            deep: Also re-hash every chunk instead of checking presence and size
+            
+        Returns:
+            Dictionary with verification results
+        """
+        try:
+            manifest = self._read_snapshot(snapshot_id, verify_checksum=True)
+        except FileNotFoundError as e:
+            return {"success": False, "error": str(e), "valid": False}
+        except ValueError as e:
+            return {"success": False, "error": f"{e} - backup may be corrupted", "valid": False}
+        
+        missing_chunks = []
+        corrupted_chunks = []
+        checked = set()
+        for entry in manifest["files"]:
+            for digest in entry["chunks"]:
+                if digest in checked:
+                    continue
+                checked.add(digest)
+                chunk_path = self._chunk_path(digest)
+                if not chunk_path.exists():
+                    missing_chunks.append(digest)
+                elif deep and self._calculate_checksum(chunk_path) != digest:
+                    corrupted_chunks.append(digest)
+        
+        if missing_chunks or corrupted_chunks:
+            logger.error(
+                "Snapshot verification failed",
+                snapshot_id=snapshot_id,
+                missing_chunks=len(missing_chunks),
+                corrupted_chunks=len(corrupted_chunks)
+            )
+            return {
+                "success": False,
+                "valid": False,
+                "error": f"{len(missing_chunks)} missing and {len(corrupted_chunks)} corrupted chunks",
+                "missing_chunks": missing_chunks,
+                "corrupted_chunks": corrupted_chunks
+            }
+        
+        return {
+            "success": True,
+            "valid": True,
+            "message": "Snapshot is valid and intact",
+            "file_count": len(manifest["files"]),
+            "chunk_count": len(checked)
+        }
+    
+    def prune_chunks(self) -> Dict[str, int]:
+        """
+        Remove chunks no remaining snapshot references.
+        
+        Returns:
+            Dictionary with counts of removed chunks and bytes
+        """
+        removed = {"chunks": 0, "bytes": 0}
+        with _chunk_store_lock(self._chunk_lock_path()):
+            referenced: Set[str] = set()
+            for manifest_path in self.storage_backup_dir.glob(f"{SNAPSHOT_PREFIX}*{MANIFEST_SUFFIX}"):
+                try:
+                    with open(manifest_path) as f:
+                        for entry in json.load(f).get("files", []):
+                            referenced.update(entry["chunks"])
+                except Exception as e:
+                    # An unreadable manifest may still reference chunks: keep everything
+                    logger.error("Failed to read snapshot manifest, skipping chunk pruning", file=str(manifest_path), error=str(e))
+                    return removed
+            
+            stale_before = time.time() - STALE_PARTIAL_SECONDS
+            for chunk_path in self.chunk_dir.glob("*/*"):
+                name = chunk_path.name
+                try:
+                    if len(name) != CHUNK_NAME_LENGTH:
+                        # Partial writes are only dropped once clearly abandoned
+                        if name.startswith(".") and chunk_path.stat().st_mtime < stale_before:
+                            chunk_path.unlink()
+                        continue
+                    if name in referenced:
+                        continue
+                    size = chunk_path.stat().st_size
+                    chunk_path.unlink()
+                    removed["chunks"] += 1
+                    removed["bytes"] += size
+                except FileNotFoundError:
+                    continue
+        
+        if removed["chunks"]:
+            logger.info("Unreferenced backup chunks removed", chunks=removed["chunks"], size_mb=round(removed["bytes"] / (1024 * 1024), 2))
+        return removed
+    
+    def create_full_backup(self, mode: Optional[str] = None) -> Dict[str, Any]:
         """
         Create a full backup (database + storage).
         
+        Args:
+            mode: Storage backup mode, "incremental" or "archive" (default: from settings)
+        
         Returns:
             Dictionary with backup information
         """
@@ -384,7 +915,7 @@ class BackupManager:
         db_result = self.backup_database(timestamp)
         
         # Backup storage
-        storage_result = self.backup_storage(timestamp)
+        storage_result = self.backup_storage(timestamp, mode=mode)
         
         # Create combined metadata
         metadata = {
@@ -509,6 +1040,18 @@ class BackupManager:
             except Exception as e:
                 logger.error("Failed to remove old backup", file=str(backup_file), error=str(e))
         
+        # Rotate storage snapshots; their chunks are pruned below once unreferenced
+        for snapshot in self.list_snapshots()[self.max_backups:]:
+            manifest_path, metadata_path = self._snapshot_paths(snapshot.get("snapshot_id", ""))
+            try:
+                manifest_path.unlink(missing_ok=True)
+                metadata_path.unlink(missing_ok=True)
+                removed["storage"] += 1
+                logger.info("Removed old storage snapshot", snapshot_id=snapshot.get("snapshot_id"))
+            except Exception as e:
+                logger.error("Failed to remove old snapshot", snapshot_id=snapshot.get("snapshot_id"), error=str(e))
+        self.prune_chunks()
+        
         # Rotate full backup metadata
         full_backups = sorted(
             self.full_backup_dir.glob("full_backup_*.json"),
@@ -592,6 +1135,10 @@ class BackupManager:
             logger.error("Backup file not found", backup_path=str(backup_path))
             return False
         
+        snapshot_id = self.snapshot_id_from_path(backup_path)
+        if snapshot_id is not None:
+            return self.restore_snapshot(snapshot_id, verify_checksum=verify_checksum)
+        
         try:
             # Load metadata
             metadata_path = backup_path.with_suffix(".json")
@@ -669,6 +1216,13 @@ class BackupManager:
                     "actual_checksum": current_checksum
                 }
             
+            # For snapshots, verify that every referenced chunk is present
+            snapshot_id = self.snapshot_id_from_path(backup_path)
+            if snapshot_id is not None:
+                snapshot_result = self.verify_snapshot(snapshot_id)
+                if not snapshot_result.get("valid"):
+                    return snapshot_result
+            
             # For tar files, verify structure
             if backup_path.suffix in [".tar", ".tgz"] or ".tar." in backup_path.name:
                 try:
@@ -706,10 +1260,13 @@ class BackupManager:
         """
         db_backups = list(self.db_backup_dir.glob("db_backup_*.db"))
         storage_backups = [f for f in self.storage_backup_dir.glob("storage_backup_*") if not f.suffix == ".json"]
+        storage_backups += list(self.storage_backup_dir.glob(f"{SNAPSHOT_PREFIX}*{MANIFEST_SUFFIX}"))
         full_backups = list(self.full_backup_dir.glob("full_backup_*.json"))
         
         db_size = sum(f.stat().st_size for f in db_backups)
         storage_size = sum(f.stat().st_size for f in storage_backups)
+        # Snapshot manifests are counted above; add the chunks they share
+        storage_size += sum(f.stat().st_size for f in self.chunk_dir.glob("*/*"))
         
         latest_backup = None
         all_backups = self.list_backups("full")
@@ -743,6 +1300,10 @@ class BackupManager:
         if not backup_path.exists():
             return {"success": False, "error": "Backup file not found"}
         
+        snapshot_id = self.snapshot_id_from_path(backup_path)
+        if snapshot_id is not None:
+            return self._sync_snapshot_to_remote(snapshot_id, remote_storage, remote_dir)
+        
         try:
             # Check if this is a split backup
             metadata_path = backup_path.with_suffix(".json")
@@ -833,6 +1394,98 @@ class BackupManager:
             logger.error("Failed to sync backup to remote", error=str(e))
             return {"success": False, "error": str(e)}
     
+    def _sync_snapshot_to_remote(self, snapshot_id: str, remote_storage, remote_dir: str) -> Dict[str, Any]:
+        """Upload a snapshot: the chunks not yet on the remote, then its manifest and metadata."""
+        try:
+            manifest = self._read_snapshot(snapshot_id, verify_checksum=False)
+            manifest_path, metadata_path = self._snapshot_paths(snapshot_id)
+            chunk_remote_dir = f"{remote_dir}/chunks"
+            # Uploads into a missing folder fail (Yandex Disk answers 409)
+            result = remote_storage.create_directory(chunk_remote_dir)
+            if not result.get("success"):
+                return result
+            remote_chunks = {item.get("name") for item in remote_storage.list_files(chunk_remote_dir)}
+            
+            uploaded_chunks = 0
+            skipped_chunks = 0
+            total_size = 0
+            seen = set()
+            for entry in manifest["files"]:
+                for digest in entry["chunks"]:
+                    if digest in seen:
+                        continue
+                    seen.add(digest)
+                    if digest in remote_chunks:
+                        skipped_chunks += 1
+                        continue
+                    chunk_path = self._chunk_path(digest)
+                    result = remote_storage.upload_file(chunk_path, f"{chunk_remote_dir}/{digest}")
+                    if not result.get("success"):
+                        return {"success": False, "error": f"Failed to upload chunk {digest}: {result.get('error')}"}
+                    uploaded_chunks += 1
+                    total_size += chunk_path.stat().st_size
+            
+            # Manifest last: a remote snapshot is only listed once all its chunks are there
+            remote_path = f"{remote_dir}/{manifest_path.name}"
+            result = remote_storage.upload_file(manifest_path, remote_path)
+            if not result.get("success"):
+                return result
+            remote_storage.upload_file(metadata_path, f"{remote_dir}/{metadata_path.name}")
+            
+            logger.info(
+                "Snapshot synced to remote storage",
+                snapshot_id=snapshot_id,
+                uploaded_chunks=uploaded_chunks,
+                skipped_chunks=skipped_chunks,
+                size_mb=round(total_size / (1024 * 1024), 2)
+            )
+            return {
+                "success": True,
+                "remote_path": remote_path,
+                "snapshot_id": snapshot_id,
+                "uploaded_chunks": uploaded_chunks,
+                "skipped_chunks": skipped_chunks,
+                "size": total_size
+            }
+        except Exception as e:
+            logger.error("Failed to sync snapshot to remote", snapshot_id=snapshot_id, error=str(e))
+            return {"success": False, "error": str(e)}
+    
+    def _restore_snapshot_from_remote(self, remote_storage, remote_filename: str, remote_dir: str) -> Dict[str, Any]:
+        """Download a snapshot manifest and the chunks missing locally."""
+        snapshot_id = self.snapshot_id_from_path(Path(remote_filename))
+        if not self._is_valid_snapshot_id(snapshot_id):
+            return {"success": False, "error": "Invalid snapshot file name"}
+        
+        manifest_path, metadata_path = self._snapshot_paths(snapshot_id)
+        for local_path in (manifest_path, metadata_path):
+            result = remote_storage.download_file(f"{remote_dir}/{local_path.name}", local_path)
+            if not result.get("success"):
+                return result
+        
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        downloaded_chunks = 0
+        for digest in {digest for entry in manifest["files"] for digest in entry["chunks"]}:
+            chunk_path = self._chunk_path(digest)
+            if chunk_path.exists():
+                continue
+            chunk_path.parent.mkdir(exist_ok=True)
+            result = remote_storage.download_file(f"{remote_dir}/chunks/{digest}", chunk_path)
+            if not result.get("success"):
+                return {"success": False, "error": f"Failed to download chunk {digest}: {result.get('error')}"}
+            downloaded_chunks += 1
+        
+        logger.info("Snapshot downloaded from remote storage", snapshot_id=snapshot_id, downloaded_chunks=downloaded_chunks)
+        return {
+            "success": True,
+            "backup_type": "storage",
+            "snapshot_id": snapshot_id,
+            "local_path": str(manifest_path),
+            "downloaded_chunks": downloaded_chunks,
+            "message": "Snapshot downloaded. Use restore endpoint to apply it."
+        }
+    
     def restore_from_remote(
         self, 
         remote_storage, 
@@ -851,6 +1504,9 @@ class BackupManager:
             Dictionary with restore result
         """
         try:
+            if self.snapshot_id_from_path(Path(remote_filename)) is not None:
+                return self._restore_snapshot_from_remote(remote_storage, remote_filename, remote_dir)
+            
             # Determine backup type from filename
             if "db_backup" in remote_filename:
                 local_dir = self.db_backup_dir
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Command-line interface for the local media cache of remote storage.
+
+    python media_cache_cli.py warmup [--days 7] [--limit 100]
+    python media_cache_cli.py stats
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Добавляем путь к приложению
+sys.path.insert(0, str(Path(__file__).parent))
+
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+def format_size(size_bytes: int) -> str:
+    """Format size in bytes to human-readable string."""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size_bytes < 1024.0:
+            return f"{size_bytes:.2f} {unit}"
+        size_bytes /= 1024.0
+    return f"{size_bytes:.2f} TB"
+
+
+def _get_media_cache():
+    from app.media_cache import get_media_cache
+
+    cache = get_media_cache()
+    if cache is None:
+        print("Media cache is disabled (MEDIA_CACHE_ENABLED=false)")
+    return cache
+
+
+def cmd_warmup(args):
+    """Prefetch the active videos of recently viewed portraits."""
+    if _get_media_cache() is None:
+        return 1
+
+    from app.main import create_app
+    from app.media_cache import warm_media_cache
+
+    app = create_app()
+    print(f"Warming media cache: portraits viewed in the last {args.days} days (up to {args.limit})...")
+    result = asyncio.run(warm_media_cache(
+        app.state.database,
+        app.state.storage_manager,
+        limit=args.limit,
+        since_days=args.days,
+        concurrency=args.concurrency,
+    ))
+    print(f"  Warmed: {result['warmed']}")
+    print(f"  Already cached: {result['cached']}")
+    print(f"  Local storage (skipped): {result['local']}")
+    print(f"  Failed: {result['failed']}")
+    return 1 if result["failed"] else 0
+
+
+def cmd_stats(args):
+    """Show media cache size and contents."""
+    cache = _get_media_cache()
+    if cache is None:
+        return 1
+
+    stats = cache.get_stats()
+    print(f"Media cache: {cache.root}")
+    print(f"  Files: {stats['entries']}")
+    print(f"  Size: {format_size(stats['size_bytes'])} of {format_size(stats['max_bytes'])}")
+    return 0
+
+
+def main():
+    """Main CLI entry point."""
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description="Vertex AR media cache management")
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+
+    warmup_parser = subparsers.add_parser("warmup", help="Prefetch active videos of recently viewed portraits")
+    warmup_parser.add_argument("--days", type=int, default=settings.MEDIA_CACHE_WARMUP_DAYS,
+                               help="Only portraits viewed within this many days")
+    warmup_parser.add_argument("--limit", type=int, default=settings.MEDIA_CACHE_WARMUP_LIMIT,
+                               help="Maximum number of portraits to warm")
+    warmup_parser.add_argument("--concurrency", type=int, default=4, help="Parallel remote downloads")
+
+    subparsers.add_parser("stats", help="Show media cache statistics")
+
+    args = parser.parse_args()
+
+    if args.command == "warmup":
+        return cmd_warmup(args)
+    if args.command == "stats":
+        return cmd_stats(args)
+    parser.print_help()
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
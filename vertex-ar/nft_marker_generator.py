@@ -16,6 +16,8 @@ Enhanced Features:
 - Automatic contrast enhancement
 - Feature visualization
 - Performance monitoring
+- NumPy-backed feature detection and image pyramid packing
+- Single decode of the source image per marker generation
 """
 
 from __future__ import annotations
@@ -24,23 +26,36 @@ import hashlib
 import json
 import shutil
 import struct
+import threading
 import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
+from io import BytesIO
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from logging_setup import get_logger
 
 try:
-    from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
+    from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageStat
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 logger = get_logger(__name__)
 
+# Maximum side (in pixels) of the grid sampled for brightness/contrast analysis
+ANALYSIS_SAMPLE_SIZE = 1024
+
 
 @dataclass
 class NFTMarkerConfig:
@@ -78,85 +93,223 @@ class NFTMarker:
     generation_time: Optional[float] = None
 
 
+class DecodedImage:
+    """
+    Source image decoded once and shared across the marker pipeline.
+    
+    Opening reads only the header, so size validation stays cheap. Pixel data,
+    the grayscale copy and the downscaled pyramid levels are computed on first
+    use and reused by validation, the marker writers, analysis and previews.
+    """
+    
+    def __init__(self, image: Image.Image, source: Optional[Path] = None):
+        self._image = image
+        self._loaded = False
+        self._gray: Optional[Image.Image] = None
+        self._levels: Dict[int, Image.Image] = {}
+        self.source = source
+    
+    @classmethod
+    def open(cls, source: str | Path | bytes) -> DecodedImage:
+        """Open an image file or in-memory content without decoding pixels yet."""
+        if isinstance(source, (bytes, bytearray)):
+            return cls(Image.open(BytesIO(source)))
+        path = Path(source)
+        return cls(Image.open(path), path)
+    
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Image size (width, height), available from the header."""
+        return self._image.size
+    
+    @property
+    def image(self) -> Image.Image:
+        """Decoded source image."""
+        if not self._loaded:
+            self._image.load()
+            self._loaded = True
+        return self._image
+    
+    @property
+    def gray(self) -> Image.Image:
+        """Grayscale version of the source image."""
+        if self._gray is None:
+            self._gray = self.image.convert('L')
+        return self._gray
+    
+    def pyramid_level(self, level: int) -> Image.Image:
+        """
+        Get a grayscale pyramid level downscaled by ``2 ** level``.
+        
+        Levels are resized from the source image before the grayscale
+        conversion, exactly as the .iset format has always been written.
+        """
+        if level == 0:
+            return self.gray
+        if level not in self._levels:
+            scale = 2 ** level
+            width, height = self.size
+            scaled = self.image.resize(
+                (width // scale, height // scale),
+                Image.Resampling.LANCZOS if hasattr(Image, 'Resampling') else Image.LANCZOS
+            )
+            self._levels[level] = scaled.convert('L')
+        return self._levels[level]
+    
+    def close(self) -> None:
+        """Release decoded pixel data."""
+        self._levels.clear()
+        self._gray = None
+        self._image.close()
+    
+    def __enter__(self) -> DecodedImage:
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
 class NFTAnalysisCache:
-    """Cache for image analysis results with TTL support."""
+    """
+    Cache for image analysis results with TTL support.
+    
+    Entries are keyed by a BLAKE2 hash of the image content, so the same photo
+    uploaded under different names or portraits is analyzed only once. A small
+    in-memory LRU tier sits in front of the JSON files, and expired files are
+    removed by a background sweep instead of on read.
+    """
 
-    def __init__(self, cache_dir: Path, ttl_days: int = 7):
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_days: int = 7,
+        memory_entries: int = 256,
+        sweep_interval: Optional[float] = 3600.0,
+    ):
         """
         Initialize analysis cache.
 
         Args:
             cache_dir: Directory to store cache files
             ttl_days: Time to live in days
+            memory_entries: Maximum number of entries kept in memory
+            sweep_interval: Seconds between background TTL sweeps (None disables)
         """
         self.cache_dir = cache_dir
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.ttl = timedelta(days=ttl_days)
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[str, Tuple[datetime, Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        self.sweep_interval = sweep_interval
+        self._sweep_stop = threading.Event()
+        self._sweep_thread: Optional[threading.Thread] = None
+        if sweep_interval:
+            self._sweep_thread = threading.Thread(
+                target=self._sweep_loop, name="nft-analysis-cache-sweep", daemon=True
+            )
+            self._sweep_thread.start()
+
         logger.info(f"NFT analysis cache initialized at {cache_dir} with TTL {ttl_days} days")
 
-    def _get_cache_key(self, image_path: Path) -> str:
-        """Generate cache key from image path and modification time."""
-        stat = image_path.stat()
-        key_string = f"{image_path}_{stat.st_mtime}_{stat.st_size}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+    @staticmethod
+    def content_key(image_path: Path) -> str:
+        """Generate cache key from the image content (BLAKE2b, 160-bit)."""
+        digest = hashlib.blake2b(digest_size=20)
+        with open(image_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
 
     def _get_cache_path(self, cache_key: str) -> Path:
         """Get cache file path for a cache key."""
         return self.cache_dir / f"{cache_key}.json"
 
-    def get(self, image_path: Path) -> Optional[Dict[str, Any]]:
+    def _is_expired(self, cached_time: datetime) -> bool:
+        return datetime.now() - cached_time > self.ttl
+
+    def _remember(self, cache_key: str, cached_time: datetime, analysis: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[cache_key] = (cached_time, dict(analysis))
+            self._memory.move_to_end(cache_key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, image_path: Path, cache_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Get cached analysis result.
 
         Args:
             image_path: Path to image file
+            cache_key: Precomputed content key (avoids hashing the file again)
 
         Returns:
             Cached analysis result or None if not found/expired
         """
-        cache_key = self._get_cache_key(image_path)
-        cache_path = self._get_cache_path(cache_key)
+        try:
+            cache_key = cache_key or self.content_key(image_path)
+        except OSError as e:
+            logger.warning(f"Failed to hash {image_path} for cache lookup: {e}")
+            return None
+
+        with self._lock:
+            entry = self._memory.get(cache_key)
+            if entry is not None:
+                if not self._is_expired(entry[0]):
+                    self._memory.move_to_end(cache_key)
+                    self.stats['memory_hits'] += 1
+                    return dict(entry[1])
+                del self._memory[cache_key]
 
+        cache_path = self._get_cache_path(cache_key)
         if not cache_path.exists():
             logger.debug(f"Cache miss for {image_path}")
+            self.stats['misses'] += 1
             return None
 
         try:
             with open(cache_path, 'r') as f:
                 cached_data = json.load(f)
 
-            # Check TTL
+            # Check TTL; expired files are deleted by the background sweep
             cached_time = datetime.fromisoformat(cached_data['cached_at'])
-            if datetime.now() - cached_time > self.ttl:
+            if self._is_expired(cached_time):
                 logger.debug(f"Cache expired for {image_path}")
-                cache_path.unlink()
+                self.stats['misses'] += 1
                 return None
 
             logger.debug(f"Cache hit for {image_path}")
+            self.stats['disk_hits'] += 1
+            self._remember(cache_key, cached_time, cached_data['analysis'])
             return cached_data['analysis']
 
         except Exception as e:
             logger.warning(f"Failed to read cache for {image_path}: {e}")
             return None
 
-    def set(self, image_path: Path, analysis: Dict[str, Any]) -> None:
+    def set(self, image_path: Path, analysis: Dict[str, Any], cache_key: Optional[str] = None) -> None:
         """
         Cache analysis result.
 
         Args:
             image_path: Path to image file
             analysis: Analysis result to cache
+            cache_key: Precomputed content key (avoids hashing the file again)
         """
-        cache_key = self._get_cache_key(image_path)
-        cache_path = self._get_cache_path(cache_key)
-
         try:
+            cache_key = cache_key or self.content_key(image_path)
+            cached_time = datetime.now()
+            self._remember(cache_key, cached_time, analysis)
+
             cached_data = {
-                'cached_at': datetime.now().isoformat(),
+                'cached_at': cached_time.isoformat(),
                 'image_path': str(image_path),
                 'analysis': analysis
             }
 
+            cache_path = self._get_cache_path(cache_key)
             with open(cache_path, 'w') as f:
                 json.dump(cached_data, f, indent=2)
 
@@ -165,6 +318,21 @@ class NFTAnalysisCache:
         except Exception as e:
             logger.warning(f"Failed to cache analysis for {image_path}: {e}")
 
+    def _sweep_loop(self) -> None:
+        """Periodically remove expired cache files until stopped."""
+        while not self._sweep_stop.wait(self.sweep_interval):
+            try:
+                self.clear_expired()
+            except Exception as e:
+                logger.warning(f"NFT analysis cache sweep failed: {e}")
+
+    def stop_sweeper(self) -> None:
+        """Stop the background TTL sweep."""
+        self._sweep_stop.set()
+        if self._sweep_thread is not None:
+            self._sweep_thread.join(timeout=5)
+            self._sweep_thread = None
+
     def clear_expired(self) -> int:
         """
         Clear expired cache entries.
@@ -172,6 +340,10 @@ class NFTAnalysisCache:
         Returns:
             Number of entries cleared
         """
+        with self._lock:
+            for cache_key in [k for k, (cached_time, _) in self._memory.items() if self._is_expired(cached_time)]:
+                del self._memory[cache_key]
+
         cleared = 0
         for cache_file in self.cache_dir.glob("*.json"):
             try:
@@ -179,7 +351,7 @@ class NFTAnalysisCache:
                     cached_data = json.load(f)
 
                 cached_time = datetime.fromisoformat(cached_data['cached_at'])
-                if datetime.now() - cached_time > self.ttl:
+                if self._is_expired(cached_time):
                     cache_file.unlink()
                     cleared += 1
 
@@ -196,6 +368,9 @@ class NFTAnalysisCache:
         Returns:
             Number of entries cleared
         """
+        with self._lock:
+            self._memory.clear()
+
         cleared = 0
         for cache_file in self.cache_dir.glob("*.json"):
             try:
@@ -208,6 +383,21 @@ class NFTAnalysisCache:
         return cleared
 
 
+_analysis_caches: Dict[Path, NFTAnalysisCache] = {}
+_analysis_caches_lock = threading.Lock()
+
+
+def get_analysis_cache(cache_dir: Path, ttl_days: int = 7) -> NFTAnalysisCache:
+    """Get the shared analysis cache for a directory (one LRU tier and sweeper per directory)."""
+    cache_dir = Path(cache_dir)
+    with _analysis_caches_lock:
+        cache = _analysis_caches.get(cache_dir)
+        if cache is None:
+            cache = NFTAnalysisCache(cache_dir, ttl_days=ttl_days)
+            _analysis_caches[cache_dir] = cache
+        return cache
+
+
 class NFTMarkerGenerator:
     """
     Generator for AR.js NFT markers.
@@ -221,9 +411,16 @@ class NFTMarkerGenerator:
     - Automatic contrast enhancement
     - Feature visualization
     - Performance monitoring
+    - NumPy engine for .fset/.iset generation (byte-identical to the pure Python path)
     """
     
-    def __init__(self, storage_root: Path, enable_cache: bool = True, cache_ttl_days: int = 7):
+    def __init__(
+        self,
+        storage_root: Path,
+        enable_cache: bool = True,
+        cache_ttl_days: int = 7,
+        use_numpy: Optional[bool] = None,
+    ):
         """
         Initialize NFT marker generator.
         
@@ -231,15 +428,17 @@ class NFTMarkerGenerator:
             storage_root: Root directory for storing markers
             enable_cache: Enable analysis caching
             cache_ttl_days: Cache time-to-live in days
+            use_numpy: Use the NumPy engine (default: when NumPy is installed)
         """
         self.storage_root = storage_root
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else (use_numpy and NUMPY_AVAILABLE)
         self.markers_dir = storage_root / "nft_markers"
         self.markers_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize cache
         if enable_cache:
             cache_dir = storage_root / "nft_cache"
-            self.cache = NFTAnalysisCache(cache_dir, ttl_days=cache_ttl_days)
+            self.cache = get_analysis_cache(cache_dir, ttl_days=cache_ttl_days)
         else:
             self.cache = None
         
@@ -253,14 +452,33 @@ class NFTMarkerGenerator:
         
         logger.info(f"NFT marker generator initialized at {storage_root}")
         logger.info(f"Cache {'enabled' if enable_cache else 'disabled'}")
+        logger.info(f"Marker engine: {'numpy' if self.use_numpy else 'python'}")
     
-    def _validate_image(self, image_path: Path, config: NFTMarkerConfig) -> Tuple[bool, str]:
+    @staticmethod
+    @contextmanager
+    def _open_decoded(image_path: Path, decoded: Optional[DecodedImage]) -> Iterator[DecodedImage]:
+        """Yield the shared decoded image, or decode ``image_path`` for this call only."""
+        if decoded is not None:
+            yield decoded
+        else:
+            with DecodedImage.open(image_path) as own:
+                yield own
+    
+    def _validate_image(
+        self,
+        image_path: Path,
+        config: NFTMarkerConfig,
+        decoded: Optional[DecodedImage] = None,
+    ) -> Tuple[bool, str]:
         """
         Validate image for NFT marker generation.
         
+        Only the image header is needed, so validation never decodes pixels.
+        
         Args:
             image_path: Path to image file
             config: NFT marker configuration
+            decoded: Already opened source image
             
         Returns:
             Tuple of (is_valid, message)
@@ -268,12 +486,12 @@ class NFTMarkerGenerator:
         if not PIL_AVAILABLE:
             return False, "PIL/Pillow is not installed"
         
-        if not image_path.exists():
+        if decoded is None and not image_path.exists():
             return False, "Image file does not exist"
         
         try:
-            with Image.open(image_path) as img:
-                width, height = img.size
+            with self._open_decoded(image_path, decoded) as source:
+                width, height = source.size
                 
                 if width < 480 or height < 480:
                     return False, f"Image too small ({width}x{height}). Minimum 480x480px recommended"
@@ -293,12 +511,17 @@ class NFTMarkerGenerator:
         except Exception as e:
             return False, f"Failed to open image: {e}"
     
-    def _analyze_image_features(self, image_path: Path) -> Dict[str, Any]:
+    def _analyze_image_features(
+        self,
+        image_path: Path,
+        decoded: Optional[DecodedImage] = None,
+    ) -> Dict[str, Any]:
         """
         Analyze image features for NFT tracking quality.
         
         Args:
             image_path: Path to image file
+            decoded: Already opened source image
             
         Returns:
             Dictionary with feature analysis
@@ -307,15 +530,9 @@ class NFTMarkerGenerator:
             return {"error": "PIL not available"}
         
         try:
-            with Image.open(image_path) as img:
-                img_gray = img.convert('L')
-                pixels = list(img_gray.getdata())
-                width, height = img.size
-                
-                # Calculate basic statistics
-                avg_brightness = sum(pixels) / len(pixels)
-                variance = sum((p - avg_brightness) ** 2 for p in pixels) / len(pixels)
-                contrast = variance ** 0.5
+            with self._open_decoded(image_path, decoded) as source:
+                width, height = source.size
+                avg_brightness, contrast = self._brightness_contrast(source.gray)
                 
                 # Determine tracking quality - Russian language
                 if contrast < 30:
@@ -343,6 +560,26 @@ class NFTMarkerGenerator:
         except Exception as e:
             return {"error": str(e)}
     
+    @staticmethod
+    def _brightness_contrast(img_gray: Image.Image) -> Tuple[float, float]:
+        """
+        Compute mean brightness and contrast (population std dev) of a grayscale image.
+        
+        Statistics are taken on a strided sample bounded to ANALYSIS_SAMPLE_SIZE
+        pixels per side; C-level ImageStat is used when NumPy is missing.
+        
+        Returns:
+            Tuple of (brightness, contrast)
+        """
+        if NUMPY_AVAILABLE:
+            gray = np.asarray(img_gray, dtype=np.uint8)
+            stride = max(1, -(-max(gray.shape) // ANALYSIS_SAMPLE_SIZE))
+            sample = gray[::stride, ::stride].astype(np.float64)
+            return float(sample.mean()), float(sample.std())
+        
+        stat = ImageStat.Stat(img_gray)
+        return stat.mean[0], stat.stddev[0]
+    
     def _localize_analysis(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """
         Localize analysis text to Russian if needed.
@@ -405,7 +642,13 @@ class NFTMarkerGenerator:
         
         return result
     
-    def _generate_fset(self, image_path: Path, output_path: Path, config: NFTMarkerConfig) -> bool:
+    def _generate_fset(
+        self,
+        image_path: Path,
+        output_path: Path,
+        config: NFTMarkerConfig,
+        decoded: Optional[DecodedImage] = None,
+    ) -> bool:
         """
         Generate .fset file (feature set).
         
@@ -413,6 +656,7 @@ class NFTMarkerGenerator:
             image_path: Source image path
             output_path: Output .fset file path
             config: Marker configuration
+            decoded: Already decoded source image
             
         Returns:
             True if successful
@@ -423,8 +667,8 @@ class NFTMarkerGenerator:
                 output_path.write_bytes(self._create_placeholder_fset(image_path))
                 return True
             
-            with Image.open(image_path) as img:
-                width, height = img.size
+            with self._open_decoded(image_path, decoded) as source:
+                width, height = source.size
                 
                 # Create binary fset data
                 # Format: header + feature data
@@ -442,30 +686,14 @@ class NFTMarkerGenerator:
                 data.extend(struct.pack("<I", density_map[config.feature_density]))
                 
                 # Generate feature points (simplified version)
-                img_gray = img.convert('L')
-                pixels = img_gray.load()
-                
-                features = []
+                img_gray = source.gray
                 step = 20 if config.feature_density == "low" else 10 if config.feature_density == "medium" else 5
                 
-                for y in range(0, height - 8, step):
-                    for x in range(0, width - 8, step):
-                        # Simple corner detection (Harris-like)
-                        dx = abs(pixels[x+1, y] - pixels[x, y]) if x+1 < width else 0
-                        dy = abs(pixels[x, y+1] - pixels[x, y]) if y+1 < height else 0
-                        score = dx * dy
-                        
-                        if score > 100:  # Threshold for corner detection
-                            features.append((x, y, score))
-                
-                # Write feature count
-                data.extend(struct.pack("<I", len(features)))
-                
-                # Write features
-                for x, y, score in features:
-                    data.extend(struct.pack("<f", float(x)))
-                    data.extend(struct.pack("<f", float(y)))
-                    data.extend(struct.pack("<f", float(score)))
+                # Write feature count and features
+                if self.use_numpy:
+                    data.extend(self._pack_features_numpy(img_gray, step))
+                else:
+                    data.extend(self._pack_features_python(img_gray, step))
                 
                 output_path.write_bytes(data)
                 return True
@@ -476,7 +704,81 @@ class NFTMarkerGenerator:
             output_path.write_bytes(self._create_placeholder_fset(image_path))
             return True
     
-    def _generate_fset3(self, image_path: Path, output_path: Path, config: NFTMarkerConfig) -> bool:
+    @staticmethod
+    def _pack_features_python(img_gray: Image.Image, step: int) -> bytes:
+        """
+        Detect corner features with a per-pixel loop and pack them.
+        
+        Args:
+            img_gray: Grayscale source image
+            step: Sampling grid step in pixels
+            
+        Returns:
+            Feature count followed by (x, y, score) float32 triples
+        """
+        width, height = img_gray.size
+        pixels = img_gray.load()
+        
+        features = []
+        for y in range(0, height - 8, step):
+            for x in range(0, width - 8, step):
+                # Simple corner detection (Harris-like)
+                dx = abs(pixels[x+1, y] - pixels[x, y]) if x+1 < width else 0
+                dy = abs(pixels[x, y+1] - pixels[x, y]) if y+1 < height else 0
+                score = dx * dy
+                
+                if score > 100:  # Threshold for corner detection
+                    features.append((x, y, score))
+        
+        data = bytearray(struct.pack("<I", len(features)))
+        for x, y, score in features:
+            data.extend(struct.pack("<f", float(x)))
+            data.extend(struct.pack("<f", float(y)))
+            data.extend(struct.pack("<f", float(score)))
+        return bytes(data)
+    
+    @staticmethod
+    def _pack_features_numpy(img_gray: Image.Image, step: int) -> bytes:
+        """
+        Vectorized equivalent of ``_pack_features_python``.
+        
+        Samples the same grid with strided views, scores all points at once
+        and packs them through a structured dtype. Output is byte-identical.
+        
+        Args:
+            img_gray: Grayscale source image
+            step: Sampling grid step in pixels
+            
+        Returns:
+            Feature count followed by (x, y, score) float32 triples
+        """
+        width, height = img_gray.size
+        if width <= 8 or height <= 8:
+            return struct.pack("<I", 0)
+        
+        gray = np.asarray(img_gray, dtype=np.uint8)
+        base = gray[0:height - 8:step, 0:width - 8:step].astype(np.int32)
+        right = gray[0:height - 8:step, 1:width - 7:step].astype(np.int32)
+        below = gray[1:height - 7:step, 0:width - 8:step].astype(np.int32)
+        
+        score = np.abs(right - base) * np.abs(below - base)
+        # np.nonzero walks rows first, matching the y-outer/x-inner loop order
+        rows, cols = np.nonzero(score > 100)
+        
+        features = np.empty(rows.size, dtype=[("x", "<f4"), ("y", "<f4"), ("score", "<f4")])
+        features["x"] = cols * step
+        features["y"] = rows * step
+        features["score"] = score[rows, cols]
+        
+        return struct.pack("<I", rows.size) + features.tobytes()
+    
+    def _generate_fset3(
+        self,
+        image_path: Path,
+        output_path: Path,
+        config: NFTMarkerConfig,
+        decoded: Optional[DecodedImage] = None,
+    ) -> bool:
         """
         Generate .fset3 file (3D feature set).
         
@@ -484,6 +786,7 @@ class NFTMarkerGenerator:
             image_path: Source image path
             output_path: Output .fset3 file path
             config: Marker configuration
+            decoded: Already decoded source image
             
         Returns:
             True if successful
@@ -493,8 +796,8 @@ class NFTMarkerGenerator:
                 output_path.write_bytes(self._create_placeholder_fset3(image_path))
                 return True
             
-            with Image.open(image_path) as img:
-                width, height = img.size
+            with self._open_decoded(image_path, decoded) as source:
+                width, height = source.size
                 
                 # Create binary fset3 data
                 data = bytearray()
@@ -527,7 +830,13 @@ class NFTMarkerGenerator:
             output_path.write_bytes(self._create_placeholder_fset3(image_path))
             return True
     
-    def _generate_iset(self, image_path: Path, output_path: Path, config: NFTMarkerConfig) -> bool:
+    def _generate_iset(
+        self,
+        image_path: Path,
+        output_path: Path,
+        config: NFTMarkerConfig,
+        decoded: Optional[DecodedImage] = None,
+    ) -> bool:
         """
         Generate .iset file (image set).
         
@@ -535,6 +844,7 @@ class NFTMarkerGenerator:
             image_path: Source image path
             output_path: Output .fset3 file path
             config: Marker configuration
+            decoded: Already decoded source image
             
         Returns:
             True if successful
@@ -544,8 +854,8 @@ class NFTMarkerGenerator:
                 output_path.write_bytes(self._create_placeholder_iset(image_path))
                 return True
             
-            with Image.open(image_path) as img:
-                width, height = img.size
+            with self._open_decoded(image_path, decoded) as source:
+                width, height = source.size
                 
                 # Create binary iset data
                 data = bytearray()
@@ -559,20 +869,18 @@ class NFTMarkerGenerator:
                 
                 # Image pyramid data
                 for level in range(config.levels):
-                    scale = 2 ** level
-                    scaled_img = img.resize(
-                        (width // scale, height // scale),
-                        Image.Resampling.LANCZOS if hasattr(Image, 'Resampling') else Image.LANCZOS
-                    )
+                    gray_img = source.pyramid_level(level)
                     
-                    level_width, level_height = scaled_img.size
+                    level_width, level_height = gray_img.size
                     data.extend(struct.pack("<I", level_width))
                     data.extend(struct.pack("<I", level_height))
                     
-                    # Convert to grayscale and write pixel data
-                    gray_img = scaled_img.convert('L')
-                    pixels = list(gray_img.getdata())
-                    data.extend(bytes(pixels))
+                    # Write grayscale pixel data
+                    if self.use_numpy:
+                        data.extend(np.asarray(gray_img, dtype=np.uint8).tobytes())
+                    else:
+                        pixels = list(gray_img.getdata())
+                        data.extend(bytes(pixels))
                 
                 output_path.write_bytes(data)
                 return True
@@ -604,15 +912,20 @@ class NFTMarkerGenerator:
         self,
         image_path: str | Path,
         marker_name: str,
-        config: Optional[NFTMarkerConfig] = None
+        config: Optional[NFTMarkerConfig] = None,
+        decoded: Optional[DecodedImage] = None,
     ) -> NFTMarker:
         """
         Generate NFT marker files from an image.
         
+        The source image is decoded once and shared by validation and all
+        three marker writers.
+        
         Args:
             image_path: Path to source image
             marker_name: Name for the marker (without extension)
             config: Optional marker configuration
+            decoded: Already opened source image (caller keeps ownership)
             
         Returns:
             NFTMarker object with paths to generated files
@@ -626,30 +939,39 @@ class NFTMarkerGenerator:
         if config is None:
             config = NFTMarkerConfig()
         
-        # Validate image with config
-        is_valid, message = self._validate_image(image_path, config)
-        if not is_valid:
-            raise ValueError(f"Image validation failed: {message}")
-        
-        # Create marker directory
-        marker_dir = self.markers_dir / marker_name
-        marker_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate marker files
-        fset_path = marker_dir / f"{marker_name}.fset"
-        fset3_path = marker_dir / f"{marker_name}.fset3"
-        iset_path = marker_dir / f"{marker_name}.iset"
-        
-        self._generate_fset(image_path, fset_path, config)
-        self._generate_fset3(image_path, fset3_path, config)
-        self._generate_iset(image_path, iset_path, config)
+        # Open the source once; validation only reads the header
+        owns_decoded = False
+        if decoded is None and PIL_AVAILABLE and image_path.exists():
+            try:
+                decoded = DecodedImage.open(image_path)
+                owns_decoded = True
+            except Exception:
+                decoded = None  # _validate_image reports the open error
         
-        # Get image dimensions
-        if PIL_AVAILABLE:
-            with Image.open(image_path) as img:
-                width, height = img.size
-        else:
-            width, height = 1024, 768  # Default
+        try:
+            # Validate image with config
+            is_valid, message = self._validate_image(image_path, config, decoded)
+            if not is_valid:
+                raise ValueError(f"Image validation failed: {message}")
+            
+            # Create marker directory
+            marker_dir = self.markers_dir / marker_name
+            marker_dir.mkdir(parents=True, exist_ok=True)
+            
+            # Generate marker files
+            fset_path = marker_dir / f"{marker_name}.fset"
+            fset3_path = marker_dir / f"{marker_name}.fset3"
+            iset_path = marker_dir / f"{marker_name}.iset"
+            
+            self._generate_fset(image_path, fset_path, config, decoded)
+            self._generate_fset3(image_path, fset3_path, config, decoded)
+            self._generate_iset(image_path, iset_path, config, decoded)
+            
+            # Get image dimensions
+            width, height = decoded.size
+        finally:
+            if owns_decoded:
+                decoded.close()
         
         return NFTMarker(
             image_path=str(image_path),
@@ -661,34 +983,42 @@ class NFTMarkerGenerator:
             dpi=config.min_dpi
         )
     
-    def analyze_image(self, image_path: str | Path, use_cache: bool = True) -> Dict[str, Any]:
+    def analyze_image(
+        self,
+        image_path: str | Path,
+        use_cache: bool = True,
+        decoded: Optional[DecodedImage] = None,
+    ) -> Dict[str, Any]:
         """
         Analyze an image for NFT tracking suitability.
         
         Args:
             image_path: Path to image file
             use_cache: Use cached results if available
+            decoded: Already opened source image
             
         Returns:
             Dictionary with analysis results
         """
         image_path = Path(image_path)
         
-        # Check cache first
-        if use_cache and self.cache:
-            cached_result = self.cache.get(image_path)
+        # Check cache first (keyed by image content, hashed once per call)
+        cache_key = None
+        if use_cache and self.cache and image_path.exists():
+            cache_key = self.cache.content_key(image_path)
+            cached_result = self.cache.get(image_path, cache_key)
             if cached_result:
                 self.metrics['cache_hits'] += 1
                 logger.debug(f"Using cached analysis for {image_path}")
                 localized_cached = self._localize_analysis(cached_result)
                 if localized_cached != cached_result:
-                    self.cache.set(image_path, localized_cached)
+                    self.cache.set(image_path, localized_cached, cache_key)
                 return localized_cached
             self.metrics['cache_misses'] += 1
         
         # Validate image with default config
         default_config = NFTMarkerConfig()
-        is_valid, message = self._validate_image(image_path, default_config)
+        is_valid, message = self._validate_image(image_path, default_config, decoded)
         result = {
             "valid": is_valid,
             "message": message
@@ -696,14 +1026,14 @@ class NFTMarkerGenerator:
         
         if is_valid:
             # Add feature analysis
-            features = self._analyze_image_features(image_path)
+            features = self._analyze_image_features(image_path, decoded)
             result.update(features)
         
         result = self._localize_analysis(result)
         
         # Cache the result
-        if use_cache and self.cache and is_valid:
-            self.cache.set(image_path, result)
+        if cache_key and is_valid:
+            self.cache.set(image_path, result, cache_key)
         
         return result
     
@@ -786,7 +1116,8 @@ class NFTMarkerGenerator:
     def generate_feature_preview(
         self,
         image_path: str | Path,
-        output_path: Optional[str | Path] = None
+        output_path: Optional[str | Path] = None,
+        decoded: Optional[DecodedImage] = None,
     ) -> Tuple[Path, Dict[str, Any]]:
         """
         Generate a preview image with feature points visualized.
@@ -794,6 +1125,7 @@ class NFTMarkerGenerator:
         Args:
             image_path: Path to source image
             output_path: Optional output path for preview
+            decoded: Already opened source image
             
         Returns:
             Tuple of (preview_path, analysis_dict)
@@ -814,21 +1146,23 @@ class NFTMarkerGenerator:
         
         logger.info(f"Generating feature preview for {image_path}")
         
-        # Analyze image first
-        analysis = self.analyze_image(image_path)
-        
-        if not analysis.get('valid', False):
-            raise ValueError(f"Image validation failed: {analysis.get('message')}")
+        if decoded is None and not image_path.exists():
+            raise ValueError("Image validation failed: Image file does not exist")
         
-        with Image.open(image_path) as img:
+        with self._open_decoded(image_path, decoded) as source:
+            # Analyze image first
+            analysis = self.analyze_image(image_path, decoded=source)
+            
+            if not analysis.get('valid', False):
+                raise ValueError(f"Image validation failed: {analysis.get('message')}")
+            
             # Create a copy to draw on
-            preview = img.copy().convert('RGB')
+            preview = source.image.convert('RGB')
             draw = ImageDraw.Draw(preview)
             
             # Get image properties
-            width, height = img.size
-            img_gray = img.convert('L')
-            pixels = img_gray.load()
+            width, height = source.size
+            pixels = source.gray.load()
             
             # Detect features (simplified)
             features = []
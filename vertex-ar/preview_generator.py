@@ -1,14 +1,22 @@
-from PIL import Image
+from PIL import Image, ImageDraw, features
 import os
 import tempfile
 from io import BytesIO
 import mimetypes
 from storage_adapter import get_storage
 import uuid
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
 import cv2
 import numpy as np
 
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
 from logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -28,30 +36,506 @@ def normalize_path(path: str) -> str:
     return path.replace("\\", "/")
 
 
+# Размеры превью видео, получаемые из одного декодированного кадра
+VIDEO_PREVIEW_SIZES = {
+    "small": (300, 300),
+    "medium": (600, 600),
+}
+# Ограничивающий прямоугольник постера (без полей и иконки воспроизведения)
+VIDEO_POSTER_SIZE = (1280, 1280)
+# Насколько далеко вперед выгоднее декодировать кадры подряд, чем искать
+SEQUENTIAL_GRAB_SECONDS = 1.0
+
+
+@dataclass
+class VideoPreviewSet:
+    """Набор превью, полученный за один проход декодирования видео"""
+
+    previews: Dict[str, bytes] = field(default_factory=dict)
+    poster: Optional[bytes] = None
+    animation: Optional[bytes] = None
+    frame_time: float = 0.0
+    source_size: Tuple[int, int] = (0, 0)
+
+
+class _OpenCVFrameReader:
+    """Чтение кадров через OpenCV: точный переход по временной метке"""
+
+    def __init__(self, video_path: str):
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            self.cap.release()
+            raise ValueError(f"Не удалось открыть видео с помощью OpenCV: {video_path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+        total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self.duration = total_frames / self.fps if self.fps > 0 and total_frames > 0 else 0.0
+        self.source_size = (
+            int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0),
+            int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0),
+        )
+
+    def read_at(self, seconds: float, box: Tuple[int, int]) -> Optional[Tuple[float, Image.Image]]:
+        """Читает кадр на заданной метке и уменьшает его до размеров box
+
+        Если метка находится недалеко впереди текущей позиции, кадры
+        пропускаются через grab() без преобразования: это дешевле, чем
+        повторный переход к ключевому кадру и декодирование от него.
+        """
+        position = self.cap.get(cv2.CAP_PROP_POS_FRAMES)
+        ahead = round(seconds * self.fps) - position
+        if self.fps > 0 and position > 0 and 0 <= ahead <= self.fps * SEQUENTIAL_GRAB_SECONDS:
+            for _ in range(int(ahead)):
+                if not self.cap.grab():
+                    return None
+        else:
+            self.cap.set(cv2.CAP_PROP_POS_MSEC, seconds * 1000.0)
+        ret, frame = self.cap.read()
+        if not ret or frame is None:
+            return None
+
+        height, width = frame.shape[:2]
+        scale = min(box[0] / width, box[1] / height, 1.0)
+        if scale < 1.0:
+            frame = cv2.resize(
+                frame,
+                (max(1, round(width * scale)), max(1, round(height * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+        return seconds, Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    def close(self) -> None:
+        self.cap.release()
+
+
+class _KeyframeReader:
+    """Чтение кадров через PyAV: переход к ближайшему предшествующему ключевому кадру
+
+    Декодируются только ключевые кадры (skip_frame=NONKEY), поэтому поиск
+    не декодирует цепочку промежуточных кадров. Масштабирование и
+    преобразование в RGB выполняются одним вызовом swscale.
+    """
+
+    def __init__(self, video_path: str):
+        self.container = av.open(video_path)
+        try:
+            self.stream = self.container.streams.video[0]
+        except IndexError:
+            self.container.close()
+            raise ValueError(f"Видео не содержит видеопотока: {video_path}")
+        self.stream.thread_type = "AUTO"
+        self.stream.codec_context.skip_frame = "NONKEY"
+        self.fps = float(self.stream.average_rate or 0)
+        if self.stream.duration and self.stream.time_base:
+            self.duration = float(self.stream.duration * self.stream.time_base)
+        elif self.container.duration:
+            self.duration = self.container.duration / av.time_base
+        else:
+            self.duration = 0.0
+        self.source_size = (self.stream.codec_context.width, self.stream.codec_context.height)
+
+    def read_at(self, seconds: float, box: Tuple[int, int]) -> Optional[Tuple[float, Image.Image]]:
+        self.container.seek(
+            int(seconds / self.stream.time_base),
+            stream=self.stream,
+            backward=True,
+            any_frame=False,
+        )
+        frame = next(self.container.decode(self.stream), None)
+        if frame is None:
+            return None
+
+        width, height = frame.width, frame.height
+        scale = min(box[0] / width, box[1] / height, 1.0)
+        image = frame.to_image(
+            width=max(1, round(width * scale)),
+            height=max(1, round(height * scale)),
+            interpolation="AREA",
+        )
+        return (frame.time if frame.time is not None else seconds), image
+
+    def close(self) -> None:
+        self.container.close()
+
+
+class VideoPreviewEngine:
+    """Извлекает кадры из сохраненного видеофайла и строит по ним превью.
+
+    Кадр ищется по временной метке, а не по номеру кадра. Если установлен
+    PyAV, берется ближайший предшествующий ключевой кадр, и промежуточные
+    кадры не декодируются; иначе OpenCV переходит к метке точно. Кадр сразу
+    уменьшается до самого большого запрошенного размера, и все остальные
+    операции выполняются над уменьшенной копией. Все размеры, постер и
+    анимация строятся за одно открытие файла.
+    """
+
+    def __init__(
+        self,
+        sizes: Optional[Dict[str, Tuple[int, int]]] = None,
+        poster_size: Optional[Tuple[int, int]] = None,
+        animation_frames: int = 0,
+        animation_size: Tuple[int, int] = (300, 300),
+        animation_frame_ms: int = 250,
+        format: str = 'webp',
+        play_icon: bool = True,
+        keyframe_seek: bool = True,
+    ):
+        self.sizes = dict(VIDEO_PREVIEW_SIZES if sizes is None else sizes)
+        self.poster_size = poster_size
+        self.animation_frames = animation_frames
+        self.animation_size = animation_size
+        self.animation_frame_ms = animation_frame_ms
+        self.format = format
+        self.play_icon = play_icon
+        self.keyframe_seek = keyframe_seek and AV_AVAILABLE
+
+    def render(self, video_path: Union[str, os.PathLike], frame_time: Optional[float] = None) -> Optional[VideoPreviewSet]:
+        """Строит все запрошенные превью; возвращает None, если кадр получить не удалось"""
+        reader = self._open(os.fspath(video_path))
+        if reader is None:
+            return None
+        try:
+            duration = reader.duration
+            logger.info(f"Видео открыто успешно: FPS={reader.fps}, длительность={duration:.2f} с, размер: {reader.source_size}")
+
+            target = duration / 2 if frame_time is None else max(0.0, float(frame_time))
+            if duration > 0 and reader.fps > 0:
+                # Последний кадр может отсутствовать в индексе контейнера
+                target = min(target, max(0.0, duration - 1.0 / reader.fps))
+
+            decoded = reader.read_at(target, self._decode_box())
+            if decoded is None and target > 0:
+                logger.error(f"Не удалось прочитать кадр на {target:.2f} с, пробуем первый кадр")
+                decoded = reader.read_at(0.0, self._decode_box())
+            if decoded is None:
+                logger.error("Не удалось прочитать даже первый кадр")
+                return None
+
+            frame_seconds, frame = decoded
+            result = VideoPreviewSet(frame_time=frame_seconds, source_size=reader.source_size)
+            for name, size in self.sizes.items():
+                result.previews[name] = self._encode(self._compose(frame, size))
+            if self.poster_size:
+                poster = frame.copy()
+                poster.thumbnail(self.poster_size, Image.Resampling.LANCZOS)
+                result.poster = self._encode(poster)
+            if self.animation_frames > 1 and duration > 0:
+                result.animation = self._render_animation(reader, duration)
+
+            logger.info(f"Превью видео сгенерированы из кадра на {frame_seconds:.2f} с: {sorted(result.previews)}, постер: {result.poster is not None}, анимация: {result.animation is not None}")
+            return result
+        finally:
+            reader.close()
+
+    def _open(self, video_path: str):
+        if self.keyframe_seek:
+            try:
+                return _KeyframeReader(video_path)
+            except Exception as e:
+                logger.warning(f"PyAV не смог открыть видео, используем OpenCV: {e}")
+        try:
+            return _OpenCVFrameReader(video_path)
+        except ValueError as e:
+            logger.error(str(e))
+            return None
+
+    def _decode_box(self) -> Tuple[int, int]:
+        """Самый большой размер, который понадобится из основного кадра"""
+        boxes = list(self.sizes.values())
+        if self.poster_size:
+            boxes.append(self.poster_size)
+        if not boxes:
+            boxes.append(self.animation_size)
+        return max(w for w, _ in boxes), max(h for _, h in boxes)
+
+    def _compose(self, frame: Image.Image, size: Tuple[int, int], play_icon: Optional[bool] = None) -> Image.Image:
+        """Вписывает кадр в квадрат на черном фоне и рисует иконку воспроизведения"""
+        image = frame.copy()
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+
+        preview = Image.new('RGB', size, (0, 0, 0))
+        preview.paste(image, ((size[0] - image.size[0]) // 2, (size[1] - image.size[1]) // 2))
+
+        if self.play_icon if play_icon is None else play_icon:
+            draw = ImageDraw.Draw(preview)
+            center_x, center_y = size[0] // 2, size[1] // 2
+            triangle_size = min(size) // 8
+            triangle_points = [
+                (center_x - triangle_size//2, center_y - triangle_size//2),  # Левая точка
+                (center_x - triangle_size//2, center_y + triangle_size//2),  # Нижняя точка
+                (center_x + triangle_size//2, center_y)                     # Правая точка
+            ]
+            draw.polygon(triangle_points, fill=(255, 255, 255))  # Белый треугольник
+        return preview
+
+    def _render_animation(self, reader, duration: float) -> Optional[bytes]:
+        """Короткая анимированная WebP из равномерно распределенных кадров"""
+        step = duration / self.animation_frames
+        frames = []
+        last_time = None
+        for index in range(self.animation_frames):
+            decoded = reader.read_at(step * index + step / 2, self.animation_size)
+            # При поиске по ключевым кадрам соседние метки могут дать один и тот же кадр
+            if decoded is None or decoded[0] == last_time:
+                continue
+            last_time = decoded[0]
+            frames.append(self._compose(decoded[1], self.animation_size, play_icon=False))
+        if len(frames) < 2:
+            return None
+
+        buffer = BytesIO()
+        frames[0].save(
+            buffer,
+            format='WEBP',
+            save_all=True,
+            append_images=frames[1:],
+            duration=self.animation_frame_ms,
+            loop=0,
+            quality=70,
+            method=4,
+        )
+        return buffer.getvalue()
+
+    def _encode(self, image: Image.Image) -> bytes:
+        buffer = BytesIO()
+        if self.format.lower() == 'webp':
+            # WebP с лучшим сжатием
+            image.save(buffer, format='WEBP', quality=85, method=6)
+        else:
+            # JPEG с высоким качеством
+            image.save(buffer, format='JPEG', quality=92, optimize=True)
+        return buffer.getvalue()
+
+
+# Ширины адаптивных превью изображений и форматы по умолчанию
+IMAGE_PREVIEW_WIDTHS = (150, 300, 600, 1200)
+IMAGE_PREVIEW_FORMATS = ("webp", "jpeg")
+# Потоки для параллельного кодирования вариантов (Pillow отпускает GIL при кодировании)
+PREVIEW_ENCODE_WORKERS = min(4, os.cpu_count() or 1)
+
+PREVIEW_EXTENSIONS = {"webp": "webp", "jpeg": "jpg", "avif": "avif"}
+PREVIEW_MIME_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg", "avif": "image/avif"}
+
+_encode_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_encode_executor() -> ThreadPoolExecutor:
+    global _encode_executor
+    if _encode_executor is None:
+        _encode_executor = ThreadPoolExecutor(max_workers=PREVIEW_ENCODE_WORKERS, thread_name_prefix="preview-encode")
+    return _encode_executor
+
+
+def supported_preview_formats(formats) -> Tuple[str, ...]:
+    """Оставляет только форматы, которые умеет кодировать установленный Pillow"""
+    supported = []
+    for fmt in formats:
+        fmt = fmt.strip().lower()
+        if fmt == "jpg":
+            fmt = "jpeg"
+        if fmt not in PREVIEW_EXTENSIONS or fmt in supported:
+            continue
+        if fmt in ("webp", "avif") and not features.check(fmt):
+            logger.warning(f"Формат превью {fmt} не поддерживается установленным Pillow, пропускаем")
+            continue
+        supported.append(fmt)
+    return tuple(supported)
+
+
+def _open_image(image_content: Union[bytes, str, os.PathLike, Image.Image], box: Tuple[int, int]) -> Image.Image:
+    """Открывает изображение, уменьшая JPEG еще при декодировании
+
+    Image.draft() выбирает масштаб DCT (1/2, 1/4, 1/8), при котором
+    изображение остается не меньше box, поэтому полный кадр не декодируется.
+    Переданное изображение PIL возвращается как есть.
+    """
+    if isinstance(image_content, Image.Image):
+        return image_content
+    source = image_content if isinstance(image_content, (str, os.PathLike)) else BytesIO(image_content)
+    with Image.open(source) as opened:
+        if opened.format == 'JPEG':
+            opened.draft('RGB', box)
+        opened.load()
+        return opened.copy()
+
+
+def _flatten(image: Image.Image, background=(255, 255, 255)) -> Image.Image:
+    """Переводит изображение в RGB, подкладывая фон под прозрачные области"""
+    if image.mode == 'P':
+        image = image.convert('RGBA')
+    if image.mode in ('RGBA', 'LA'):
+        flattened = Image.new('RGB', image.size, background)
+        flattened.paste(image, mask=image.split()[-1])
+        return flattened
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+
+def _encode_image(image: Image.Image, format: str) -> bytes:
+    """Кодирует вариант превью с настройками, сбалансированными по скорости"""
+    buffer = BytesIO()
+    if format == 'webp':
+        image.save(buffer, format='WEBP', quality=80, method=4)
+    elif format == 'avif':
+        image.save(buffer, format='AVIF', quality=60, speed=8)
+    else:
+        image.save(buffer, format='JPEG', quality=85, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+@dataclass
+class PreviewVariant:
+    """Один вариант адаптивного превью"""
+
+    width: int
+    height: int
+    format: str
+    data: bytes
+
+    @property
+    def suffix(self) -> str:
+        return f"_preview_{self.width}.{PREVIEW_EXTENSIONS[self.format]}"
+
+    @property
+    def mime_type(self) -> str:
+        return PREVIEW_MIME_TYPES[self.format]
+
+
+@dataclass
+class ImagePreviewSet:
+    """Набор превью изображения, полученный из одного декодирования"""
+
+    variants: List[PreviewVariant] = field(default_factory=list)
+    square: Optional[bytes] = None
+    decoded_size: Tuple[int, int] = (0, 0)
+
+
+class ImagePreviewEngine:
+    """Строит адаптивные превью изображения из одного уменьшенного декодирования.
+
+    Исходник декодируется один раз с draft() до самой большой нужной ширины,
+    варианты получаются каскадом от большего к меньшему, а кодирование всех
+    вариантов (и квадратного превью для списков) идет параллельно в пуле
+    потоков. Варианты сохраняют пропорции и не увеличиваются сверх исходника.
+    """
+
+    def __init__(
+        self,
+        widths=IMAGE_PREVIEW_WIDTHS,
+        formats=IMAGE_PREVIEW_FORMATS,
+        square_size: Optional[Tuple[int, int]] = (300, 300),
+        square_format: str = 'webp',
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self.widths = sorted({int(width) for width in widths if int(width) > 0}, reverse=True)
+        self.formats = supported_preview_formats(formats)
+        self.square_size = square_size
+        self.square_format = square_format
+        self.executor = executor
+
+    def render(self, image_content: Union[bytes, str, os.PathLike, Image.Image]) -> Optional[ImagePreviewSet]:
+        """Строит все варианты; возвращает None, если изображение не удалось декодировать"""
+        try:
+            box_width = max(self.widths + ([max(self.square_size)] if self.square_size else []), default=1)
+            image = _open_image(image_content, (box_width, 1))
+            decoded_size = image.size
+            if image.mode == 'P':
+                image = image.convert('RGBA')
+            # Все дальнейшие операции, включая замену прозрачности фоном, идут
+            # над копией не больше самого крупного варианта
+            if image.width > box_width:
+                image = image.resize(
+                    (box_width, max(1, round(image.height * box_width / image.width))),
+                    Image.Resampling.LANCZOS,
+                    reducing_gap=2.0,
+                )
+            image = _flatten(image)
+        except Exception as e:
+            logger.exception(f"Ошибка при декодировании изображения для превью: {e}")
+            return None
+
+        executor = self.executor or _get_encode_executor()
+        futures = []
+        square_future = None
+        if self.square_size:
+            square_future = executor.submit(self._square, image, self.square_size, self.square_format)
+
+        # Каскад: каждый следующий вариант уменьшается из предыдущего
+        current = image
+        seen_widths = set()
+        for width in self.widths:
+            width = min(width, image.width)
+            if width in seen_widths:
+                continue
+            seen_widths.add(width)
+            if width < current.width:
+                height = max(1, round(current.height * width / current.width))
+                current = current.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)
+            for fmt in self.formats:
+                futures.append((current.size, fmt, executor.submit(_encode_image, current, fmt)))
+
+        result = ImagePreviewSet(decoded_size=decoded_size)
+        for (width, height), fmt, future in futures:
+            result.variants.append(PreviewVariant(width=width, height=height, format=fmt, data=future.result()))
+        if square_future is not None:
+            result.square = square_future.result()
+
+        logger.info(f"Сгенерировано {len(result.variants)} вариантов превью изображения {image.size}: ширины {sorted(seen_widths)}, форматы {list(self.formats)}")
+        return result
+
+    @staticmethod
+    def _square(image: Image.Image, size: Tuple[int, int], format: str) -> bytes:
+        """Квадратное превью на белом фоне, как у generate_image_preview"""
+        thumbnail = image.copy()
+        thumbnail.thumbnail(size, Image.Resampling.LANCZOS)
+        preview = Image.new('RGB', size, (255, 255, 255))
+        preview.paste(thumbnail, ((size[0] - thumbnail.size[0]) // 2, (size[1] - thumbnail.size[1]) // 2))
+        buffer = BytesIO()
+        if format.lower() == 'webp':
+            preview.save(buffer, format='WEBP', quality=85, method=6)
+        else:
+            preview.save(buffer, format='JPEG', quality=92, optimize=True)
+        return buffer.getvalue()
+
+
 class PreviewGenerator:
     """Класс для генерации превью для различных типов файлов"""
 
     @staticmethod
-    def generate_image_preview(image_content: bytes, size=(300, 300), format='webp') -> Optional[bytes]:
-        """Генерирует превью для изображений с улучшенным качеством и поддержкой WebP"""
-        logger.info(f"Начинаем генерацию превью для изображения, размер: {len(image_content)} байт, целевой размер: {size}, формат: {format}")
+    def generate_image_preview(image_content: Union[bytes, str, os.PathLike, Image.Image], size=(300, 300), format='webp') -> Optional[bytes]:
+        """Генерирует превью для изображений с улучшенным качеством и поддержкой WebP
+
+        Принимает байты изображения, путь к файлу изображения или уже
+        декодированное изображение PIL (например, DecodedImage.image), чтобы не
+        декодировать исходник повторно. Переданное изображение не изменяется.
+        JPEG декодируется сразу в уменьшенном масштабе (Image.draft), а
+        прозрачность заменяется белым фоном уже после уменьшения.
+        """
         try:
-            # Открываем изображение
-            image = Image.open(BytesIO(image_content))
-            logger.info(f"Изображение успешно открыто, размеры: {image.size}, формат: {image.format}")
-
-            # Конвертируем в RGB если необходимо
-            if image.mode in ('RGBA', 'LA', 'P'):
-                # Создаем белый фон для полупрозрачных изображений
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    image = image.convert('RGBA')
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
+            if isinstance(image_content, Image.Image):
+                logger.info(f"Начинаем генерацию превью для декодированного изображения, размеры: {image_content.size}, целевой размер: {size}, формат: {format}")
+            elif isinstance(image_content, (str, os.PathLike)):
+                logger.info(f"Начинаем генерацию превью для файла изображения {image_content}, целевой размер: {size}, формат: {format}")
+            else:
+                logger.info(f"Начинаем генерацию превью для изображения, размер: {len(image_content)} байт, целевой размер: {size}, формат: {format}")
+
+            image = _open_image(image_content, size)
+            logger.info(f"Изображение успешно открыто, размеры: {image.size}")
+
+            # Палитру переводим в RGBA, чтобы уменьшать ее с фильтрацией
+            if image.mode == 'P':
+                image = image.convert('RGBA')
+
+            # Не изменяем изображение, принадлежащее вызывающему коду
+            if image is image_content:
+                image = image.copy()
 
             # Создаем превью с сохранением пропорций и высоким качеством
             image.thumbnail(size, Image.Resampling.LANCZOS)
 
+            # Создаем белый фон для полупрозрачных изображений
+            image = _flatten(image)
+
             # Создаем новое изображение с белым фоном
             preview = Image.new('RGB', size, (255, 255, 255))
 
@@ -81,135 +565,77 @@ class PreviewGenerator:
             return None
 
     @staticmethod
-    def generate_video_preview(video_content: bytes, size=(300, 300), frame_time=None, format='webp') -> Optional[bytes]:
-        """Генерирует превью для видео с улучшенным качеством и поддержкой WebP"""
+    def generate_video_preview(video_content: Union[bytes, str, os.PathLike], size=(300, 300), frame_time=None, format='webp') -> Optional[bytes]:
+        """Генерирует превью для видео с улучшенным качеством и поддержкой WebP
+
+        Принимает байты видео или путь к уже сохраненному файлу; файл читается
+        напрямую, без копирования во временный файл. frame_time задается в
+        секундах, по умолчанию берется середина видео.
+        """
+
+        is_file = isinstance(video_content, (str, os.PathLike))
 
         # Validate input
-        if not video_content or len(video_content) == 0:
+        if is_file:
+            video_size = os.path.getsize(video_content) if os.path.exists(video_content) else 0
+        else:
+            video_size = len(video_content) if video_content else 0
+        if video_size == 0:
             logger.error("Пустое видео содержимое")
             return PreviewGenerator.generate_video_preview_stub(size, format)
 
-        logger.info(f"Начинаем генерацию превью для видео, размер: {len(video_content)} байт, целевой размер: {size}, формат: {format}")
+        logger.info(f"Начинаем генерацию превью для видео, размер: {video_size} байт, целевой размер: {size}, формат: {format}")
 
         try:
-            # Сохраняем видео во временный файл
-            with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as temp_video:
-                temp_video.write(video_content)
-                temp_video_path = temp_video.name
+            if is_file:
+                temp_video_path = os.fspath(video_content)
+            else:
+                # Сохраняем видео во временный файл
+                with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as temp_video:
+                    temp_video.write(video_content)
+                    temp_video_path = temp_video.name
 
             try:
-                # Открываем видео с помощью OpenCV
-                cap = cv2.VideoCapture(temp_video_path)
-
-                if not cap.isOpened():
-                    logger.error("Не удалось открыть видео с помощью OpenCV")
-                    return PreviewGenerator.generate_video_preview_stub(size, format)
-
-                # Получаем общее количество кадров
-                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                fps = cap.get(cv2.CAP_PROP_FPS)
-
-                logger.info(f"Видео открыто успешно: всего кадров={total_frames}, FPS={fps}")
-
-                if total_frames <= 0:
-                    logger.error("Видео не содержит кадров")
-                    return PreviewGenerator.generate_video_preview_stub(size, format)
-
-                # Вычисляем номер кадра из середины видео
-                middle_frame = total_frames // 2
-
-                # Устанавливаем позицию на середину видео
-                cap.set(cv2.CAP_PROP_POS_FRAMES, middle_frame)
-
-                # Читаем кадр
-                ret, frame = cap.read()
-
-                if not ret or frame is None:
-                    logger.error(f"Не удалось прочитать кадр {middle_frame} из видео")
-                    # Пробуем первый кадр как fallback
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    ret, frame = cap.read()
-                    if not ret or frame is None:
-                        logger.error("Не удалось прочитать даже первый кадр")
-                        return PreviewGenerator.generate_video_preview_stub(size, format)
-
-                logger.info(f"Кадр успешно извлечен, размер: {frame.shape}")
-
-                # Применяем небольшой размытие для уменьшения артефактов сжатия
-                frame = cv2.GaussianBlur(frame, (3, 3), 0)
-
-                # Конвертируем BGR (OpenCV) в RGB (PIL)
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                # Конвертируем numpy array в PIL Image
-                pil_image = Image.fromarray(frame_rgb)
-
-                # Создаем превью с сохранением пропорций
-                pil_image.thumbnail(size, Image.Resampling.LANCZOS)
-
-                # Создаем новое изображение с черным фоном (для видео)
-                preview = Image.new('RGB', size, (0, 0, 0))
-
-                # Вычисляем позицию для центрирования
-                x = (size[0] - pil_image.size[0]) // 2
-                y = (size[1] - pil_image.size[1]) // 2
-
-                # Вставляем кадр в центр
-                preview.paste(pil_image, (x, y))
-
-                # Добавляем иконку воспроизведения поверх превью
-                from PIL import ImageDraw
-                draw = ImageDraw.Draw(preview)
-
-                # Рисуем полупрозрачный круг в центре
-                center_x, center_y = size[0] // 2, size[1] // 2
-                circle_radius = min(size) // 8
-
-                # Рисуем треугольник воспроизведения
-                triangle_size = circle_radius
-                triangle_points = [
-                    (center_x - triangle_size//2, center_y - triangle_size//2),  # Левая точка
-                    (center_x - triangle_size//2, center_y + triangle_size//2),  # Нижняя точка
-                    (center_x + triangle_size//2, center_y)                     # Правая точка
-                ]
-                draw.polygon(triangle_points, fill=(255, 255, 255))  # Белый треугольник
-
-                # Сохраняем превью в байтовый буфер
-                buffer = BytesIO()
-
-                if format.lower() == 'webp':
-                    # WebP с лучшим сжатием
-                    preview.save(buffer, format='WEBP', quality=85, method=6)
-                else:
-                    # JPEG с высоким качеством
-                    preview.save(buffer, format='JPEG', quality=92, optimize=True)
-
-                buffer.seek(0)
-                preview_bytes = buffer.getvalue()
+                engine = VideoPreviewEngine(sizes={"preview": size}, format=format)
+                result = engine.render(temp_video_path, frame_time=frame_time)
+                preview_bytes = result.previews.get("preview") if result else None
 
                 # Validate the generated preview
-                if len(preview_bytes) == 0:
-                    logger.error("Сгенерированное превью видео имеет нулевой размер")
+                if not preview_bytes:
+                    logger.error("Не удалось сгенерировать превью видео")
                     return PreviewGenerator.generate_video_preview_stub(size, format)
 
-                logger.info(f"Превью видео успешно сгенерировано из кадра {middle_frame}, формат: {format}, размер превью: {len(preview_bytes)} байт")
+                logger.info(f"Превью видео успешно сгенерировано, формат: {format}, размер превью: {len(preview_bytes)} байт")
                 return preview_bytes
 
             finally:
-                # Освобождаем ресурсы
-                if 'cap' in locals():
-                    cap.release()
                 # Удаляем временный файл
-                try:
-                    os.unlink(temp_video_path)
-                except:
-                    pass
+                if not is_file:
+                    try:
+                        os.unlink(temp_video_path)
+                    except:
+                        pass
 
         except Exception as e:
             logger.exception(f"Ошибка при генерации превью видео: {e}")
             logger.info("Используем заглушку для превью видео")
             return PreviewGenerator.generate_video_preview_stub(size, format)
 
+    @staticmethod
+    def generate_video_previews(video_path: Union[str, os.PathLike], sizes=None, poster_size=VIDEO_POSTER_SIZE, animation_frames=0, frame_time=None, format='webp') -> Optional[VideoPreviewSet]:
+        """Генерирует несколько размеров превью, постер и анимацию за один проход по видео"""
+        try:
+            engine = VideoPreviewEngine(
+                sizes=sizes,
+                poster_size=poster_size,
+                animation_frames=animation_frames,
+                format=format,
+            )
+            return engine.render(video_path, frame_time=frame_time)
+        except Exception as e:
+            logger.exception(f"Ошибка при генерации набора превью видео: {e}")
+            return None
+
     @staticmethod
     def generate_video_preview_stub(size=(300, 300), format='webp') -> Optional[bytes]:
         """Создает заглушку для превью видео с поддержкой WebP"""
@@ -3,6 +3,7 @@
 Скрипт для регенерации всех существующих превью с улучшенными параметрами.
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -13,22 +14,72 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 logger = get_logger(__name__)
 
+
+def _resolve(storage_root: Path, path):
+    """Resolve a stored path (absolute or relative to storage root)."""
+    if not path:
+        return None
+    candidate = Path(path)
+    return candidate if candidate.is_absolute() else storage_root / candidate
+
+
+def _hash_file(path: Path) -> str:
+    """Content hash of a file without reading it into memory at once."""
+    from app.services.blob_store import content_hasher
+    hasher = content_hasher()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _is_blob_store_path(storage_root: Path, path) -> bool:
+    """Whether a stored path lives in the shared blob store ({type}/blobs/...)."""
+    resolved = _resolve(storage_root, path)
+    if resolved is None:
+        return False
+    try:
+        parts = resolved.relative_to(storage_root).parts
+    except ValueError:
+        return False
+    return len(parts) > 2 and parts[1] == "blobs"
+
+
+def _record_blob(database, blob_store, record, company_id, content_type: str, path_field: str):
+    """Blob a portrait or video row points at, or None for legacy per-record files."""
+    content_hash = record.get("blob_hash")
+    if not content_hash:
+        return None
+    blob = database.get_blob(content_hash, company_id or "", content_type)
+    if blob is None or not blob_store.is_blob_path(blob, record.get(path_field)):
+        return None
+    return blob
+
+
+def _remove_legacy_preview(storage_root: Path, old_path, new_path) -> None:
+    """Delete a replaced per-record preview; shared blob previews are never deleted here."""
+    old_file = _resolve(storage_root, old_path)
+    if old_file is None or old_file == _resolve(storage_root, new_path):
+        return
+    if _is_blob_store_path(storage_root, old_file) or not old_file.exists():
+        return
+    os.remove(old_file)
+
+
 def regenerate_previews():
     """Регенерирует все превью с новыми параметрами."""
+    from app.config import settings
     from app.database import Database
-    from preview_generator import PreviewGenerator
-    from app.main import get_current_app
+    from app.main import create_app, get_current_app
+    from app.services.blob_store import get_blob_store
+    from preview_generator import ImagePreviewEngine, PreviewGenerator
     
     # Инициализация приложения
     try:
         app = get_current_app()
         if not app:
-            from app.config import settings
-            from app.main import create_app
             app = create_app()
     except:
-        from app.config import settings
-        from app.main import create_app
         app = create_app()
     
     database = app.state.database
@@ -38,48 +89,69 @@ def regenerate_previews():
     portraits = database.list_portraits()
     logger.info(f"Found {len(portraits)} portraits to regenerate previews for")
     
-    # Регенерируем превью портретов
+    # Регенерируем превью портретов: квадратное превью и адаптивные варианты
+    # строятся из одного декодирования каждого изображения
+    engine = ImagePreviewEngine(
+        widths=settings.IMAGE_PREVIEW_WIDTHS,
+        formats=settings.IMAGE_PREVIEW_FORMATS,
+        square_size=(300, 300),
+    )
+    blob_store = get_blob_store(database, app.state.storage_manager, storage_root)
+    company_by_client = {}
+    # content hash -> shared preview path already regenerated in this run
+    regenerated_blobs = {}
+    
     for portrait in portraits:
         try:
             portrait_id = portrait["id"]
             image_path = portrait.get("image_path")
+            image_file = _resolve(storage_root, image_path)
             
-            if not image_path or not Path(image_path).exists():
+            if image_file is None or not image_file.exists():
                 logger.warning(f"Image file not found for portrait {portrait_id}: {image_path}")
                 continue
             
-            # Читаем оригинальное изображение
-            with open(image_path, "rb") as f:
-                image_content = f.read()
-            
-            # Генерируем новое превью
-            new_preview = PreviewGenerator.generate_image_preview(
-                image_content, 
-                size=(300, 300), 
-                format='webp'
-            )
+            # Генерируем превью прямо из сохраненного файла
+            previews = engine.render(image_file)
             
-            if new_preview:
-                # Определяем путь для нового превью
+            if previews and previews.square:
                 client_id = portrait["client_id"]
-                preview_dir = storage_root / "portraits" / client_id
-                preview_dir.mkdir(parents=True, exist_ok=True)
+                if client_id not in company_by_client:
+                    client = database.get_client(client_id)
+                    company_by_client[client_id] = client.get("company_id") if client else None
+                company_id = company_by_client[client_id]
                 
-                new_preview_path = preview_dir / f"{portrait_id}_preview.webp"
-                
-                # Сохраняем новое превью
-                with open(new_preview_path, "wb") as f:
-                    f.write(new_preview)
+                blob = _record_blob(database, blob_store, portrait, company_id, "portraits", "image_path")
+                if blob is not None:
+                    # Общее превью blob: перезаписываем один раз для всех портретов с этим содержимым
+                    if blob["content_hash"] not in regenerated_blobs:
+                        asyncio.run(blob_store.save_preview(blob, previews.square))
+                        regenerated_blobs[blob["content_hash"]] = blob["preview_path"]
+                    new_preview_path = regenerated_blobs[blob["content_hash"]]
+                else:
+                    # Определяем путь для нового превью
+                    preview_dir = storage_root / "portraits" / client_id
+                    preview_dir.mkdir(parents=True, exist_ok=True)
+                    
+                    new_preview_path = str(preview_dir / f"{portrait_id}_preview.webp")
+                    
+                    # Сохраняем новое превью
+                    with open(new_preview_path, "wb") as f:
+                        f.write(previews.square)
                 
                 # Обновляем путь в базе данных
-                database.update_portrait_preview(portrait_id, str(new_preview_path))
+                database.update_portrait_preview(portrait_id, new_preview_path)
+                
+                # Удаляем старое превью если существует (кроме общих превью blob)
+                _remove_legacy_preview(storage_root, portrait.get("image_preview_path"), new_preview_path)
                 
-                # Удаляем старое превью если существует
-                old_preview_path = portrait.get("image_preview_path")
-                if old_preview_path and Path(old_preview_path).exists():
-                    os.remove(old_preview_path)
+                # Регистрируем адаптивные варианты (общие для одинакового содержимого)
+                content_hash = portrait.get("blob_hash") or _hash_file(image_file)
+                asyncio.run(blob_store.save_preview_variants(
+                    content_hash, company_id, "portraits", previews.variants,
+                ))
                 
-                logger.info(f"Regenerated preview for portrait {portrait_id}")
+                logger.info(f"Regenerated {len(previews.variants)} previews for portrait {portrait_id}")
             else:
                 logger.error(f"Failed to generate preview for portrait {portrait_id}")
                 
@@ -93,49 +165,52 @@ def regenerate_previews():
         videos.extend(portrait_videos)
     
     logger.info(f"Found {len(videos)} videos to regenerate previews for")
+    regenerated_video_blobs = {}
     
     for video in videos:
         try:
             video_id = video["id"]
-            video_path = video.get("video_path")
+            video_path = _resolve(storage_root, video.get("video_path"))
             
-            if not video_path or not Path(video_path).exists():
+            if video_path is None or not video_path.exists():
                 logger.warning(f"Video file not found for video {video_id}: {video_path}")
                 continue
             
-            # Читаем оригинальное видео
-            with open(video_path, "rb") as f:
-                video_content = f.read()
-            
-            # Генерируем новое превью
+            # Генерируем новое превью прямо из сохраненного файла
             new_preview = PreviewGenerator.generate_video_preview(
-                video_content, 
+                video_path, 
                 size=(300, 300), 
                 format='webp'
             )
             
             if new_preview:
-                # Определяем путь для нового превью
-                portrait_id = video["portrait_id"]
-                portrait_info = database.get_portrait(portrait_id)
-                client_id = portrait_info["client_id"] if portrait_info else "unknown"
-                
-                preview_dir = storage_root / "portraits" / client_id / portrait_id
-                preview_dir.mkdir(parents=True, exist_ok=True)
-                
-                new_preview_path = preview_dir / f"{video_id}_preview.webp"
-                
-                # Сохраняем новое превью
-                with open(new_preview_path, "wb") as f:
-                    f.write(new_preview)
+                blob = _record_blob(database, blob_store, video, None, "videos", "video_path")
+                if blob is not None:
+                    # Общее превью blob: перезаписываем один раз для всех видео с этим содержимым
+                    if blob["content_hash"] not in regenerated_video_blobs:
+                        asyncio.run(blob_store.save_preview(blob, new_preview))
+                        regenerated_video_blobs[blob["content_hash"]] = blob["preview_path"]
+                    new_preview_path = regenerated_video_blobs[blob["content_hash"]]
+                else:
+                    # Определяем путь для нового превью
+                    portrait_id = video["portrait_id"]
+                    portrait_info = database.get_portrait(portrait_id)
+                    client_id = portrait_info["client_id"] if portrait_info else "unknown"
+                    
+                    preview_dir = storage_root / "portraits" / client_id / portrait_id
+                    preview_dir.mkdir(parents=True, exist_ok=True)
+                    
+                    new_preview_path = str(preview_dir / f"{video_id}_preview.webp")
+                    
+                    # Сохраняем новое превью
+                    with open(new_preview_path, "wb") as f:
+                        f.write(new_preview)
                 
                 # Обновляем путь в базе данных
-                database.update_video_preview(video_id, str(new_preview_path))
+                database.update_video_preview(video_id, new_preview_path)
                 
-                # Удаляем старое превью если существует
-                old_preview_path = video.get("video_preview_path")
-                if old_preview_path and Path(old_preview_path).exists():
-                    os.remove(old_preview_path)
+                # Удаляем старое превью если существует (кроме общих превью blob)
+                _remove_legacy_preview(storage_root, video.get("video_preview_path"), new_preview_path)
                 
                 logger.info(f"Regenerated preview for video {video_id}")
             else:
@@ -38,6 +38,10 @@ class RemoteStorage(ABC):
         """Delete a file from remote storage."""
         pass
     
+    def create_directory(self, remote_dir: str) -> Dict[str, Any]:
+        """Create a directory (and its parents) if the provider has directories."""
+        return {"success": True, "remote_path": remote_dir}
+    
     @abstractmethod
     def get_storage_info(self) -> Dict[str, Any]:
         """Get storage quota and usage information."""
@@ -53,6 +57,7 @@ class YandexDiskStorage(RemoteStorage):
     """Yandex Disk storage implementation."""
     
     BASE_URL = "https://cloud-api.yandex.net/v1/disk"
+    LIST_PAGE_SIZE = 1000
     
     def __init__(self, oauth_token: str):
         """
@@ -184,33 +189,54 @@ class YandexDiskStorage(RemoteStorage):
             return {"success": False, "error": str(e)}
     
     def list_files(self, remote_dir: str = "disk:/") -> List[Dict[str, Any]]:
-        """List files in Yandex Disk directory."""
+        """List files in Yandex Disk directory (all pages)."""
         try:
-            response = self._make_request(
-                "GET",
-                "/resources",
-                params={"path": remote_dir, "limit": 1000}
-            )
-            data = response.json()
-            
             files = []
-            for item in data.get("_embedded", {}).get("items", []):
-                if item.get("type") == "file":
-                    files.append({
-                        "name": item.get("name"),
-                        "path": item.get("path"),
-                        "size": item.get("size", 0),
-                        "created": item.get("created"),
-                        "modified": item.get("modified"),
-                        "mime_type": item.get("mime_type")
-                    })
-            
-            return files
+            offset = 0
+            while True:
+                response = self._make_request(
+                    "GET",
+                    "/resources",
+                    params={"path": remote_dir, "limit": self.LIST_PAGE_SIZE, "offset": offset}
+                )
+                items = response.json().get("_embedded", {}).get("items", [])
+                
+                for item in items:
+                    if item.get("type") == "file":
+                        files.append({
+                            "name": item.get("name"),
+                            "path": item.get("path"),
+                            "size": item.get("size", 0),
+                            "created": item.get("created"),
+                            "modified": item.get("modified"),
+                            "mime_type": item.get("mime_type")
+                        })
+                
+                if len(items) < self.LIST_PAGE_SIZE:
+                    return files
+                offset += len(items)
             
         except Exception as e:
             logger.error("Failed to list Yandex Disk files", error=str(e))
             return []
     
+    def create_directory(self, remote_dir: str) -> Dict[str, Any]:
+        """Create a folder and its missing parents on Yandex Disk."""
+        path = ""
+        try:
+            for part in remote_dir.strip("/").split("/"):
+                path = f"{path}/{part}" if path else part
+                try:
+                    self._make_request("PUT", "/resources", params={"path": path})
+                except requests.exceptions.HTTPError as e:
+                    # 409: the folder already exists
+                    if e.response is None or e.response.status_code != 409:
+                        raise
+            return {"success": True, "remote_path": remote_dir}
+        except Exception as e:
+            logger.error("Failed to create Yandex Disk folder", error=str(e), remote_path=path)
+            return {"success": False, "error": str(e)}
+    
     def delete_file(self, remote_path: str) -> Dict[str, Any]:
         """Delete file from Yandex Disk."""
         try:
@@ -417,28 +443,31 @@ class GoogleDriveStorage(RemoteStorage):
             if self.folder_id:
                 query += f" and '{self.folder_id}' in parents"
             
-            response = self._make_request(
-                "GET",
-                "/files",
-                params={
+            files = []
+            page_token = None
+            while True:
+                params = {
                     "q": query,
-                    "fields": "files(id, name, size, createdTime, modifiedTime, mimeType)",
+                    "fields": "nextPageToken, files(id, name, size, createdTime, modifiedTime, mimeType)",
                     "pageSize": 1000
                 }
-            )
-            
-            files = []
-            for item in response.json().get("files", []):
-                files.append({
-                    "id": item.get("id"),
-                    "name": item.get("name"),
-                    "size": int(item.get("size", 0)),
-                    "created": item.get("createdTime"),
-                    "modified": item.get("modifiedTime"),
-                    "mime_type": item.get("mimeType")
-                })
-            
-            return files
+                if page_token:
+                    params["pageToken"] = page_token
+                data = self._make_request("GET", "/files", params=params).json()
+                
+                for item in data.get("files", []):
+                    files.append({
+                        "id": item.get("id"),
+                        "name": item.get("name"),
+                        "size": int(item.get("size", 0)),
+                        "created": item.get("createdTime"),
+                        "modified": item.get("modifiedTime"),
+                        "mime_type": item.get("mimeType")
+                    })
+                
+                page_token = data.get("nextPageToken")
+                if not page_token:
+                    return files
             
         except Exception as e:
             logger.error("Failed to list Google Drive files", error=str(e))
@@ -90,7 +90,9 @@ class StorageConfig:
                 "auto_split_backups": True,
                 "max_backup_size_mb": 500,
                 "chunk_size_mb": 100,
-                "compression": "gz"
+                "compression": "gz",
+                "storage_backup_mode": "incremental",
+                "snapshot_chunk_size_mb": 4
             },
             "yandex_disk": {
                 "oauth_token": "",
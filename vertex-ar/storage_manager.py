@@ -5,6 +5,7 @@ Manages different storage adapters for different content types.
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from app.media_cache import delete_through, invalidate_cached, read_through
 from app.storage import StorageAdapter
 from app.storage_local import LocalStorageAdapter
 from app.storage_minio import MinioStorageAdapter
@@ -82,7 +83,10 @@ class StorageManager:
                 cache_ttl=settings.YANDEX_DIRECTORY_CACHE_TTL,
                 cache_size=settings.YANDEX_DIRECTORY_CACHE_SIZE,
                 pool_connections=settings.YANDEX_SESSION_POOL_CONNECTIONS,
-                pool_maxsize=settings.YANDEX_SESSION_POOL_MAXSIZE
+                pool_maxsize=settings.YANDEX_SESSION_POOL_MAXSIZE,
+                http_client=settings.YANDEX_HTTP_CLIENT,
+                limit_per_host=settings.YANDEX_HTTP_LIMIT_PER_HOST,
+                keepalive_timeout=settings.YANDEX_HTTP_KEEPALIVE_TIMEOUT
             )
         
         else:
@@ -119,7 +123,9 @@ class StorageManager:
             Public URL to access the file
         """
         adapter = self.get_adapter(content_type)
-        return await adapter.save_file(file_data, file_path)
+        url = await adapter.save_file(file_data, file_path)
+        invalidate_cached(adapter, file_path)
+        return url
     
     async def get_file(self, file_path: str, content_type: str = "portraits") -> bytes:
         """Get file using appropriate adapter.
@@ -132,7 +138,7 @@ class StorageManager:
             Raw file data
         """
         adapter = self.get_adapter(content_type)
-        return await adapter.get_file(file_path)
+        return await read_through(adapter, file_path)
     
     async def delete_file(self, file_path: str, content_type: str = "portraits") -> bool:
         """Delete file using appropriate adapter.
@@ -145,7 +151,7 @@ class StorageManager:
             True if deleted successfully
         """
         adapter = self.get_adapter(content_type)
-        return await adapter.delete_file(file_path)
+        return await delete_through(adapter, file_path)
     
     async def file_exists(self, file_path: str, content_type: str = "portraits") -> bool:
         """Check if file exists using appropriate adapter.
@@ -303,7 +309,10 @@ class StorageManager:
                     cache_ttl=settings.YANDEX_DIRECTORY_CACHE_TTL,
                     cache_size=settings.YANDEX_DIRECTORY_CACHE_SIZE,
                     pool_connections=settings.YANDEX_SESSION_POOL_CONNECTIONS,
-                    pool_maxsize=settings.YANDEX_SESSION_POOL_MAXSIZE
+                    pool_maxsize=settings.YANDEX_SESSION_POOL_MAXSIZE,
+                    http_client=settings.YANDEX_HTTP_CLIENT,
+                    limit_per_host=settings.YANDEX_HTTP_LIMIT_PER_HOST,
+                    keepalive_timeout=settings.YANDEX_HTTP_KEEPALIVE_TIMEOUT
                 )
         
         else: